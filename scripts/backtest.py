@@ -23,6 +23,8 @@ if env_path.exists():
 
 from loguru import logger
 from src.trading.backtesting import BacktestEngine
+from src.trading.monte_carlo import MonteCarloAnalyzer
+from src.trading.result_store import BacktestResultStore
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.trading.strategies.scalping_strategy import ScalpingStrategy
 from src.trading.strategies.improved_breakout_strategy import ImprovedBreakoutStrategy
@@ -80,6 +82,9 @@ Przykłady:
   # Test z własnymi parametrami
   python scripts/backtest.py --strategy=scalping_strategy --symbol=BTC-USD --days=90 \\
     --param min_confidence=3.0 --param rsi_oversold=30
+
+  # Odporność wyniku: 10 000 symulacji Monte Carlo na logu transakcji
+  python scripts/backtest.py --strategy=piotrek_breakout_strategy --days=90 --monte-carlo=10000
         """
     )
     
@@ -132,14 +137,14 @@ Przykłady:
         "--position-size",
         type=float,
         default=10.0,
-        help="% kapitału na pozycję (domyślnie: 10%)"
+        help="%% kapitału na pozycję (domyślnie: 10%%)"
     )
     
     parser.add_argument(
         "--slippage",
         type=float,
         default=0.1,
-        help="Slippage w % (domyślnie: 0.1%)"
+        help="Slippage w %% (domyślnie: 0.1%%)"
     )
     
     parser.add_argument(
@@ -157,7 +162,42 @@ Przykłady:
         help="Parametr strategii (można użyć wielokrotnie, np. --param min_confidence=5.0)"
     )
     
+    # Monte Carlo
+    parser.add_argument(
+        "--monte-carlo",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Liczba symulacji Monte Carlo/bootstrap na logu transakcji (domyślnie: 0 = wyłączone)"
+    )
+    
+    parser.add_argument(
+        "--mc-block-size",
+        type=int,
+        default=5,
+        help="Długość bloku (w transakcjach) dla block bootstrap (domyślnie: 5)"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Ziarno losowania Monte Carlo (powtarzalne wyniki)"
+    )
+    
     # Inne
+    parser.add_argument(
+        "--no-data-cache",
+        action="store_true",
+        help="Pobieraj świece bezpośrednio z giełdy (bez lokalnego cache w data/)"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Używaj cache wyników (data/backtest_results) - powtórny run zwraca zapisany wynik"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -227,7 +267,8 @@ Przykłady:
     engine = BacktestEngine(
         initial_balance=args.balance,
         slippage_percent=args.slippage,
-        leverage=args.leverage
+        leverage=args.leverage,
+        result_store=BacktestResultStore() if args.cache else None
     )
     
     # Pobierz dane historyczne
@@ -238,7 +279,8 @@ Przykłady:
         symbol=args.symbol,
         timeframe=timeframe,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        use_cache=not args.no_data_cache
     )
     
     if df.empty:
@@ -262,6 +304,16 @@ Przykłady:
     # Wyświetl wyniki
     engine.print_results(result)
     
+    # Analiza odporności
+    if args.monte_carlo > 0:
+        if result.total_trades < 2:
+            logger.warning("⚠️ Za mało transakcji do analizy Monte Carlo")
+        else:
+            analyzer = MonteCarloAnalyzer.from_result(result, seed=args.seed)
+            MonteCarloAnalyzer.print_report(
+                analyzer.run_all(args.monte_carlo, block_size=args.mc_block_size)
+            )
+    
     # Podsumowanie
     print("\n" + "=" * 70)
     if result.total_return > 0:
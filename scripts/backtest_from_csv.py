@@ -24,6 +24,7 @@ if env_path.exists():
 
 from loguru import logger
 from src.trading.backtesting import BacktestEngine, BacktestResult
+from src.trading.result_store import BacktestResultStore
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.trading.strategies.scalping_strategy import ScalpingStrategy
 from src.trading.strategies.improved_breakout_strategy import ImprovedBreakoutStrategy
@@ -187,6 +188,12 @@ Przykłady:
         help="Rozmiar pozycji w procentach (domyślnie: 10.0)"
     )
     
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Używaj cache wyników (data/backtest_results) - powtórny run zwraca zapisany wynik"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -258,7 +265,8 @@ Przykłady:
     engine = BacktestEngine(
         initial_balance=args.balance,
         slippage_percent=args.slippage,
-        leverage=args.leverage
+        leverage=args.leverage,
+        result_store=BacktestResultStore() if args.cache else None
     )
     
     # Uruchom backtest
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Store CLI
+=========================
+Przeglądanie, porównywanie i czyszczenie zapisanych wyników backtestu
+(cache z --cache w backtest.py, backtest_from_csv.py, optimize_strategy.py).
+
+Użycie:
+    python scripts/backtest_store.py list [--strategy=piotrek] [--symbol=BTC-USD]
+    python scripts/backtest_store.py show 3fa9c1
+    python scripts/backtest_store.py compare 3fa9c1 b72e04 ...
+    python scripts/backtest_store.py prune --older-than=30 [--keep-last=20] [--dry-run]
+"""
+
+import sys
+import argparse
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+# Dodaj ścieżkę projektu
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.trading.backtesting import BacktestEngine
+from src.trading.result_store import BacktestResultStore
+
+
+def cmd_list(store: BacktestResultStore, args) -> int:
+    runs = store.list_runs(strategy=args.strategy, symbol=args.symbol)
+    if not runs:
+        print(f"Brak zapisanych runów w {store.directory}")
+        return 0
+    
+    print(f"{'klucz':<14} {'utworzono':<20} {'strategia':<28} {'symbol':<10} {'zwrot':>9} {'trans.':>7} {'max DD':>8} {'Sharpe':>7} {'rozmiar':>9}")
+    for run in runs[:args.limit]:
+        summary = run.get("summary", {})
+        print(
+            f"{run['key'][:12]:<14} {run.get('created_at', '')[:19]:<20} "
+            f"{str(run.get('strategy', ''))[:27]:<28} {str(run.get('symbol', '')):<10} "
+            f"{summary.get('total_return', 0):>8.2f}% {summary.get('total_trades', 0):>7} "
+            f"{summary.get('max_drawdown', 0):>7.2f}% {summary.get('sharpe_ratio', 0):>7.2f} "
+            f"{run['size_bytes'] / 1024:>7.1f}KB"
+        )
+    total = sum(run["size_bytes"] for run in runs)
+    print(f"\n{len(runs)} runów, {total / 1024 / 1024:.2f} MB")
+    return 0
+
+
+def cmd_show(store: BacktestResultStore, args) -> int:
+    result = store.load(args.key)
+    run = next(r for r in store.list_runs() if r["key"] == store.resolve(args.key))
+    print(f"Klucz:    {run['key']}")
+    print(f"Utworzono: {run.get('created_at')}")
+    print(f"Okres:    {run.get('period')}")
+    print(f"Config:   {run.get('config')}")
+    print(f"Silnik:   {run.get('engine')}")
+    print(f"Run:      {run.get('run')}")
+    
+    BacktestEngine.print_results(result)
+    return 0
+
+
+def cmd_compare(store: BacktestResultStore, args) -> int:
+    table = store.compare(args.keys)
+    with pd.option_context("display.max_columns", None, "display.width", 200):
+        print(table.T.to_string())
+    return 0
+
+
+def cmd_prune(store: BacktestResultStore, args) -> int:
+    if args.older_than is None and args.keep_last is None and not args.all:
+        logger.error("Podaj --older-than, --keep-last lub --all")
+        return 1
+    
+    removed = store.prune(
+        older_than=timedelta(days=args.older_than) if args.older_than is not None else None,
+        keep_last=args.keep_last,
+        strategy=args.strategy,
+        dry_run=args.dry_run
+    )
+    action = "Do usunięcia" if args.dry_run else "Usunięto"
+    print(f"{action}: {len(removed)} runów")
+    for key in removed:
+        print(f"  {key}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Zarządzanie zapisanymi wynikami backtestu"
+    )
+    parser.add_argument(
+        '--dir',
+        type=str,
+        default=None,
+        help='Katalog wyników (domyślnie: data/backtest_results)'
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    list_parser = subparsers.add_parser("list", help="Lista zapisanych runów")
+    list_parser.add_argument('--strategy', type=str, help='Filtr po nazwie strategii')
+    list_parser.add_argument('--symbol', type=str, help='Filtr po symbolu')
+    list_parser.add_argument('--limit', type=int, default=50, help='Maks. liczba wierszy (domyślnie: 50)')
+    
+    show_parser = subparsers.add_parser("show", help="Szczegóły runu")
+    show_parser.add_argument('key', help='Klucz runu lub jego prefiks')
+    
+    compare_parser = subparsers.add_parser("compare", help="Porównanie runów (statystyki i parametry)")
+    compare_parser.add_argument('keys', nargs="+", help='Klucze runów lub ich prefiksy')
+    
+    prune_parser = subparsers.add_parser("prune", help="Usuwanie runów")
+    prune_parser.add_argument('--older-than', type=float, help='Usuń runy starsze niż N dni')
+    prune_parser.add_argument('--keep-last', type=int, help='Zachowaj N najnowszych runów per strategia')
+    prune_parser.add_argument('--strategy', type=str, help='Ogranicz do strategii')
+    prune_parser.add_argument('--all', action='store_true', help='Usuń wszystkie runy')
+    prune_parser.add_argument('--dry-run', action='store_true', help='Tylko pokaż, co zostałoby usunięte')
+    
+    args = parser.parse_args()
+    store = BacktestResultStore(args.dir)
+    
+    commands = {"list": cmd_list, "show": cmd_show, "compare": cmd_compare, "prune": cmd_prune}
+    try:
+        return commands[args.command](store, args)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
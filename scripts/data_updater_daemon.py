@@ -4,6 +4,10 @@ Data Updater Daemon
 ===================
 Skrypt działający w tle, który aktualizuje dane OHLCV i tickers co 1 minutę.
 
+Cykl to graf zadań asyncio: każda giełda ma własny budżet zapytań, świece
+wszystkich symboli i tickery (jedno zapytanie na giełdę) są pobierane
+równolegle, a zapis do bazy odbywa się jedną partią na końcu cyklu.
+
 Użycie:
     python scripts/data_updater_daemon.py
     python scripts/data_updater_daemon.py --symbols=BTC/USDC,ETH/USDC --exchanges=binance,dydx
@@ -16,10 +20,12 @@ import os
 import sys
 import time
 import signal
+import asyncio
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import traceback
 
 # Dodaj ścieżkę projektu
@@ -41,6 +47,7 @@ from loguru import logger
 import pandas as pd
 from src.database.manager import DatabaseManager
 from src.collectors.exchange.binance_collector import BinanceCollector
+from src.utils.rate_limiter import AsyncRateLimiter
 
 # Spróbuj zaimportować dYdX collector
 try:
@@ -51,6 +58,17 @@ except ImportError:
     logger.warning("DydxCollector niedostępny - używam tylko Binance")
 
 
+# Budżet zapytań do API per giełda (zapytania/s)
+EXCHANGE_RATE_LIMITS = {
+    "binance": 10.0,
+    "dydx": 8.0,
+}
+DEFAULT_RATE_LIMIT = 2.0
+
+# Maksymalna liczba równoległych zapytań do jednej giełdy
+MAX_CONCURRENT_REQUESTS = 8
+
+
 class DataUpdaterDaemon:
     """
     Daemon do aktualizacji danych OHLCV i tickers.
@@ -61,7 +79,9 @@ class DataUpdaterDaemon:
         symbols: List[str] = None,
         exchanges: List[str] = None,
         update_interval: int = 60,  # sekundy
-        database_url: Optional[str] = None
+        database_url: Optional[str] = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS
     ):
         """
         Inicjalizuje daemon.
@@ -71,12 +91,16 @@ class DataUpdaterDaemon:
             exchanges: Lista giełd (domyślnie: binance, dydx)
             update_interval: Interwał aktualizacji w sekundach (domyślnie: 60)
             database_url: URL bazy danych (domyślnie: z .env lub SQLite)
+            rate_limits: Budżet zapytań/s per giełda (domyślnie: EXCHANGE_RATE_LIMITS)
+            max_concurrent: Maksymalna liczba równoległych zapytań do jednej giełdy
         """
         # Domyślnie używamy BTC/USDC (spójne z strategiami i testami)
         # Daemon automatycznie znormalizuje to do odpowiedniego formatu dla każdej giełdy
         self.symbols = symbols or ["BTC/USDC"]
         self.exchanges = exchanges or ["binance", "dydx"]
         self.update_interval = update_interval
+        self.rate_limits = {**EXCHANGE_RATE_LIMITS, **(rate_limits or {})}
+        self.max_concurrent = max_concurrent
         self.running = False
         
         # Inicjalizuj bazę danych
@@ -111,6 +135,12 @@ class DataUpdaterDaemon:
         if not self.collectors:
             raise RuntimeError("Brak dostępnych kolektorów!")
         
+        # Wątki na blokujące zapytania kolektorów (+1 na zapis do bazy)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent * len(self.collectors) + 1,
+            thread_name_prefix="data-updater"
+        )
+        
         # Statystyki
         self.stats = {
             "start_time": datetime.now(timezone.utc),
@@ -160,85 +190,57 @@ class DataUpdaterDaemon:
             return symbol
         return symbol
     
-    def _update_ohlcv(self, exchange: str, symbol: str) -> int:
+    def _fetch_ohlcv(self, exchange: str, symbol: str) -> Optional[Tuple[str, pd.DataFrame, tuple]]:
         """
-        Aktualizuje dane OHLCV dla danego symbolu, uzupełniając brakujące dane.
+        Pobiera brakujące świece OHLCV dla danego symbolu (bez zapisu do bazy).
         
         Args:
             exchange: Nazwa giełdy
             symbol: Symbol pary
             
         Returns:
-            Liczba zapisanych świec
+            (symbol giełdy, świece, zakres pokrycia) lub None, gdy nie ma nic do zapisania
         """
         if exchange not in self.collectors:
-            return 0
+            return None
         
         collector = self.collectors[exchange]
         normalized_symbol = self._normalize_symbol(symbol, exchange)
         timeframe = "1m"
         
         try:
-            # Sprawdź ostatni timestamp w bazie
-            existing_df = self.db.get_ohlcv(
-                exchange=exchange,
-                symbol=normalized_symbol,
-                timeframe=timeframe,
-                limit=1
-            )
-            
             now = datetime.now(timezone.utc)
-            
-            if existing_df.empty:
-                # Baza jest pusta - pobierz dane z ostatnich 7 dni
-                logger.info(f"Baza pusta dla {exchange}:{normalized_symbol}, pobieram dane z ostatnich 7 dni")
-                since_date = now - timedelta(days=7)
-            else:
-                # Pobierz dane od ostatniego timestamp + 1 minuta
-                last_timestamp = existing_df.index[-1]
-                # Konwertuj na datetime jeśli potrzeba
-                if isinstance(last_timestamp, pd.Timestamp):
-                    last_timestamp_dt = last_timestamp.to_pydatetime()
-                else:
-                    last_timestamp_dt = last_timestamp
-                
-                if last_timestamp_dt.tzinfo is None:
-                    last_timestamp_dt = last_timestamp_dt.replace(tzinfo=timezone.utc)
-                
-                # Pobierz dane od ostatniego timestamp + 1 minuta do teraz
-                since_date = last_timestamp_dt + timedelta(minutes=1)
-                
-                # Upewnij się że since_date nie jest w przyszłości
-                if since_date > now:
-                    logger.debug(f"Ostatni timestamp ({last_timestamp_dt}) jest bardzo świeży, pobieram tylko ostatnie 5 minut")
-                    since_date = now - timedelta(minutes=5)
-                
-                # Jeśli ostatni timestamp jest bardzo stary (> 7 dni), ogranicz do 7 dni wstecz
-                max_age = now - timedelta(days=7)
-                if since_date < max_age:
-                    logger.warning(f"Ostatni timestamp ({last_timestamp_dt}) jest bardzo stary, ograniczam do 7 dni wstecz")
-                    since_date = max_age
-            
-            # Oblicz ile minut brakuje (maksymalnie 1000 świec dla Binance, 100 dla dYdX)
-            minutes_diff = (now - since_date).total_seconds() / 60
+            step = timedelta(minutes=1)
+            # Maksymalnie 1000 świec dla Binance, 100 dla dYdX na jedno zapytanie
             max_candles = 1000 if exchange == "binance" else 100
             
-            if minutes_diff > max_candles:
-                logger.warning(f"Za dużo brakujących minut ({minutes_diff:.0f}), ograniczam do {max_candles} świec")
-                since_date = now - timedelta(minutes=max_candles)
+            # Brakujące zakresy z ostatnich 7 dni (bez bieżącej, niezamkniętej świecy)
+            gaps = self.db.missing_ranges(
+                exchange, normalized_symbol, timeframe,
+                now - timedelta(days=7), now - step
+            )
+            if not gaps:
+                logger.debug(f"Brak brakujących świec dla {exchange}:{normalized_symbol}")
+                return None
+            
+            # Najpierw najnowsza dziura (ogon danych); starsze dziury w kolejnych cyklach
+            gap_start, gap_end = gaps[-1]
+            gap_start = max(gap_start, gap_end - (max_candles - 1) * step)
+            since_date = gap_start.tz_localize('UTC').to_pydatetime()
+            until_date = (gap_end + step).tz_localize('UTC').to_pydatetime()
             
-            logger.info(f"Pobieram {exchange}:{normalized_symbol} {timeframe} od {since_date} do {now}")
+            if len(gaps) > 1:
+                logger.info(f"{exchange}:{normalized_symbol}: {len(gaps)} brakujących zakresów w ostatnich 7 dniach")
+            logger.debug(f"Pobieram {exchange}:{normalized_symbol} {timeframe} od {since_date} do {until_date}")
             
             # Różne giełdy używają różnych metod
             if exchange == "dydx":
                 # dYdX używa fetch_candles
-                from_iso = since_date.isoformat()
-                to_iso = now.isoformat()
                 df = collector.fetch_candles(
                     ticker=normalized_symbol,
                     resolution=timeframe,
-                    from_iso=from_iso,
-                    to_iso=to_iso,
+                    from_iso=since_date.isoformat(),
+                    to_iso=until_date.isoformat(),
                     limit=max_candles
                 )
             else:
@@ -252,87 +254,62 @@ class DataUpdaterDaemon:
             
             if df.empty:
                 logger.debug(f"Brak nowych danych OHLCV dla {exchange}:{normalized_symbol}")
-                return 0
+                return None
             
-            # Filtruj tylko dane nowsze niż ostatni timestamp (jeśli istnieje)
-            if not existing_df.empty:
-                last_timestamp = existing_df.index[-1]
-                # Konwertuj na pandas Timestamp jeśli potrzeba
-                if isinstance(last_timestamp, pd.Timestamp):
-                    last_timestamp_pd = last_timestamp
-                else:
-                    last_timestamp_pd = pd.Timestamp(last_timestamp)
-                # Upewnij się że oba są w UTC
-                if last_timestamp_pd.tz is None:
-                    last_timestamp_pd = last_timestamp_pd.tz_localize('UTC')
-                elif last_timestamp_pd.tz != timezone.utc:
-                    last_timestamp_pd = last_timestamp_pd.tz_convert('UTC')
-                
-                # Upewnij się że df.index też jest w UTC
-                if df.index.tz is None:
-                    df.index = df.index.tz_localize('UTC')
-                elif df.index.tz != timezone.utc:
-                    df.index = df.index.tz_convert('UTC')
-                
-                df = df[df.index > last_timestamp_pd]
+            # Tylko świece z pobieranej dziury
+            if df.index.tz is None:
+                df.index = df.index.tz_localize('UTC')
+            df = df[(df.index >= since_date) & (df.index < until_date)]
             
             if df.empty:
-                logger.debug(f"Wszystkie dane już są w bazie dla {exchange}:{normalized_symbol}")
-                return 0
-            
-            # Zapisz do bazy
-            saved = self.db.save_ohlcv(
-                df=df,
-                exchange=exchange,
-                symbol=normalized_symbol,
-                timeframe=timeframe
-            )
-            
-            if saved > 0:
-                logger.info(f"✅ Zapisano {saved}/{len(df)} świec OHLCV: {exchange}:{normalized_symbol} (okres: {df.index.min()} → {df.index.max()})")
-            else:
-                logger.debug(f"Nie zapisano nowych świec (wszystkie były duplikatami)")
+                logger.debug(f"Brak świec w brakującym zakresie dla {exchange}:{normalized_symbol}")
+                return None
             
-            return saved
+            # Pobrany zakres (do ostatniej zwróconej świecy) trafia do indeksu pokrycia,
+            # więc świece, których giełda nie ma, nie są pobierane ponownie
+            return normalized_symbol, df, (since_date, df.index.max())
             
         except Exception as e:
-            logger.error(f"Błąd aktualizacji OHLCV {exchange}:{normalized_symbol}: {e}")
+            logger.error(f"Błąd pobierania OHLCV {exchange}:{normalized_symbol}: {e}")
             logger.debug(traceback.format_exc())
             self.stats["errors_count"] += 1
-            return 0
+            return None
     
-    def _update_ticker(self, exchange: str, symbol: str) -> int:
+    def _fetch_tickers(self, exchange: str) -> List[dict]:
         """
-        Aktualizuje dane tickera dla danego symbolu.
+        Pobiera tickery wszystkich symboli giełdy jednym zapytaniem.
         
         Args:
             exchange: Nazwa giełdy
-            symbol: Symbol pary
             
         Returns:
-            Liczba zapisanych tickerów
+            Lista rekordów tickera (kolumny tabeli tickers)
         """
         if exchange not in self.collectors:
-            return 0
+            return []
         
         collector = self.collectors[exchange]
-        normalized_symbol = self._normalize_symbol(symbol, exchange)
+        symbols = list(dict.fromkeys(self._normalize_symbol(s, exchange) for s in self.symbols))
         
         try:
-            # Pobierz aktualny ticker
-            ticker_dict = collector.get_ticker(normalized_symbol)
-            
+            tickers = collector.get_tickers(symbols)
+        except Exception as e:
+            logger.error(f"Błąd pobierania tickerów {exchange}: {e}")
+            logger.debug(traceback.format_exc())
+            self.stats["errors_count"] += 1
+            return []
+        
+        timestamp = datetime.now(timezone.utc)
+        records = []
+        for symbol in symbols:
+            ticker_dict = tickers.get(symbol)
             if not ticker_dict:
-                logger.debug(f"Brak danych tickera dla {exchange}:{normalized_symbol}")
-                return 0
-            
-            # Konwertuj dict na DataFrame
-            timestamp = datetime.now(timezone.utc)
+                logger.debug(f"Brak danych tickera dla {exchange}:{symbol}")
+                continue
             
             # Różne giełdy mają różne formaty tickera
             if exchange == "binance":
-                ticker_df = pd.DataFrame([{
-                    'timestamp': timestamp,
+                record = {
                     'price': ticker_dict.get('last', 0),
                     'bid': ticker_dict.get('bid', 0),
                     'ask': ticker_dict.get('ask', 0),
@@ -340,69 +317,109 @@ class DataUpdaterDaemon:
                     'high_24h': ticker_dict.get('high', 0),
                     'low_24h': ticker_dict.get('low', 0),
                     'change_24h': ticker_dict.get('percentage', 0),
-                }])
+                }
             elif exchange == "dydx":
-                ticker_df = pd.DataFrame([{
-                    'timestamp': timestamp,
+                record = {
                     'price': ticker_dict.get('oracle_price', 0),
                     'volume_24h': ticker_dict.get('volume_24h', 0),
                     'change_24h': ticker_dict.get('price_change_24h', 0),
                     'open_interest': ticker_dict.get('open_interest', 0),
                     'funding_rate': ticker_dict.get('next_funding_rate', 0),
-                }])
+                }
             else:
                 # Domyślny format
-                ticker_df = pd.DataFrame([{
-                    'timestamp': timestamp,
-                    'price': ticker_dict.get('price', ticker_dict.get('last', 0)),
-                }])
+                record = {'price': ticker_dict.get('price', ticker_dict.get('last', 0))}
             
-            ticker_df.set_index('timestamp', inplace=True)
-            
-            # Zapisz do bazy
-            saved = self.db.save_tickers(
-                df=ticker_df,
-                exchange=exchange,
-                symbol=normalized_symbol
+            records.append({'timestamp': timestamp, 'exchange': exchange, 'symbol': symbol, **record})
+        return records
+    
+    def _save_batch(self, ohlcv_batch: List[Tuple[str, str, pd.DataFrame, tuple]], ticker_records: List[dict]) -> Tuple[int, int]:
+        """
+        Zapisuje wyniki cyklu (wszystkie giełdy i symbole) z jednego wątku.
+        
+        Returns:
+            (zapisane świece, zapisane tickery)
+        """
+        ohlcv_saved = 0
+        if ohlcv_batch:
+            try:
+                # Świece wszystkich symboli jedną transakcją, rollupy raz na symbol
+                saved = self.db.save_ohlcv_batch(ohlcv_batch, timeframe="1m")
+                for exchange, symbol, df, _ in ohlcv_batch:
+                    count = saved.get((exchange, symbol), 0)
+                    ohlcv_saved += count
+                    if count > 0:
+                        logger.info(f"✅ Zapisano {count}/{len(df)} świec OHLCV: {exchange}:{symbol} (okres: {df.index.min()} → {df.index.max()})")
+            except Exception as e:
+                logger.error(f"Błąd zapisu OHLCV ({len(ohlcv_batch)} serii): {e}")
+                self.stats["errors_count"] += 1
+        
+        tickers_saved = 0
+        if ticker_records:
+            try:
+                tickers_saved = self.db.save_tickers_batch(pd.DataFrame(ticker_records))
+            except Exception as e:
+                logger.error(f"Błąd zapisu tickerów: {e}")
+                self.stats["errors_count"] += 1
+        
+        return ohlcv_saved, tickers_saved
+    
+    async def _update_cycle_async(self) -> Tuple[int, int]:
+        """
+        Cykl jako graf zadań asyncio.
+        
+        Każda giełda ma własny budżet zapytań (AsyncRateLimiter); świece wszystkich
+        symboli i tickery giełdy są pobierane równolegle w puli wątków, a zapis
+        do bazy odbywa się jedną partią po zakończeniu pobierania.
+        """
+        exchanges = [e for e in self.exchanges if e in self.collectors]
+        limiters = {
+            exchange: AsyncRateLimiter(
+                self.rate_limits.get(exchange, DEFAULT_RATE_LIMIT),
+                max_concurrent=self.max_concurrent
             )
-            
-            if saved > 0:
-                logger.debug(f"✅ Zapisano ticker: {exchange}:{normalized_symbol}")
-            
-            return saved
-            
-        except Exception as e:
-            logger.error(f"Błąd aktualizacji tickera {exchange}:{normalized_symbol}: {e}")
-            logger.debug(traceback.format_exc())
-            self.stats["errors_count"] += 1
-            return 0
+            for exchange in exchanges
+        }
+        
+        ohlcv_tasks = [
+            (exchange, limiters[exchange].call(self._fetch_ohlcv, exchange, symbol, executor=self._executor))
+            for exchange in exchanges
+            for symbol in self.symbols
+        ]
+        ticker_tasks = [
+            limiters[exchange].call(self._fetch_tickers, exchange, executor=self._executor)
+            for exchange in exchanges
+        ]
+        
+        results = await asyncio.gather(*(task for _, task in ohlcv_tasks), *ticker_tasks)
+        ohlcv_results, ticker_results = results[:len(ohlcv_tasks)], results[len(ohlcv_tasks):]
+        
+        ohlcv_batch = [
+            (exchange, *fetched)
+            for (exchange, _), fetched in zip(ohlcv_tasks, ohlcv_results)
+            if fetched is not None
+        ]
+        ticker_records = [record for records in ticker_results for record in records]
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._save_batch, ohlcv_batch, ticker_records)
+    
+    def _catch_up_rollups(self):
+        """Dociąga rollupy OHLCV dla świec 1m zapisanych poza daemonem (odczyty ich nie odświeżają)."""
+        for exchange in self.collectors:
+            for symbol in dict.fromkeys(self._normalize_symbol(s, exchange) for s in self.symbols):
+                try:
+                    self.db.refresh_ohlcv_rollups(exchange, symbol)
+                except Exception as e:
+                    logger.warning(f"Nie można odświeżyć rollupów OHLCV {exchange}:{symbol}: {e}")
     
     def _update_cycle(self):
         """Wykonuje jeden cykl aktualizacji."""
         cycle_start = datetime.now(timezone.utc)
-        ohlcv_total = 0
-        tickers_total = 0
         
         logger.info(f"🔄 Rozpoczynam cykl aktualizacji ({cycle_start.strftime('%Y-%m-%d %H:%M:%S')})")
         
-        for exchange in self.exchanges:
-            if exchange not in self.collectors:
-                continue
-            
-            for symbol in self.symbols:
-                # Aktualizuj OHLCV
-                ohlcv_saved = self._update_ohlcv(exchange, symbol)
-                ohlcv_total += ohlcv_saved
-                
-                # Małe opóźnienie między requestami
-                time.sleep(0.5)
-                
-                # Aktualizuj ticker
-                ticker_saved = self._update_ticker(exchange, symbol)
-                tickers_total += ticker_saved
-                
-                # Małe opóźnienie między symbolami
-                time.sleep(0.5)
+        ohlcv_total, tickers_total = asyncio.run(self._update_cycle_async())
         
         # Aktualizuj statystyki
         self.stats["updates_count"] += 1
@@ -416,6 +433,8 @@ class DataUpdaterDaemon:
             f"✅ Cykl zakończony: {ohlcv_total} świec OHLCV, {tickers_total} tickerów "
             f"(czas: {cycle_duration:.1f}s)"
         )
+        if cycle_duration > self.update_interval:
+            logger.warning(f"Cykl ({cycle_duration:.1f}s) dłuższy niż interwał aktualizacji ({self.update_interval}s)")
     
     def _print_stats(self):
         """Drukuje statystyki daemona."""
@@ -441,8 +460,11 @@ class DataUpdaterDaemon:
         logger.info(f"   Symbole: {', '.join(self.symbols)}")
         logger.info("   Naciśnij Ctrl+C aby zatrzymać\n")
         
+        self._catch_up_rollups()
+        
         try:
             while self.running:
+                cycle_started = time.monotonic()
                 try:
                     self._update_cycle()
                     
@@ -455,14 +477,15 @@ class DataUpdaterDaemon:
                     logger.debug(traceback.format_exc())
                     self.stats["errors_count"] += 1
                 
-                # Czekaj do następnego cyklu
+                # Czekaj do następnego cyklu (interwał liczony od startu cyklu)
                 if self.running:
-                    time.sleep(self.update_interval)
+                    time.sleep(max(0.0, self.update_interval - (time.monotonic() - cycle_started)))
                     
         except KeyboardInterrupt:
             logger.info("Otrzymano sygnał przerwania")
         finally:
             logger.info("Zatrzymywanie daemona...")
+            self._executor.shutdown(wait=False)
             self._print_stats()
             logger.info("✅ Daemon zatrzymany")
 
@@ -491,6 +514,13 @@ def main():
         help="Interwał aktualizacji w sekundach (domyślnie: 60)"
     )
     
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=MAX_CONCURRENT_REQUESTS,
+        help=f"Maks. liczba równoległych zapytań do jednej giełdy (domyślnie: {MAX_CONCURRENT_REQUESTS})"
+    )
+    
     parser.add_argument(
         "--database-url",
         default=None,
@@ -535,7 +565,8 @@ def main():
         symbols=symbols,
         exchanges=exchanges,
         update_interval=args.interval,
-        database_url=args.database_url
+        database_url=args.database_url,
+        max_concurrent=args.max_concurrent
     )
     
     daemon.run()
@@ -40,6 +40,11 @@ if env_file.exists():
 from loguru import logger
 from src.database.manager import DatabaseManager
 from src.collectors.sentiment.gdelt_collector import GDELTCollector
+from src.collectors.sentiment.sentiment_snapshots import load_sentiment_history
+from src.collectors.sentiment.streaming_lag_tracker import StreamingLagTracker, published_path
+
+# Okno macierzy lag-ów publikowanej dla strategii (jak days_back w SentimentWaveTracker)
+LAG_TRACKER_WINDOW_DAYS = 7
 
 # Mapowanie krajów na języki
 COUNTRY_LANGUAGES = {
@@ -154,6 +159,9 @@ class GDELTSentimentDaemon:
             logger.error(f"Nie można zainicjalizować GDELTCollector: {e}")
             raise
         
+        # Przyrostowa macierz lag-ów dla zapytania
+        self.lag_tracker = StreamingLagTracker(self.countries, window_hours=LAG_TRACKER_WINDOW_DAYS * 24)
+        
         # Statystyki
         self.stats = {
             "cycles_count": 0,
@@ -272,6 +280,25 @@ class GDELTSentimentDaemon:
             self.stats["errors_count"] += 1
             return False
     
+    def _update_lag_tracker(self):
+        """Wprowadza nowe/poprawione kubełki do StreamingLagTracker i publikuje macierz lag-ów."""
+        try:
+            tracker = self.lag_tracker
+            if tracker.last_bucket is None:
+                start = datetime.now(timezone.utc) - timedelta(days=LAG_TRACKER_WINDOW_DAYS)
+            else:
+                # Cykl nadpisuje ostatnie days_back dni - wczytaj je ponownie
+                start = tracker.last_bucket - timedelta(days=self.days_back)
+            df = load_sentiment_history(
+                self.db, self.query, self.countries, start, use_llm_data=False, query=self.query
+            )
+            changed = tracker.sync(df) if not df.empty else 0
+            
+            path = tracker.publish(published_path("gdelt", self.query), query=self.query, source="gdelt")
+            logger.debug(f"Macierz lag-ów: {changed} nowych/poprawionych kubełków, {len(tracker)} w oknie → {path}")
+        except Exception as e:
+            logger.warning(f"Nie można zaktualizować macierzy lag-ów: {e}")
+    
     def run(self):
         """Główna pętla daemona."""
         logger.info("=" * 60)
@@ -300,6 +327,8 @@ class GDELTSentimentDaemon:
                 self.stats["cycles_count"] += 1
                 self.stats["last_update"] = cycle_start
                 
+                self._update_lag_tracker()
+                
                 # Podsumowanie cyklu
                 logger.info(
                     f"✅ Cykl zakończony: {self.stats['records_saved']} rekordów łącznie, "
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Generate Synthetic Market Data
+==============================
+Generuje syntetyczne świece 1m, tickery (funding rate, open interest),
+snapshoty arkusza zleceń i sentyment regionów (LLM, GDELT) do testów
+obciążeniowych - zapis paczkami do bazy lub do plików Parquet.
+
+Użycie:
+    python scripts/generate_synthetic_data.py --symbols=BTC/USDC,ETH/USDC --days=30 --database-url=sqlite:///data/synthetic.db
+    python scripts/generate_synthetic_data.py --symbols=24 --days=730 --parquet=data/synthetic
+"""
+
+import sys
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from loguru import logger
+
+# Dodaj ścieżkę projektu
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.database.manager import DatabaseManager
+from src.database.synthetic_data import DATASETS, SyntheticMarketGenerator, DatabaseSink, ParquetSink
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generuje syntetyczne dane rynkowe i sentymentu do testów obciążeniowych"
+    )
+    parser.add_argument(
+        '--symbols',
+        type=str,
+        default="BTC/USDC",
+        help='Lista symboli po przecinku lub liczba symboli (domyślnie: BTC/USDC)'
+    )
+    parser.add_argument(
+        '--start',
+        type=str,
+        default="2024-01-01",
+        help='Data początkowa UTC (domyślnie: 2024-01-01)'
+    )
+    parser.add_argument(
+        '--days',
+        type=float,
+        default=7,
+        help='Liczba dni danych (domyślnie: 7)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Ziarno generatora (domyślnie: 42)'
+    )
+    parser.add_argument(
+        '--exchange',
+        type=str,
+        default="synthetic",
+        help='Nazwa giełdy w zapisanych danych (domyślnie: synthetic)'
+    )
+    parser.add_argument(
+        '--chunk-hours',
+        type=int,
+        default=24,
+        help='Rozmiar paczki w godzinach (domyślnie: 24)'
+    )
+    parser.add_argument(
+        '--datasets',
+        type=str,
+        default=",".join(DATASETS),
+        help=f'Zbiory danych po przecinku (domyślnie: {",".join(DATASETS)})'
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        '--database-url',
+        type=str,
+        help='URL bazy danych (np. sqlite:///data/synthetic.db)'
+    )
+    target.add_argument(
+        '--parquet',
+        type=str,
+        help='Katalog docelowy plików Parquet'
+    )
+    parser.add_argument(
+        '--no-rollups',
+        action='store_true',
+        help='Nie odświeżaj rollupów OHLCV i llm_sentiment_hourly po każdej paczce'
+    )
+    
+    args = parser.parse_args()
+    
+    # Konfiguruj logger
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
+        level="INFO",
+        colorize=True
+    )
+    
+    symbols = int(args.symbols) if args.symbols.isdigit() else [s.strip() for s in args.symbols.split(",")]
+    start = datetime.fromisoformat(args.start)
+    generator = SyntheticMarketGenerator(
+        symbols=symbols,
+        start=start,
+        end=start + timedelta(days=args.days),
+        seed=args.seed,
+        exchange=args.exchange,
+        chunk_hours=args.chunk_hours
+    )
+    
+    if args.parquet:
+        sink = ParquetSink(args.parquet)
+    else:
+        sink = DatabaseSink(DatabaseManager(database_url=args.database_url), refresh_rollups=not args.no_rollups)
+    
+    try:
+        started = datetime.now()
+        written = generator.generate(sink, datasets=[d.strip() for d in args.datasets.split(",")])
+        elapsed = (datetime.now() - started).total_seconds()
+        total = sum(written.values())
+        logger.success(f"✅ Zapisano {total} wierszy w {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} wierszy/s)")
+        return 0
+    except Exception as e:
+        logger.error(f"❌ Błąd: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,6 +41,13 @@ if env_file.exists():
 
 from loguru import logger
 from src.database.manager import DatabaseManager
+from src.collectors.sentiment.sentiment_snapshots import load_sentiment_history
+from src.collectors.sentiment.streaming_lag_tracker import StreamingLagTracker, published_path
+
+# Okno macierzy lag-ów publikowanej dla strategii (jak days_back w SentimentWaveTracker)
+LAG_TRACKER_WINDOW_DAYS = 7
+# Ostatnie godziny wczytywane ponownie (rollup poprawia bieżący kubełek)
+LAG_TRACKER_REVISION_HOURS = 3
 
 # Spróbuj zaimportować web search engine
 try:
@@ -299,6 +306,9 @@ class LLMSentimentDaemon:
             logger.error(f"Nie można zainicjalizować LLMSentimentAnalyzer: {e}")
             raise
         
+        # Przyrostowe macierze lag-ów per symbol
+        self.lag_trackers: Dict[str, StreamingLagTracker] = {}
+        
         # Statystyki
         self.stats = {
             "cycles_count": 0,
@@ -718,11 +728,41 @@ class LLMSentimentDaemon:
                    f"koszt łączny: {self.stats['total_cost_pln']:.2f} PLN, "
                    f"błędy: {self.stats['errors_count']}")
         
+        # Dociągnij nowe analizy do godzinowego rollupu (czytanego przez webapp i strategię)
+        try:
+            refreshed = self.db.refresh_llm_sentiment_hourly()
+            logger.debug(f"Rollup llm_sentiment_hourly: odświeżono {refreshed} przedziałów")
+        except Exception as e:
+            logger.warning(f"Nie można odświeżyć llm_sentiment_hourly: {e}")
+        
+        self._update_lag_trackers()
+        
         # Raport synchronizacji - sprawdź ile danych jest w bazie
         self._report_data_status()
         
         logger.info(f"{'='*70}\n")
     
+    def _update_lag_trackers(self):
+        """Wprowadza nowe kubełki godzinowe do StreamingLagTracker i publikuje macierze lag-ów."""
+        for symbol in self.symbols:
+            try:
+                tracker = self.lag_trackers.get(symbol)
+                if tracker is None:
+                    tracker = StreamingLagTracker(self.countries, window_hours=LAG_TRACKER_WINDOW_DAYS * 24)
+                    self.lag_trackers[symbol] = tracker
+                
+                if tracker.last_bucket is None:
+                    start = datetime.now(timezone.utc) - timedelta(days=LAG_TRACKER_WINDOW_DAYS)
+                else:
+                    start = tracker.last_bucket - timedelta(hours=LAG_TRACKER_REVISION_HOURS)
+                df = load_sentiment_history(self.db, symbol, self.countries, start)
+                changed = tracker.sync(df) if not df.empty else 0
+                
+                path = tracker.publish(published_path("llm", symbol), symbol=symbol, source="llm")
+                logger.debug(f"Macierz lag-ów {symbol}: {changed} nowych/poprawionych kubełków, {len(tracker)} w oknie → {path}")
+            except Exception as e:
+                logger.warning(f"Nie można zaktualizować macierzy lag-ów dla {symbol}: {e}")
+    
     def _report_data_status(self):
         """Raportuje status danych w bazie dla synchronizacji ze strategią."""
         try:
@@ -732,11 +772,12 @@ class LLMSentimentDaemon:
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(hours=24)
             
-            # Pobierz dane z bazy
-            df = self.db.get_llm_sentiment_analysis(
+            # Pobierz godzinowy rollup (odświeżony na końcu cyklu)
+            df = self.db.get_llm_sentiment_hourly(
                 symbol=self.symbols[0] if self.symbols else "BTC/USDC",
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                refresh=False
             )
             
             if df.empty:
@@ -744,12 +785,8 @@ class LLMSentimentDaemon:
                 regions_count = 0
             else:
                 # Policz unikalne punkty czasowe (godzinowe)
-                if hasattr(df.index, 'floor'):
-                    hourly_points = df.index.floor('H').nunique()
-                else:
-                    hourly_points = len(df)
-                data_points = hourly_points
-                regions_count = df['region'].nunique() if 'region' in df.columns else 0
+                data_points = df.index.nunique()
+                regions_count = df['region'].nunique()
             
             min_required = 24  # Strategia wymaga minimum 24 punktów
             percentage = min(100, (data_points / min_required) * 100)
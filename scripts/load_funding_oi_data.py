@@ -5,6 +5,9 @@ Load Funding Rates and Open Interest Data
 Pobiera dane funding rates i open interest z Binance Futures
 i zapisuje je do bazy danych PostgreSQL.
 
+Backtesty UnderhumanStrategyV14 dołączają te dane do świec point-in-time
+(src/trading/market_data_store.py - FundingOIStore).
+
 Użycie:
     python scripts/load_funding_oi_data.py
     python scripts/load_funding_oi_data.py --days=30
@@ -15,6 +15,7 @@ from pathlib import Path
 from itertools import product
 from typing import Dict, List, Any, Tuple
 from dotenv import load_dotenv
+import pandas as pd
 
 # Dodaj ścieżkę projektu
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,6 +29,8 @@ from loguru import logger
 from src.trading.backtesting import BacktestEngine, BacktestResult
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.trading.strategies.scalping_strategy import ScalpingStrategy
+from src.trading.walk_forward import WalkForwardOptimizer, WalkForwardResult
+from src.trading.result_store import BacktestResultStore
 
 
 def setup_logging(verbose: bool = False):
@@ -120,23 +123,13 @@ def run_backtest_for_params(
     return params, result
 
 
-def optimize_strategy(
-    strategy_name: str,
-    symbol: str,
-    days: int,
-    max_combinations: int = None,
-    position_size_percent: float = 10.0,
-    verbose: bool = False
-) -> List[Tuple[Dict[str, Any], BacktestResult]]:
+def get_strategy_setup(strategy_name: str) -> Tuple[type, Dict[str, List[Any]], Dict[str, Any]]:
     """
-    Optymalizuje strategię testując różne kombinacje parametrów.
+    Zwraca klasę strategii, siatkę parametrów i parametry domyślne.
     
     Returns:
-        Lista tupli (params, result) posortowana po total_return (malejąco)
+        Tuple (strategy_class, params_dict, default_params)
     """
-    logger.info(f"🔍 Optymalizacja strategii: {strategy_name}")
-    
-    # Wybierz parametry do testowania
     if strategy_name == "scalping_strategy":
         params_dict = SCALPING_PARAMS
         strategy_class = ScalpingStrategy
@@ -174,25 +167,53 @@ def optimize_strategy(
             'account_for_slippage': True,
         }
     
-    # Generuj kombinacje parametrów
-    combinations = generate_param_combinations(params_dict, max_combinations)
-    logger.info(f"📊 Wygenerowano {len(combinations)} kombinacji parametrów do testowania")
-    
-    # Pobierz dane historyczne
+    return strategy_class, params_dict, default_params
+
+
+def fetch_data(symbol: str, timeframe: str, days: int):
+    """Pobiera dane historyczne (raz - współdzielone przez wszystkie kombinacje/foldy)."""
     engine = BacktestEngine(initial_balance=10000.0)
-    
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
-    timeframe = default_params.get('timeframe', '1h')
     logger.info(f"📥 Pobieram dane historyczne: {symbol} {timeframe} ({days} dni)...")
-    
-    df = engine.fetch_historical_data(
+    return engine.fetch_historical_data(
         symbol=symbol,
         timeframe=timeframe,
         start_date=start_date,
         end_date=end_date
     )
+
+
+def optimize_strategy(
+    strategy_name: str,
+    symbol: str,
+    days: int,
+    max_combinations: int = None,
+    position_size_percent: float = 10.0,
+    verbose: bool = False,
+    use_cache: bool = False
+) -> List[Tuple[Dict[str, Any], BacktestResult]]:
+    """
+    Optymalizuje strategię testując różne kombinacje parametrów.
+    
+    Returns:
+        Lista tupli (params, result) posortowana po total_return (malejąco)
+    """
+    logger.info(f"🔍 Optymalizacja strategii: {strategy_name}")
+    
+    strategy_class, params_dict, default_params = get_strategy_setup(strategy_name)
+    
+    # Generuj kombinacje parametrów
+    combinations = generate_param_combinations(params_dict, max_combinations)
+    logger.info(f"📊 Wygenerowano {len(combinations)} kombinacji parametrów do testowania")
+    
+    # Pobierz dane historyczne
+    engine = BacktestEngine(
+        initial_balance=10000.0,
+        result_store=BacktestResultStore() if use_cache else None
+    )
+    df = fetch_data(symbol, default_params.get('timeframe', '1h'), days)
     
     if df.empty:
         logger.error("❌ Nie udało się pobrać danych historycznych")
@@ -240,6 +261,84 @@ def optimize_strategy(
     return results
 
 
+def walk_forward_strategy(
+    strategy_name: str,
+    symbol: str,
+    days: int,
+    in_sample_days: float,
+    out_of_sample_days: float,
+    anchored: bool = False,
+    objective: str = "sharpe_ratio",
+    workers: int = None,
+    position_size_percent: float = 10.0,
+    use_cache: bool = False
+) -> WalkForwardResult:
+    """
+    Optymalizacja walk-forward: parametry wybierane in-sample, oceniane out-of-sample.
+    
+    Returns:
+        WalkForwardResult
+    """
+    logger.info(f"🔍 Walk-forward strategii: {strategy_name}")
+    
+    strategy_class, params_dict, default_params = get_strategy_setup(strategy_name)
+    timeframe = default_params.get('timeframe', '1h')
+    df = fetch_data(symbol, timeframe, days)
+    
+    if df.empty:
+        logger.error("❌ Nie udało się pobrać danych historycznych")
+        return WalkForwardResult()
+    
+    logger.info(f"✅ Pobrano {len(df)} świec")
+    
+    candles_per_day = pd.Timedelta(days=1) / pd.Timedelta(timeframe)
+    optimizer = WalkForwardOptimizer(
+        strategy_class=strategy_class,
+        param_grid=params_dict,
+        base_params=default_params,
+        in_sample_candles=int(in_sample_days * candles_per_day),
+        out_of_sample_candles=int(out_of_sample_days * candles_per_day),
+        anchored=anchored,
+        objective=objective,
+        max_workers=workers,
+        engine_kwargs={"result_store": BacktestResultStore()} if use_cache else None,
+        position_size_percent=position_size_percent
+    )
+    return optimizer.run(df, symbol=symbol)
+
+
+def print_walk_forward_results(strategy_name: str, result: WalkForwardResult):
+    """Wyświetla foldy i metryki stabilności walk-forward."""
+    print("\n" + "=" * 100)
+    print(f"🚶 WALK-FORWARD: {strategy_name}")
+    print("=" * 100)
+    
+    if not result.folds:
+        print("❌ Brak foldów (za mało danych)")
+        return
+    
+    print(f"{'Fold':<5} {'IS zwrot':>10} {'OOS zwrot':>10} {'OOS trades':>11} {'OOS DD':>8}  Parametry")
+    print("-" * 100)
+    for fold in result.folds:
+        print(
+            f"{fold.index:<5} {fold.in_sample_return:>+9.2f}% {fold.out_of_sample_return:>+9.2f}% "
+            f"{fold.out_of_sample_trades:>11} {fold.out_of_sample_max_drawdown:>7.2f}%  {fold.best_params}"
+        )
+    
+    print()
+    print("📊 OUT-OF-SAMPLE (sklejone):")
+    print(f"  Zwrot:                {result.total_return:+.2f}%")
+    print(f"  Max Drawdown:         {result.max_drawdown:.2f}%")
+    print(f"  Sharpe Ratio:         {result.sharpe_ratio:.2f}")
+    print()
+    print("🧭 STABILNOŚĆ:")
+    print(f"  WF efficiency:        {result.walk_forward_efficiency:.2f}")
+    print(f"  Zyskowne foldy:       {result.profitable_folds_percent:.0f}%")
+    print(f"  Odch. std zwrotu OOS: {result.out_of_sample_return_std:.2f}%")
+    for name, share in result.parameter_stability.items():
+        print(f"  {name:<22}{share * 100:.0f}% foldów z dominującą wartością")
+
+
 def print_optimization_results(
     strategy_name: str,
     results: List[Tuple[Dict[str, Any], BacktestResult]],
@@ -340,6 +439,9 @@ Przykłady:
 
   # Test obu strategii
   python scripts/optimize_strategy.py --strategy=all --symbol=BTC-USD --days=30
+
+  # Walk-forward (60 dni in-sample, 14 dni out-of-sample, 4 procesy)
+  python scripts/optimize_strategy.py --strategy=piotrek_breakout_strategy --days=365 --walk-forward --is-days=60 --oos-days=14 --workers=4
         """
     )
     
@@ -380,7 +482,7 @@ Przykłady:
         "--position-size",
         type=float,
         default=10.0,
-        help="% kapitału na pozycję (domyślnie: 10%)"
+        help="%% kapitału na pozycję (domyślnie: 10%%)"
     )
     
     parser.add_argument(
@@ -389,6 +491,51 @@ Przykłady:
         help="Zapisz wyniki do pliku JSON"
     )
     
+    parser.add_argument(
+        "--walk-forward",
+        action="store_true",
+        help="Optymalizacja walk-forward (foldy in-sample/out-of-sample) zamiast jednego okresu"
+    )
+    
+    parser.add_argument(
+        "--is-days",
+        type=float,
+        default=60,
+        help="Walk-forward: długość okna in-sample w dniach (domyślnie: 60)"
+    )
+    
+    parser.add_argument(
+        "--oos-days",
+        type=float,
+        default=14,
+        help="Walk-forward: długość okna out-of-sample w dniach (domyślnie: 14)"
+    )
+    
+    parser.add_argument(
+        "--anchored",
+        action="store_true",
+        help="Walk-forward: okno in-sample zawsze od początku danych"
+    )
+    
+    parser.add_argument(
+        "--objective",
+        default="sharpe_ratio",
+        choices=["sharpe_ratio", "total_return", "profit_factor", "win_rate"],
+        help="Walk-forward: kryterium wyboru parametrów (domyślnie: sharpe_ratio)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Walk-forward: liczba procesów (domyślnie: liczba CPU)"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Używaj cache wyników (data/backtest_results) - powtórzone kombinacje nie są liczone ponownie"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -412,13 +559,30 @@ Przykłady:
         logger.info(f"🚀 OPTYMALIZACJA: {strategy_name}")
         logger.info(f"{'='*80}\n")
         
+        if args.walk_forward:
+            wf_result = walk_forward_strategy(
+                strategy_name=strategy_name,
+                symbol=args.symbol,
+                days=args.days,
+                in_sample_days=args.is_days,
+                out_of_sample_days=args.oos_days,
+                anchored=args.anchored,
+                objective=args.objective,
+                workers=args.workers,
+                position_size_percent=args.position_size,
+                use_cache=args.cache
+            )
+            print_walk_forward_results(strategy_name, wf_result)
+            continue
+        
         results = optimize_strategy(
             strategy_name=strategy_name,
             symbol=args.symbol,
             days=args.days,
             max_combinations=args.max_combinations,
             position_size_percent=args.position_size,
-            verbose=args.verbose
+            verbose=args.verbose,
+            use_cache=args.cache
         )
         
         all_results[strategy_name] = results
@@ -431,7 +595,7 @@ Przykłady:
             save_results_to_file(strategy_name, results)
     
     # Podsumowanie
-    if len(strategies_to_test) > 1:
+    if len(strategies_to_test) > 1 and not args.walk_forward:
         print("\n" + "=" * 80)
         print("📊 PODSUMOWANIE WSZYSTKICH STRATEGII")
         print("=" * 80)
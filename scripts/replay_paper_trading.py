@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Replay Paper Trading
+====================
+Przyspieszony replay rynku dla EnhancedTradingBot: ta sama ścieżka kodu co live
+(PaperTradingEngine, strategia, limity sesji, TradeRegister), ale z wirtualnym
+zegarem i świecami z historii - tydzień danych 1m w kilka minut.
+
+Źródła świec bazowych:
+- lokalna baza (tabela ohlcv, jak CandleCache) - domyślnie,
+- pliki CSV/Parquet: --data BTC-USD=data/btc_1m.csv (kolumna timestamp + OHLCV).
+
+Użycie:
+    python scripts/replay_paper_trading.py --strategy piotrek_breakout_strategy \\
+        --symbols BTC-USD --start 2025-01-01 --end 2025-01-08 --interval 1min
+    python scripts/replay_paper_trading.py --data BTC-USD=data/btc_1m.csv --time-limit 2d
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Dodaj ścieżkę projektu
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from loguru import logger
+
+from scripts.run_multi_strategy import create_strategy
+from scripts.run_paper_trading_enhanced import EnhancedTradingBot
+from src.trading.market_replay import MarketReplay
+from src.utils.time_parser import parse_time_duration, TimeParseError
+
+
+def setup_logging(verbose: bool = False):
+    """Konfiguruje logowanie (replay loguje tysiące cykli - domyślnie tylko INFO na konsolę)."""
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
+        level="DEBUG" if verbose else "INFO",
+        colorize=True
+    )
+    os.makedirs("logs", exist_ok=True)
+    logger.add(
+        "logs/replay_{time:YYYY-MM-DD}.log",
+        rotation="1 day",
+        retention="7 days",
+        level="DEBUG" if verbose else "INFO"
+    )
+
+
+def load_data_file(path: str) -> pd.DataFrame:
+    """Wczytuje świece z CSV/Parquet (indeks lub kolumna timestamp)."""
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    if 'timestamp' in df.columns:
+        df = df.set_index(pd.to_datetime(df['timestamp'], utc=True)).drop(columns=['timestamp'])
+    return df
+
+
+def load_candles(args, symbols, start, end) -> dict:
+    """Świece bazowe symboli z plików (--data) lub lokalnej bazy."""
+    files = dict(item.split("=", 1) for item in args.data or [])
+    candles = {}
+    cache = None
+    for symbol in symbols:
+        if symbol in files:
+            df = load_data_file(files[symbol])
+        else:
+            if cache is None:
+                from src.trading.candle_cache import CandleCache
+                cache = CandleCache(exchange=args.exchange)
+            df = cache.load(symbol, args.base, start, end)
+        if not df.empty:
+            index = pd.DatetimeIndex(df.index)
+            df.index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+            if start is not None:
+                df = df[df.index >= start]
+            if end is not None:
+                df = df[df.index <= end]
+        if df.empty:
+            logger.error(f"Brak świec {args.base} dla {symbol}")
+            continue
+        logger.info(f"{symbol}: {len(df)} świec {args.base} ({df.index[0]} - {df.index[-1]})")
+        candles[symbol] = df
+    return candles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Przyspieszony replay paper tradingu")
+    parser.add_argument('--strategy', default='piotrek_breakout_strategy', help='Nazwa strategii (jak w run_multi_strategy.py)')
+    parser.add_argument('--strategy-config', default='{}', help='Konfiguracja strategii (JSON)')
+    parser.add_argument('--symbols', default='BTC-USD', help='Symbole (oddzielone przecinkami)')
+    parser.add_argument('--data', action='append', help='Plik świec SYMBOL=ścieżka (CSV/Parquet), można powtarzać')
+    parser.add_argument('--exchange', default='dydx', help='Giełda w tabeli ohlcv (dla lokalnej bazy)')
+    parser.add_argument('--base', default='1m', help='Interwał świec bazowych (domyślnie: 1m)')
+    parser.add_argument('--start', help='Początek replayu (ISO, UTC)')
+    parser.add_argument('--end', help='Koniec replayu (ISO, UTC)')
+    parser.add_argument('--warmup', default='3d', help='Historia przed startem dla wskaźników (domyślnie: 3d)')
+    parser.add_argument('--interval', default='1min', help='Interwał cyklu bota w czasie wirtualnym')
+    parser.add_argument('--time-limit', help='Limit czasu sesji (czas wirtualny)')
+    parser.add_argument('--max-loss', type=float, help='Maksymalna strata w USD')
+    parser.add_argument('--account', default='replay_bot', help='Nazwa konta')
+    parser.add_argument('--balance', type=float, default=10000.0, help='Początkowy kapitał')
+    parser.add_argument('--db', default='sqlite:///data/replay_trading.db', help='URL bazy wyników replayu')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Szczegółowe logi')
+    args = parser.parse_args()
+    
+    setup_logging(args.verbose)
+    os.makedirs("data", exist_ok=True)
+    
+    try:
+        interval_seconds = parse_time_duration(args.interval)
+        warmup = pd.Timedelta(seconds=parse_time_duration(args.warmup))
+        time_limit_seconds = parse_time_duration(args.time_limit) if args.time_limit else None
+    except TimeParseError as e:
+        logger.error(f"Błąd parsowania czasu: {e}")
+        return 1
+    
+    symbols = [s.strip() for s in args.symbols.split(',')]
+    start = pd.Timestamp(args.start, tz="UTC") if args.start else None
+    end = pd.Timestamp(args.end, tz="UTC") if args.end else None
+    candles = load_candles(args, symbols, start - warmup if start is not None else None, end)
+    if not candles:
+        return 1
+    
+    try:
+        strategy = create_strategy(args.strategy, json.loads(args.strategy_config))
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    
+    with MarketReplay(candles, base_resolution=args.base, start=start, end=end) as replay:
+        # Bot tworzony pod wirtualnym zegarem (session_start, TradingSession)
+        bot = EnhancedTradingBot(
+            database_url=args.db,
+            account_name=args.account,
+            initial_balance=args.balance,
+            symbols=list(candles),
+            strategy=strategy,
+            check_interval=interval_seconds,
+            dydx_collector=replay.collector,
+            time_limit_seconds=time_limit_seconds,
+            max_loss_limit=args.max_loss
+        )
+        # Podsumowanie na żywo raz na dobę czasu wirtualnego (zamiast co minutę)
+        bot.summary_interval = max(bot.summary_interval, 24 * 3600)
+        result = replay.run(bot)
+    
+    account = result['account']
+    logger.info("=" * 50)
+    logger.info(f"Replay {result['start']} -> {result['end']}")
+    logger.info(f"Cykle: {result['cycles']}, czas: {result['wall_seconds']:.1f}s (x{result['speedup']:.0f})")
+    logger.info(f"Equity: ${account['equity']:.2f}, PnL: ${account['total_pnl']:.2f}, ROI: {account['roi']:.2f}%")
+    logger.info("=" * 50)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Multi Strategy Paper Trading
+============================
+Uruchamia wiele par (strategia, konto) w jednym procesie: jeden kolektor dYdX,
+jeden snapshot rynku na cykl i jeden silnik bazy dla wszystkich botów.
+
+Plik konfiguracyjny (JSON):
+    {
+        "interval": "5min",
+        "bots": [
+            {"strategy": "piotrek_breakout_strategy", "account": "piotrek_bot",
+             "symbols": ["BTC-USD", "ETH-USD"], "config": {"min_confidence": 5}},
+            {"strategy": "prompt_strategy", "account": "prompt_bot",
+             "symbols": ["BTC-USD"], "config": {"prompt_file": "prompts/trading/btc.txt"},
+             "balance": 5000, "max_positions": 1}
+        ]
+    }
+
+Użycie:
+    python scripts/run_multi_strategy.py --config config/multi_strategy.json
+    python scripts/run_multi_strategy.py --config config/multi_strategy.json --once
+"""
+
+import os
+import sys
+import json
+import argparse
+import signal
+from pathlib import Path
+
+# Dodaj ścieżkę projektu
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loguru import logger
+
+from src.trading import strategies
+from src.trading.multi_runner import MultiStrategyRunner
+from src.utils.time_parser import parse_time_duration, TimeParseError
+
+
+# Ustawienia bota (atrybuty TradingBot) dopuszczalne w konfiguracji
+BOT_SETTINGS = ('max_positions', 'position_size_percent', 'default_leverage')
+
+
+def setup_logging(verbose: bool = False):
+    """Konfiguruje logowanie."""
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
+        level="DEBUG" if verbose else "INFO",
+        colorize=True
+    )
+    os.makedirs("logs", exist_ok=True)
+    logger.add(
+        "logs/multi_strategy_{time:YYYY-MM-DD}.log",
+        rotation="1 day",
+        retention="30 days",
+        level="DEBUG"
+    )
+
+
+def create_strategy(name: str, config: dict):
+    """Tworzy strategię po nazwie z konfiguracji."""
+    if name.lower() not in strategies.STRATEGY_NAMES:
+        raise ValueError(f"Nieznana strategia: {name} (dostępne: {', '.join(strategies.available_strategies())})")
+    return strategies.get_strategy_class(name)(config)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Wiele strategii paper trading w jednym procesie"
+    )
+    parser.add_argument('--config', required=True, help='Plik JSON z listą botów')
+    parser.add_argument(
+        '--db',
+        default=os.getenv('DATABASE_URL', 'sqlite:///data/paper_trading.db'),
+        help='URL bazy danych (domyślnie: DATABASE_URL lub SQLite)'
+    )
+    parser.add_argument('--interval', help='Interwał cyklu (np. 5min) - nadpisuje konfigurację')
+    parser.add_argument('--cpu-workers', type=int, default=4, help='Wątki strategii obliczeniowych (domyślnie: 4)')
+    parser.add_argument('--llm-workers', type=int, default=8, help='Wątki strategii LLM (domyślnie: 8)')
+    parser.add_argument('--once', action='store_true', help='Wykonaj jeden cykl i zakończ')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Szczegółowe logi')
+    args = parser.parse_args()
+    
+    setup_logging(args.verbose)
+    os.makedirs("data", exist_ok=True)
+    
+    config = json.loads(Path(args.config).read_text(encoding="utf-8"))
+    try:
+        interval_seconds = parse_time_duration(args.interval or config.get('interval', '5min'))
+    except TimeParseError as e:
+        logger.error(f"Błąd parsowania czasu: {e}")
+        return 1
+    
+    runner = MultiStrategyRunner(
+        database_url=args.db,
+        check_interval=interval_seconds,
+        cpu_workers=args.cpu_workers,
+        llm_workers=args.llm_workers
+    )
+    
+    for bot_config in config.get('bots', []):
+        try:
+            strategy = create_strategy(bot_config['strategy'], bot_config.get('config', {}))
+        except ValueError as e:
+            logger.error(str(e))
+            return 1
+        bot = runner.add_bot(
+            strategy,
+            account_name=bot_config['account'],
+            symbols=bot_config.get('symbols', ["BTC-USD"]),
+            initial_balance=bot_config.get('balance', 10000.0)
+        )
+        for setting in BOT_SETTINGS:
+            if setting in bot_config:
+                setattr(bot, setting, bot_config[setting])
+    
+    if not runner.bots:
+        logger.error("Brak botów w konfiguracji")
+        return 1
+    
+    if args.once:
+        runner.run_cycle()
+        for row in runner.summary():
+            logger.info(
+                f"{row['account_name']} ({row['strategy']}): equity ${row['equity']:.2f}, "
+                f"PnL ${row['total_pnl']:.2f}, pozycje {row['open_positions']}"
+            )
+        runner.stop()
+        return 0
+    
+    # Obsługa SIGINT (Ctrl+C)
+    def signal_handler(sig, frame):
+        runner.stop()
+        sys.exit(0)
+    
+    signal.signal(signal.SIGINT, signal_handler)
+    runner.start()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,20 +29,9 @@ from sqlalchemy.orm import sessionmaker
 
 from src.trading.paper_trading import PaperTradingEngine
 from src.trading.trading_bot import TradingBot
-from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
-from src.trading.strategies.scalping_strategy import ScalpingStrategy
-from src.trading.strategies.funding_rate_arbitrage_strategy import FundingRateArbitrageStrategy
-from src.trading.strategies.improved_breakout_strategy import ImprovedBreakoutStrategy
-from src.trading.strategies.prompt_strategy import PromptStrategy
-from src.trading.strategies.prompt_strategy_v11 import PromptStrategyV11
-from src.trading.strategies.prompt_strategy_v12 import PromptStrategyV12
-from src.trading.strategies.piotr_swiec_strategy import PiotrSwiecStrategy
-from src.trading.strategies.piotr_swiec_prompt_strategy import PiotrSwiecPromptStrategy
-from src.trading.strategies.ultra_short_prompt_strategy import UltraShortPromptStrategy
-from src.trading.strategies.test_prompt_strategy import TestPromptStrategy
-from src.trading.strategies.sentiment_propagation_strategy import SentimentPropagationStrategy
-# Import: plik under_human_strategy_1.0.py → import przez __init__.py
-from src.trading.strategies import UnderhumanStrategyV10
+# Strategie ładowane leniwie (strategies.NazwaKlasy) - tylko wybrana strategia
+# importuje swoje zależności (LLM, sentyment)
+from src.trading import strategies
 from src.trading.models import Base as TradingBase
 from src.trading.models_extended import Strategy, TradeRegister, TradingSession
 from src.database.models import Base as DatabaseBase, create_timescale_hypertables
@@ -490,14 +479,14 @@ def main():
             'dydx_collector': dydx_collector,  # Przekaż collector dla rzeczywistych funding rates
             'use_real_funding_rate': True  # Użyj rzeczywistych funding rates z dYdX
         }
-        strategy = FundingRateArbitrageStrategy(strategy_config)
+        strategy = strategies.FundingRateArbitrageStrategy(strategy_config)
     elif strategy_name == 'prompt_strategy':
         # Strategia Prompt Strategy - używa LLM do podejmowania decyzji
         if not args.prompt_file:
             logger.error("--prompt-file jest wymagane dla prompt_strategy!")
             sys.exit(1)
         
-        strategy = PromptStrategy({
+        strategy = strategies.PromptStrategy({
             'prompt_file': args.prompt_file,
             'provider': os.getenv('LLM_PROVIDER', 'anthropic'),
             'model': os.getenv('LLM_MODEL', 'claude-3-5-haiku-20241022'),
@@ -519,7 +508,7 @@ def main():
             logger.error("--prompt-file jest wymagane dla prompt_strategy_v11!")
             sys.exit(1)
         
-        strategy = PromptStrategyV11({
+        strategy = strategies.PromptStrategyV11({
             'prompt_file': args.prompt_file,
             'provider': os.getenv('LLM_PROVIDER', 'anthropic'),
             'model': os.getenv('LLM_MODEL', 'claude-3-5-haiku-20241022'),
@@ -557,7 +546,7 @@ def main():
             logger.error("--prompt-file jest wymagane dla prompt_strategy_v12!")
             sys.exit(1)
         
-        strategy = PromptStrategyV12({
+        strategy = strategies.PromptStrategyV12({
             'prompt_file': args.prompt_file,
             'provider': os.getenv('LLM_PROVIDER', 'anthropic'),
             'model': os.getenv('LLM_MODEL', 'claude-3-5-haiku-20241022'),
@@ -599,7 +588,7 @@ def main():
     elif strategy_name == 'improved_breakout_strategy':
         # Strategia Improved Breakout - AGRESYWNE parametry dla szybkiego generowania transakcji
         # Parametry ustawione tak, aby strategia mogła wygenerować transakcje w ciągu 12h
-        strategy = ImprovedBreakoutStrategy({
+        strategy = strategies.ImprovedBreakoutStrategy({
             'timeframe': '1h',  # 1h timeframe
             'breakout_threshold': 0.2,  # Bardzo niski próg (0.2% zamiast 0.5%) - łatwiej wykryje breakout
             'min_confidence': 2.5,  # Niska pewność (2.5 zamiast 4.0) - łatwiej wygeneruje sygnał
@@ -620,7 +609,7 @@ def main():
     elif strategy_name == 'scalping_strategy':
         # Strategia Scalping - szybkie transakcje
         # Użyj krótkiego timeframe (1min lub 5min) dla scalping
-        strategy = ScalpingStrategy({
+        strategy = strategies.ScalpingStrategy({
             'timeframe': '1min',  # Krótki timeframe dla scalping
             'min_price_change': 0.1,
             'max_price_change': 0.5,
@@ -640,7 +629,7 @@ def main():
         })
     elif strategy_name == 'piotr_swiec_strategy':
         # Strategia Piotra Święsa - impulsowa z RSI
-        strategy = PiotrSwiecStrategy({
+        strategy = strategies.PiotrSwiecStrategy({
             'rsi_period': 14,
             'rsi_overbought': 70,
             'rsi_oversold': 30,
@@ -667,7 +656,7 @@ def main():
     elif strategy_name == 'piotr_swiec_prompt_strategy':
         # Strategia Piotra Święsa z LLM
         prompt_file = args.prompt_file or 'prompts/trading/piotr_swiec_method.txt'
-        strategy = PiotrSwiecPromptStrategy({
+        strategy = strategies.PiotrSwiecPromptStrategy({
             'prompt_file': prompt_file,
             # RSI
             'rsi_period': 14,
@@ -687,7 +676,7 @@ def main():
     elif strategy_name == 'ultra_short_prompt_strategy':
         # Strategia Ultra Short - VWAP Fakeout z LLM
         prompt_file = args.prompt_file or 'prompts/trading/ultra_short_strategy_prompt.txt'
-        strategy = UltraShortPromptStrategy({
+        strategy = strategies.UltraShortPromptStrategy({
             'prompt_file': prompt_file,
             'provider': os.getenv('LLM_PROVIDER', 'anthropic'),
             'model': os.getenv('LLM_MODEL', 'claude-3-5-haiku-20241022'),
@@ -724,7 +713,7 @@ def main():
     elif strategy_name == 'test_prompt_strategy':
         # Testowa strategia prompt-based
         prompt_file = args.prompt_file or 'prompts/trading/test_prompt_strategy.txt'
-        strategy = TestPromptStrategy({
+        strategy = strategies.TestPromptStrategy({
             'prompt_file': prompt_file,
             'provider': os.getenv('LLM_PROVIDER', 'anthropic'),
             'model': os.getenv('LLM_MODEL', 'claude-3-5-haiku-20241022'),
@@ -745,7 +734,7 @@ def main():
         strategy.set_session_context(session_context)
     elif strategy_name == 'under_human_strategy_1.0':
         # Strategia UNDERHUMAN v1.0 - handluje zmianę stanu rynku
-        strategy = UnderhumanStrategyV10({
+        strategy = strategies.UnderhumanStrategyV10({
             # RSI
             'rsi_period': 14,
             # Okna analizy
@@ -792,7 +781,7 @@ def main():
             use_llm_data = False
             logger.info("Używam danych z GDELT API jako źródła sentymentu")
         
-        strategy = SentimentPropagationStrategy({
+        strategy = strategies.SentimentPropagationStrategy({
             'symbol': symbol,  # Symbol dla danych LLM z bazy
             'query': 'bitcoin OR cryptocurrency',  # Używane dla GDELT lub jako fallback
             'countries': ['US', 'CN', 'JP', 'KR', 'DE', 'GB'],
@@ -809,7 +798,7 @@ def main():
     else:
         # Strategia Breakout (domyślna) - AGRESYWNE parametry dla szybkiego testowania
         # Dla normalnego użycia zwiększ min_confidence do 5-6 i breakout_threshold do 0.8-1.0
-        strategy = PiotrekBreakoutStrategy({
+        strategy = strategies.PiotrekBreakoutStrategy({
             'breakout_threshold': 0.3,  # Bardzo niski próg - łatwiej wykryje breakout
             'consolidation_threshold': 0.3,  # Niższy próg konsolidacji
             'min_confidence': 3,  # Bardzo niska pewność - łatwiej wygeneruje sygnał
@@ -251,7 +251,7 @@ if [ $EXIT_CODE -eq 0 ]; then
     echo "  sqlite3 data/paper_trading.db \"SELECT name, current_balance, total_trades, win_rate, roi FROM paper_accounts WHERE name='$ACCOUNT';\""
     echo ""
     log_info "📋 Logi API LLM:"
-    echo "  tail -100 logs/api_llm_requests_$(date +%Y-%m-%d).log"
+    echo "  tail -100 logs/api_llm_requests_$(date +%Y-%m-%d).jsonl"
 else
     log_error "Strategia zakończona z błędem (kod: $EXIT_CODE)"
     exit $EXIT_CODE
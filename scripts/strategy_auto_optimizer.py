@@ -24,6 +24,7 @@ if env_path.exists():
     load_dotenv(env_path)
 
 from src.trading.backtesting import BacktestEngine, BacktestResult
+from src.trading.result_store import BacktestResultStore
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.collectors.exchange.binance_collector import BinanceCollector
 
@@ -42,7 +43,8 @@ class StrategyAutoOptimizer:
         target_profit_factor: float = 1.5,
         target_return: float = 5.0,
         max_iterations: int = 50,
-        slippage_percent: float = 0.1
+        slippage_percent: float = 0.1,
+        use_cache: bool = False
     ):
         """
         Inicjalizacja optymalizatora.
@@ -54,6 +56,7 @@ class StrategyAutoOptimizer:
             target_return: Docelowy zwrot (%)
             max_iterations: Maksymalna liczba iteracji
             slippage_percent: Slippage w %
+            use_cache: Cache wyników backtestu (BacktestResultStore)
         """
         self.initial_balance = initial_balance
         self.target_win_rate = target_win_rate
@@ -64,7 +67,8 @@ class StrategyAutoOptimizer:
         
         self.engine = BacktestEngine(
             initial_balance=initial_balance,
-            slippage_percent=slippage_percent
+            slippage_percent=slippage_percent,
+            result_store=BacktestResultStore() if use_cache else None
         )
         
         self.binance = BinanceCollector(sandbox=False)
@@ -549,6 +553,12 @@ def main():
         help="Zapisz wyniki do pliku"
     )
     
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Używaj cache wyników backtestu (data/backtest_results)"
+    )
+    
     args = parser.parse_args()
     
     # Utwórz optymalizator
@@ -557,7 +567,8 @@ def main():
         target_profit_factor=args.target_profit_factor,
         target_return=args.target_return,
         max_iterations=args.max_iterations,
-        slippage_percent=args.slippage
+        slippage_percent=args.slippage,
+        use_cache=args.cache
     )
     
     # Uruchom optymalizację
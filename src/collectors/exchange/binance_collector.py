@@ -10,7 +10,7 @@ import ccxt
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 import time
 from loguru import logger
 
@@ -249,6 +249,30 @@ class BinanceCollector:
         """Pobiera aktualny ticker (cenę) dla symbolu."""
         return self.exchange.fetch_ticker(symbol)
     
+    def get_tickers(self, symbols: List[str]) -> Dict[str, dict]:
+        """Pobiera tickery wielu symboli jednym zapytaniem."""
+        return self.exchange.fetch_tickers(symbols)
+    
+    def get_orderbook(self, symbol: str = "BTC/USDT", limit: int = 100) -> dict:
+        """
+        Pobiera orderbook spot (format jak DydxCollector.get_orderbook).
+        
+        Args:
+            symbol: Para handlowa
+            limit: Liczba poziomów na stronę
+        
+        Returns:
+            Słownik z bids i asks [(cena, wielkość), ...] oraz timestamp giełdy
+        """
+        book = self.exchange.fetch_order_book(symbol, limit=limit)
+        timestamp = book.get('timestamp')
+        return {
+            'ticker': symbol,
+            'bids': [(float(price), float(size)) for price, size, *_ in book.get('bids', [])],
+            'asks': [(float(price), float(size)) for price, size, *_ in book.get('asks', [])],
+            'timestamp': datetime.fromtimestamp(timestamp / 1000) if timestamp else datetime.now()
+        }
+    
     def get_funding_rates(
         self,
         symbol: str = "BTC/USDT:USDT",  # Perpetual futures symbol
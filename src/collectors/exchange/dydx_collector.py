@@ -19,6 +19,8 @@ import time
 import requests
 from loguru import logger
 
+from src.utils.metrics import get_metrics
+
 # dYdX v4 API endpoints
 # Base URL dla publicznych endpointów (candles, markets, orderbook, etc.)
 DYDX_INDEXER_API = "https://indexer.dydx.trade/v4"
@@ -90,12 +92,17 @@ class DydxCollector:
         """
         url = f"{self.base_url}{endpoint}"
         last_exception = None
+        metrics = get_metrics()
+        # Etykieta bez tickera (np. /candles/perpetualMarkets) - ogranicza liczbę serii
+        stage_endpoint = endpoint.rsplit('/', 1)[0] if endpoint.count('/') > 1 else endpoint
         
         for attempt in range(max_retries):
             try:
-                response = self.session.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                return response.json()
+                with metrics.span("dydx.request", endpoint=stage_endpoint):
+                    response = self.session.get(url, params=params, timeout=30)
+                    response.raise_for_status()
+                    data = response.json()
+                return data
             except requests.exceptions.RequestException as e:
                 last_exception = e
                 if attempt < max_retries - 1:
@@ -167,8 +174,27 @@ class DydxCollector:
             Słownik z danymi tickera
         """
         data = self._make_request(f"/perpetualMarkets")
-        market = data.get('markets', {}).get(ticker, {})
+        return self._market_ticker(ticker, data.get('markets', {}).get(ticker, {}))
+    
+    def get_tickers(self, tickers: List[str]) -> Dict[str, dict]:
+        """
+        Pobiera tickery wielu rynków jednym zapytaniem.
         
+        Args:
+            tickers: Symbole rynków
+            
+        Returns:
+            Słownik {ticker: dane tickera} (tylko rynki zwrócone przez API)
+        """
+        markets = self._make_request("/perpetualMarkets").get('markets', {})
+        return {
+            ticker: self._market_ticker(ticker, markets[ticker])
+            for ticker in tickers if ticker in markets
+        }
+    
+    @staticmethod
+    def _market_ticker(ticker: str, market: dict) -> dict:
+        """Ticker z opisu rynku /perpetualMarkets."""
         return {
             'ticker': ticker,
             'oracle_price': float(market.get('oraclePrice', 0)),
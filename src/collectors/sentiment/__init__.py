@@ -1,75 +1,87 @@
 """
 Kolektory danych sentymentu z mediów społecznościowych.
+
+Klasy są ładowane przy pierwszym użyciu - import jednej klasy (np. przez
+SentimentPropagationStrategy) nie ładuje klientów Twittera, Reddita, Telegrama
+ani analizatora LLM.
 """
 
-from .twitter_collector import TwitterCollector
-from .reddit_collector import RedditCollector
-from .telegram_collector import TelegramCollector
-from .gdelt_collector import GDELTCollector
-from .sentiment_propagation_analyzer import (
-    SentimentPropagationAnalyzer,
-    PropagationDirection,
-    LagResult,
-    PropagationWave
-)
-from .sentiment_wave_tracker import SentimentWaveTracker
+import importlib
+
+# Nazwa eksportu -> (moduł, atrybut)
+_EXPORTS = {
+    'TwitterCollector': ('.twitter_collector', 'TwitterCollector'),
+    'RedditCollector': ('.reddit_collector', 'RedditCollector'),
+    'TelegramCollector': ('.telegram_collector', 'TelegramCollector'),
+    'TelegramNotifier': ('.telegram_notifier', 'TelegramNotifier'),
+    'GDELTCollector': ('.gdelt_collector', 'GDELTCollector'),
+    'SentimentPropagationAnalyzer': ('.sentiment_propagation_analyzer', 'SentimentPropagationAnalyzer'),
+    'PropagationDirection': ('.sentiment_propagation_analyzer', 'PropagationDirection'),
+    'LagResult': ('.sentiment_propagation_analyzer', 'LagResult'),
+    'PropagationWave': ('.sentiment_propagation_analyzer', 'PropagationWave'),
+    'SentimentWaveTracker': ('.sentiment_wave_tracker', 'SentimentWaveTracker'),
+    'SentimentSnapshots': ('.sentiment_snapshots', 'SentimentSnapshots'),
+    'StreamingLagTracker': ('.streaming_lag_tracker', 'StreamingLagTracker'),
+}
 
-# Import LLM sentiment analyzer (opcjonalnie)
-try:
-    from .llm_sentiment_analyzer import (
-        LLMSentimentAnalyzer,
-        analyze_sentiment as analyze_sentiment_llm
-    )
-    LLM_SENTIMENT_AVAILABLE = True
-except ImportError:
-    LLM_SENTIMENT_AVAILABLE = False
-    LLMSentimentAnalyzer = None
-    analyze_sentiment_llm = None
+# Eksporty opcjonalne (None gdy brak zależności): nazwa -> (moduł, atrybut)
+_OPTIONAL_EXPORTS = {
+    # LLM sentiment analyzer
+    'LLMSentimentAnalyzer': ('.llm_sentiment_analyzer', 'LLMSentimentAnalyzer'),
+    'analyze_sentiment_llm': ('.llm_sentiment_analyzer', 'analyze_sentiment'),
+    # Timezone-aware analyzer
+    'TimezoneAwareAnalyzer': ('.timezone_aware_analyzer', 'TimezoneAwareAnalyzer'),
+    'TimezoneAwareLag': ('.timezone_aware_analyzer', 'TimezoneAwareLag'),
+    'RegionConfig': ('.timezone_aware_analyzer', 'RegionConfig'),
+    'ActivityType': ('.timezone_aware_analyzer', 'ActivityType'),
+    'REGION_CONFIGS': ('.timezone_aware_analyzer', 'REGION_CONFIGS'),
+}
 
-# Import timezone-aware analyzer (opcjonalnie)
-try:
-    from .timezone_aware_analyzer import (
-        TimezoneAwareAnalyzer,
-        TimezoneAwareLag,
-        RegionConfig,
-        ActivityType,
-        REGION_CONFIGS
-    )
-    TIMEZONE_AWARE_AVAILABLE = True
-except ImportError:
-    TIMEZONE_AWARE_AVAILABLE = False
-    TimezoneAwareAnalyzer = None
-    TimezoneAwareLag = None
-    RegionConfig = None
-    ActivityType = None
-    REGION_CONFIGS = None
+# Flaga dostępności -> moduł opcjonalny
+_AVAILABILITY_FLAGS = {
+    'LLM_SENTIMENT_AVAILABLE': '.llm_sentiment_analyzer',
+    'TIMEZONE_AWARE_AVAILABLE': '.timezone_aware_analyzer',
+}
 
 __all__ = [
     'TwitterCollector',
     'RedditCollector',
     'TelegramCollector',
+    'TelegramNotifier',
     'GDELTCollector',
     'SentimentPropagationAnalyzer',
     'PropagationDirection',
     'LagResult',
     'PropagationWave',
     'SentimentWaveTracker',
+    'SentimentSnapshots',
+    'StreamingLagTracker',
 ]
 
-# Dodaj timezone-aware do __all__ jeśli dostępne
-if TIMEZONE_AWARE_AVAILABLE:
-    __all__.extend([
-        'TimezoneAwareAnalyzer',
-        'TimezoneAwareLag',
-        'RegionConfig',
-        'ActivityType',
-        'REGION_CONFIGS'
-    ])
 
-# Dodaj LLM sentiment analyzer do __all__ jeśli dostępne
-if LLM_SENTIMENT_AVAILABLE:
-    __all__.extend([
-        'LLMSentimentAnalyzer',
-        'analyze_sentiment_llm'
-    ])
+def _optional_module(module_name: str):
+    """Moduł opcjonalny lub None gdy brak jego zależności."""
+    try:
+        return importlib.import_module(module_name, __name__)
+    except ImportError:
+        return None
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        module_name, attribute = _EXPORTS[name]
+        value = getattr(importlib.import_module(module_name, __name__), attribute)
+    elif name in _OPTIONAL_EXPORTS:
+        module_name, attribute = _OPTIONAL_EXPORTS[name]
+        module = _optional_module(module_name)
+        value = getattr(module, attribute) if module is not None else None
+    elif name in _AVAILABILITY_FLAGS:
+        value = _optional_module(_AVAILABILITY_FLAGS[name]) is not None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_OPTIONAL_EXPORTS) | set(_AVAILABILITY_FLAGS))
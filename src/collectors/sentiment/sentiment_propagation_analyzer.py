@@ -15,10 +15,9 @@ Funkcje:
 - Korelacja z cenami BTC
 """
 
+import importlib.util
 import numpy as np
 import pandas as pd
-from scipy import signal
-from scipy.stats import pearsonr, spearmanr
 from typing import Dict, List, Tuple, Optional, Any
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
@@ -33,12 +32,10 @@ except ImportError:
     TIMEZONE_AWARE_AVAILABLE = False
     logger.debug("TimezoneAwareAnalyzer niedostępny - używam podstawowej analizy")
 
-try:
-    import matplotlib.pyplot as plt
-    import matplotlib.dates as mdates
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# scipy i matplotlib są importowane dopiero w metodach, które ich używają
+# (import modułu przez strategię nie może kosztować sekund)
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
+if not MATPLOTLIB_AVAILABLE:
     logger.warning("matplotlib nie jest zainstalowany. Wizualizacje będą niedostępne.")
 
 
@@ -191,6 +188,7 @@ class SentimentPropagationAnalyzer:
         
         # Cross-correlation
         # Używamy scipy.signal.correlate dla pełnej cross-correlation
+        from scipy import signal
         correlation = signal.correlate(a, b, mode='full')
         
         # Normalizuj przez liczbę próbek
@@ -200,6 +198,31 @@ class SentimentPropagationAnalyzer:
         # Lagi odpowiadające każdej wartości korelacji
         lags = signal.correlation_lags(len(a), len(b), mode='full')
         
+        result = self._lag_result(region_a, region_b, correlation, lags)
+        
+        logger.debug(f"Lag {region_a}-{region_b}: {result.optimal_lag} units ({result.lag_hours:.1f}h), r={result.correlation:.3f}")
+        
+        return result
+    
+    def _lag_result(
+        self,
+        region_a: str,
+        region_b: str,
+        correlation: np.ndarray,
+        lags: np.ndarray
+    ) -> LagResult:
+        """
+        Wyznacza optymalny lag, kierunek i pewność z funkcji cross-correlation.
+        
+        Args:
+            region_a: Kod pierwszego regionu
+            region_b: Kod drugiego regionu
+            correlation: Znormalizowana korelacja dla każdego lag-u
+            lags: Lagi odpowiadające wartościom korelacji (rosnąco)
+            
+        Returns:
+            LagResult
+        """
         # Ogranicz do max_lag
         valid_mask = np.abs(lags) <= self.max_lag
         correlation = correlation[valid_mask]
@@ -227,7 +250,7 @@ class SentimentPropagationAnalyzer:
         
         lag_hours = optimal_lag * self.time_resolution
         
-        result = LagResult(
+        return LagResult(
             region_a=region_a,
             region_b=region_b,
             optimal_lag=int(optimal_lag),
@@ -236,10 +259,6 @@ class SentimentPropagationAnalyzer:
             confidence=float(confidence),
             lag_hours=float(lag_hours)
         )
-        
-        logger.debug(f"Lag {region_a}-{region_b}: {optimal_lag} units ({lag_hours:.1f}h), r={max_corr:.3f}")
-        
-        return result
     
     def compute_lag_matrix(
         self,
@@ -271,45 +290,56 @@ class SentimentPropagationAnalyzer:
                 if result:
                     # Jeśli timezone-aware jest włączone, skoryguj lag
                     if use_tz and self.tz_analyzer:
-                        try:
-                            tz_lag = self.tz_analyzer.calculate_timezone_aware_lag(
-                                df, region_a, region_b,
-                                result.lag_hours, result.correlation
-                            )
-                            
-                            # Użyj skorygowanego lag-u jeśli różni się znacząco
-                            if abs(tz_lag.adjusted_lag_hours) < abs(result.lag_hours) * 0.8:
-                                # Skorygowany lag jest znacznie mniejszy - użyj go
-                                result = LagResult(
-                                    region_a=result.region_a,
-                                    region_b=result.region_b,
-                                    optimal_lag=int(tz_lag.adjusted_lag_hours / self.time_resolution),
-                                    correlation=result.correlation,
-                                    direction=result.direction,
-                                    confidence=result.confidence,
-                                    lag_hours=tz_lag.adjusted_lag_hours
-                                )
-                                logger.debug(f"Skorygowano lag {region_a}→{region_b}: {tz_lag.raw_lag_hours:.1f}h → {tz_lag.adjusted_lag_hours:.1f}h (wakeup: {tz_lag.wakeup_delay_hours:.1f}h)")
-                        except Exception as e:
-                            logger.warning(f"Błąd timezone-aware analizy dla {region_a}→{region_b}: {e}")
+                        result = self._adjust_for_timezones(df, result)
                     
                     lag_matrix[(region_a, region_b)] = result
                     # Dodaj też odwrotną relację
-                    lag_matrix[(region_b, region_a)] = LagResult(
-                        region_a=region_b,
-                        region_b=region_a,
-                        optimal_lag=-result.optimal_lag,
-                        correlation=result.correlation,
-                        direction=PropagationDirection.LAGS if result.direction == PropagationDirection.LEADS else 
-                                  PropagationDirection.LEADS if result.direction == PropagationDirection.LAGS else
-                                  PropagationDirection.SYNCHRONOUS,
-                        confidence=result.confidence,
-                        lag_hours=-result.lag_hours
-                    )
+                    lag_matrix[(region_b, region_a)] = self._reversed(result)
         
         logger.info(f"Obliczono {len(lag_matrix)} par lag-ów (timezone-aware: {use_tz})")
         return lag_matrix
     
+    def _adjust_for_timezones(self, df: pd.DataFrame, result: LagResult) -> LagResult:
+        """Koryguje lag o opóźnienie wynikające ze stref czasowych (aktywność regionu docelowego)."""
+        region_a, region_b = result.region_a, result.region_b
+        try:
+            tz_lag = self.tz_analyzer.calculate_timezone_aware_lag(
+                df, region_a, region_b,
+                result.lag_hours, result.correlation
+            )
+            
+            # Użyj skorygowanego lag-u jeśli różni się znacząco
+            if abs(tz_lag.adjusted_lag_hours) < abs(result.lag_hours) * 0.8:
+                # Skorygowany lag jest znacznie mniejszy - użyj go
+                logger.debug(f"Skorygowano lag {region_a}→{region_b}: {tz_lag.raw_lag_hours:.1f}h → {tz_lag.adjusted_lag_hours:.1f}h (wakeup: {tz_lag.wakeup_delay_hours:.1f}h)")
+                return LagResult(
+                    region_a=result.region_a,
+                    region_b=result.region_b,
+                    optimal_lag=int(tz_lag.adjusted_lag_hours / self.time_resolution),
+                    correlation=result.correlation,
+                    direction=result.direction,
+                    confidence=result.confidence,
+                    lag_hours=tz_lag.adjusted_lag_hours
+                )
+        except Exception as e:
+            logger.warning(f"Błąd timezone-aware analizy dla {region_a}→{region_b}: {e}")
+        return result
+    
+    @staticmethod
+    def _reversed(result: LagResult) -> LagResult:
+        """Ta sama relacja widziana od strony drugiego regionu."""
+        return LagResult(
+            region_a=result.region_b,
+            region_b=result.region_a,
+            optimal_lag=-result.optimal_lag,
+            correlation=result.correlation,
+            direction=PropagationDirection.LAGS if result.direction == PropagationDirection.LEADS else 
+                      PropagationDirection.LEADS if result.direction == PropagationDirection.LAGS else
+                      PropagationDirection.SYNCHRONOUS,
+            confidence=result.confidence,
+            lag_hours=-result.lag_hours
+        )
+    
     def find_leader_region(
         self,
         lag_matrix: Dict[Tuple[str, str], LagResult],
@@ -517,6 +547,8 @@ class SentimentPropagationAnalyzer:
         max_lag = int(max_lag_hours)
         correlations = []
         
+        from scipy.stats import pearsonr
+        
         for lag in range(-max_lag, max_lag + 1):
             if lag < 0:
                 # Sentiment wyprzedza cenę
@@ -575,6 +607,7 @@ class SentimentPropagationAnalyzer:
         if not MATPLOTLIB_AVAILABLE:
             logger.warning("matplotlib niedostępny - pomijam wizualizację")
             return
+        import matplotlib.pyplot as plt
         
         if regions is None:
             regions = sorted(list(set([k[0] for k in lag_matrix.keys()])))
@@ -635,6 +668,8 @@ class SentimentPropagationAnalyzer:
         if not MATPLOTLIB_AVAILABLE:
             logger.warning("matplotlib niedostępny")
             return
+        import matplotlib.pyplot as plt
+        import matplotlib.dates as mdates
         
         if regions is None:
             regions = list(df.columns)[:6]  # Max 6 dla czytelności
@@ -679,6 +714,7 @@ class SentimentPropagationAnalyzer:
         """
         if not MATPLOTLIB_AVAILABLE:
             return
+        import matplotlib.pyplot as plt
         
         fig, ax = plt.subplots(figsize=(12, 6))
         
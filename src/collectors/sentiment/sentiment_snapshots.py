@@ -0,0 +1,526 @@
+"""
+Sentiment Snapshots
+===================
+Analiza propagacji sentymentu "as-of" dla backtestów.
+
+SentimentWaveTracker.run_full_analysis() liczy okno days_back względem
+datetime.now(), więc w backtestach każda świeca widzi dzisiejszy sentyment.
+SentimentSnapshots przelicza raz cały zakres backtestu: dla każdej pełnej
+godziny macierz lag-ów, region lidera i aktywne fale - wyłącznie z danych
+dostępnych w tej godzinie - a strategia odczytuje wynik w O(1) na świecę.
+
+Założenia point-in-time:
+- kubełek godzinowy (etykieta = początek godziny) jest dostępny dopiero po
+  jej zamknięciu - snapshot dla granicy B widzi kubełki < B,
+- luki wypełniane przyczynowo (ffill z limitem) zamiast interpolacji, która
+  sięgałaby po przyszłe wartości,
+- okno przesuwne days_back: lagi z StreamingLagTracker (sumy iloczynów
+  z lag-iem aktualizowane przyrostowo, O(R² · max_lag) na godzinę zamiast
+  pełnej korelacji), statystyki zmian z sum prefiksowych.
+
+Przykład:
+    snapshots = SentimentSnapshots.from_database(
+        db, symbol="BTC/USDC", regions=["US", "CN", "JP"],
+        start=datetime(2025, 1, 1), days_back=7
+    )
+    results = snapshots.analysis_at(candle_time)  # format jak run_full_analysis
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .sentiment_propagation_analyzer import (
+    SentimentPropagationAnalyzer,
+    PropagationDirection,
+    PropagationWave
+)
+from .sentiment_wave_tracker import SentimentWaveTracker
+from .streaming_lag_tracker import StreamingLagTracker
+
+# Kierunek propagacji <-> kod w macierzy snapshotów
+_DIRECTION_CODES = {
+    PropagationDirection.LEADS: 1,
+    PropagationDirection.LAGS: -1,
+    PropagationDirection.SYNCHRONOUS: 0,
+}
+_DIRECTIONS = {code: direction for direction, code in _DIRECTION_CODES.items()}
+
+# Okno szukania fali w innych regionach (jak detect_sentiment_waves)
+WAVE_WINDOW_HOURS = 24
+
+
+def load_sentiment_history(
+    db: Any,
+    symbol: str,
+    regions: List[str],
+    start: datetime,
+    end: Optional[datetime] = None,
+    use_llm_data: bool = True,
+    query: Optional[str] = None,
+    fill_limit: int = 3
+) -> pd.DataFrame:
+    """
+    Godzinowy sentyment regionów z bazy dla zakresu backtestu (jedno zapytanie).
+    
+    Args:
+        db: DatabaseManager
+        symbol: Symbol dla danych LLM (np. "BTC/USDC")
+        regions: Kody regionów
+        start: Początek danych (razem z oknem days_back)
+        end: Koniec danych (None = do najnowszych)
+        use_llm_data: Dane z llm_sentiment_hourly (True) lub gdelt_sentiment (False)
+        query: Zapytanie GDELT
+        fill_limit: Maksymalna liczba godzin wypełnianych ostatnią wartością
+    
+    Returns:
+        DataFrame (index: godzina UTC, kolumny: regiony z danymi)
+    """
+    if use_llm_data:
+        rows = db.get_llm_sentiment_hourly(symbol=symbol, regions=regions, start_date=start, end_date=end)
+        if rows.empty:
+            return pd.DataFrame()
+        wide = rows.pivot_table(index=rows.index, columns='region', values='score', aggfunc='mean')
+    else:
+        rows = db.get_gdelt_sentiment(query=query, regions=regions, start_date=start, end_date=end)
+        if rows.empty or 'tone' not in rows.columns:
+            return pd.DataFrame()
+        hours = pd.DatetimeIndex(rows.index).floor('h')
+        wide = rows.groupby([hours, 'region'])['tone'].mean().unstack('region')
+    
+    index = pd.DatetimeIndex(wide.index)
+    wide.index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+    wide = wide.asfreq('1h')
+    wide = wide[[r for r in regions if r in wide.columns]].rename_axis(None, axis=1)
+    # Przyczynowo: luka wypełniana ostatnią znaną wartością
+    return wide.astype(float).ffill(limit=fill_limit)
+
+
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """Dla każdego wiersza: indeks pierwszego True od tego wiersza w dół (len = brak), kolumnami."""
+    rows = len(mask)
+    positions = np.where(mask, np.arange(rows)[:, None], rows)
+    nxt = np.minimum.accumulate(positions[::-1], axis=0)[::-1]
+    return np.vstack([nxt, np.full((1, mask.shape[1]), rows)])
+
+
+class SentimentSnapshots:
+    """
+    Godzinowe snapshoty analizy propagacji sentymentu (point-in-time).
+    
+    Dane przechowywane kolumnowo:
+    - macierze (godzina × region × region): lag_hours, correlation, confidence,
+      kierunek (int8); NaN = brak wyniku dla pary,
+    - lider: indeks regionu i średni lead time,
+    - aktywne fale: tablice płaskie + offsety na godzinę (CSR).
+    
+    Snapshot j odpowiada granicy times[j] i zawiera dane zamkniętych kubełków
+    sprzed tej granicy; analysis_at(t) wybiera ostatnią granicę <= t.
+    """
+    
+    def __init__(
+        self,
+        regions: List[str],
+        times: pd.DatetimeIndex,
+        lag_hours: np.ndarray,
+        correlation: np.ndarray,
+        confidence: np.ndarray,
+        direction: np.ndarray,
+        leader: np.ndarray,
+        avg_lead_hours: np.ndarray,
+        waves_detected: np.ndarray,
+        wave_offsets: np.ndarray,
+        waves: Dict[str, np.ndarray],
+        paths: List[Tuple[Tuple[str, float], ...]]
+    ):
+        self.regions = list(regions)
+        self.times = times
+        self.lag_hours = lag_hours
+        self.correlation = correlation
+        self.confidence = confidence
+        self.direction = direction
+        self.leader = leader
+        self.avg_lead_hours = avg_lead_hours
+        self.waves_detected = waves_detected
+        self.wave_offsets = wave_offsets
+        self._waves = waves
+        self._paths = paths
+        
+        self._start_ns = int(times.asi8[0]) if len(times) else 0
+        self._step_ns = int(times.asi8[1] - times.asi8[0]) if len(times) > 1 else 3600 * 10**9
+        self._cached: Tuple[int, Optional[Dict[str, Any]]] = (-1, None)
+    
+    def __len__(self) -> int:
+        return len(self.times)
+    
+    def __repr__(self) -> str:
+        if not len(self):
+            return "<SentimentSnapshots: empty>"
+        return f"<SentimentSnapshots: {len(self)}h {self.times[0]} - {self.times[-1]}, regions={self.regions}>"
+    
+    # === Budowa ===
+    
+    @classmethod
+    def from_database(
+        cls,
+        db: Any,
+        symbol: str,
+        regions: List[str],
+        start: datetime,
+        end: Optional[datetime] = None,
+        days_back: int = 7,
+        analyzer: Optional[SentimentPropagationAnalyzer] = None,
+        use_llm_data: bool = True,
+        query: Optional[str] = None,
+        recent_wave_hours: float = 24
+    ) -> "SentimentSnapshots":
+        """
+        Ładuje historię sentymentu (zakres + okno days_back) i buduje snapshoty.
+        
+        Args:
+            db: DatabaseManager
+            symbol: Symbol dla danych LLM
+            regions: Kody regionów
+            start: Pierwsza świeca backtestu
+            end: Ostatnia świeca (None = do końca danych)
+            days_back: Okno analizy w dniach (jak w run_full_analysis)
+            analyzer: Analizator (domyślnie parametry SentimentWaveTracker)
+            use_llm_data: Źródło danych: LLM (True) lub GDELT (False)
+            query: Zapytanie GDELT
+            recent_wave_hours: Wiek fali, do którego generuje sygnał
+        """
+        start = pd.Timestamp(start)
+        start = start.tz_localize('UTC') if start.tz is None else start.tz_convert('UTC')
+        sentiment = load_sentiment_history(
+            db, symbol, regions, (start - pd.Timedelta(days=days_back)).to_pydatetime(),
+            end, use_llm_data=use_llm_data, query=query
+        )
+        return cls.build(
+            sentiment, analyzer=analyzer, start=start, end=end,
+            days_back=days_back, recent_wave_hours=recent_wave_hours
+        )
+    
+    @classmethod
+    def build(
+        cls,
+        sentiment: pd.DataFrame,
+        analyzer: Optional[SentimentPropagationAnalyzer] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        days_back: int = 7,
+        recent_wave_hours: float = 24,
+        threshold_std: float = 2.0,
+        min_affected_regions: int = 2
+    ) -> "SentimentSnapshots":
+        """
+        Buduje snapshoty z szeregu sentymentu (przesuwne okno, obliczenia przyrostowe).
+        
+        Args:
+            sentiment: DataFrame w regularnej siatce time_resolution (kolumny = regiony)
+            analyzer: Analizator (domyślnie parametry SentimentWaveTracker)
+            start: Pierwsza granica snapshotu (domyślnie pierwsza możliwa)
+            end: Ostatnia granica (domyślnie koniec danych)
+            days_back: Okno analizy w dniach
+            recent_wave_hours: Wiek fali, do którego generuje sygnał
+            threshold_std: Próg wykrywania fal (jak detect_sentiment_waves)
+            min_affected_regions: Minimalna liczba regionów fali
+        """
+        if analyzer is None:
+            analyzer = SentimentPropagationAnalyzer(time_resolution_hours=1.0, max_lag_hours=48, min_correlation=0.3)
+        
+        regions = list(sentiment.columns)
+        step = pd.Timedelta(hours=analyzer.time_resolution)
+        if sentiment.empty:
+            return cls._empty(regions)
+        
+        index = pd.DatetimeIndex(sentiment.index)
+        index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+        grid = pd.date_range(index[0], index[-1], freq=step)
+        sentiment = sentiment.set_axis(index).reindex(grid)
+        
+        # Granice snapshotów: kubełek o etykiecie t zamknięty w t + step
+        first = grid[0] + step
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize('UTC') if start.tz is None else start.tz_convert('UTC')
+            first = max(first, start.floor(step))
+        last = grid[-1] + step
+        if end is not None:
+            end = pd.Timestamp(end)
+            end = end.tz_localize('UTC') if end.tz is None else end.tz_convert('UTC')
+            last = min(last, end.floor(step))
+        if last < first:
+            return cls._empty(regions)
+        times = pd.date_range(first, last, freq=step)
+        
+        builder = _SnapshotBuilder(
+            sentiment, analyzer,
+            window=max(2, int(round(days_back * 24 / analyzer.time_resolution))),
+            recent_wave_hours=recent_wave_hours,
+            threshold_std=threshold_std,
+            min_affected_regions=min_affected_regions
+        )
+        snapshots = builder.run(times)
+        logger.info(f"Zbudowano {snapshots}")
+        return snapshots
+    
+    @classmethod
+    def _empty(cls, regions: List[str]) -> "SentimentSnapshots":
+        r = len(regions)
+        return cls(
+            regions, pd.DatetimeIndex([], tz='UTC'),
+            np.empty((0, r, r), np.float32), np.empty((0, r, r), np.float32),
+            np.empty((0, r, r), np.float32), np.empty((0, r, r), np.int8),
+            np.empty(0, np.int16), np.empty(0, np.float32), np.empty(0, np.int32),
+            np.zeros(1, np.int64), _wave_columns([], [], [], [], []), []
+        )
+    
+    # === Odczyt ===
+    
+    def index_of(self, timestamp: Any) -> Optional[int]:
+        """Indeks snapshotu dla chwili timestamp (ostatnia granica <= timestamp), O(1)."""
+        if not len(self):
+            return None
+        ts = pd.Timestamp(timestamp)
+        ts = ts.tz_localize('UTC') if ts.tz is None else ts
+        i = (ts.value - self._start_ns) // self._step_ns
+        if i < 0 or i >= len(self):
+            return None
+        return int(i)
+    
+    def analysis_at(self, timestamp: Any) -> Optional[Dict[str, Any]]:
+        """
+        Wynik analizy w formacie SentimentWaveTracker.run_full_analysis (bez danych surowych).
+        
+        Returns:
+            Słownik z timestamp, leader_region, waves i summary (trading_signals)
+            lub None poza zakresem snapshotów
+        """
+        i = self.index_of(timestamp)
+        if i is None:
+            return None
+        if self._cached[0] == i:
+            return self._cached[1]
+        
+        leader = self.leader_region(i)
+        waves = self._active_waves(i)
+        results = {
+            "timestamp": self.times[i].isoformat(),
+            "leader_region": leader,
+            "waves": waves,
+            "summary": {
+                "waves_detected": int(self.waves_detected[i]),
+                "leader_region": leader["region"] if leader else None,
+                "trading_signals": [
+                    {
+                        "type": "bullish" if wave["sentiment_change"] > 0 else "bearish",
+                        "origin": wave["origin"],
+                        "strength": wave["strength"],
+                        "expected_propagation": wave["affected_regions"][1:],
+                        "message": SentimentWaveTracker._generate_signal_message(wave)
+                    }
+                    for wave in waves
+                ]
+            }
+        }
+        self._cached = (i, results)
+        return results
+    
+    def leader_region(self, i: int) -> Optional[Dict[str, Any]]:
+        """Region lidera snapshotu i (jak run_full_analysis["leader_region"])."""
+        if self.leader[i] < 0:
+            return None
+        return {"region": self.regions[self.leader[i]], "avg_lead_hours": float(self.avg_lead_hours[i])}
+    
+    def lag_matrix_at(self, timestamp: Any) -> Dict[str, Dict[str, Any]]:
+        """Macierz lag-ów w formacie run_full_analysis["lag_matrix"] ("A-B" -> wartości)."""
+        i = self.index_of(timestamp)
+        if i is None:
+            return {}
+        matrix = {}
+        for a, b in zip(*np.nonzero(~np.isnan(self.lag_hours[i]))):
+            matrix[f"{self.regions[a]}-{self.regions[b]}"] = {
+                "lag_hours": float(self.lag_hours[i, a, b]),
+                "correlation": float(self.correlation[i, a, b]),
+                "direction": _DIRECTIONS[int(self.direction[i, a, b])].value,
+                "confidence": float(self.confidence[i, a, b])
+            }
+        return matrix
+    
+    def _active_waves(self, i: int) -> List[Dict[str, Any]]:
+        waves = []
+        for row in range(self.wave_offsets[i], self.wave_offsets[i + 1]):
+            path = self._paths[self._waves['path'][row]]
+            waves.append({
+                "origin": self.regions[self._waves['origin'][row]],
+                "time": pd.Timestamp(int(self._waves['time'][row]), tz='UTC').isoformat(),
+                "affected_regions": [region for region, _ in path],
+                "arrival_times": dict(path),
+                "sentiment_change": float(self._waves['change'][row]),
+                "strength": float(self._waves['strength'][row])
+            })
+        return waves
+
+
+def _wave_columns(origin, time, change, strength, path) -> Dict[str, np.ndarray]:
+    return {
+        'origin': np.asarray(origin, dtype=np.int16),
+        'time': np.asarray(time, dtype=np.int64),
+        'change': np.asarray(change, dtype=np.float32),
+        'strength': np.asarray(strength, dtype=np.float32),
+        'path': np.asarray(path, dtype=np.int32),
+    }
+
+
+class _SnapshotBuilder:
+    """Przesuwne okno po siatce sentymentu: lagi ze StreamingLagTracker, fale z sum prefiksowych."""
+    
+    def __init__(
+        self,
+        sentiment: pd.DataFrame,
+        analyzer: SentimentPropagationAnalyzer,
+        window: int,
+        recent_wave_hours: float,
+        threshold_std: float,
+        min_affected_regions: int
+    ):
+        self.sentiment = sentiment
+        self.analyzer = analyzer
+        self.window = window
+        self.recent_wave_hours = recent_wave_hours
+        self.threshold_std = threshold_std
+        self.min_affected_regions = min_affected_regions
+        self.regions = list(sentiment.columns)
+        self.grid_ns = sentiment.index.asi8
+        self.lags = StreamingLagTracker(
+            self.regions, window_hours=window * analyzer.time_resolution, analyzer=analyzer
+        )
+        
+        # Zmiany (diff) - statystyki okna z sum prefiksowych, najbliższa zmiana danego znaku w O(1)
+        changes = sentiment.diff().to_numpy(dtype=np.float64)
+        self.changes = changes
+        changes_valid = ~np.isnan(changes)
+        changes_x = np.where(changes_valid, changes, 0.0)
+        zero = np.zeros((1, len(self.regions)))
+        self.change_sum = np.vstack([zero, np.cumsum(changes_x, axis=0)])
+        self.change_sum_sq = np.vstack([zero, np.cumsum(changes_x ** 2, axis=0)])
+        self.change_count = np.vstack([zero, np.cumsum(changes_valid, axis=0)]).astype(np.int64)
+        self.next_positive = _next_index(changes > 0)
+        self.next_negative = _next_index(changes < 0)
+        self.wave_rows = int(WAVE_WINDOW_HOURS / analyzer.time_resolution)
+    
+    def _waves(self, s: int, e: int, boundary_ns: int) -> Tuple[int, List[PropagationWave]]:
+        """Fale sentymentu w oknie [s, e) (jak detect_sentiment_waves) i te z ostatnich recent_wave_hours."""
+        lo = s + 1  # pierwsza zmiana w oknie (diff pierwszego wiersza = NaN)
+        count = self.change_count[e] - self.change_count[lo]
+        total = self.change_sum[e] - self.change_sum[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / count
+            var = (self.change_sum_sq[e] - self.change_sum_sq[lo] - count * mean ** 2) / (count - 1)
+        threshold = mean + self.threshold_std * np.sqrt(np.maximum(var, 0.0))
+        
+        window = self.changes[lo:e]
+        with np.errstate(invalid='ignore'):
+            anomalies = (np.abs(window) > np.abs(threshold)) & (count >= 10)
+        
+        # Anomalie regionami (jak pętla w detect_sentiment_waves), pierwsza zmiana tego samego znaku w ±24h
+        origins, rows = np.nonzero(anomalies.T)
+        rows = rows + lo
+        changes = self.changes[rows, origins]
+        first_rows = np.maximum(rows - self.wave_rows, lo)
+        closest = np.where((changes > 0)[:, None], self.next_positive[first_rows], self.next_negative[first_rows])
+        time_diff = (closest - rows[:, None]) * self.analyzer.time_resolution
+        reached = (closest <= np.minimum(rows + self.wave_rows, e - 1)[:, None]) & (np.abs(time_diff) < WAVE_WINDOW_HOURS)
+        reached[np.arange(len(rows)), origins] = False
+        
+        waves = []
+        for n in np.nonzero(reached.sum(axis=1) + 1 >= self.min_affected_regions)[0]:
+            region, change = origins[n], changes[n]
+            arrival_times = {self.regions[region]: 0.0}
+            for other in np.nonzero(reached[n])[0]:
+                arrival_times[self.regions[other]] = float(time_diff[n, other])
+            waves.append(PropagationWave(
+                origin_region=self.regions[region],
+                wave_time=pd.Timestamp(self.grid_ns[rows[n]], tz='UTC'),
+                affected_regions=sorted(arrival_times.keys(), key=lambda x: arrival_times[x]),
+                arrival_times=arrival_times,
+                sentiment_change=float(change),
+                strength=min(1.0, abs(change) / (threshold[region] * 2))
+            ))
+        
+        unique = self.analyzer._deduplicate_waves(waves)
+        since = boundary_ns - int(self.recent_wave_hours * 3600 * 10**9)
+        return len(unique), [w for w in unique if w.wave_time.value > since]
+    
+    def run(self, times: pd.DatetimeIndex) -> SentimentSnapshots:
+        regions = self.regions
+        r = len(regions)
+        h = len(times)
+        lag_hours = np.full((h, r, r), np.nan, np.float32)
+        correlation = np.full((h, r, r), np.nan, np.float32)
+        confidence = np.full((h, r, r), np.nan, np.float32)
+        direction = np.zeros((h, r, r), np.int8)
+        leader = np.full(h, -1, np.int16)
+        avg_lead = np.zeros(h, np.float32)
+        waves_detected = np.zeros(h, np.int32)
+        wave_offsets = np.zeros(h + 1, np.int64)
+        wave_rows: Tuple[list, ...] = ([], [], [], [], [])
+        paths: List[Tuple[Tuple[str, float], ...]] = []
+        path_ids: Dict[Tuple[Tuple[str, float], ...], int] = {}
+        
+        step_ns = int(self.grid_ns[1] - self.grid_ns[0]) if len(self.grid_ns) > 1 else 3600 * 10**9
+        ends = np.clip((times.asi8 - self.grid_ns[0]) // step_ns, 0, len(self.grid_ns))
+        values = self.sentiment.to_numpy(dtype=np.float64)
+        
+        pushed = max(0, int(ends[0]) - self.window)
+        for j, e in enumerate(ends):
+            e = int(e)
+            s = max(0, e - self.window)
+            # Przesuń okno wiersz po wierszu (najstarszy wypada z bufora)
+            while pushed < e:
+                self.lags.push(self.grid_ns[pushed], values[pushed])
+                pushed += 1
+            
+            if e - s >= 2:
+                for a, b, result in self.lags.lag_results():
+                    for (i, k), item in (((a, b), result), ((b, a), self.analyzer._reversed(result))):
+                        lag_hours[j, i, k] = item.lag_hours
+                        correlation[j, i, k] = item.correlation
+                        confidence[j, i, k] = item.confidence
+                        direction[j, i, k] = _DIRECTION_CODES[item.direction]
+                leader[j], avg_lead[j] = self._leader(lag_hours[j], confidence[j], direction[j])
+                waves_detected[j], active = self._waves(s, e, int(times.asi8[j]))
+                for wave in active:
+                    path = tuple((region, wave.arrival_times[region]) for region in wave.affected_regions)
+                    if path not in path_ids:
+                        path_ids[path] = len(paths)
+                        paths.append(path)
+                    for column, value in zip(wave_rows, (
+                        regions.index(wave.origin_region), wave.wave_time.value,
+                        wave.sentiment_change, wave.strength, path_ids[path]
+                    )):
+                        column.append(value)
+            wave_offsets[j + 1] = len(wave_rows[0])
+        
+        return SentimentSnapshots(
+            regions, times, lag_hours, correlation, confidence, direction,
+            leader, avg_lead, waves_detected, wave_offsets, _wave_columns(*wave_rows), paths
+        )
+    
+    @staticmethod
+    def _leader(lag_hours: np.ndarray, confidence: np.ndarray, direction: np.ndarray) -> Tuple[int, float]:
+        """Region najczęściej prowadzący (jak find_leader_region) - indeks i średni lead time."""
+        present = ~np.isnan(lag_hours)
+        candidates = np.nonzero(present.any(axis=1))[0]
+        if not len(candidates):
+            return -1, 0.0
+        leads = present & (direction == _DIRECTION_CODES[PropagationDirection.LEADS]) & (confidence > 0.5)
+        scores = np.array([
+            np.abs(lag_hours[i][leads[i]]).mean() if leads[i].any() else 0.0
+            for i in candidates
+        ])
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
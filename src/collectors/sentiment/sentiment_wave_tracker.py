@@ -34,6 +34,7 @@ from .sentiment_propagation_analyzer import (
     LagResult,
     PropagationWave
 )
+from .streaming_lag_tracker import StreamingLagTracker, published_path, read_published
 
 # Spróbuj zaimportować moduły z projektu użytkownika
 try:
@@ -137,6 +138,9 @@ class SentimentWaveTracker:
             except Exception:
                 pass
         
+        # Przyrostowe macierze lag-ów: (źródło, symbol/zapytanie, regiony, days_back) -> tracker
+        self.lag_trackers: Dict[tuple, StreamingLagTracker] = {}
+        
         logger.info("SentimentWaveTracker zainicjalizowany")
     
     def fetch_multi_country_sentiment(
@@ -399,7 +403,7 @@ class SentimentWaveTracker:
         logger.info("KROK 2: Analiza lag-ów między regionami")
         logger.info("=" * 50)
         
-        lag_matrix = self.analyzer.compute_lag_matrix(sentiment_df)
+        lag_matrix = self._lag_matrix(sentiment_df, symbol, query, days_back)
         results["lag_matrix"] = {
             f"{k[0]}-{k[1]}": {
                 "lag_hours": v.lag_hours,
@@ -465,6 +469,41 @@ class SentimentWaveTracker:
         
         return results
     
+    def _lag_matrix(
+        self,
+        sentiment_df: pd.DataFrame,
+        symbol: str,
+        query: str,
+        days_back: int
+    ) -> Dict[tuple, LagResult]:
+        """
+        Macierz lag-ów: opublikowana przez daemon (gdy świeża) lub z lokalnego
+        StreamingLagTracker, który wprowadza tylko nowe/poprawione kubełki.
+        """
+        regions = list(sentiment_df.columns)
+        source = "llm" if self.use_llm_data else "gdelt"
+        name = symbol if self.use_llm_data else query
+        published = read_published(published_path(source, name, self.cache_dir))
+        if (
+            published
+            and set(regions) <= set(published["regions"])
+            and published["window_hours"] == days_back * 24
+        ):
+            logger.info(f"Macierz lag-ów z daemona {source} (aktualizacja: {published['updated_at']})")
+            return {
+                pair: result for pair, result in published["lag_matrix"].items()
+                if pair[0] in regions and pair[1] in regions
+            }
+        
+        # Osobne okno na źródło i symbol - inaczej dane BTC poprawiałyby kubełki ETH
+        key = (source, name, tuple(regions), days_back)
+        if key not in self.lag_trackers:
+            self.lag_trackers[key] = StreamingLagTracker(regions, window_hours=days_back * 24, analyzer=self.analyzer)
+        tracker = self.lag_trackers[key]
+        changed = tracker.sync(sentiment_df)
+        logger.debug(f"StreamingLagTracker: {changed} nowych/poprawionych kubełków")
+        return tracker.lag_matrix()
+    
     def _generate_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Generuje podsumowanie wyników."""
         summary = {
@@ -504,7 +543,8 @@ class SentimentWaveTracker:
         
         return summary
     
-    def _generate_signal_message(self, wave: Dict) -> str:
+    @staticmethod
+    def _generate_signal_message(wave: Dict) -> str:
         """Generuje czytelny komunikat o sygnale."""
         direction = "pozytywna" if wave["sentiment_change"] > 0 else "negatywna"
         
@@ -0,0 +1,418 @@
+"""
+Streaming Lag Tracker
+=====================
+Przyrostowa macierz lag-ów między regionami dla trybu live.
+
+compute_lag_matrix() przy każdym odświeżeniu liczy pełną cross-correlation
+okna days_back, choć od poprzedniego razu doszedł jeden punkt godzinowy na
+region. StreamingLagTracker trzyma okno w buforze pierścieniowym i sumy
+iloczynów z lag-iem dla każdej pary regionów: nowy (lub poprawiony) punkt to
+O(R² · max_lag), a bieżący lag, korelacja i pewność są dostępne od razu -
+z tymi samymi wynikami co detect_lag dla okna bez luk.
+
+Daemony LLM/GDELT karmią tracker punktami w miarę zapisu do bazy i publikują
+macierz do pliku JSON, który SentimentWaveTracker czyta zamiast liczyć:
+
+    tracker = StreamingLagTracker(["US", "CN", "JP"], window_hours=7 * 24)
+    tracker.update(bucket_time, {"US": 0.4, "JP": 0.1})
+    tracker.lag("US", "JP")           # LagResult
+    tracker.publish(published_path("llm", "BTC/USDC"), symbol="BTC/USDC")
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .sentiment_propagation_analyzer import (
+    SentimentPropagationAnalyzer,
+    PropagationDirection,
+    LagResult
+)
+
+# Katalog publikowanych macierzy (jak cache SentimentWaveTracker)
+PUBLISHED_DIR = Path("data/sentiment_waves")
+
+
+def published_path(source: str, symbol: str, directory: Optional[Path] = None) -> Path:
+    """Plik macierzy lag-ów publikowanej przez daemon (source: "llm" + symbol lub "gdelt" + zapytanie)."""
+    name = re.sub(r"[^A-Za-z0-9]+", "_", symbol).strip("_")
+    return (directory or PUBLISHED_DIR) / f"lag_tracker_{source}_{name}.json"
+
+
+def lag_matrix_to_dict(lag_matrix: Dict[Tuple[str, str], LagResult]) -> Dict[str, Dict[str, Any]]:
+    """Macierz lag-ów w formacie run_full_analysis["lag_matrix"] ("A-B" -> wartości)."""
+    return {
+        f"{a}-{b}": {
+            "lag_hours": result.lag_hours,
+            "correlation": result.correlation,
+            "direction": result.direction.value,
+            "confidence": result.confidence,
+            "optimal_lag": result.optimal_lag
+        }
+        for (a, b), result in lag_matrix.items()
+    }
+
+
+def read_published(path: Path, max_age_hours: float = 2.0) -> Optional[Dict[str, Any]]:
+    """
+    Czyta macierz opublikowaną przez daemon.
+    
+    Returns:
+        Słownik z regions, updated_at, last_bucket i lag_matrix ((A, B) -> LagResult)
+        lub None gdy brak pliku, błąd odczytu albo dane starsze niż max_age_hours
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        updated_at = datetime.fromisoformat(data["updated_at"])
+    except (OSError, ValueError, KeyError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Nie można odczytać macierzy lag-ów {path}: {e}")
+        return None
+    
+    age_hours = (datetime.now(timezone.utc) - updated_at).total_seconds() / 3600
+    if age_hours > max_age_hours:
+        logger.debug(f"Macierz lag-ów {path} nieaktualna ({age_hours:.1f}h)")
+        return None
+    
+    lag_matrix = {}
+    for key, item in data["lag_matrix"].items():
+        region_a, region_b = key.split("-", 1)
+        lag_matrix[(region_a, region_b)] = LagResult(
+            region_a=region_a,
+            region_b=region_b,
+            optimal_lag=int(item["optimal_lag"]),
+            correlation=float(item["correlation"]),
+            direction=PropagationDirection(item["direction"]),
+            confidence=float(item["confidence"]),
+            lag_hours=float(item["lag_hours"])
+        )
+    data["lag_matrix"] = lag_matrix
+    return data
+
+
+class StreamingLagTracker:
+    """
+    Macierz lag-ów okna przesuwnego aktualizowana punkt po punkcie.
+    
+    Stan:
+    - bufor pierścieniowy okna (godzina × region) z wartościami i znacznikami czasu,
+    - sumy, sumy kwadratów i liczniki wartości per region,
+    - products[i, j, K + k] = Σ x[n + k, i] · x[n, j] (K = max_lag, brak danych = 0),
+    - liczniki wspólnych próbek per para.
+    
+    Para z pełnym oknem liczona jest z sum w O(max_lag); para z lukami
+    przez detect_lag na danych okna (dropna + wspólny indeks).
+    
+    Poprawki tylko nadpisują wartości: NaN w update()/sync() oznacza "bez
+    zmian", więc wartości usuniętej ze źródła tracker nie wyczyści - po
+    takiej zmianie trzeba zbudować nowy tracker.
+    """
+    
+    def __init__(
+        self,
+        regions: List[str],
+        window_hours: float = 7 * 24,
+        analyzer: Optional[SentimentPropagationAnalyzer] = None,
+        fill_limit: int = 3
+    ):
+        """
+        Args:
+            regions: Kody regionów (kolejność kolumn)
+            window_hours: Długość okna (jak days_back * 24 w run_full_analysis)
+            analyzer: Analizator (max_lag, min_samples, korekta stref czasowych)
+            fill_limit: Ile kubełków update() wypełnia ostatnią wartością regionu
+        """
+        if analyzer is None:
+            analyzer = SentimentPropagationAnalyzer(time_resolution_hours=1.0, max_lag_hours=48, min_correlation=0.3)
+        self.regions = list(regions)
+        self.analyzer = analyzer
+        self.fill_limit = fill_limit
+        self.window = max(2, int(round(window_hours / analyzer.time_resolution)))
+        self.max_lag = analyzer.max_lag
+        self.step_ns = int(analyzer.time_resolution * 3600 * 10**9)
+        self.use_tz = bool(analyzer.use_timezone_aware and analyzer.tz_analyzer)
+        
+        r = len(self.regions)
+        self._times = np.zeros(self.window, np.int64)
+        self._x = np.zeros((self.window, r))
+        self._valid = np.zeros((self.window, r), bool)
+        self._head = 0
+        self.size = 0
+        
+        self._sum = np.zeros(r)
+        self._sum_sq = np.zeros(r)
+        self._count = np.zeros(r, np.int64)
+        self._pair_count = np.zeros((r, r), np.int64)
+        self._products = np.zeros((r, r, 2 * self.max_lag + 1))
+        self._lags = np.arange(-self.max_lag, self.max_lag + 1)
+        
+        self._last_values = np.full(r, np.nan)
+        self._last_age = np.zeros(r, np.int64)
+        self._tz_cache: Dict[Tuple[str, str, Any, float], LagResult] = {}
+        self._matrix: Optional[Dict[Tuple[str, str], LagResult]] = None
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __repr__(self) -> str:
+        return f"<StreamingLagTracker: {self.size}/{self.window} punktów, regions={self.regions}>"
+    
+    @property
+    def last_bucket(self) -> Optional[pd.Timestamp]:
+        """Znacznik czasu najnowszego kubełka w oknie."""
+        if not self.size:
+            return None
+        return pd.Timestamp(int(self._times[self._slots(self.size - 1)]), tz='UTC')
+    
+    # === Aktualizacja ===
+    
+    def update(self, timestamp: Any, values: Dict[str, float]) -> bool:
+        """
+        Dodaje punkt (lub poprawia kubełek już obecny w oknie).
+        
+        Args:
+            timestamp: Czas punktu - zaokrąglany w dół do kubełka time_resolution
+            values: Region -> wartość (brakujące regiony: ostatnia wartość do fill_limit kubełków;
+                dla kubełka już w oknie brak regionu lub NaN nie zmienia jego wartości)
+        
+        Returns:
+            True gdy okno się zmieniło (False: punkt starszy niż okno lub bez zmian)
+        """
+        ts = pd.Timestamp(timestamp)
+        ts = ts.tz_localize('UTC') if ts.tz is None else ts
+        bucket = ts.value - ts.value % self.step_ns
+        row = np.array([values.get(region, np.nan) for region in self.regions], dtype=np.float64)
+        
+        if not self.size or bucket > self._times[self._slots(self.size - 1)]:
+            latest = self._times[self._slots(self.size - 1)] if self.size else bucket - self.step_ns
+            missing = min(int((bucket - latest) // self.step_ns) - 1, self.window)
+            for n in range(missing, 0, -1):
+                self.push(bucket - n * self.step_ns, self._carried(np.full(len(self.regions), np.nan)))
+            self.push(bucket, self._carried(row))
+            return True
+        
+        oldest = self._times[self._slots(0)]
+        if bucket < oldest:
+            return False
+        i = int((bucket - oldest) // self.step_ns)
+        current = np.where(self._valid[self._slots(i)], self._x[self._slots(i)], np.nan)
+        merged = np.where(np.isnan(row), current, row)
+        if np.array_equal(merged, current, equal_nan=True):
+            return False
+        self._contribute(i, -1.0)
+        self._write(self._slots(i), merged)
+        self._contribute(i, 1.0)
+        if i == self.size - 1:
+            self._last_values = np.where(np.isnan(merged), self._last_values, merged)
+        self._matrix = None
+        return True
+    
+    def sync(self, df: pd.DataFrame) -> int:
+        """
+        Wprowadza wiersze DataFrame (index: czas, kolumny: regiony) - nowe i poprawione.
+        
+        Returns:
+            Liczba wierszy, które zmieniły okno
+        """
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize('UTC') if index.tz is None else index.tz_convert('UTC')
+        columns = [region for region in self.regions if region in df.columns]
+        values = df[columns].to_numpy(dtype=np.float64)
+        return sum(
+            self.update(ts, {region: value for region, value in zip(columns, row) if not np.isnan(value)})
+            for ts, row in zip(index, values)
+        )
+    
+    def push(self, timestamp_ns: int, row: np.ndarray):
+        """Dopisuje kolejny kubełek (bez wypełniania luk), usuwając najstarszy przy pełnym oknie."""
+        if self.size == self.window:
+            self._contribute(0, -1.0)
+            self._set_counts(self._slots(0), -1)
+            self.size -= 1
+        slot = self._head
+        self._head = (self._head + 1) % self.window
+        self.size += 1
+        self._times[slot] = timestamp_ns
+        self._x[slot] = 0.0
+        self._valid[slot] = False
+        self._write(slot, row)
+        self._contribute(self.size - 1, 1.0)
+        self._matrix = None
+    
+    def _carried(self, row: np.ndarray) -> np.ndarray:
+        """Brakujące wartości z ostatniego kubełka regionu (maksymalnie fill_limit kubełków)."""
+        missing = np.isnan(row)
+        self._last_age = np.where(missing, self._last_age + 1, 0)
+        carry = missing & (self._last_age <= self.fill_limit)
+        row = np.where(carry, self._last_values, row)
+        self._last_values = np.where(missing, self._last_values, row)
+        return row
+    
+    def _slots(self, logical):
+        """Pozycje w buforze dla indeksów logicznych (0 = najstarszy punkt okna)."""
+        return (self._head - self.size + np.asarray(logical)) % self.window
+    
+    def _write(self, slot: int, row: np.ndarray):
+        """Zapisuje wartości kubełka, aktualizując sumy i liczniki."""
+        self._set_counts(slot, -1)
+        valid = ~np.isnan(row)
+        self._x[slot] = np.where(valid, row, 0.0)
+        self._valid[slot] = valid
+        self._set_counts(slot, 1)
+    
+    def _set_counts(self, slot: int, sign: int):
+        x, valid = self._x[slot], self._valid[slot]
+        self._sum += sign * x
+        self._sum_sq += sign * x ** 2
+        self._count += sign * valid
+        self._pair_count += sign * np.outer(valid, valid)
+    
+    def _contribute(self, i: int, sign: float):
+        """Dodaje (sign=1) lub usuwa (sign=-1) iloczyny z udziałem punktu i okna."""
+        row = self._x[self._slots(i)]
+        # Punkt jako "a" przy lag-u k: x[i, a] · x[i - k, b]
+        partners = i - self._lags
+        ok = (partners >= 0) & (partners < self.size)
+        self._products[:, :, ok] += sign * np.einsum('i,kj->ijk', row, self._x[self._slots(partners[ok])])
+        # Punkt jako "b": x[i + k, a] · x[i, b] (k = 0 już policzone)
+        partners = i + self._lags
+        ok = (partners >= 0) & (partners < self.size) & (self._lags != 0)
+        self._products[:, :, ok] += sign * np.einsum('ki,j->ijk', self._x[self._slots(partners[ok])], row)
+    
+    # === Odczyt ===
+    
+    def window_frame(self) -> pd.DataFrame:
+        """Okno jako DataFrame (index: kubełki UTC, kolumny: regiony)."""
+        slots = self._slots(np.arange(self.size))
+        return pd.DataFrame(
+            np.where(self._valid[slots], self._x[slots], np.nan),
+            index=pd.DatetimeIndex(self._times[slots]).tz_localize('UTC'),
+            columns=self.regions
+        )
+    
+    def _correlations(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Znormalizowana cross-correlation (jak detect_lag) dla wszystkich par, przy pełnym oknie."""
+        n = self.size
+        k_max = min(self.max_lag, n - 1)
+        lags = np.arange(-k_max, k_max + 1)
+        mean = self._sum / n
+        std = np.sqrt(np.maximum(self._sum_sq / n - mean ** 2, 0.0)) + 1e-10
+        
+        # Sumy pierwszych i ostatnich k punktów okna (części poza nakładaniem przy lag-u k)
+        zero = np.zeros((1, len(self.regions)))
+        head = np.vstack([zero, np.cumsum(self._x[self._slots(np.arange(k_max))], axis=0)])
+        tail = np.vstack([zero, np.cumsum(self._x[self._slots(np.arange(n - 1, n - 1 - k_max, -1))], axis=0)])
+        shift = np.abs(lags)
+        # k >= 0: a z [k, n), b z [0, n - k); k < 0: a z [0, n - |k|), b z [|k|, n)
+        sum_a = self._sum - np.where((lags >= 0)[:, None], head[shift], tail[shift])
+        sum_b = self._sum - np.where((lags >= 0)[:, None], tail[shift], head[shift])
+        overlap = (n - shift)[:, None, None]
+        
+        p = self._products[:, :, self.max_lag - k_max:self.max_lag + k_max + 1].transpose(2, 0, 1)
+        centered = (
+            p
+            - sum_a[:, :, None] * mean[None, None, :]
+            - mean[None, :, None] * sum_b[:, None, :]
+            + overlap * mean[None, :, None] * mean[None, None, :]
+        )
+        return centered / (n * std[None, :, None] * std[None, None, :]), lags
+    
+    def lag_results(self) -> Iterator[Tuple[int, int, LagResult]]:
+        """Wyniki par (a < b) jak compute_lag_matrix: (indeks a, indeks b, LagResult)."""
+        n = self.size
+        if n < 2:
+            return
+        full = self._count == n
+        corr, lags = self._correlations() if full.any() else (None, None)
+        frame = None
+        
+        for a, region_a in enumerate(self.regions):
+            for b in range(a + 1, len(self.regions)):
+                region_b = self.regions[b]
+                if full[a] and full[b]:
+                    if n < self.analyzer.min_samples:
+                        continue
+                    result = self.analyzer._lag_result(region_a, region_b, corr[:, a, b], lags)
+                else:
+                    # Luki w oknie - dokładna ścieżka detect_lag (dropna + wspólny indeks)
+                    if self._pair_count[a, b] < self.analyzer.min_samples:
+                        continue
+                    if frame is None:
+                        frame = self.window_frame()
+                    result = self.analyzer.detect_lag(frame, region_a, region_b)
+                    if result is None:
+                        continue
+                if self.use_tz:
+                    result = self._timezone_adjusted(result)
+                yield a, b, result
+    
+    def _timezone_adjusted(self, result: LagResult) -> LagResult:
+        """Korekta stref czasowych (zależy od regionu docelowego, daty środka okna i lag-u) z cache."""
+        middle = pd.Timestamp(int(self._times[self._slots(self.size // 2)]), tz='UTC')
+        key = (result.region_a, result.region_b, middle.date(), result.lag_hours)
+        if key not in self._tz_cache:
+            self._tz_cache[key] = self.analyzer._adjust_for_timezones(pd.DataFrame(index=[middle]), result)
+        adjusted = self._tz_cache[key]
+        if adjusted.lag_hours == result.lag_hours:
+            return result
+        return LagResult(
+            region_a=result.region_a,
+            region_b=result.region_b,
+            optimal_lag=adjusted.optimal_lag,
+            correlation=result.correlation,
+            direction=result.direction,
+            confidence=result.confidence,
+            lag_hours=adjusted.lag_hours
+        )
+    
+    def lag_matrix(self) -> Dict[Tuple[str, str], LagResult]:
+        """Bieżąca macierz lag-ów w formacie compute_lag_matrix (obie strony każdej pary)."""
+        if self._matrix is None:
+            matrix = {}
+            for a, b, result in self.lag_results():
+                matrix[(result.region_a, result.region_b)] = result
+                matrix[(result.region_b, result.region_a)] = self.analyzer._reversed(result)
+            self._matrix = matrix
+        return self._matrix
+    
+    def lag(self, region_a: str, region_b: str) -> Optional[LagResult]:
+        """Bieżący lag między regionami (None gdy za mało danych)."""
+        return self.lag_matrix().get((region_a, region_b))
+    
+    def leader_region(self) -> Tuple[str, float]:
+        """Region lidera i średni lead time (jak find_leader_region)."""
+        return self.analyzer.find_leader_region(self.lag_matrix())
+    
+    def publish(self, path: Path, **meta: Any) -> Path:
+        """
+        Zapisuje bieżącą macierz do JSON (atomowo) dla procesów strategii.
+        
+        Args:
+            path: Plik docelowy (np. published_path("llm", symbol))
+            **meta: Dodatkowe pola (np. symbol, source)
+        """
+        leader, avg_lead = self.leader_region() if self.lag_matrix() else ("", 0.0)
+        data = {
+            **meta,
+            "regions": self.regions,
+            "window_hours": self.window * self.analyzer.time_resolution,
+            "max_lag_hours": self.max_lag * self.analyzer.time_resolution,
+            "points": self.size,
+            "last_bucket": self.last_bucket.isoformat() if self.size else None,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "leader_region": {"region": leader, "avg_lead_hours": float(avg_lead)},
+            "lag_matrix": lag_matrix_to_dict(self.lag_matrix())
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
@@ -4,6 +4,10 @@ Telegram Collector
 Kolektor danych z Telegram Bot API do wysyłania/odbierania wiadomości.
 
 Uwaga: Telegram nie ma sandbox/testnet, ale można użyć testowego bota.
+
+Z async_notifications=True alerty i raporty trafiają do kolejki
+TelegramNotifier (wysyłka w tle, koalescencja, ponawianie) zamiast blokować
+wywołującego na czas zapytania HTTP.
 """
 
 import os
@@ -11,6 +15,8 @@ from typing import List, Dict, Optional
 from datetime import datetime
 from loguru import logger
 
+from .telegram_notifier import TelegramNotifier
+
 try:
     import requests
     REQUESTS_AVAILABLE = True
@@ -28,13 +34,21 @@ class TelegramCollector:
     
     BASE_URL = "https://api.telegram.org/bot"
     
-    def __init__(self, bot_token: Optional[str] = None, chat_id: Optional[str] = None):
+    def __init__(
+        self,
+        bot_token: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        api_base_url: Optional[str] = None,
+        async_notifications: bool = False
+    ):
         """
         Inicjalizacja kolektora Telegram.
         
         Args:
             bot_token: Bot token (lub z TELEGRAM_BOT_TOKEN)
             chat_id: Chat ID (lub z TELEGRAM_CHAT_ID)
+            api_base_url: Adres Bot API (domyślnie api.telegram.org, np. własny serwer Bot API)
+            async_notifications: Alerty i raporty przez kolejkę w tle (TelegramNotifier)
         """
         if not REQUESTS_AVAILABLE:
             raise ImportError("Zainstaluj requests: pip install requests")
@@ -45,7 +59,8 @@ class TelegramCollector:
         if not self.bot_token:
             logger.warning("Brak TELEGRAM_BOT_TOKEN - niektóre funkcje mogą nie działać")
         
-        self.api_url = f"{self.BASE_URL}{self.bot_token}" if self.bot_token else None
+        self.api_url = f"{api_base_url or self.BASE_URL}{self.bot_token}" if self.bot_token else None
+        self.notifier = TelegramNotifier(self) if async_notifications else None
         logger.info("Telegram Collector zainicjalizowany")
     
     def send_message(
@@ -67,28 +82,55 @@ class TelegramCollector:
         Returns:
             Odpowiedź API
         """
-        if not self.api_url:
-            raise ValueError("TELEGRAM_BOT_TOKEN jest wymagany")
+        target_chat_id = self._target_chat_id(chat_id)
         
-        target_chat_id = chat_id or self.chat_id
-        if not target_chat_id:
-            raise ValueError("chat_id jest wymagany (jako parametr lub TELEGRAM_CHAT_ID)")
+        try:
+            return self.post_message(text, target_chat_id, parse_mode, disable_notification)
+        except Exception as e:
+            logger.error(f"Błąd wysyłania wiadomości Telegram: {e}")
+            return None
+    
+    def post_message(
+        self,
+        text: str,
+        chat_id: Optional[str] = None,
+        parse_mode: str = 'HTML',
+        disable_notification: bool = False
+    ) -> Dict:
+        """
+        Wysyła wiadomość, zgłaszając błędy HTTP wyjątkiem (ponawianie w TelegramNotifier).
         
+        Returns:
+            Odpowiedź API
+        """
         url = f"{self.api_url}/sendMessage"
         data = {
-            'chat_id': target_chat_id,
+            'chat_id': self._target_chat_id(chat_id),
             'text': text,
             'parse_mode': parse_mode,
             'disable_notification': disable_notification
         }
         
-        try:
-            response = requests.post(url, json=data, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Błąd wysyłania wiadomości Telegram: {e}")
-            return None
+        response = requests.post(url, json=data, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    def _target_chat_id(self, chat_id: Optional[str]) -> str:
+        if not self.api_url:
+            raise ValueError("TELEGRAM_BOT_TOKEN jest wymagany")
+        
+        target_chat_id = chat_id or self.chat_id
+        if not target_chat_id:
+            raise ValueError("chat_id jest wymagany (jako parametr lub TELEGRAM_CHAT_ID)")
+        return target_chat_id
+    
+    def _deliver(self, message: str) -> Optional[Dict]:
+        """Wysyła wiadomość od razu lub (async_notifications) dodaje ją do kolejki TelegramNotifier."""
+        if self.notifier is None:
+            return self.send_message(message)
+        
+        self._target_chat_id(None)
+        return {'ok': self.notifier.submit(message), 'queued': True}
     
     def send_signal_alert(
         self,
@@ -109,7 +151,7 @@ class TelegramCollector:
             additional_info: Dodatkowe informacje
             
         Returns:
-            Odpowiedź API
+            Odpowiedź API ({'ok': ..., 'queued': True} przy async_notifications)
         """
         emoji = "🟢" if signal_type.lower() == "buy" else "🔴"
         
@@ -127,7 +169,7 @@ class TelegramCollector:
         
         message += f"\n\n<i>Czas: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
         
-        return self.send_message(message)
+        return self._deliver(message)
     
     def send_market_report(
         self,
@@ -142,14 +184,14 @@ class TelegramCollector:
             title: Tytuł raportu
             
         Returns:
-            Odpowiedź API
+            Odpowiedź API ({'ok': ..., 'queued': True} przy async_notifications)
         """
         # Telegram ma limit 4096 znaków na wiadomość
         if len(report) > 4000:
             report = report[:4000] + "\n\n... (raport został obcięty)"
         
         message = f"<b>{title}</b>\n\n{report}"
-        return self.send_message(message)
+        return self._deliver(message)
     
     def get_updates(self, offset: Optional[int] = None, limit: int = 100) -> List[Dict]:
         """
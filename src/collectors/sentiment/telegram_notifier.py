@@ -0,0 +1,263 @@
+"""
+Telegram Notifier
+=================
+Asynchroniczna wysyłka powiadomień Telegram w tle.
+
+send_signal_alert()/send_market_report() w TelegramCollector blokują wątek
+wywołujący na czas zapytania HTTP (do 10s timeoutu) - wolne API Telegrama
+zatrzymywałoby pętlę tradingową. TelegramNotifier przyjmuje wiadomości do
+ograniczonej kolejki w pamięci i wysyła je z wątku w tle:
+
+- koalescencja: wiadomości z okna coalesce_seconds idą jednym sendMessage
+  (do limitu długości wiadomości Telegrama),
+- ponawianie z wykładniczym backoffem tylko dla 429 (czas z retry_after),
+  5xx i błędów połączenia - pozostałe 4xx odrzucane od razu,
+- przy pełnej kolejce odrzucana jest najstarsza wiadomość (liczona w statystykach).
+
+Użycie:
+    collector = TelegramCollector(async_notifications=True)
+    collector.send_signal_alert("BTC/USDT", "buy", 50000.0, "scalping")  # nie czeka na HTTP
+    collector.notifier.close()
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from src.utils.metrics import get_metrics
+
+# Telegram: maksymalnie 4096 znaków na wiadomość
+MAX_MESSAGE_LENGTH = 4096
+BATCH_SEPARATOR = "\n\n────────\n\n"
+
+
+class TelegramNotifier:
+    """
+    Kolejka powiadomień z wątkiem wysyłającym dla TelegramCollector.
+    
+    Wiadomości dla tego samego chatu i parse_mode z okna koalescencji są
+    łączone w jedną. Wysyłka zakończona 429, 5xx lub błędem połączenia jest
+    ponawiana max_retries razy; po wyczerpaniu prób albo przy innym błędzie
+    paczka jest odrzucana (licznik failed). stats zmieniane pod _condition.
+    """
+    
+    def __init__(
+        self,
+        collector: Any,
+        max_queue: int = 100,
+        coalesce_seconds: float = 2.0,
+        max_batch: int = 10,
+        max_retries: int = 4,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0
+    ):
+        """
+        Args:
+            collector: TelegramCollector (wysyłka przez post_message)
+            max_queue: Pojemność kolejki (przy przepełnieniu odrzucana najstarsza)
+            coalesce_seconds: Okno zbierania wiadomości do jednej wysyłki (0 = bez czekania)
+            max_batch: Maksymalna liczba wiadomości w jednej wysyłce
+            max_retries: Liczba prób wysyłki paczki
+            retry_delay: Pierwsze opóźnienie ponowienia (sekundy, podwajane)
+            max_retry_delay: Górny limit opóźnienia ponowienia
+        """
+        self.collector = collector
+        self.max_queue = max_queue
+        self.coalesce_seconds = coalesce_seconds
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.metrics = get_metrics()
+        self.stats = {"queued": 0, "sent": 0, "messages_sent": 0, "dropped": 0, "failed": 0, "retries": 0}
+        
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._flush_waiters = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="telegram_notifier", daemon=True)
+        self._thread.start()
+    
+    def __repr__(self) -> str:
+        return f"<TelegramNotifier: {len(self._queue)}/{self.max_queue} w kolejce, wysłane={self.stats['sent']}>"
+    
+    def submit(
+        self,
+        text: str,
+        chat_id: Optional[str] = None,
+        parse_mode: str = 'HTML',
+        disable_notification: bool = False
+    ) -> bool:
+        """
+        Dodaje wiadomość do kolejki bez blokowania.
+        
+        Returns:
+            False gdy notifier jest zamknięty (wiadomość nie zostanie wysłana)
+        """
+        message = {
+            "text": text,
+            "chat_id": chat_id,
+            "parse_mode": parse_mode,
+            "disable_notification": disable_notification,
+            "queued_at": time.monotonic()
+        }
+        with self._condition:
+            if self._stopping:
+                return False
+            if len(self._queue) >= self.max_queue:
+                # Backpressure: najstarsza wiadomość jest najmniej aktualna
+                self._queue.popleft()
+                self.stats["dropped"] += 1
+                self.metrics.increment("telegram.notifications_dropped")
+                logger.warning(f"Kolejka powiadomień Telegram pełna ({self.max_queue}) - odrzucono najstarszą")
+            self._queue.append(message)
+            self.stats["queued"] += 1
+            self._condition.notify_all()
+        return True
+    
+    def pending(self) -> int:
+        """Liczba wiadomości w kolejce i w trakcie wysyłki."""
+        with self._condition:
+            return len(self._queue) + self._in_flight
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Czeka aż kolejka zostanie wysłana (do timeout sekund, bez okna koalescencji)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_waiters += 1
+            self._condition.notify_all()
+            try:
+                while self._queue or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flush_waiters -= 1
+        return True
+    
+    def close(self, timeout: float = 10.0):
+        """Wysyła zaległe wiadomości (do timeout sekund) i zatrzymuje wątek."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive() or self._queue:
+            logger.warning(f"TelegramNotifier zamknięty z {self.pending()} niewysłanymi wiadomościami")
+    
+    # === Wątek wysyłający ===
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                # Okno koalescencji liczone od najstarszej wiadomości w kolejce
+                deadline = self._queue[0]["queued_at"] + self.coalesce_seconds
+                while (
+                    not self._stopping
+                    and not self._flush_waiters
+                    and len(self._queue) < self.max_batch
+                    and time.monotonic() < deadline
+                ):
+                    self._condition.wait(deadline - time.monotonic())
+                batch = self._take_batch()
+                self._in_flight = len(batch)
+            
+            try:
+                self._send(batch)
+            except Exception as e:
+                logger.error(f"Błąd wątku powiadomień Telegram: {e}")
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+                    self._condition.notify_all()
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Zdejmuje z kolejki wiadomości do jednej wysyłki (ten sam chat, parse_mode i limit długości)."""
+        first = self._queue.popleft()
+        batch = [first]
+        length = len(first["text"])
+        while self._queue and len(batch) < self.max_batch:
+            message = self._queue[0]
+            if (
+                message["chat_id"] != first["chat_id"]
+                or message["parse_mode"] != first["parse_mode"]
+                or length + len(BATCH_SEPARATOR) + len(message["text"]) > MAX_MESSAGE_LENGTH
+            ):
+                break
+            batch.append(self._queue.popleft())
+            length += len(BATCH_SEPARATOR) + len(message["text"])
+        return batch
+    
+    def _send(self, batch: List[Dict[str, Any]]):
+        first = batch[0]
+        text = BATCH_SEPARATOR.join(message["text"].strip() for message in batch)
+        disable_notification = all(message["disable_notification"] for message in batch)
+        
+        for attempt in range(self.max_retries):
+            start = time.perf_counter()
+            try:
+                self.collector.post_message(
+                    text,
+                    chat_id=first["chat_id"],
+                    parse_mode=first["parse_mode"],
+                    disable_notification=disable_notification
+                )
+                self.metrics.observe("telegram.send", (time.perf_counter() - start) * 1000)
+                with self._condition:
+                    self.stats["sent"] += 1
+                    self.stats["messages_sent"] += len(batch)
+                if len(batch) > 1:
+                    logger.debug(f"Telegram: wysłano {len(batch)} powiadomień w jednej wiadomości")
+                return
+            except ValueError as e:
+                # Brak tokenu/chat_id - ponawianie nic nie zmieni
+                logger.error(f"Nie można wysłać powiadomienia Telegram: {e}")
+                break
+            except Exception as e:
+                if not self._is_retryable(e):
+                    # 400/401/403 itd. - ta sama wiadomość zostanie odrzucona ponownie
+                    logger.error(f"Telegram odrzucił powiadomienie: {e}")
+                    break
+                if attempt == self.max_retries - 1:
+                    logger.error(f"Błąd wysyłania powiadomienia Telegram po {self.max_retries} próbach: {e}")
+                    break
+                wait_time = min(self._retry_after(e) or self.retry_delay * (2 ** attempt), self.max_retry_delay)
+                with self._condition:
+                    self.stats["retries"] += 1
+                logger.warning(
+                    f"Błąd wysyłania powiadomienia Telegram (próba {attempt + 1}/{self.max_retries}): {e}. "
+                    f"Ponawiam za {wait_time:.1f}s..."
+                )
+                time.sleep(wait_time)
+        
+        with self._condition:
+            self.stats["failed"] += len(batch)
+        self.metrics.increment("telegram.notifications_failed", len(batch))
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Czy ponowić wysyłkę: 429, 5xx albo błąd połączenia/timeout (requests: OSError bez odpowiedzi)."""
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+        if status_code is not None:
+            return status_code == 429 or status_code >= 500
+        return isinstance(error, OSError)
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Czas oczekiwania z odpowiedzi 429 Telegrama (parameters.retry_after)."""
+        response = getattr(error, "response", None)
+        if response is None or getattr(response, "status_code", None) != 429:
+            return None
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return None
@@ -114,38 +114,43 @@ class BTCUSDCDataLoader:
         """
         Aktualizuje bazę o najnowsze dane.
         
+        Pobiera dokładnie brakujące zakresy (z indeksu pokrycia bazy): dziury
+        z ostatnich days_back dni oraz wszystko od ostatniej świecy w bazie.
+        
         Args:
             days_back: Ile dni wstecz sprawdzić (domyślnie 7)
             
         Returns:
             Liczba zapisanych świec
         """
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days_back)
+        
         # Sprawdź ostatnią datę w bazie
         latest_in_db = self.get_latest_timestamp()
-        
         if latest_in_db:
-            # Upewnij się że latest_in_db jest tz-aware
-            if latest_in_db.tzinfo is None:
-                latest_in_db = latest_in_db.replace(tzinfo=timezone.utc)
-            
-            start_date = latest_in_db + timedelta(hours=1)  # Od następnej godziny
             logger.info(f"Ostatnia świeca w bazie: {latest_in_db}")
+            # Dłuższa przerwa niż days_back - uzupełnij ciągle od ostatniej świecy
+            start_date = min(start_date, latest_in_db)
         else:
-            # Jeśli baza jest pusta, pobierz ostatnie N dni
-            start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
             logger.info(f"Baza jest pusta, pobieram ostatnie {days_back} dni")
         
-        # Upewnij się że start_date jest tz-aware
-        if start_date.tzinfo is None:
-            start_date = start_date.replace(tzinfo=timezone.utc)
-        
-        end_date = datetime.now(timezone.utc)
-        
-        if start_date >= end_date:
+        gaps = self.db.missing_ranges(
+            self.exchange, self.symbol, self.timeframe, start_date, end_date
+        )
+        if not gaps:
             logger.info("Baza jest aktualna, brak nowych danych")
             return 0
         
-        return self.load_historical_data(start_date=start_date, end_date=end_date)
+        logger.info(f"Brakujące zakresy: {len(gaps)}")
+        saved = 0
+        for gap_start, gap_end in gaps:
+            # Koniec zakresu włącznie (fetch_historical pobiera świece z [since, end))
+            saved += self.load_historical_data(
+                start_date=gap_start.tz_localize(timezone.utc).to_pydatetime(),
+                end_date=(gap_end + pd.Timedelta(seconds=1)).tz_localize(timezone.utc).to_pydatetime()
+            )
+        return saved
     
     def get_latest_timestamp(self) -> Optional[datetime]:
         """
@@ -154,21 +159,12 @@ class BTCUSDCDataLoader:
         Returns:
             Ostatni timestamp lub None jeśli baza jest pusta
         """
-        df = self.db.get_ohlcv(
-            exchange=self.exchange,
-            symbol=self.symbol,
-            timeframe=self.timeframe,
-            limit=1
-        )
-        
-        if df.empty:
+        latest = self.db.latest_timestamp(self.exchange, self.symbol, self.timeframe)
+        if latest is None:
             return None
         
-        # Konwertuj na datetime i upewnij się że jest tz-aware
-        dt = df.index[0].to_pydatetime()
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
+        # Baza przechowuje naiwne UTC
+        return latest.replace(tzinfo=timezone.utc)
     
     def get_data(
         self,
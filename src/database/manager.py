@@ -12,19 +12,22 @@ Obsługuje:
 
 import os
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from contextlib import contextmanager
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import (
+    create_engine, inspect, text, select, insert, delete, func, case, cast, literal_column, and_, Integer
+)
+from sqlalchemy.orm import sessionmaker, Session, aliased
 from sqlalchemy.pool import QueuePool
 from loguru import logger
 
 from .models import (
-    Base, OHLCV, Ticker, Trade, 
+    Base, OHLCV, OHLCVRollup, OHLCVCoverage, Ticker, Trade, 
     TechnicalIndicator, SentimentScore, Signal,
-    LLMSentimentAnalysis, GDELTSentiment,
+    LLMSentimentAnalysis, LLMSentimentHourly, GDELTSentiment,
     create_timescale_hypertables
 )
 
@@ -45,6 +48,24 @@ class DatabaseManager:
     db = DatabaseManager("postgresql://...", use_timescale=True)
     """
     
+    # Interwały utrzymywane jako rollupy ze świec 1m (timeframe -> sekundy)
+    # (w tym 30m/3h/6h/12h/2d używane przez wykres webapp - bez resamplingu 1m przy odczycie)
+    OHLCV_ROLLUP_TIMEFRAMES = {
+        '5m': 300,
+        '15m': 900,
+        '30m': 1800,
+        '1h': 3600,
+        '3h': 10800,
+        '4h': 14400,
+        '6h': 21600,
+        '12h': 43200,
+        '1d': 86400,
+        '2d': 172800,
+    }
+    
+    # Interwały kalendarzowe (bez stałej długości świecy) - poza indeksem pokrycia
+    OHLCV_CALENDAR_TIMEFRAMES = ('1M',)
+    
     def __init__(
         self,
         database_url: str = None,
@@ -104,8 +125,71 @@ class DatabaseManager:
             return f"{creds[0]}://***@{parts[1]}"
         return url
     
+    def _is_postgresql(self) -> bool:
+        """Czy baza to PostgreSQL (w przeciwnym razie zakładamy SQLite)."""
+        return 'postgres' in self.database_url.lower()
+    
+    def _upsert(self, session: Session, model, records: List[Dict[str, Any]], keys: List[str]):
+        """
+        INSERT ... ON CONFLICT (keys) DO UPDATE - bezpieczne przy współbieżnych zapisach
+        tych samych kluczy (w przeciwieństwie do DELETE + INSERT).
+        """
+        if not records:
+            return
+        if self._is_postgresql():
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        
+        stmt = dialect_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={column: stmt.excluded[column] for column in records[0] if column not in keys}
+        )
+        session.execute(stmt, records)
+    
+    @staticmethod
+    def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+        """Konwertuje datetime do naiwnego UTC (tak jak timestampy zapisane w bazie)."""
+        if value is None:
+            return None
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        return ts.to_pydatetime()
+    
+    def _time_bucket(self, column, bucket_seconds: int):
+        """
+        Wyrażenie SQL zaokrąglające timestamp w dół do przedziału bucket_seconds.
+        
+        PostgreSQL: to_timestamp(floor(epoch / n) * n) przeliczone na UTC bez strefy
+        SQLite: datetime((strftime('%s') / n) * n, 'unixepoch')
+        """
+        # Liczba jako literał, a nie parametr - to samo wyrażenie trafia do SELECT i GROUP BY,
+        # a PostgreSQL wymaga, żeby były identyczne
+        seconds = literal_column(str(int(bucket_seconds)), Integer)
+        
+        if self._is_postgresql():
+            return func.timezone(
+                'UTC',
+                func.to_timestamp(func.floor(func.extract('epoch', column) / seconds) * seconds)
+            )
+        return func.datetime(
+            (cast(func.strftime('%s', column), Integer) // seconds) * seconds,
+            'unixepoch'
+        )
+    
     def create_tables(self):
         """Tworzy wszystkie tabele."""
+        try:
+            inspector = inspect(self.engine)
+            build_coverage = (
+                inspector.has_table(OHLCV.__tablename__)
+                and not inspector.has_table(OHLCVCoverage.__tablename__)
+            )
+        except Exception:
+            build_coverage = False
+        
         try:
             Base.metadata.create_all(bind=self.engine, checkfirst=True)
             logger.success("Tabele utworzone")
@@ -116,6 +200,13 @@ class DatabaseManager:
             else:
                 logger.warning(f"Ostrzeżenie przy tworzeniu tabel: {e}")
         
+        # Nowy indeks pokrycia w bazie z istniejącymi świecami - zbuduj go raz ze świec
+        if build_coverage:
+            try:
+                self.rebuild_ohlcv_coverage()
+            except Exception as e:
+                logger.warning(f"Nie można zbudować indeksu pokrycia OHLCV: {e}")
+        
         if self.use_timescale and 'postgresql' in self.database_url:
             try:
                 create_timescale_hypertables(self.engine)
@@ -147,16 +238,21 @@ class DatabaseManager:
         df: pd.DataFrame,
         exchange: str,
         symbol: str,
-        timeframe: str
+        timeframe: str,
+        coverage: Optional[Tuple[datetime, datetime]] = None
     ) -> int:
         """
         Zapisuje DataFrame OHLCV do bazy (bulk insert z obsługą duplikatów).
         
+        Zapisane świece są dopisywane do indeksu pokrycia (ohlcv_coverage).
+        
         Args:
             df: DataFrame z kolumnami open, high, low, close, volume
             exchange: Nazwa giełdy
             symbol: Symbol pary
             timeframe: Interwał czasowy
+            coverage: Zakres (początek, koniec) faktycznie pobrany z giełdy - brakujące
+                w nim świece to dziury po stronie giełdy, a nie do ponownego pobrania
             
         Returns:
             Liczba zapisanych rekordów
@@ -164,20 +260,7 @@ class DatabaseManager:
         if df.empty:
             return 0
         
-        records = []
-        for timestamp, row in df.iterrows():
-            records.append({
-                'timestamp': timestamp,
-                'exchange': exchange,
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'open': row['open'],
-                'high': row['high'],
-                'low': row['low'],
-                'close': row['close'],
-                'volume': row['volume'],
-                'trades_count': row.get('trades', None),
-            })
+        records = self._ohlcv_records(df, exchange, symbol, timeframe)
         
         inserted_count = 0
         
@@ -226,12 +309,20 @@ class DatabaseManager:
                     inserted_count = new_count - existing_count
                 else:
                     inserted_count = 0
+        elif self.database_url.startswith('sqlite'):
+            # SQLite: INSERT ... ON CONFLICT DO NOTHING jednym executemany
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+            
+            with self.get_session() as session:
+                result = session.connection().execute(
+                    sqlite_insert(OHLCV).on_conflict_do_nothing(), records
+                )
+                inserted_count = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(records)
         else:
-            # SQLite/inne: batch insert z ignorowaniem błędów
+            # Inne bazy: insert rekord po rekordzie z pominięciem istniejących
             with self.get_session() as session:
                 for record in records:
                     try:
-                        # Sprawdź czy istnieje (optymalizacja: można użyć INSERT OR IGNORE)
                         existing = session.query(OHLCV).filter(
                             OHLCV.timestamp == record['timestamp'],
                             OHLCV.exchange == record['exchange'],
@@ -246,8 +337,120 @@ class DatabaseManager:
                         continue
         
         logger.info(f"Zapisano {inserted_count}/{len(records)} świec {exchange}:{symbol} {timeframe}")
+        
+        self._after_ohlcv_write(df, exchange, symbol, timeframe, coverage, inserted_count)
         return inserted_count
     
+    def save_ohlcv_batch(
+        self,
+        batch: List[Tuple[str, str, pd.DataFrame, Optional[Tuple[datetime, datetime]]]],
+        timeframe: str = '1m'
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        Zapisuje świece wielu giełd i symboli w jednej transakcji.
+        
+        Świece o istniejącym kluczu są pomijane. Indeks pokrycia i rollupy
+        (dla 1m) są aktualizowane raz na symbol, w zakresie jego nowych świec.
+        
+        Args:
+            batch: Lista (giełda, symbol, DataFrame OHLCV, zakres pobrany z giełdy lub None)
+            timeframe: Interwał czasowy wszystkich serii
+            
+        Returns:
+            Dict {(giełda, symbol): liczba zapisanych świec}
+        """
+        series = {}
+        for exchange, symbol, df, coverage in batch:
+            if not df.empty:
+                series[(exchange, symbol)] = (df, coverage, self._ohlcv_records(df, exchange, symbol, timeframe))
+        if not series:
+            return {}
+        
+        inserted = {}
+        new_records = []
+        with self.get_session() as session:
+            for (exchange, symbol), (df, coverage, records) in series.items():
+                timestamps = [r['timestamp'] for r in records]
+                existing = {
+                    pd.Timestamp(row[0]) for row in session.query(OHLCV.timestamp).filter(
+                        OHLCV.exchange == exchange,
+                        OHLCV.symbol == symbol,
+                        OHLCV.timeframe == timeframe,
+                        OHLCV.timestamp >= min(timestamps),
+                        OHLCV.timestamp <= max(timestamps)
+                    )
+                }
+                fresh = [r for r in records if pd.Timestamp(r['timestamp']) not in existing]
+                inserted[(exchange, symbol)] = len(fresh)
+                new_records.extend(fresh)
+            
+            if new_records:
+                if self._is_postgresql():
+                    from sqlalchemy.dialects.postgresql import insert as dialect_insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+                # DO NOTHING - świece dopisane w międzyczasie przez inny proces nie psują transakcji
+                session.execute(
+                    dialect_insert(OHLCV).on_conflict_do_nothing(
+                        index_elements=['timestamp', 'exchange', 'symbol', 'timeframe']
+                    ),
+                    new_records
+                )
+        
+        logger.info(f"Zapisano {len(new_records)} świec {timeframe} dla {len(series)} serii jedną transakcją")
+        
+        for (exchange, symbol), (df, coverage, _) in series.items():
+            self._after_ohlcv_write(df, exchange, symbol, timeframe, coverage, inserted[(exchange, symbol)])
+        return inserted
+    
+    def _ohlcv_records(self, df: pd.DataFrame, exchange: str, symbol: str, timeframe: str) -> List[Dict[str, Any]]:
+        """Rekordy tabeli ohlcv z DataFrame (timestamp jako naiwny UTC)."""
+        return [{
+            'timestamp': self._to_naive_utc(timestamp),
+            'exchange': exchange,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'open': row['open'],
+            'high': row['high'],
+            'low': row['low'],
+            'close': row['close'],
+            'volume': row['volume'],
+            'trades_count': row.get('trades', None),
+        } for timestamp, row in df.iterrows()]
+    
+    def _after_ohlcv_write(
+        self,
+        df: pd.DataFrame,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        coverage: Optional[Tuple[datetime, datetime]],
+        inserted_count: int
+    ):
+        """Aktualizuje indeks pokrycia i (dla nowych świec 1m) rollupy po zapisie serii."""
+        # Świece (także duplikaty) są w bazie - dopisz ich zakresy do indeksu pokrycia
+        try:
+            step = self._timeframe_delta(timeframe)
+            if step is not None:
+                ranges = self._contiguous_ranges(df.index, step)
+                if coverage is not None:
+                    ranges.append((pd.Timestamp(self._to_naive_utc(coverage[0])),
+                                   pd.Timestamp(self._to_naive_utc(coverage[1]))))
+                self._add_ohlcv_coverage(exchange, symbol, timeframe, ranges)
+        except Exception as e:
+            logger.warning(f"Nie można zaktualizować indeksu pokrycia OHLCV {exchange}:{symbol}: {e}")
+        
+        # Nowe świece 1m - przelicz rollupy wyższych interwałów w zapisanym zakresie
+        if timeframe == '1m' and inserted_count > 0:
+            try:
+                self.refresh_ohlcv_rollups(
+                    exchange, symbol,
+                    start_date=df.index.min(),
+                    end_date=df.index.max()
+                )
+            except Exception as e:
+                logger.warning(f"Nie można odświeżyć rollupów OHLCV {exchange}:{symbol}: {e}")
+    
     def get_ohlcv(
         self,
         exchange: str,
@@ -260,6 +463,10 @@ class DatabaseManager:
         """
         Pobiera dane OHLCV z bazy.
         
+        Jeśli brak natywnych świec dla interwału z OHLCV_ROLLUP_TIMEFRAMES
+        (5m, 15m, 30m, 1h, 3h, 4h, 6h, 12h, 1d, 2d), dane są czytane z rollupu
+        zagregowanego ze świec 1m.
+        
         Args:
             exchange: Nazwa giełdy
             symbol: Symbol pary
@@ -294,6 +501,11 @@ class DatabaseManager:
             results = query.all()
         
         if not results:
+            if timeframe in self.OHLCV_ROLLUP_TIMEFRAMES:
+                return self._get_ohlcv_rollup(
+                    exchange, symbol, timeframe,
+                    start_date=start_date, end_date=end_date, limit=limit
+                )
             return pd.DataFrame()
         
         df = pd.DataFrame([{
@@ -308,6 +520,511 @@ class DatabaseManager:
         df.set_index('timestamp', inplace=True)
         df.sort_index(inplace=True)
         return df
+
+    def get_ohlcv_fingerprint(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[str, Any]:
+        """
+        Zwraca lekki "odcisk" danych OHLCV w zakresie (bez ładowania świec).
+
+        Uwzględnia świece natywne danego interwału oraz świece 1m, z których
+        budowane są rollupy - każda nowa świeca zmienia wynik. Używane do
+        unieważniania cache odpowiedzi (ETag/Last-Modified) w webapp.
+
+        Returns:
+            Dict z kluczami: count, last_timestamp, last_modified
+        """
+        timeframes = {timeframe, '1m'}
+        stmt = select(
+            func.count(OHLCV.id),
+            func.max(OHLCV.timestamp),
+            func.max(OHLCV.created_at)
+        ).where(
+            OHLCV.exchange == exchange,
+            OHLCV.symbol == symbol,
+            OHLCV.timeframe.in_(timeframes)
+        )
+        if start_date is not None:
+            stmt = stmt.where(OHLCV.timestamp >= self._to_naive_utc(start_date))
+        if end_date is not None:
+            stmt = stmt.where(OHLCV.timestamp <= self._to_naive_utc(end_date))
+
+        with self.get_session() as session:
+            count, last_timestamp, last_modified = session.execute(stmt).one()
+
+        return {
+            'count': int(count or 0),
+            'last_timestamp': last_timestamp,
+            'last_modified': last_modified or last_timestamp
+        }
+
+    # === Indeks pokrycia OHLCV (ciągłe zakresy i dziury) ===
+    
+    @staticmethod
+    def _timeframe_delta(timeframe: str) -> Optional[pd.Timedelta]:
+        """Długość świecy interwału (None dla interwałów kalendarzowych, np. 1M)."""
+        try:
+            step = pd.Timedelta(timeframe)
+        except ValueError:
+            return None
+        return step if step > pd.Timedelta(0) else None
+    
+    @classmethod
+    def _contiguous_ranges(cls, index, step: pd.Timedelta) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Ciągłe (co jedną świecę) serie znaczników czasu jako zakresy (naiwne UTC, włącznie)."""
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        index = index.unique().sort_values()
+        if len(index) == 0:
+            return []
+        
+        breaks = np.flatnonzero(np.diff(index.asi8) > step.value)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(index) - 1]))
+        return [(index[a], index[b]) for a, b in zip(starts, ends)]
+    
+    @staticmethod
+    def _merge_ranges(ranges, step: pd.Timedelta) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Scala nakładające się i sąsiadujące (odległe o jedną świecę) zakresy."""
+        merged: List[List[pd.Timestamp]] = []
+        for start, end in sorted((pd.Timestamp(a), pd.Timestamp(b)) for a, b in ranges):
+            if merged and start <= merged[-1][1] + step:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [(start, end) for start, end in merged]
+    
+    def _add_ohlcv_coverage(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]
+    ):
+        """Dopisuje zakresy do indeksu pokrycia, scalając je z istniejącymi."""
+        if not ranges:
+            return
+        step = self._timeframe_delta(timeframe)
+        c = OHLCVCoverage
+        low = min(start for start, _ in ranges) - step
+        high = max(end for _, end in ranges) + step
+        
+        with self.get_session() as session:
+            existing = session.query(c.id, c.range_start, c.range_end).filter(
+                c.exchange == exchange,
+                c.symbol == symbol,
+                c.timeframe == timeframe,
+                c.range_end >= low.to_pydatetime(),
+                c.range_start <= high.to_pydatetime()
+            ).all()
+            
+            merged = self._merge_ranges(
+                [(row.range_start, row.range_end) for row in existing] + list(ranges), step
+            )
+            unchanged = {(pd.Timestamp(row.range_start), pd.Timestamp(row.range_end)) for row in existing}
+            if set(merged) == unchanged and len(existing) == len(merged):
+                return
+            
+            if existing:
+                session.execute(delete(c).where(c.id.in_([row.id for row in existing])))
+            session.execute(insert(c), [{
+                'exchange': exchange,
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'range_start': start.to_pydatetime(),
+                'range_end': end.to_pydatetime(),
+            } for start, end in merged])
+    
+    def add_ohlcv_coverage(self, exchange: str, symbol: str, timeframe: str, timestamps) -> None:
+        """
+        Dopisuje do indeksu pokrycia świece zapisane z pominięciem save_ohlcv()
+        (np. bulk insert DatabaseSink).
+        
+        Args:
+            timestamps: Znaczniki czasu zapisanych świec serii
+        """
+        step = self._timeframe_delta(timeframe)
+        if step is None:
+            return
+        self._add_ohlcv_coverage(exchange, symbol, timeframe, self._contiguous_ranges(timestamps, step))
+    
+    def rebuild_ohlcv_coverage(
+        self,
+        exchange: str = None,
+        symbol: str = None,
+        timeframe: str = None
+    ) -> int:
+        """
+        Buduje indeks pokrycia od zera ze świec w tabeli ohlcv.
+        
+        Wywoływane automatycznie przy pierwszym utworzeniu tabeli ohlcv_coverage
+        w istniejącej bazie oraz przy pierwszym odczycie serii bez indeksu.
+        
+        Args:
+            exchange: Ogranicz do giełdy (opcjonalnie)
+            symbol: Ogranicz do symbolu (opcjonalnie)
+            timeframe: Ogranicz do interwału (opcjonalnie)
+            
+        Returns:
+            Liczba zapisanych zakresów
+        """
+        filters = []
+        if exchange is not None:
+            filters.append(OHLCV.exchange == exchange)
+        if symbol is not None:
+            filters.append(OHLCV.symbol == symbol)
+        if timeframe is not None:
+            filters.append(OHLCV.timeframe == timeframe)
+        
+        with self.get_session() as session:
+            series = session.query(OHLCV.exchange, OHLCV.symbol, OHLCV.timeframe).filter(*filters).distinct().all()
+        
+        total = 0
+        for series_exchange, series_symbol, series_timeframe in series:
+            step = self._timeframe_delta(series_timeframe)
+            if step is None:
+                continue
+            with self.get_session() as session:
+                timestamps = session.execute(
+                    select(OHLCV.timestamp).where(
+                        OHLCV.exchange == series_exchange,
+                        OHLCV.symbol == series_symbol,
+                        OHLCV.timeframe == series_timeframe
+                    )
+                ).scalars().all()
+                ranges = self._contiguous_ranges(pd.to_datetime(timestamps), step)
+                
+                session.execute(delete(OHLCVCoverage).where(
+                    OHLCVCoverage.exchange == series_exchange,
+                    OHLCVCoverage.symbol == series_symbol,
+                    OHLCVCoverage.timeframe == series_timeframe
+                ))
+                if ranges:
+                    session.execute(insert(OHLCVCoverage), [{
+                        'exchange': series_exchange,
+                        'symbol': series_symbol,
+                        'timeframe': series_timeframe,
+                        'range_start': start.to_pydatetime(),
+                        'range_end': end.to_pydatetime(),
+                    } for start, end in ranges])
+            total += len(ranges)
+        
+        logger.info(f"Zbudowano indeks pokrycia OHLCV: {len(series)} serii, {total} zakresów")
+        return total
+    
+    def _ensure_ohlcv_coverage(self, exchange: str, symbol: str, timeframe: str):
+        """Buduje indeks pokrycia serii, jeśli ma świece, a nie ma zakresów (np. zapis z pominięciem save_ohlcv)."""
+        c = OHLCVCoverage
+        with self.get_session() as session:
+            indexed = session.query(c.id).filter(
+                c.exchange == exchange, c.symbol == symbol, c.timeframe == timeframe
+            ).first() is not None
+            if indexed:
+                return
+            has_candles = session.query(OHLCV.id).filter(
+                OHLCV.exchange == exchange, OHLCV.symbol == symbol, OHLCV.timeframe == timeframe
+            ).first() is not None
+        if has_candles:
+            self.rebuild_ohlcv_coverage(exchange, symbol, timeframe)
+    
+    def get_ohlcv_coverage(self, exchange: str, symbol: str, timeframe: str) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Zwraca ciągłe zakresy świec serii (naiwne UTC, włącznie, rosnąco).
+        """
+        self._ensure_ohlcv_coverage(exchange, symbol, timeframe)
+        c = OHLCVCoverage
+        with self.get_session() as session:
+            rows = session.query(c.range_start, c.range_end).filter(
+                c.exchange == exchange, c.symbol == symbol, c.timeframe == timeframe
+            ).order_by(c.range_start).all()
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in rows]
+    
+    def latest_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[datetime]:
+        """
+        Zwraca znacznik czasu najnowszej świecy serii (naiwne UTC) lub None.
+        
+        Czytane z indeksu pokrycia (jeden wiersz), bez skanowania tabeli ohlcv.
+        Dla interwałów kalendarzowych (np. 1M) - MAX(timestamp) po indeksie ix_ohlcv_lookup.
+        """
+        if self._timeframe_delta(timeframe) is None:
+            with self.get_session() as session:
+                return session.query(func.max(OHLCV.timestamp)).filter(
+                    OHLCV.exchange == exchange, OHLCV.symbol == symbol, OHLCV.timeframe == timeframe
+                ).scalar()
+        
+        self._ensure_ohlcv_coverage(exchange, symbol, timeframe)
+        c = OHLCVCoverage
+        with self.get_session() as session:
+            return session.query(c.range_end).filter(
+                c.exchange == exchange, c.symbol == symbol, c.timeframe == timeframe
+            ).order_by(c.range_end.desc()).limit(1).scalar()
+    
+    def missing_ranges(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Zwraca brakujące w bazie podzakresy świec w [start_date, end_date].
+        
+        Wyliczane z indeksu pokrycia - do pobrania z giełdy dokładnie dziury.
+        Granice są na siatce interwału (naiwne UTC, włącznie), jak w
+        src.trading.candle_cache.missing_ranges.
+        
+        Args:
+            exchange: Nazwa giełdy
+            symbol: Symbol pary
+            timeframe: Interwał czasowy
+            start_date: Początek zakresu
+            end_date: Koniec zakresu (włącznie)
+            
+        Returns:
+            Lista (początek, koniec) brakujących zakresów
+        """
+        start = pd.Timestamp(self._to_naive_utc(start_date))
+        end = pd.Timestamp(self._to_naive_utc(end_date))
+        step = self._timeframe_delta(timeframe)
+        
+        if step is None:
+            # Bez stałej długości świecy - brakuje wszystkiego po ostatniej świecy
+            latest = self.latest_timestamp(exchange, symbol, timeframe)
+            if latest is not None:
+                start = max(start, pd.Timestamp(latest) + pd.Timedelta(seconds=1))
+            return [(start, end)] if start <= end else []
+        
+        start, end = start.ceil(step), end.floor(step)
+        if start > end:
+            return []
+        
+        self._ensure_ohlcv_coverage(exchange, symbol, timeframe)
+        c = OHLCVCoverage
+        with self.get_session() as session:
+            covered = session.query(c.range_start, c.range_end).filter(
+                c.exchange == exchange,
+                c.symbol == symbol,
+                c.timeframe == timeframe,
+                c.range_end >= start.to_pydatetime(),
+                c.range_start <= end.to_pydatetime()
+            ).all()
+        
+        gaps = []
+        cursor = start
+        for range_start, range_end in self._merge_ranges(covered, step):
+            if range_start > cursor:
+                gaps.append((cursor, min(range_start - step, end)))
+            cursor = max(cursor, range_end + step)
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+    
+    # === OHLCV Rollups (OHLCV_ROLLUP_TIMEFRAMES z 1m) ===
+    
+    def _aggregate_ohlcv(
+        self,
+        exchange: str,
+        symbol: str,
+        bucket_seconds: int,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Agreguje świece 1m do przedziałów bucket_seconds po stronie bazy.
+        
+        high/low/volume liczone są w GROUP BY, a open/close pobierane przez złączenie
+        z pierwszą i ostatnią świecą przedziału (indeks ix_ohlcv_lookup).
+        
+        Returns:
+            Lista rekordów gotowych do zapisu w ohlcv_rollup (bez timeframe)
+        """
+        o = OHLCV
+        filters = [o.exchange == exchange, o.symbol == symbol, o.timeframe == '1m']
+        if start_date is not None:
+            filters.append(o.timestamp >= start_date)
+        if end_date is not None:
+            filters.append(o.timestamp < end_date)
+        
+        bucket = self._time_bucket(o.timestamp, bucket_seconds).label('bucket')
+        buckets = select(
+            bucket,
+            func.min(o.timestamp).label('first_ts'),
+            func.max(o.timestamp).label('last_ts'),
+            func.max(o.high).label('high'),
+            func.min(o.low).label('low'),
+            func.sum(o.volume).label('volume'),
+            func.sum(o.trades_count).label('trades_count'),
+            func.count(o.id).label('candles')
+        ).where(*filters).group_by(bucket).subquery()
+        
+        first = aliased(OHLCV)
+        last = aliased(OHLCV)
+        
+        def _same_series(candle, ts_column):
+            return and_(
+                candle.exchange == exchange,
+                candle.symbol == symbol,
+                candle.timeframe == '1m',
+                candle.timestamp == ts_column
+            )
+        
+        stmt = select(
+            buckets.c.bucket, first.open, buckets.c.high, buckets.c.low, last.close,
+            buckets.c.volume, buckets.c.trades_count, buckets.c.candles
+        ).select_from(buckets).join(
+            first, _same_series(first, buckets.c.first_ts)
+        ).join(
+            last, _same_series(last, buckets.c.last_ts)
+        ).order_by(buckets.c.bucket)
+        
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        
+        return [{
+            'bucket': pd.Timestamp(r[0]).to_pydatetime(),
+            'exchange': exchange,
+            'symbol': symbol,
+            'open': r[1],
+            'high': r[2],
+            'low': r[3],
+            'close': r[4],
+            'volume': r[5],
+            'trades_count': int(r[6]) if r[6] is not None else None,
+            'candles': r[7],
+        } for r in rows]
+    
+    def refresh_ohlcv_rollups(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframes: List[str] = None,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> Dict[str, int]:
+        """
+        Przyrostowo przelicza rollupy OHLCV ze świec 1m.
+        
+        Bez start_date przelicza od ostatniej zmaterializowanej świecy (watermark),
+        a jeśli od tego czasu nie przybyło świec 1m - nic nie robi. Przy pustym
+        rollupie przelicza całą historię.
+        
+        Args:
+            exchange: Nazwa giełdy
+            symbol: Symbol pary
+            timeframes: Interwały do przeliczenia (domyślnie wszystkie z OHLCV_ROLLUP_TIMEFRAMES)
+            start_date: Początek zakresu zmienionych świec 1m (opcjonalnie)
+            end_date: Koniec zakresu zmienionych świec 1m (opcjonalnie)
+            
+        Returns:
+            Dict {timeframe: liczba zapisanych świec}
+        """
+        r = OHLCVRollup
+        timeframes = timeframes or list(self.OHLCV_ROLLUP_TIMEFRAMES)
+        start_date = self._to_naive_utc(start_date)
+        end_date = self._to_naive_utc(end_date)
+        refreshed = {}
+        
+        for timeframe in timeframes:
+            bucket_seconds = self.OHLCV_ROLLUP_TIMEFRAMES[timeframe]
+            freq = f'{bucket_seconds}s'
+            
+            if start_date is not None:
+                range_start = pd.Timestamp(start_date).floor(freq).to_pydatetime()
+            else:
+                with self.get_session() as session:
+                    watermark = session.query(r.bucket, r.candles).filter(
+                        r.exchange == exchange,
+                        r.symbol == symbol,
+                        r.timeframe == timeframe
+                    ).order_by(r.bucket.desc()).first()
+                    
+                    if watermark is not None:
+                        # Ostatnia świeca rollupu mogła być niepełna - sprawdź czy są nowe świece 1m
+                        source_count = session.query(func.count(OHLCV.id)).filter(
+                            OHLCV.exchange == exchange,
+                            OHLCV.symbol == symbol,
+                            OHLCV.timeframe == '1m',
+                            OHLCV.timestamp >= watermark.bucket
+                        ).scalar() or 0
+                        if source_count == watermark.candles:
+                            refreshed[timeframe] = 0
+                            continue
+                
+                range_start = watermark.bucket if watermark is not None else None
+            
+            range_end = None
+            if end_date is not None:
+                range_end = (pd.Timestamp(end_date).floor(freq) + pd.Timedelta(seconds=bucket_seconds)).to_pydatetime()
+            
+            records = self._aggregate_ohlcv(
+                exchange, symbol, bucket_seconds,
+                start_date=range_start, end_date=range_end
+            )
+            now = datetime.utcnow()
+            for record in records:
+                record['timeframe'] = timeframe
+                record['updated_at'] = now
+            
+            with self.get_session() as session:
+                # Upsert zamiast DELETE + INSERT - równoległe odświeżenia tych samych
+                # przedziałów nie kolidują na uq_ohlcv_rollup
+                self._upsert(session, r, records, keys=['bucket', 'exchange', 'symbol', 'timeframe'])
+            
+            refreshed[timeframe] = len(records)
+        
+        logger.debug(f"Odświeżono rollupy OHLCV {exchange}:{symbol}: {refreshed}")
+        return refreshed
+    
+    def _get_ohlcv_rollup(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        limit: int = None
+    ) -> pd.DataFrame:
+        """Pobiera świece z rollupu (odświeżanego przy zapisie świec 1m, nie przy odczycie)."""
+        r = OHLCVRollup
+        with self.get_session() as session:
+            query = session.query(
+                r.bucket, r.open, r.high, r.low, r.close, r.volume
+            ).filter(
+                r.exchange == exchange,
+                r.symbol == symbol,
+                r.timeframe == timeframe
+            )
+            
+            if start_date:
+                query = query.filter(r.bucket >= start_date)
+            if end_date:
+                query = query.filter(r.bucket <= end_date)
+            
+            # Ta sama semantyka limit co dla natywnych świec
+            if limit:
+                query = query.order_by(r.bucket.asc()).limit(limit)
+            else:
+                query = query.order_by(r.bucket.desc())
+            
+            rows = query.all()
+        
+        if not rows:
+            return pd.DataFrame()
+        
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df.set_index('timestamp', inplace=True)
+        df.sort_index(inplace=True)
+        return df
     
     # === Funding Rates ===
     
@@ -514,6 +1231,44 @@ class DatabaseManager:
         logger.info(f"Zapisano {saved} tickerów {exchange}:{symbol} (pominięto {skipped} duplikatów)")
         return saved
     
+    def save_tickers_batch(self, df: pd.DataFrame) -> int:
+        """
+        Zapisuje tickery wielu giełd i symboli w jednej transakcji.
+        
+        Tickery o istniejącym kluczu (timestamp, exchange, symbol) są pomijane.
+        
+        Args:
+            df: DataFrame z kolumnami timestamp, exchange, symbol, price i opcjonalnie
+                pozostałymi polami tickera (bid, ask, volume_24h, funding_rate, ...)
+            
+        Returns:
+            Liczba zapisanych rekordów
+        """
+        if df.empty or 'price' not in df.columns:
+            return 0
+        
+        columns = [
+            column.name for column in Ticker.__table__.columns
+            if column.name != 'id' and column.name in df.columns
+        ]
+        records = df[columns].astype(object).where(df[columns].notna(), None)
+        records['timestamp'] = [self._to_naive_utc(ts) for ts in df['timestamp']]
+        records = records.to_dict('records')
+        
+        with self.get_session() as session:
+            existing = set(session.query(Ticker.timestamp, Ticker.exchange, Ticker.symbol).filter(
+                Ticker.timestamp.in_({r['timestamp'] for r in records})
+            ).all())
+            new_records = [
+                r for r in records
+                if (r['timestamp'], r['exchange'], r['symbol']) not in existing
+            ]
+            if new_records:
+                session.execute(insert(Ticker), new_records)
+        
+        logger.info(f"Zapisano {len(new_records)} tickerów (pominięto {len(records) - len(new_records)} duplikatów)")
+        return len(new_records)
+    
     def save_open_interest(
         self,
         df: pd.DataFrame,
@@ -685,31 +1440,64 @@ class DatabaseManager:
         return stats
     
     def get_available_data(self) -> pd.DataFrame:
-        """Zwraca podsumowanie dostępnych danych."""
-        query = """
-            SELECT 
-                exchange,
-                symbol,
-                timeframe,
-                MIN(timestamp) as first_date,
-                MAX(timestamp) as last_date,
-                COUNT(*) as candle_count
-            FROM ohlcv
-            GROUP BY exchange, symbol, timeframe
-            ORDER BY exchange, symbol, timeframe
         """
+        Zwraca podsumowanie dostępnych danych.
         
-        with self.engine.connect() as conn:
-            result = conn.execute(text(query))
-            rows = result.fetchall()
+        Czytane z indeksu pokrycia (bez agregacji świec). candle_count to
+        liczba świec w ciągłych zakresach, gaps - liczba dziur między nimi.
+        Serie ze świecami, ale bez zakresów (zapis z pominięciem save_ohlcv),
+        są najpierw indeksowane.
+        """
+        columns = ['exchange', 'symbol', 'timeframe', 'first_date', 'last_date', 'candle_count', 'gaps']
+        c = OHLCVCoverage
+        with self.get_session() as session:
+            # Lista serii z indeksu ix_ohlcv_lookup - bez czytania świec
+            series = set(session.query(OHLCV.exchange, OHLCV.symbol, OHLCV.timeframe).filter(
+                OHLCV.timeframe.notin_(self.OHLCV_CALENDAR_TIMEFRAMES)
+            ).distinct().all())
+            indexed = set(session.query(c.exchange, c.symbol, c.timeframe).distinct().all())
+        for exchange, symbol, timeframe in sorted(series - indexed):
+            self.rebuild_ohlcv_coverage(exchange, symbol, timeframe)
         
-        if not rows:
+        with self.get_session() as session:
+            rows = session.query(
+                c.exchange, c.symbol, c.timeframe, c.range_start, c.range_end
+            ).all()
+            # Interwały kalendarzowe nie mają zakresów - agregat po indeksie (tylko ich świece)
+            calendar_rows = session.query(
+                OHLCV.exchange, OHLCV.symbol, OHLCV.timeframe,
+                func.min(OHLCV.timestamp), func.max(OHLCV.timestamp), func.count(OHLCV.id)
+            ).filter(
+                OHLCV.timeframe.in_(self.OHLCV_CALENDAR_TIMEFRAMES)
+            ).group_by(OHLCV.exchange, OHLCV.symbol, OHLCV.timeframe).all()
+        
+        frames = []
+        if rows:
+            ranges = pd.DataFrame(rows, columns=['exchange', 'symbol', 'timeframe', 'range_start', 'range_end'])
+            steps = pd.to_timedelta(ranges['timeframe'].map(self._timeframe_delta))
+            ranges['candles'] = (
+                (pd.to_datetime(ranges['range_end']) - pd.to_datetime(ranges['range_start'])) / steps
+            ).round().astype(int) + 1
+            
+            summary = ranges.groupby(['exchange', 'symbol', 'timeframe']).agg(
+                first_date=('range_start', 'min'),
+                last_date=('range_end', 'max'),
+                candle_count=('candles', 'sum'),
+                gaps=('candles', 'size')
+            ).reset_index()
+            summary['gaps'] -= 1
+            frames.append(summary)
+        if calendar_rows:
+            calendar = pd.DataFrame(calendar_rows, columns=columns[:-1])
+            calendar['gaps'] = 0
+            frames.append(calendar)
+        
+        if not frames:
             return pd.DataFrame()
         
-        return pd.DataFrame(rows, columns=[
-            'exchange', 'symbol', 'timeframe', 
-            'first_date', 'last_date', 'candle_count'
-        ])
+        return pd.concat(frames, ignore_index=True)[columns].sort_values(
+            ['exchange', 'symbol', 'timeframe']
+        ).reset_index(drop=True)
     
     # === LLM Sentiment Analysis Operations ===
     
@@ -799,6 +1587,213 @@ class DatabaseManager:
         
         return df
     
+    def _aggregate_llm_sentiment(
+        self,
+        symbol: str = None,
+        regions: List[str] = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        bucket_seconds: int = 3600
+    ) -> pd.DataFrame:
+        """
+        Agreguje llm_sentiment_analysis jednym zapytaniem GROUP BY (symbol, region, przedział).
+        
+        Wszystkie metryki liczone są naraz po stronie bazy - nie pobieramy pełnych
+        wierszy (prompt, response, web search).
+        
+        Returns:
+            DataFrame z kolumnami: symbol, region, samples, score, confidence,
+            fud_level, fomo_level, market_impact (średnie; market_impact = ostatnia wartość)
+            Index: timestamp (początek przedziału)
+        """
+        stmt = self.llm_sentiment_aggregate_query(symbol, regions, start_date, end_date, bucket_seconds)
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        return self.llm_sentiment_frame(rows)
+    
+    def llm_sentiment_aggregate_query(
+        self,
+        symbol: str = None,
+        regions: List[str] = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        bucket_seconds: int = 3600
+    ):
+        """SELECT agregujący llm_sentiment_analysis w przedziały (wiersze dla llm_sentiment_frame)."""
+        m = LLMSentimentAnalysis
+        bucket = self._time_bucket(m.timestamp, bucket_seconds).label('bucket')
+        
+        if self._is_postgresql():
+            from sqlalchemy.dialects.postgresql import aggregate_order_by, ARRAY
+            from sqlalchemy import String, type_coerce
+            
+            last_impact = type_coerce(
+                func.array_agg(
+                    aggregate_order_by(m.market_impact, m.timestamp.desc())
+                ).filter(m.market_impact.isnot(None)),
+                ARRAY(String)
+            )[1]
+            extra_columns = []
+        else:
+            # SQLite: przy jedynym MAX() "gołe" kolumny pochodzą z wiersza z maksimum,
+            # a MAX ignoruje NULL-e -> ostatnie niepuste market_impact w przedziale
+            last_impact = m.market_impact
+            extra_columns = [func.max(case((m.market_impact.isnot(None), m.timestamp))).label('impact_at')]
+        
+        stmt = select(
+            bucket,
+            m.symbol,
+            m.region,
+            func.count(m.id).label('samples'),
+            func.avg(m.score).label('score'),
+            func.avg(m.confidence).label('confidence'),
+            func.avg(m.fud_level).label('fud_level'),
+            func.avg(m.fomo_level).label('fomo_level'),
+            last_impact.label('market_impact'),
+            *extra_columns
+        )
+        
+        if symbol:
+            stmt = stmt.where(m.symbol == symbol)
+        if regions:
+            stmt = stmt.where(m.region.in_(regions))
+        if start_date:
+            stmt = stmt.where(m.timestamp >= self._to_naive_utc(start_date))
+        if end_date:
+            stmt = stmt.where(m.timestamp <= self._to_naive_utc(end_date))
+        
+        return stmt.group_by(bucket, m.symbol, m.region).order_by(bucket)
+    
+    @staticmethod
+    def llm_sentiment_frame(rows) -> pd.DataFrame:
+        """
+        DataFrame z wierszy llm_sentiment_aggregate_query / llm_sentiment_hourly_query.
+        
+        Returns:
+            DataFrame z kolumnami zapytania (bez kolumn pomocniczych), Index: timestamp (bucket)
+        """
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame([dict(row._mapping) for row in rows])
+        df = df.drop(columns=['impact_at'], errors='ignore').rename(columns={'bucket': 'timestamp'})
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df.set_index('timestamp').sort_index()
+    
+    def refresh_llm_sentiment_hourly(
+        self,
+        symbol: str = None,
+        start_date: datetime = None
+    ) -> int:
+        """
+        Przyrostowo odświeża godzinowy rollup llm_sentiment_hourly.
+        
+        Bez start_date odświeża od ostatniego zmaterializowanego przedziału (watermark),
+        który jest liczony ponownie, bo mógł być niepełny. Przy pustym rollupie
+        przelicza całą historię. Przedziały są zapisywane upsertem, więc równoległe
+        odświeżanie nie koliduje na uq_llm_sentiment_hourly (odświeża daemon LLM,
+        czytelnicy domyślnie nie).
+        
+        Args:
+            symbol: Symbol kryptowaluty (jeśli None, wszystkie symbole)
+            start_date: Od kiedy przeliczyć przedziały (opcjonalnie)
+            
+        Returns:
+            Liczba zapisanych przedziałów (bucket x symbol x region)
+        """
+        h = LLMSentimentHourly
+        
+        if start_date is None:
+            with self.get_session() as session:
+                query = session.query(func.max(h.bucket))
+                if symbol:
+                    query = query.filter(h.symbol == symbol)
+                start_date = query.scalar()
+        
+        if start_date is not None:
+            start_date = pd.Timestamp(self._to_naive_utc(start_date)).floor('h').to_pydatetime()
+        
+        df = self._aggregate_llm_sentiment(symbol=symbol, start_date=start_date, bucket_seconds=3600)
+        
+        now = datetime.utcnow()
+        records = []
+        for bucket, row in df.iterrows():
+            records.append({
+                'bucket': bucket.to_pydatetime(),
+                'symbol': row['symbol'],
+                'region': row['region'],
+                'samples': int(row['samples']),
+                'score': None if pd.isna(row['score']) else float(row['score']),
+                'confidence': None if pd.isna(row['confidence']) else float(row['confidence']),
+                'fud_level': None if pd.isna(row['fud_level']) else float(row['fud_level']),
+                'fomo_level': None if pd.isna(row['fomo_level']) else float(row['fomo_level']),
+                'market_impact': row['market_impact'] if pd.notna(row['market_impact']) else None,
+                'updated_at': now,
+            })
+        
+        with self.get_session() as session:
+            # Przedziały >= watermark są liczone od nowa - nadpisz stare wersje
+            self._upsert(session, h, records, keys=['bucket', 'symbol', 'region'])
+        
+        logger.debug(f"Odświeżono llm_sentiment_hourly: {len(records)} przedziałów od {start_date}")
+        return len(records)
+    
+    def get_llm_sentiment_hourly(
+        self,
+        symbol: str,
+        regions: List[str] = None,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        refresh: bool = False
+    ) -> pd.DataFrame:
+        """
+        Pobiera godzinowy rollup sentymentu LLM (bez pełnych wierszy analiz).
+        
+        Rollup odświeża daemon LLM (refresh_llm_sentiment_hourly po każdym cyklu).
+        
+        Args:
+            symbol: Symbol kryptowaluty
+            regions: Lista kodów regionów (opcjonalnie)
+            start_date: Data początkowa
+            end_date: Data końcowa
+            refresh: Czy najpierw dociągnąć nowe analizy do rollupu (domyślnie nie)
+            
+        Returns:
+            DataFrame z kolumnami: region, samples, score, confidence, fud_level,
+            fomo_level, market_impact
+            Index: timestamp (początek godziny)
+        """
+        if refresh:
+            self.refresh_llm_sentiment_hourly(symbol=symbol)
+        
+        stmt = self.llm_sentiment_hourly_query(symbol, regions, start_date, end_date)
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        return self.llm_sentiment_frame(rows)
+    
+    def llm_sentiment_hourly_query(
+        self,
+        symbol: str,
+        regions: List[str] = None,
+        start_date: datetime = None,
+        end_date: datetime = None
+    ):
+        """SELECT godzinowego rollupu sentymentu LLM (wiersze dla llm_sentiment_frame)."""
+        h = LLMSentimentHourly
+        stmt = select(
+            h.bucket, h.region, h.samples, h.score, h.confidence,
+            h.fud_level, h.fomo_level, h.market_impact
+        ).where(h.symbol == symbol)
+        
+        if regions:
+            stmt = stmt.where(h.region.in_(regions))
+        if start_date:
+            start = pd.Timestamp(self._to_naive_utc(start_date)).floor('h').to_pydatetime()
+            stmt = stmt.where(h.bucket >= start)
+        if end_date:
+            stmt = stmt.where(h.bucket <= self._to_naive_utc(end_date))
+        
+        return stmt.order_by(h.bucket.asc())
+    
     def get_llm_sentiment_timeseries(
         self,
         symbol: str,
@@ -809,6 +1804,9 @@ class DatabaseManager:
         """
         Pobiera dane sentymentu LLM jako time series (pogrupowane po regionach).
         
+        Dla resolution_hours=1 czyta godzinowy rollup (llm_sentiment_hourly),
+        dla innych rozdzielczości agreguje surowe dane jednym zapytaniem GROUP BY.
+        
         Args:
             symbol: Symbol kryptowaluty
             regions: Lista kodów regionów (jeśli None, pobiera wszystkie)
@@ -818,84 +1816,80 @@ class DatabaseManager:
         Returns:
             DataFrame z kolumnami dla każdego regionu (wartości = score)
             Index: timestamp (pogrupowane według resolution_hours)
+            attrs: confidence, fud_level, fomo_level, market_impact (DataFrame per metryka)
+        """
+        stmt, bucket_seconds = self.llm_sentiment_timeseries_query(symbol, regions, days_back, resolution_hours)
+        with self.engine.connect() as conn:
+            rows = conn.execute(stmt).fetchall()
+        
+        combined = self.llm_sentiment_wide(self.llm_sentiment_frame(rows), regions, bucket_seconds)
+        if combined.empty:
+            logger.warning(f"Brak danych LLM sentymentu dla {symbol}")
+        else:
+            logger.success(f"Pobrano LLM sentiment timeseries dla {len(combined.columns)} regionów")
+        return combined
+    
+    def llm_sentiment_timeseries_query(
+        self,
+        symbol: str,
+        regions: List[str] = None,
+        days_back: int = 7,
+        resolution_hours: float = 1.0
+    ) -> Tuple[Any, int]:
+        """
+        SELECT dla get_llm_sentiment_timeseries - wykonywany też przez asynchroniczny silnik webapp.
+        
+        Dla resolution_hours=1 czyta godzinowy rollup, dla innych rozdzielczości agreguje surowe dane.
+        
+        Returns:
+            (zapytanie, długość przedziału w sekundach)
         """
         start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
         end_date = datetime.now(timezone.utc)
         
-        df = self.get_llm_sentiment_analysis(
-            symbol=symbol,
-            regions=regions,
-            start_date=start_date,
-            end_date=end_date
-        )
+        bucket_seconds = int(resolution_hours * 60) * 60
         
+        if bucket_seconds == 3600:
+            stmt = self.llm_sentiment_hourly_query(symbol, regions, start_date, end_date)
+        else:
+            stmt = self.llm_sentiment_aggregate_query(symbol, regions, start_date, end_date, bucket_seconds)
+        return stmt, bucket_seconds
+    
+    @staticmethod
+    def llm_sentiment_wide(df: pd.DataFrame, regions: List[str], bucket_seconds: int) -> pd.DataFrame:
+        """
+        Układ szeroki (kolumna na region) z wyniku llm_sentiment_frame - jak get_llm_sentiment_timeseries.
+        """
         if df.empty:
-            logger.warning(f"Brak danych LLM sentymentu dla {symbol}")
             return pd.DataFrame()
         
         # Jeśli nie podano regionów, pobierz wszystkie dostępne
+        available = df['region'].unique().tolist()
         if regions is None:
-            regions = df['region'].unique().tolist()
-        
-        # Grupuj po regionach i agreguj wszystkie wartości według resolution_hours
-        all_series = {}
-        all_confidence = {}
-        all_fud_level = {}
-        all_fomo_level = {}
-        all_market_impact = {}
+            regions = available
+        regions = [r for r in regions if r in available]
         
-        for region in regions:
-            region_df = df[df['region'] == region].copy()
-            
-            if region_df.empty:
-                continue
-            
-            # Resample do resolution_hours i uśrednij wszystkie wartości
-            resample_rule = f'{int(resolution_hours * 60)}T'  # Konwertuj godziny na minuty
-            
-            # Agreguj score (średnia)
-            region_df_resampled = region_df['score'].resample(resample_rule).mean()
-            all_series[region] = region_df_resampled
-            
-            # Agreguj confidence (średnia)
-            if 'confidence' in region_df.columns:
-                confidence_resampled = region_df['confidence'].resample(resample_rule).mean()
-                all_confidence[region] = confidence_resampled
-            
-            # Agreguj fud_level (średnia)
-            if 'fud_level' in region_df.columns:
-                fud_resampled = region_df['fud_level'].resample(resample_rule).mean()
-                all_fud_level[region] = fud_resampled
-            
-            # Agreguj fomo_level (średnia)
-            if 'fomo_level' in region_df.columns:
-                fomo_resampled = region_df['fomo_level'].resample(resample_rule).mean()
-                all_fomo_level[region] = fomo_resampled
-            
-            # Agreguj market_impact (ostatnia wartość - string)
-            if 'market_impact' in region_df.columns:
-                impact_resampled = region_df['market_impact'].resample(resample_rule).last()
-                all_market_impact[region] = impact_resampled
+        # Pełna siatka przedziałów (jak przy resample - luki jako NaN)
+        full_index = pd.date_range(
+            df.index.min(), df.index.max(), freq=f'{bucket_seconds}s', name='timestamp'
+        )
         
-        if not all_series:
-            return pd.DataFrame()
+        def _pivot(metric: str) -> pd.DataFrame:
+            wide = df.pivot(columns='region', values=metric).reindex(full_index)[regions]
+            return wide.rename_axis(None, axis=1)
         
-        # Połącz wszystkie serie w jeden DataFrame
-        combined = pd.DataFrame(all_series)
-        combined = combined.sort_index()
+        combined = _pivot('score').astype(float)
         
         # Wypełnij brakujące wartości interpolacją (tylko dla score)
         combined = combined.interpolate(method="time", limit=3)
         
         # Dodaj dodatkowe wartości jako atrybuty DataFrame (dla łatwego dostępu)
         combined.attrs = {
-            'confidence': pd.DataFrame(all_confidence) if all_confidence else pd.DataFrame(),
-            'fud_level': pd.DataFrame(all_fud_level) if all_fud_level else pd.DataFrame(),
-            'fomo_level': pd.DataFrame(all_fomo_level) if all_fomo_level else pd.DataFrame(),
-            'market_impact': pd.DataFrame(all_market_impact) if all_market_impact else pd.DataFrame()
+            'confidence': _pivot('confidence').astype(float),
+            'fud_level': _pivot('fud_level').astype(float),
+            'fomo_level': _pivot('fomo_level').astype(float),
+            'market_impact': _pivot('market_impact')
         }
-        
-        logger.success(f"Pobrano LLM sentiment timeseries dla {len(all_series)} regionów")
         return combined
     
     # === GDELT Sentiment Operations ===
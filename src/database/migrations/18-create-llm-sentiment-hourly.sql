@@ -0,0 +1,52 @@
+-- Migracja: Utworzenie tabeli llm_sentiment_hourly
+-- ==================================================
+-- Godzinowy rollup analiz sentymentu LLM (per symbol i region).
+-- Tabela jest utrzymywana przyrostowo przez DatabaseManager.refresh_llm_sentiment_hourly()
+-- (od ostatniego zmaterializowanego przedziału), więc odczyt time series nie musi
+-- pobierać pełnych wierszy llm_sentiment_analysis (prompt, response, web search).
+--
+-- Uwaga: continuous aggregate TimescaleDB wymagałby hypertable na llm_sentiment_analysis,
+-- a ta tabela ma PRIMARY KEY (id) bez kolumny timestamp - dlatego rollup jest zwykłą tabelą.
+
+CREATE TABLE IF NOT EXISTS llm_sentiment_hourly (
+    id SERIAL PRIMARY KEY,
+    bucket TIMESTAMP NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    region VARCHAR(10) NOT NULL,
+    
+    samples INTEGER NOT NULL,
+    score FLOAT,
+    confidence FLOAT,
+    fud_level FLOAT,
+    fomo_level FLOAT,
+    market_impact VARCHAR(10),
+    
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT uq_llm_sentiment_hourly UNIQUE (bucket, symbol, region)
+);
+
+CREATE INDEX IF NOT EXISTS ix_llm_sentiment_hourly_lookup ON llm_sentiment_hourly (symbol, region, bucket);
+
+-- Komentarze do kolumn
+COMMENT ON TABLE llm_sentiment_hourly IS 'Godzinowy rollup analiz sentymentu LLM (utrzymywany przyrostowo)';
+COMMENT ON COLUMN llm_sentiment_hourly.bucket IS 'Początek godziny (UTC)';
+COMMENT ON COLUMN llm_sentiment_hourly.samples IS 'Liczba analiz LLM w godzinie';
+COMMENT ON COLUMN llm_sentiment_hourly.score IS 'Średni score sentymentu (-1.0 do 1.0)';
+COMMENT ON COLUMN llm_sentiment_hourly.market_impact IS 'Ostatnia wartość market_impact w godzinie';
+
+-- Wypełnienie rollupu istniejącymi danymi
+INSERT INTO llm_sentiment_hourly (bucket, symbol, region, samples, score, confidence, fud_level, fomo_level, market_impact)
+SELECT
+    date_trunc('hour', timestamp) AS bucket,
+    symbol,
+    region,
+    COUNT(*),
+    AVG(score),
+    AVG(confidence),
+    AVG(fud_level),
+    AVG(fomo_level),
+    (array_agg(market_impact ORDER BY timestamp DESC) FILTER (WHERE market_impact IS NOT NULL))[1]
+FROM llm_sentiment_analysis
+GROUP BY date_trunc('hour', timestamp), symbol, region
+ON CONFLICT (bucket, symbol, region) DO NOTHING;
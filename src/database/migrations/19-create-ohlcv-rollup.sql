@@ -0,0 +1,41 @@
+-- Migracja: Utworzenie tabeli ohlcv_rollup
+-- =========================================
+-- Świece 5m/15m/1h/4h/1d zagregowane ze świec 1m tabeli ohlcv.
+-- Tabela jest utrzymywana przyrostowo przez DatabaseManager.refresh_ohlcv_rollups()
+-- (wywoływane przy zapisie świec 1m oraz przy odczycie z watermarkiem),
+-- a DatabaseManager.get_ohlcv() czyta z niej, gdy brak natywnych świec danego interwału.
+--
+-- Uwaga: continuous aggregates TimescaleDB wymagają hypertable na ohlcv, a ohlcv ma
+-- PRIMARY KEY (id) bez kolumny timestamp - dlatego rollup jest zwykłą tabelą.
+
+CREATE TABLE IF NOT EXISTS ohlcv_rollup (
+    id SERIAL PRIMARY KEY,
+    bucket TIMESTAMP NOT NULL,
+    exchange VARCHAR(50) NOT NULL,
+    symbol VARCHAR(50) NOT NULL,
+    timeframe VARCHAR(10) NOT NULL,
+    
+    open FLOAT NOT NULL,
+    high FLOAT NOT NULL,
+    low FLOAT NOT NULL,
+    close FLOAT NOT NULL,
+    volume FLOAT NOT NULL,
+    
+    trades_count INTEGER,
+    candles INTEGER NOT NULL,
+    
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    CONSTRAINT uq_ohlcv_rollup UNIQUE (bucket, exchange, symbol, timeframe)
+);
+
+CREATE INDEX IF NOT EXISTS ix_ohlcv_rollup_lookup ON ohlcv_rollup (exchange, symbol, timeframe, bucket);
+
+-- Komentarze do kolumn
+COMMENT ON TABLE ohlcv_rollup IS 'Świece wyższych interwałów zagregowane ze świec 1m (utrzymywane przyrostowo)';
+COMMENT ON COLUMN ohlcv_rollup.bucket IS 'Początek świecy (UTC)';
+COMMENT ON COLUMN ohlcv_rollup.timeframe IS 'Interwał rollupu: 5m, 15m, 1h, 4h, 1d';
+COMMENT ON COLUMN ohlcv_rollup.candles IS 'Liczba świec 1m w przedziale';
+
+-- Dane historyczne są agregowane przy starcie data_updater_daemon.py
+-- (DatabaseManager.refresh_ohlcv_rollups przy pustym rollupie przelicza całą historię)
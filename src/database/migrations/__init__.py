@@ -28,6 +28,8 @@ MIGRATIONS = [
     '15-insert-special-events-data.sql',
     '16-insert-social-events-data.sql',
     '17-move-tables-to-public.sql',
+    '18-create-llm-sentiment-hourly.sql',
+    '19-create-ohlcv-rollup.sql',
 ]
 
 
@@ -86,6 +86,70 @@ class OHLCV(Base):
         return f"<OHLCV {self.exchange}:{self.symbol} {self.timeframe} @ {self.timestamp}>"
 
 
+class OHLCVRollup(Base):
+    """
+    Świece wyższych interwałów (5m, 15m, 1h, 4h, 1d) zagregowane ze świec 1m.
+    
+    Utrzymywana przyrostowo przez DatabaseManager.refresh_ohlcv_rollups()
+    (wywoływane przy zapisie świec 1m) i czytana transparentnie przez
+    DatabaseManager.get_ohlcv(), gdy brak natywnych świec danego interwału.
+    """
+    __tablename__ = 'ohlcv_rollup'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bucket = Column(DateTime, nullable=False)  # Początek świecy (UTC)
+    exchange = Column(String(50), nullable=False)
+    symbol = Column(String(50), nullable=False)
+    timeframe = Column(String(10), nullable=False)  # 5m, 15m, 1h, 4h, 1d
+    
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, nullable=False)
+    
+    trades_count = Column(Integer, nullable=True)
+    candles = Column(Integer, nullable=False)  # Liczba świec 1m w przedziale
+    
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('bucket', 'exchange', 'symbol', 'timeframe', name='uq_ohlcv_rollup'),
+        Index('ix_ohlcv_rollup_lookup', 'exchange', 'symbol', 'timeframe', 'bucket'),
+    )
+    
+    def __repr__(self):
+        return f"<OHLCVRollup {self.exchange}:{self.symbol} {self.timeframe} @ {self.bucket}>"
+
+
+class OHLCVCoverage(Base):
+    """
+    Indeks pokrycia tabeli ohlcv: ciągłe zakresy załadowanych świec
+    per (exchange, symbol, timeframe). Dziury to przerwy między zakresami.
+    
+    Utrzymywany przez DatabaseManager.save_ohlcv() (sąsiednie i nakładające
+    się zakresy są scalane) i czytany przez latest_timestamp() / missing_ranges()
+    bez skanowania świec.
+    """
+    __tablename__ = 'ohlcv_coverage'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    exchange = Column(String(50), nullable=False)
+    symbol = Column(String(50), nullable=False)
+    timeframe = Column(String(10), nullable=False)
+    range_start = Column(DateTime, nullable=False)  # Pierwsza świeca zakresu (UTC, włącznie)
+    range_end = Column(DateTime, nullable=False)  # Ostatnia świeca zakresu (UTC, włącznie)
+    
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    
+    __table_args__ = (
+        Index('ix_ohlcv_coverage_lookup', 'exchange', 'symbol', 'timeframe', 'range_end'),
+    )
+    
+    def __repr__(self):
+        return f"<OHLCVCoverage {self.exchange}:{self.symbol} {self.timeframe} {self.range_start} → {self.range_end}>"
+
+
 class Ticker(Base):
     """
     Snapshoty tickerów - aktualne ceny i wolumeny.
@@ -262,6 +326,39 @@ class LLMSentimentAnalysis(Base):
         return f"<LLMSentimentAnalysis {self.symbol} {self.region} @ {self.timestamp} ({self.sentiment}, cost: {self.cost_pln:.4f} PLN)>"
 
 
+class LLMSentimentHourly(Base):
+    """
+    Godzinowy rollup analiz sentymentu LLM (per symbol i region).
+    
+    Utrzymywany przyrostowo przez DatabaseManager.refresh_llm_sentiment_hourly()
+    na podstawie tabeli llm_sentiment_analysis. Zawiera tylko zagregowane metryki
+    (bez promptów i odpowiedzi), więc odczyt time series jest tani.
+    """
+    __tablename__ = 'llm_sentiment_hourly'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bucket = Column(DateTime, nullable=False)  # Początek godziny (UTC)
+    symbol = Column(String(50), nullable=False)
+    region = Column(String(10), nullable=False)
+    
+    samples = Column(Integer, nullable=False)  # Liczba analiz w godzinie
+    score = Column(Float, nullable=True)  # Średni score
+    confidence = Column(Float, nullable=True)  # Średnie confidence
+    fud_level = Column(Float, nullable=True)  # Średni fud_level
+    fomo_level = Column(Float, nullable=True)  # Średni fomo_level
+    market_impact = Column(String(10), nullable=True)  # Ostatnia wartość w godzinie
+    
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('bucket', 'symbol', 'region', name='uq_llm_sentiment_hourly'),
+        Index('ix_llm_sentiment_hourly_lookup', 'symbol', 'region', 'bucket'),
+    )
+    
+    def __repr__(self):
+        return f"<LLMSentimentHourly {self.symbol} {self.region} @ {self.bucket} (score: {self.score}, n={self.samples})>"
+
+
 class GDELTSentiment(Base):
     """
     Dane sentymentu z GDELT (Global Database of Events, Language, and Tone).
@@ -272,7 +369,9 @@ class GDELTSentiment(Base):
     __tablename__ = 'gdelt_sentiment'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    timestamp = Column(DateTime, nullable=False, index=True)
+    # Bez index=True - indeks ix_gdelt_sentiment_timestamp jest zdefiniowany w __table_args__
+    # (index=True generował indeks o tej samej nazwie i create_all() kończył się błędem)
+    timestamp = Column(DateTime, nullable=False)
     region = Column(String(10), nullable=False, index=True)  # US, CN, JP, KR, DE, GB, etc.
     language = Column(String(10), nullable=True)  # en, zh, ja, ko, etc.
     
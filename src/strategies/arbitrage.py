@@ -18,9 +18,13 @@ WAŻNE: Arbitraż wymaga:
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from itertools import permutations
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
+import threading
+import time
+import numpy as np
 import pandas as pd
 from loguru import logger
 
@@ -63,10 +67,16 @@ class ArbitrageOpportunity:
     volume_24h_buy: Optional[float] = None
     volume_24h_sell: Optional[float] = None
     
+    # Skaner z głębokością rynku (DepthArbitrageScanner)
+    notional_usd: Optional[float] = None  # Wielkość transakcji, dla której liczono ceny (VWAP)
+    funding_cost_percent: float = 0.0  # Koszt funding nogi perpetual (ujemny = przychód)
+    book_timestamp: Optional[datetime] = None  # Czas giełdy najstarszego z dwóch orderbooków
+    latency_ms: Optional[float] = None  # Od aktualizacji orderbooka do wykrycia okazji
+    
     def __post_init__(self):
         """Oblicz net profit po opłatach."""
         total_fees = self.fees_buy + self.fees_sell + self.slippage_estimate
-        self.net_profit_percent = self.spread_percent - (total_fees * 100)
+        self.net_profit_percent = self.spread_percent - (total_fees * 100) - self.funding_cost_percent
     
     def is_profitable(self, min_profit: float = 0.1) -> bool:
         """Czy okazja jest opłacalna (domyślnie min 0.1% zysku)."""
@@ -390,6 +400,401 @@ class ArbitrageScanner:
         return "\n".join(report)
 
 
+def _epoch_seconds(timestamp) -> float:
+    """Czas epoki w sekundach (datetime, pd.Timestamp lub liczba; None = teraz)."""
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return timestamp.timestamp()
+
+
+class DepthBooks:
+    """
+    Orderbooki jednej giełdy dla wszystkich assetów jako tablice (asset × poziom).
+    
+    Wiersz strony książki trzyma top `depth` poziomów z narastającą wielkością
+    i wartością USD, więc przejście po głębokości dla wszystkich assetów to kilka
+    operacji numpy. Aktualizacja przelicza tylko wiersz zmienionego assetu.
+    """
+    
+    SIDES = ('bids', 'asks')
+    
+    def __init__(self, n_assets: int, depth: int = 50):
+        self.depth = depth
+        self.price = {side: np.full((n_assets, depth), np.nan) for side in self.SIDES}
+        # Wypełnienie inf za ostatnim poziomem - przejście dalej = brak płynności
+        self.cum_size = {side: np.full((n_assets, depth), np.inf) for side in self.SIDES}
+        self.cum_notional = {side: np.full((n_assets, depth), np.inf) for side in self.SIDES}
+        self.count = {side: np.zeros(n_assets, dtype=int) for side in self.SIDES}
+        self.timestamp = np.full(n_assets, np.nan)  # Czas giełdy (epoka, s)
+        self._levels = [{side: {} for side in self.SIDES} for _ in range(n_assets)]
+    
+    def update(
+        self,
+        row: int,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        timestamp: float,
+        snapshot: bool = True
+    ):
+        """
+        Aktualizuje orderbook assetu.
+        
+        Args:
+            row: Indeks assetu
+            bids, asks: Poziomy [(cena, wielkość), ...]
+            timestamp: Czas giełdy (epoka, s)
+            snapshot: True = pełny orderbook, False = zmiany poziomów (wielkość 0 usuwa poziom)
+        """
+        for side, levels in (('bids', bids), ('asks', asks)):
+            if snapshot:
+                self._levels[row][side] = {}
+            book = self._levels[row][side]
+            for price, size in levels:
+                if size > 0:
+                    book[float(price)] = float(size)
+                else:
+                    book.pop(float(price), None)
+            self._rebuild(row, side)
+        self.timestamp[row] = timestamp
+    
+    def _rebuild(self, row: int, side: str):
+        """Przelicza tablice jednej strony książki assetu."""
+        book = self._levels[row][side]
+        prices = np.array(sorted(book, reverse=(side == 'bids'))[:self.depth])
+        sizes = np.array([book[price] for price in prices])
+        n = len(prices)
+        
+        self.price[side][row] = np.nan
+        self.cum_size[side][row] = np.inf
+        self.cum_notional[side][row] = np.inf
+        if n:
+            self.price[side][row, :n] = prices
+            self.cum_size[side][row, :n] = np.cumsum(sizes)
+            self.cum_notional[side][row, :n] = np.cumsum(prices * sizes)
+        self.count[side][row] = n
+    
+    def buy_quantity(self, notional: float) -> np.ndarray:
+        """Ilość kupiona za notional USD (taker po asks) per asset; NaN gdy za mała głębokość."""
+        return self._walk('asks', notional, by_notional=True)
+    
+    def sell_proceeds(self, quantity: np.ndarray) -> np.ndarray:
+        """Przychód USD ze sprzedaży quantity (taker po bids) per asset; NaN gdy za mała głębokość."""
+        return self._walk('bids', quantity, by_notional=False)
+    
+    def _walk(self, side: str, amount, by_notional: bool) -> np.ndarray:
+        """Przejście po poziomach do wypełnienia amount (USD gdy by_notional, inaczej ilość)."""
+        target = (self.cum_notional if by_notional else self.cum_size)[side]
+        result = (self.cum_size if by_notional else self.cum_notional)[side]
+        price = self.price[side]
+        amount = np.broadcast_to(np.asarray(amount, dtype=float), self.timestamp.shape)
+        rows = np.arange(len(amount))
+        
+        # Poziom, na którym kończy się wypełnienie (== count gdy płynności brakuje)
+        level = (target < amount[:, None]).sum(axis=1)
+        filled = level < self.count[side]
+        level = np.minimum(level, self.depth - 1)
+        before = np.maximum(level - 1, 0)
+        target_before = np.where(level > 0, target[rows, before], 0.0)
+        result_before = np.where(level > 0, result[rows, before], 0.0)
+        remainder = amount - target_before
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            partial = remainder / price[rows, level] if by_notional else remainder * price[rows, level]
+        return np.where(filled, result_before + partial, np.nan)
+
+
+class DepthArbitrageScanner:
+    """
+    Ciągły skaner arbitrażu Binance (spot) vs dYdX (perpetual) z głębokością rynku.
+    
+    W odróżnieniu od ArbitrageScanner (ceny last/oracle, migawki co skan):
+    - orderbooki obu giełd są trzymane w pamięci i aktualizowane przyrostowo
+      (update_book - snapshot REST albo zmiany poziomów z feedu),
+    - spread jest wykonywalny: VWAP zakupu za notional_usd po asks i sprzedaży
+      tej samej ilości po bids, minus opłaty taker i funding nogi perpetual,
+    - każda aktualizacja przelicza wszystkie assety wektorowo (DepthBooks),
+    - okazja jest emitowana raz, gdy się pojawi (z latencją od aktualizacji
+      orderbooka), a jej zamknięcie jest logowane z czasem życia.
+    
+    Przykład użycia:
+    ```python
+    with DepthArbitrageScanner(notional_usd=25_000, on_opportunity=print) as scanner:
+        scanner.run(duration=60, interval=0.5)
+    ```
+    """
+    
+    VENUES = ('binance', 'dydx')
+    # Funding dotyczy tylko nóg perpetual (Binance w SYMBOL_MAPPING to spot)
+    PERP_VENUES = ('dydx',)
+    
+    def __init__(
+        self,
+        assets: Optional[Sequence[str]] = None,
+        notional_usd: float = 10_000.0,
+        min_profit: float = 0.1,
+        depth: int = 50,
+        funding_periods: float = 1.0,
+        max_book_age: float = 5.0,
+        fees: Optional[Dict[str, Dict[str, float]]] = None,
+        on_opportunity: Optional[Callable[[ArbitrageOpportunity], None]] = None,
+        collectors: Optional[Dict[str, object]] = None
+    ):
+        """
+        Args:
+            assets: Assety z ArbitrageScanner.SYMBOL_MAPPING (domyślnie wszystkie)
+            notional_usd: Wielkość transakcji, dla której liczony jest spread
+            min_profit: Minimalny zysk netto % aby emitować okazję
+            depth: Liczba poziomów orderbooka branych pod uwagę
+            funding_periods: Ile okresów funding trzymana jest pozycja perpetual
+            max_book_age: Maksymalny wiek orderbooka (s) - starsze nie tworzą okazji
+            fees: Opłaty giełd (domyślnie ArbitrageScanner.FEES)
+            on_opportunity: Callback wywoływany dla każdej nowej okazji
+            collectors: Kolektory {giełda: kolektor z get_orderbook} (domyślnie Binance/dYdX)
+        """
+        self.assets = list(assets or ArbitrageScanner.SYMBOL_MAPPING)
+        unknown = [asset for asset in self.assets if asset not in ArbitrageScanner.SYMBOL_MAPPING]
+        if unknown:
+            raise ValueError(f"Nieznany asset: {', '.join(unknown)}")
+        
+        self.notional_usd = notional_usd
+        self.min_profit = min_profit
+        self.funding_periods = funding_periods
+        self.max_book_age = max_book_age
+        self.fees = fees or ArbitrageScanner.FEES
+        self.on_opportunity = on_opportunity
+        
+        self._row = {asset: row for row, asset in enumerate(self.assets)}
+        self.books = {venue: DepthBooks(len(self.assets), depth) for venue in self.VENUES}
+        self.funding_rates = {venue: np.zeros(len(self.assets)) for venue in self.VENUES}
+        
+        # Otwarte okazje: (asset, giełda kupna, giełda sprzedaży) -> okazja
+        self.active: Dict[Tuple[str, str, str], ArbitrageOpportunity] = {}
+        self._opened_at: Dict[Tuple[str, str, str], float] = {}
+        self.stats = {'updates': 0, 'emitted': 0, 'closed': 0}
+        
+        self._collectors = collectors or {}
+        self._scanner = ArbitrageScanner()  # Lazy kolektory Binance/dYdX
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Zamyka pulę wątków pobierania orderbooków."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def collector(self, venue: str):
+        """Kolektor giełdy (przekazany w konstruktorze lub lazy z ArbitrageScanner)."""
+        if venue not in self._collectors:
+            self._collectors[venue] = getattr(self._scanner, venue)
+        return self._collectors[venue]
+    
+    def update_book(
+        self,
+        venue: str,
+        asset: str,
+        bids: Iterable[Tuple[float, float]],
+        asks: Iterable[Tuple[float, float]],
+        timestamp=None,
+        snapshot: bool = True
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Aktualizuje orderbook i przelicza okazje dla wszystkich assetów.
+        
+        Args:
+            venue: Giełda ('binance' lub 'dydx')
+            asset: Asset (np. "BTC")
+            bids, asks: Poziomy [(cena, wielkość), ...]
+            timestamp: Czas giełdy (datetime lub epoka; None = teraz)
+            snapshot: True = pełny orderbook, False = zmiany poziomów
+            
+        Returns:
+            Nowe okazje wykryte po tej aktualizacji
+        """
+        with self._lock:
+            self.books[venue].update(self._row[asset], bids, asks, _epoch_seconds(timestamp), snapshot)
+            self.stats['updates'] += 1
+            emitted = self._evaluate()
+        
+        if self.on_opportunity:
+            for opportunity in emitted:
+                self.on_opportunity(opportunity)
+        return emitted
+    
+    def set_funding_rate(self, venue: str, asset: str, rate: float):
+        """Ustawia funding rate (na okres) nogi perpetual."""
+        with self._lock:
+            self.funding_rates[venue][self._row[asset]] = rate
+    
+    def opportunities(self) -> List[ArbitrageOpportunity]:
+        """Aktualnie otwarte okazje, posortowane po zysku netto."""
+        with self._lock:
+            return sorted(self.active.values(), key=lambda x: x.net_profit_percent, reverse=True)
+    
+    def _funding_rate(self, venue: str) -> np.ndarray:
+        if venue in self.PERP_VENUES:
+            return self.funding_rates[venue]
+        return np.zeros(len(self.assets))
+    
+    def _evaluate(self) -> List[ArbitrageOpportunity]:
+        """Wektorowa ocena wszystkich assetów i kierunków; zwraca nowe okazje."""
+        now = time.time()
+        emitted = []
+        seen = set()
+        
+        for buy_venue, sell_venue in permutations(self.VENUES, 2):
+            buy_books, sell_books = self.books[buy_venue], self.books[sell_venue]
+            quantity = buy_books.buy_quantity(self.notional_usd)
+            proceeds = sell_books.sell_proceeds(quantity)
+            
+            fees_buy = self.fees[buy_venue]['taker']
+            fees_sell = self.fees[sell_venue]['taker']
+            spread_percent = (proceeds / self.notional_usd - 1.0) * 100
+            # Long perpetual płaci dodatni funding, short go otrzymuje
+            funding_percent = (
+                self._funding_rate(buy_venue) - self._funding_rate(sell_venue)
+            ) * self.funding_periods * 100
+            net_percent = spread_percent - (fees_buy + fees_sell) * 100 - funding_percent
+            
+            oldest = np.minimum(buy_books.timestamp, sell_books.timestamp)
+            newest = np.maximum(buy_books.timestamp, sell_books.timestamp)
+            with np.errstate(invalid='ignore'):
+                profitable = (now - oldest <= self.max_book_age) & (net_percent >= self.min_profit)
+            
+            for row in np.flatnonzero(profitable):
+                asset = self.assets[row]
+                key = (asset, buy_venue, sell_venue)
+                seen.add(key)
+                if key in self.active:
+                    continue
+                
+                perp_venue = next((v for v in (buy_venue, sell_venue) if v in self.PERP_VENUES), None)
+                opportunity = ArbitrageOpportunity(
+                    timestamp=datetime.now(),
+                    arb_type=ArbitrageType.CROSS_EXCHANGE,
+                    symbol=asset,
+                    exchange_buy=buy_venue,
+                    exchange_sell=sell_venue,
+                    price_buy=self.notional_usd / quantity[row],
+                    price_sell=proceeds[row] / quantity[row],
+                    spread_percent=float(spread_percent[row]),
+                    spread_usd=float(proceeds[row] - self.notional_usd),
+                    fees_buy=fees_buy,
+                    fees_sell=fees_sell,
+                    slippage_estimate=0.0,  # Poślizg zawarty w VWAP
+                    funding_rate=float(self.funding_rates[perp_venue][row]) if perp_venue else None,
+                    notional_usd=self.notional_usd,
+                    funding_cost_percent=float(funding_percent[row]),
+                    book_timestamp=datetime.fromtimestamp(oldest[row]),
+                    latency_ms=(now - newest[row]) * 1000
+                )
+                self.active[key] = opportunity
+                self._opened_at[key] = now
+                self.stats['emitted'] += 1
+                emitted.append(opportunity)
+                logger.success(
+                    f"🎯 Okazja: {asset} {buy_venue} → {sell_venue} | Net: {opportunity.net_profit_percent:.3f}% "
+                    f"@ ${self.notional_usd:,.0f} | latencja {opportunity.latency_ms:.0f} ms"
+                )
+        
+        for key in set(self.active) - seen:
+            del self.active[key]
+            lifetime = now - self._opened_at.pop(key)
+            self.stats['closed'] += 1
+            logger.debug(f"Okazja zamknięta: {' → '.join(key)} po {lifetime * 1000:.0f} ms")
+        
+        return emitted
+    
+    def refresh_funding(self):
+        """Pobiera funding rates nóg perpetual (jedno zapytanie na giełdę)."""
+        for venue in self.PERP_VENUES:
+            symbols = {ArbitrageScanner.SYMBOL_MAPPING[asset][venue]: asset for asset in self.assets}
+            try:
+                tickers = self.collector(venue).get_tickers(list(symbols))
+            except Exception as e:
+                logger.error(f"Błąd pobierania funding {venue}: {e}")
+                continue
+            for symbol, ticker in tickers.items():
+                self.set_funding_rate(venue, symbols[symbol], ticker.get('next_funding_rate', 0.0))
+    
+    def poll_books(self) -> List[ArbitrageOpportunity]:
+        """
+        Pobiera orderbooki wszystkich assetów z obu giełd równolegle (stała pula
+        wątków) i przelicza okazje po każdym z nich - bez czekania na cały skan.
+        
+        Returns:
+            Nowe okazje wykryte w tej rundzie
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.assets) * len(self.VENUES))
+        
+        futures = {
+            self._executor.submit(
+                self.collector(venue).get_orderbook, ArbitrageScanner.SYMBOL_MAPPING[asset][venue]
+            ): (venue, asset)
+            for asset in self.assets
+            for venue in self.VENUES
+        }
+        emitted = []
+        for future in as_completed(futures):
+            venue, asset = futures[future]
+            try:
+                book = future.result()
+            except Exception as e:
+                logger.error(f"Błąd orderbooka {venue} {asset}: {e}")
+                continue
+            emitted.extend(self.update_book(venue, asset, book['bids'], book['asks'], book.get('timestamp')))
+        return emitted
+    
+    def run(
+        self,
+        duration: Optional[float] = None,
+        interval: float = 1.0,
+        funding_interval: float = 60.0,
+        stop_event: Optional[threading.Event] = None
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Ciągłe skanowanie: odświeża orderbooki co interval sekund, funding co funding_interval.
+        
+        Args:
+            duration: Czas działania w sekundach (None = do stop_event)
+            interval: Odstęp między rundami pobierania orderbooków
+            funding_interval: Odstęp między odświeżeniami funding rates
+            stop_event: Zdarzenie zatrzymujące skanowanie
+            
+        Returns:
+            Wszystkie okazje wykryte w trakcie działania
+        """
+        stop_event = stop_event or threading.Event()
+        started = time.monotonic()
+        funding_at = None
+        emitted = []
+        
+        while not stop_event.is_set():
+            round_start = time.monotonic()
+            if duration is not None and round_start - started >= duration:
+                break
+            if funding_at is None or round_start - funding_at >= funding_interval:
+                self.refresh_funding()
+                funding_at = round_start
+            emitted.extend(self.poll_books())
+            stop_event.wait(max(0.0, interval - (time.monotonic() - round_start)))
+        
+        logger.info(
+            f"Skaner zatrzymany: {self.stats['updates']} aktualizacji, "
+            f"{self.stats['emitted']} okazji, {self.stats['closed']} zamkniętych"
+        )
+        return emitted
+
+
 # === Przykład użycia ===
 if __name__ == "__main__":
     import sys
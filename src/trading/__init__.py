@@ -2,29 +2,28 @@
 Moduł tradingowy
 ================
 Paper trading, strategie i zarządzanie pozycjami.
+
+Eksporty są ładowane przy pierwszym użyciu - import pakietu (np. przez
+src.trading.backtesting) nie ładuje SQLAlchemy ani kolektorów giełdy.
 """
 
-from .paper_trading import PaperTradingEngine
-from .strategies.piotrek_strategy import PiotrekBreakoutStrategy
-
-# Import wszystkich modeli aby Base.metadata je widział
-from .models import (
-    Base as TradingBase,
-    PaperAccount,
-    PaperPosition,
-    PaperOrder,
-    PaperTrade,
-    OrderSide,
-    OrderType,
-    OrderStatus,
-    PositionStatus
-)
-
-from .models_extended import (
-    Strategy,
-    TradeRegister,
-    TradingSession
-)
+# Nazwa eksportu -> (moduł, atrybut)
+_EXPORTS = {
+    'PaperTradingEngine': ('.paper_trading', 'PaperTradingEngine'),
+    'PiotrekBreakoutStrategy': ('.strategies.piotrek_strategy', 'PiotrekBreakoutStrategy'),
+    'TradingBase': ('.models', 'Base'),
+    'PaperAccount': ('.models', 'PaperAccount'),
+    'PaperPosition': ('.models', 'PaperPosition'),
+    'PaperOrder': ('.models', 'PaperOrder'),
+    'PaperTrade': ('.models', 'PaperTrade'),
+    'OrderSide': ('.models', 'OrderSide'),
+    'OrderType': ('.models', 'OrderType'),
+    'OrderStatus': ('.models', 'OrderStatus'),
+    'PositionStatus': ('.models', 'PositionStatus'),
+    'Strategy': ('.models_extended', 'Strategy'),
+    'TradeRegister': ('.models_extended', 'TradeRegister'),
+    'TradingSession': ('.models_extended', 'TradingSession'),
+}
 
 __all__ = [
     'PaperTradingEngine',
@@ -44,3 +43,21 @@ __all__ = [
     'PositionStatus'
 ]
 
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    module_name, attribute = _EXPORTS[name]
+    if module_name in ('.models', '.models_extended'):
+        # Import wszystkich modeli aby Base.metadata je widział
+        importlib.import_module('.models', __name__)
+        importlib.import_module('.models_extended', __name__)
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -5,11 +5,13 @@ Silnik do testowania strategii na danych historycznych.
 Pozwala szybko przetestować różne parametry strategii bez ryzyka.
 """
 
+import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple, Union, TYPE_CHECKING
+from dataclasses import dataclass, field, fields
 from loguru import logger
 
 try:
@@ -22,8 +24,63 @@ except ImportError:
         return iterable
 
 from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
-from src.collectors.exchange.dydx_collector import DydxCollector
-from src.trading.models import OrderSide
+from src.trading.trigger_index import TriggerIndex
+
+if TYPE_CHECKING:
+    # Kolektor giełdy i cache świec (requests, baza) importowane dopiero przy pobieraniu danych
+    from src.collectors.exchange.dydx_collector import DydxCollector
+    from src.trading.candle_cache import CandleCache
+    from src.trading.result_store import BacktestResultStore
+
+
+# Kolumnowy log transakcji: czasy jako int64 ns (UTC), side: 1 = long, -1 = short
+TRADE_DTYPE = np.dtype([
+    ('entry_time', 'i8'),
+    ('exit_time', 'i8'),
+    ('side', 'i1'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('size', 'f8'),
+    ('pnl', 'f8'),
+    ('pnl_percent', 'f8'),
+    ('fees', 'f8'),
+    ('duration_seconds', 'f8'),
+    ('exit_reason', 'U16')
+])
+
+NS_PER_DAY = 86_400 * 10**9
+
+# Maksymalna liczba punktów w equity_curve (lista krotek - do wykresów i raportów)
+EQUITY_CURVE_POINTS = 1000
+
+
+def to_epoch_ns(values) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Konwertuje znaczniki czasu na int64 ns (UTC).
+    
+    Returns:
+        (tablica int64, strefa czasowa źródła lub None dla czasów naiwnych)
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(values))
+    tz = None
+    if index.tz is not None:
+        tz = str(index.tz)
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[ns]').view('i8'), tz
+
+
+def from_epoch_ns(values: np.ndarray, tz: Optional[str] = None) -> pd.DatetimeIndex:
+    """Odwrotność to_epoch_ns - DatetimeIndex w strefie źródła."""
+    index = pd.DatetimeIndex(np.asarray(values, dtype='i8').view('datetime64[ns]'))
+    return index.tz_localize('UTC').tz_convert(tz) if tz else index
+
+
+def longest_run(mask: np.ndarray) -> int:
+    """Długość najdłuższej serii True w tablicy bool."""
+    if not mask.any():
+        return 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return int((edges[1::2] - edges[::2]).max())
 
 
 @dataclass
@@ -63,10 +120,21 @@ class BacktestResult:
     max_consecutive_wins: int = 0
     max_consecutive_losses: int = 0
     
-    # Szczegóły transakcji
+    # Kontekst
+    symbol: str = ""
+    strategy_name: str = ""
+    timestamp_tz: Optional[str] = None  # strefa czasowa danych źródłowych
+    
+    # Szczegóły transakcji (lista słowników - format historyczny)
     trades: List[Dict[str, Any]] = field(default_factory=list)
+    # Krzywa kapitału przerzedzona do EQUITY_CURVE_POINTS punktów (wykresy, raporty)
     equity_curve: List[Tuple[datetime, float]] = field(default_factory=list)
     
+    # Dane kolumnowe: pełna krzywa kapitału (punkt na świecę) i log transakcji
+    equity_timestamps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype='i8'), repr=False)
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0, dtype='f8'), repr=False)
+    trade_log: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=TRADE_DTYPE), repr=False)
+    
     def __repr__(self):
         return (
             f"BacktestResult("
@@ -75,6 +143,143 @@ class BacktestResult:
             f"win_rate={self.win_rate:.1f}%, "
             f"max_dd={self.max_drawdown:.2f}%)"
         )
+    
+    def equity_series(self) -> pd.Series:
+        """Pełna krzywa kapitału jako pd.Series (indeks w strefie czasowej danych)."""
+        return pd.Series(self.equity, index=from_epoch_ns(self.equity_timestamps, self.timestamp_tz), name='equity')
+    
+    def trades_frame(self) -> pd.DataFrame:
+        """Log transakcji jako DataFrame (czasy jako Timestamp)."""
+        df = pd.DataFrame(self.trade_log)
+        for column in ('entry_time', 'exit_time'):
+            df[column] = from_epoch_ns(df[column].to_numpy(), self.timestamp_tz)
+        df['side'] = np.where(df['side'].to_numpy() > 0, 'long', 'short')
+        return df
+    
+    def to_parquet(self, path: Union[str, Path], compression: str = 'zstd') -> Path:
+        """
+        Zapisuje wynik jako archiwum Parquet (katalog).
+        
+        Zawartość:
+            equity.parquet - timestamp (int64 ns UTC), equity (float64);
+                             statystyki w metadanych pliku
+            trades.parquet - kolumnowy log transakcji (TRADE_DTYPE)
+        
+        Returns:
+            Ścieżka katalogu archiwum
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        stats = {
+            f.name: getattr(self, f.name) for f in fields(self)
+            if f.name not in ('trades', 'equity_curve', 'equity_timestamps', 'equity', 'trade_log')
+        }
+        equity = pa.table({
+            'timestamp': pa.array(self.equity_timestamps, type=pa.int64()),
+            'equity': pa.array(self.equity, type=pa.float64())
+        }).replace_schema_metadata({'backtest_result': json.dumps(stats, default=float)})
+        pq.write_table(equity, path / 'equity.parquet', compression=compression)
+        
+        trades = pa.table({name: self.trade_log[name] for name in TRADE_DTYPE.names})
+        pq.write_table(trades, path / 'trades.parquet', compression=compression)
+        return path
+    
+    @classmethod
+    def from_parquet(cls, path: Union[str, Path]) -> "BacktestResult":
+        """Wczytuje wynik zapisany przez to_parquet."""
+        import pyarrow.parquet as pq
+        
+        path = Path(path)
+        equity = pq.read_table(path / 'equity.parquet')
+        stats = json.loads(equity.schema.metadata[b'backtest_result'])
+        
+        trades = pq.read_table(path / 'trades.parquet')
+        trade_log = np.empty(trades.num_rows, dtype=TRADE_DTYPE)
+        for name in TRADE_DTYPE.names:
+            trade_log[name] = trades.column(name).to_numpy(zero_copy_only=False)
+        
+        known = {f.name for f in fields(cls)}
+        result = cls(
+            **{k: v for k, v in stats.items() if k in known},
+            equity_timestamps=equity.column('timestamp').to_numpy(),
+            equity=equity.column('equity').to_numpy(),
+            trade_log=trade_log
+        )
+        result.trades = result.trades_frame().assign(symbol=result.symbol).to_dict('records')
+        result.equity_curve = result.sampled_equity_curve()
+        return result
+    
+    def sampled_equity_curve(self, max_points: int = EQUITY_CURVE_POINTS) -> List[Tuple[datetime, float]]:
+        """Przerzedzona krzywa kapitału jako lista (czas, equity) - pierwszy i ostatni punkt zawsze."""
+        n = len(self.equity)
+        if n == 0:
+            return []
+        index = np.arange(0, n, max(1, n // max_points))
+        if index[-1] != n - 1:
+            index = np.append(index, n - 1)
+        timestamps = from_epoch_ns(self.equity_timestamps[index], self.timestamp_tz)
+        return list(zip(timestamps, self.equity[index].tolist()))
+    
+    def compute_statistics(self):
+        """
+        Przelicza statystyki z danych kolumnowych (equity i trade_log) - wektorowo.
+        
+        Drawdown i Sharpe liczone na pełnej krzywej kapitału (punkt na świecę).
+        """
+        pnl = self.trade_log['pnl']
+        wins = pnl > 0
+        
+        self.total_trades = len(pnl)
+        self.winning_trades = int(wins.sum())
+        self.losing_trades = self.total_trades - self.winning_trades
+        self.win_rate = self.winning_trades / self.total_trades * 100 if self.total_trades else 0.0
+        
+        self.total_profit = float(pnl[wins].sum())
+        self.total_loss = float(-pnl[~wins].sum())
+        self.average_win = float(pnl[wins].mean()) if self.winning_trades else 0.0
+        self.average_loss = float(pnl[~wins].mean()) if self.losing_trades else 0.0
+        self.largest_win = float(pnl.max()) if self.total_trades else 0.0
+        self.largest_loss = float(pnl.min()) if self.total_trades else 0.0
+        self.profit_factor = self.total_profit / self.total_loss if self.total_loss > 0 else float('inf')
+        self.total_fees = float(self.trade_log['fees'].sum())
+        self.average_trade_duration = float(self.trade_log['duration_seconds'].mean()) if self.total_trades else 0.0
+        self.max_consecutive_wins = longest_run(wins)
+        self.max_consecutive_losses = longest_run(~wins)
+        
+        equity = self.equity
+        if len(equity) == 0:
+            self.max_drawdown = 0.0
+            self.max_drawdown_duration = 0
+            self.sharpe_ratio = 0.0
+            return
+        
+        peaks = np.maximum.accumulate(equity)
+        drawdown = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+        self.max_drawdown = float(drawdown.max() * 100)
+        
+        # Najdłuższy okres pod szczytem: od ostatniego szczytu do odrobienia straty (lub końca danych)
+        underwater = drawdown > 0
+        self.max_drawdown_duration = 0
+        if underwater.any():
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], underwater.astype(np.int8), [0]))))
+            starts, ends = edges[::2], edges[1::2]
+            ends = np.minimum(ends, len(equity) - 1)
+            durations = self.equity_timestamps[ends] - self.equity_timestamps[np.maximum(starts - 1, 0)]
+            self.max_drawdown_duration = int(durations.max() // NS_PER_DAY)
+        
+        # Sharpe annualizowany wg interwału świec (rynek 24/7)
+        self.sharpe_ratio = 0.0
+        if len(equity) > 2:
+            returns = np.diff(equity) / equity[:-1]
+            std = returns.std()
+            step = np.median(np.diff(self.equity_timestamps))
+            periods_per_year = 365 * NS_PER_DAY / step if step > 0 else 252
+            if std > 0:
+                self.sharpe_ratio = float(returns.mean() / std * np.sqrt(periods_per_year))
 
 
 class BacktestEngine:
@@ -94,7 +299,9 @@ class BacktestEngine:
         taker_fee: float = 0.0005,  # 0.05% dYdX
         maker_fee: float = 0.0,  # 0% dla maker
         slippage_percent: float = 0.1,  # 0.1% slippage
-        leverage: float = 1.0
+        leverage: float = 1.0,
+        result_store: Optional["BacktestResultStore"] = None,
+        candle_cache: Optional["CandleCache"] = None
     ):
         """
         Inicjalizacja silnika backtestingu.
@@ -105,46 +312,81 @@ class BacktestEngine:
             maker_fee: Opłata maker
             slippage_percent: Slippage w % (0.1 = 0.1%)
             leverage: Dźwignia (1.0 = brak dźwigni)
+            result_store: Cache wyników (BacktestResultStore) - powtórny run
+                tej samej strategii/konfiguracji/danych zwraca zapisany wynik
+            candle_cache: Lokalny cache świec dla fetch_historical_data
+                (domyślnie tworzony przy pierwszym pobraniu - SQLite w data/)
         """
         self.initial_balance = initial_balance
         self.taker_fee = taker_fee
         self.maker_fee = maker_fee
         self.slippage_percent = slippage_percent / 100  # Konwersja na ułamek
         self.leverage = leverage
+        self.result_store = result_store
+        self.candle_cache = candle_cache
         
-        # Collector do pobierania danych
-        self.dydx = DydxCollector(testnet=False)
+        # Collector do pobierania danych - tworzony dopiero przy pobieraniu z giełdy
+        self._dydx: Optional["DydxCollector"] = None
         
         logger.info(f"BacktestEngine zainicjalizowany: balance=${initial_balance:.2f}, fee={taker_fee*100:.3f}%, slippage={slippage_percent:.2f}%")
     
+    @property
+    def dydx(self) -> "DydxCollector":
+        if self._dydx is None:
+            from src.collectors.exchange.dydx_collector import DydxCollector
+            self._dydx = DydxCollector(testnet=False)
+        return self._dydx
+    
+    @dydx.setter
+    def dydx(self, collector: "DydxCollector"):
+        self._dydx = collector
+    
+    def _fetch_from_exchange(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        return self.dydx.fetch_historical_candles(
+            ticker=symbol,
+            resolution=timeframe,
+            start_date=start_date,
+            end_date=end_date
+        )
+    
     def fetch_historical_data(
         self,
         symbol: str,
         timeframe: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        use_cache: bool = True
     ) -> pd.DataFrame:
         """
         Pobiera dane historyczne z dYdX używając fetch_historical_candles.
         
+        Z use_cache świece są czytane z lokalnej bazy, a z giełdy pobierane są
+        tylko brakujące podzakresy (zapisywane do bazy na kolejne runy).
+        
         Args:
             symbol: Symbol pary (np. BTC-USD)
             timeframe: Timeframe (1m, 5m, 1h, 1d)
             start_date: Data początkowa
             end_date: Data końcowa
-            
+            use_cache: Czy używać lokalnego cache świec
+        
         Returns:
             DataFrame z danymi OHLCV
         """
         logger.info(f"Pobieram dane historyczne: {symbol} {timeframe} od {start_date.date()} do {end_date.date()}")
         
-        # Użyj istniejącej metody fetch_historical_candles
-        df = self.dydx.fetch_historical_candles(
-            ticker=symbol,
-            resolution=timeframe,
-            start_date=start_date,
-            end_date=end_date
-        )
+        df = None
+        if use_cache:
+            try:
+                if self.candle_cache is None:
+                    from src.trading.candle_cache import CandleCache
+                    self.candle_cache = CandleCache()
+                df = self.candle_cache.get_candles(symbol, timeframe, start_date, end_date, fetch=self._fetch_from_exchange)
+            except Exception as e:
+                logger.warning(f"Cache świec niedostępny ({e}) - pobieram bezpośrednio z giełdy")
+        
+        if df is None:
+            df = self._fetch_from_exchange(symbol, timeframe, start_date, end_date)
         
         if df.empty:
             logger.error(f"Nie udało się pobrać danych dla {symbol}")
@@ -190,7 +432,7 @@ class BacktestEngine:
             df: DataFrame z danymi OHLCV (posortowane chronologicznie)
             position_size_percent: % kapitału na pozycję
             max_positions: Maksymalna liczba równoczesnych pozycji
-            
+        
         Returns:
             BacktestResult z wynikami
         """
@@ -198,27 +440,32 @@ class BacktestEngine:
             logger.error(f"Za mało danych: {len(df)} świec")
             return BacktestResult()
         
+        # Cache wyników (klucz: kod i config strategii, ustawienia silnika, dane)
+        cache_key = None
+        run_settings = {'position_size_percent': position_size_percent, 'max_positions': max_positions}
+        if self.result_store is not None:
+            cache_key = self.result_store.make_key(strategy, symbol, df, self.settings(), run_settings)
+            cached = self.result_store.get(cache_key)
+            if cached is not None:
+                logger.info(f"Wynik z cache ({cache_key[:12]}): {cached}")
+                return cached
+        
         # Logi tylko do pliku (jeśli logger jest skonfigurowany)
         logger.info(f"Uruchamiam backtest: {strategy.name} na {symbol} ({len(df)} świec)")
         
         # Stan symulacji
         balance = self.initial_balance
         equity = balance
-        peak_equity = balance
         
-        # Pozycje (symbol -> dict z danymi pozycji)
+        # Pozycje (symbol -> dict z danymi pozycji) i ich poziomy SL/TP
         open_positions: Dict[str, Dict[str, Any]] = {}
+        triggers = TriggerIndex()
         
-        # Statystyki
+        # Transakcje i pełna krzywa kapitału: punkt startowy (świeca 49) + punkt na każdą świecę
         trades = []
-        equity_curve = [(df.iloc[0]['timestamp'] if 'timestamp' in df.columns else df.index[0], balance)]
-        
-        total_profit = 0.0
-        total_loss = 0.0
-        consecutive_wins = 0
-        consecutive_losses = 0
-        max_consecutive_wins = 0
-        max_consecutive_losses = 0
+        timestamps_ns, timestamp_tz = to_epoch_ns(df['timestamp'] if 'timestamp' in df.columns else df.index)
+        equity_values = np.empty(len(df) - 49, dtype=np.float64)
+        equity_values[0] = balance
         
         # Przetwarzaj każdą świecę (z progress barem)
         iterator = range(50, len(df))
@@ -236,6 +483,7 @@ class BacktestEngine:
             
             # 1. Sprawdź otwarte pozycje (SL/TP, exit signals)
             positions_to_close = []
+            triggered = dict(triggers.pop_triggered(symbol, current_price))
             for pos_symbol, position in open_positions.items():
                 if pos_symbol != symbol:
                     continue
@@ -249,21 +497,9 @@ class BacktestEngine:
                 else:  # short
                     pnl_percent = ((entry_price - current_price) / entry_price) * 100
                 
-                # Sprawdź SL/TP
-                should_close = False
-                exit_reason = ""
-                
-                if position.get('stop_loss'):
-                    if (side == 'long' and current_price <= position['stop_loss']) or \
-                       (side == 'short' and current_price >= position['stop_loss']):
-                        should_close = True
-                        exit_reason = "stop_loss"
-                
-                if position.get('take_profit'):
-                    if (side == 'long' and current_price >= position['take_profit']) or \
-                       (side == 'short' and current_price <= position['take_profit']):
-                        should_close = True
-                        exit_reason = "take_profit"
+                # Sprawdź SL/TP (przekroczone poziomy z indeksu)
+                exit_reason = triggered.get(pos_symbol, "")
+                should_close = bool(exit_reason)
                 
                 # Sprawdź strategię wyjścia
                 if not should_close:
@@ -308,18 +544,6 @@ class BacktestEngine:
                 balance += margin + net_pnl
                 equity = balance
                 
-                # Statystyki
-                if net_pnl > 0:
-                    total_profit += net_pnl
-                    consecutive_wins += 1
-                    consecutive_losses = 0
-                    max_consecutive_wins = max(max_consecutive_wins, consecutive_wins)
-                else:
-                    total_loss += abs(net_pnl)
-                    consecutive_losses += 1
-                    consecutive_wins = 0
-                    max_consecutive_losses = max(max_consecutive_losses, consecutive_losses)
-                
                 # Zapisz transakcję
                 trade = {
                     'entry_time': position['entry_time'],
@@ -333,12 +557,14 @@ class BacktestEngine:
                     'pnl_percent': (net_pnl / (entry_price * entry_size)) * 100,
                     'fees': total_fees,
                     'exit_reason': exit_reason,
-                    'duration_seconds': (current_time - position['entry_time']).total_seconds() if hasattr(current_time, 'total_seconds') else 0
+                    'duration_seconds': 0.0,  # uzupełniane z logu kolumnowego
+                    'strategy': position.get('strategy') or strategy.name
                 }
                 trades.append(trade)
                 
                 # Usuń pozycję
                 del open_positions[pos_symbol]
+                triggers.remove(pos_symbol)
             
             # 2. Sprawdź nowe sygnały (tylko jeśli mamy miejsce)
             if len(open_positions) < max_positions:
@@ -374,31 +600,30 @@ class BacktestEngine:
                             'strategy': signal.strategy,
                             'confidence': signal.confidence
                         }
+                        triggers.add(
+                            symbol, symbol, side,
+                            stop_loss=signal.stop_loss,
+                            take_profit=signal.take_profit
+                        )
                         
                         # Odlicz margin i fee
                         balance -= required
             
-            # Aktualizuj equity (z unrealized PnL)
-            unrealized_pnl = 0.0
+            # Aktualizuj equity: wolne środki + margin otwartych pozycji + unrealized PnL
+            open_value = 0.0
             for pos_symbol, position in open_positions.items():
                 if pos_symbol == symbol:
                     entry_price = position['entry_price']
                     side = position['side']
+                    open_value += (entry_price * position['size']) / self.leverage
                     
                     if side == 'long':
-                        unrealized_pnl += (current_price - entry_price) * position['size']
+                        open_value += (current_price - entry_price) * position['size']
                     else:
-                        unrealized_pnl += (entry_price - current_price) * position['size']
+                        open_value += (entry_price - current_price) * position['size']
             
-            equity = balance + unrealized_pnl
-            
-            # Drawdown
-            if equity > peak_equity:
-                peak_equity = equity
-            
-            # Equity curve (co N świec, aby nie zapisywać każdej)
-            if i % max(1, len(df) // 1000) == 0:  # Max 1000 punktów na wykres
-                equity_curve.append((current_time, equity))
+            equity = balance + open_value
+            equity_values[i - 49] = equity
         
         # Zamknij wszystkie otwarte pozycje na końcu
         final_price = float(df.iloc[-1]['close'])
@@ -427,29 +652,9 @@ class BacktestEngine:
             # Aktualizuj balance: zwróć margin + net_pnl
             balance += margin + net_pnl
             
-            if net_pnl > 0:
-                total_profit += net_pnl
-            else:
-                total_loss += abs(net_pnl)
-            
-            entry_time = position['entry_time']
-            if isinstance(entry_time, pd.Timestamp):
-                entry_time = entry_time.to_pydatetime()
-            if isinstance(final_time, pd.Timestamp):
-                final_time_dt = final_time.to_pydatetime()
-            else:
-                final_time_dt = final_time
-            
-            duration_sec = 0
-            if hasattr(final_time_dt, '__sub__'):
-                try:
-                    duration_sec = (final_time_dt - entry_time).total_seconds()
-                except:
-                    pass
-            
             trades.append({
-                'entry_time': entry_time,
-                'exit_time': final_time_dt,
+                'entry_time': position['entry_time'],
+                'exit_time': final_time,
                 'symbol': symbol,
                 'side': side,
                 'entry_price': entry_price,
@@ -459,90 +664,82 @@ class BacktestEngine:
                 'pnl_percent': (net_pnl / (entry_price * entry_size)) * 100 if entry_price * entry_size > 0 else 0,
                 'fees': total_fees,
                 'exit_reason': 'end_of_data',
-                'duration_seconds': duration_sec,
-                'strategy': position.get('strategy', strategy.name)
+                'duration_seconds': 0.0,
+                'strategy': position.get('strategy') or strategy.name
             })
         
-        # Oblicz statystyki końcowe
+        # Ostatni punkt krzywej = kapitał po zamknięciu pozycji na końcu danych
         final_balance = balance
+        equity_values[-1] = final_balance
         total_pnl = final_balance - self.initial_balance
-        total_return = (total_pnl / self.initial_balance) * 100
-        
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] <= 0]
-        
-        win_rate = (len(winning_trades) / len(trades) * 100) if trades else 0.0
-        
-        avg_win = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0.0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0.0
-        
-        largest_win = max([t['pnl'] for t in trades], default=0.0)
-        largest_loss = min([t['pnl'] for t in trades], default=0.0)
-        
-        profit_factor = total_profit / abs(total_loss) if total_loss > 0 else float('inf')
-        
-        # Oblicz max drawdown
-        equity_values = [e[1] for e in equity_curve]
-        if equity_values:
-            peak = equity_values[0]
-            max_dd = 0.0
-            for eq in equity_values:
-                if eq > peak:
-                    peak = eq
-                dd = ((peak - eq) / peak) * 100
-                max_dd = max(max_dd, dd)
-        else:
-            max_dd = 0.0
-        
-        # Sharpe Ratio (uproszczony)
-        if len(equity_curve) > 1:
-            returns = np.diff([e[1] for e in equity_curve]) / [e[1] for e in equity_curve[:-1]]
-            sharpe = np.mean(returns) / np.std(returns) * np.sqrt(252) if np.std(returns) > 0 else 0.0
-        else:
-            sharpe = 0.0
-        
-        avg_duration = np.mean([t['duration_seconds'] for t in trades]) if trades else 0.0
-        total_fees_sum = sum([t['fees'] for t in trades])
         
         result = BacktestResult(
             initial_balance=self.initial_balance,
             final_balance=final_balance,
             total_pnl=total_pnl,
-            total_return=total_return,
-            total_trades=len(trades),
-            winning_trades=len(winning_trades),
-            losing_trades=len(losing_trades),
-            win_rate=win_rate,
-            total_profit=total_profit,
-            total_loss=total_loss,
-            average_win=avg_win,
-            average_loss=avg_loss,
-            largest_win=largest_win,
-            largest_loss=largest_loss,
-            profit_factor=profit_factor,
-            max_drawdown=max_dd,
-            sharpe_ratio=sharpe,
-            total_fees=total_fees_sum,
-            average_trade_duration=avg_duration,
-            max_consecutive_wins=max_consecutive_wins,
-            max_consecutive_losses=max_consecutive_losses,
+            total_return=(total_pnl / self.initial_balance) * 100,
+            symbol=symbol,
+            strategy_name=strategy.name,
+            timestamp_tz=timestamp_tz,
             trades=trades,
-            equity_curve=equity_curve
+            equity_timestamps=timestamps_ns[49:],
+            equity=equity_values,
+            trade_log=self._build_trade_log(trades)
         )
+        for trade, duration in zip(trades, result.trade_log['duration_seconds'].tolist()):
+            trade['duration_seconds'] = duration
+        result.compute_statistics()
+        result.equity_curve = result.sampled_equity_curve()
         
         logger.success(f"Backtest zakończony: {result}")
+        
+        if cache_key is not None:
+            timestamps = result.equity_series().index
+            self.result_store.put(cache_key, result, meta={
+                'config': getattr(strategy, 'config', {}),
+                'engine': self.settings(),
+                'run': run_settings,
+                'candles': len(df),
+                'period': [str(timestamps[0]), str(timestamps[-1])]
+            })
         return result
     
-    def print_results(self, result: BacktestResult):
+    def settings(self) -> Dict[str, Any]:
+        """Ustawienia silnika wpływające na wynik (część klucza cache)."""
+        return {
+            'initial_balance': self.initial_balance,
+            'taker_fee': self.taker_fee,
+            'maker_fee': self.maker_fee,
+            'slippage_percent': self.slippage_percent * 100,
+            'leverage': self.leverage
+        }
+    
+    @staticmethod
+    def _build_trade_log(trades: List[Dict[str, Any]]) -> np.ndarray:
+        """Buduje kolumnowy log transakcji (TRADE_DTYPE) z listy słowników."""
+        log = np.empty(len(trades), dtype=TRADE_DTYPE)
+        if not trades:
+            return log
+        log['entry_time'] = to_epoch_ns([t['entry_time'] for t in trades])[0]
+        log['exit_time'] = to_epoch_ns([t['exit_time'] for t in trades])[0]
+        log['side'] = [1 if t['side'] == 'long' else -1 for t in trades]
+        for column in ('entry_price', 'exit_price', 'size', 'pnl', 'pnl_percent', 'fees'):
+            log[column] = [t[column] for t in trades]
+        log['duration_seconds'] = (log['exit_time'] - log['entry_time']) / 1e9
+        log['exit_reason'] = [t['exit_reason'] for t in trades]
+        return log
+    
+    @staticmethod
+    def print_results(result: BacktestResult):
         """Wyświetla wyniki backtestingu w czytelnej formie."""
         print("\n" + "=" * 70)
         print("📊 WYNIKI BACKTESTINGU")
         print("=" * 70)
-        strategy_name = 'N/A'
-        if result.trades:
+        strategy_name = result.strategy_name or 'N/A'
+        if not result.strategy_name and result.trades:
             strategy_name = result.trades[0].get('strategy', 'N/A')
         print(f"Strategia: {strategy_name}")
-        print(f"Okres: {len(result.equity_curve)} świec")
+        print(f"Okres: {len(result.equity) or len(result.equity_curve)} świec")
         print()
         print("💰 FINANSE:")
         print(f"  Początkowy kapitał:  ${result.initial_balance:,.2f}")
@@ -0,0 +1,214 @@
+"""
+Candle Cache
+============
+Read-through cache świec dla backtestów: lokalna baza (tabela ohlcv)
+przed API giełdy.
+
+Dla zakresu [start, end] cache:
+1. wczytuje świece zapisane lokalnie,
+2. wyznacza brakujące podzakresy na siatce interwału (wektorowo),
+3. pobiera z giełdy tylko brakujące podzakresy (sąsiednie dziury łączone,
+   żeby nie płacić za osobne strony API; zakresy już pobrane, w których
+   giełda nie ma świec, są pomijane dzięki indeksowi pokrycia bazy),
+4. zapisuje nowe świece i zwraca połączony DataFrame.
+
+Drugi backtest na tym samym okresie nie wykonuje żadnego zapytania do giełdy.
+
+Użycie:
+    cache = CandleCache()  # SQLite w data/ai_blockchain.db
+    df = cache.get_candles("BTC-USD", "1h", start, end, fetch=dydx.fetch_historical_candles)
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.database.manager import DatabaseManager
+
+
+# Świece na stronę API dYdX - dziury bliższe niż tyle świec są pobierane razem
+FETCH_PAGE_CANDLES = 100
+
+# fetch(symbol, timeframe, start, end) -> DataFrame z indeksem timestamp
+CandleFetcher = Callable[[str, str, datetime, datetime], pd.DataFrame]
+
+Range = Tuple[pd.Timestamp, pd.Timestamp]
+
+
+def _naive_utc(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+
+def _naive_utc_index(index) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index
+
+
+def missing_ranges(
+    timestamps: pd.DatetimeIndex,
+    start: datetime,
+    end: datetime,
+    timeframe: str,
+    merge_within: int = 0
+) -> List[Range]:
+    """
+    Wyznacza brakujące podzakresy świec na siatce interwału.
+    
+    Args:
+        timestamps: Znaczniki czasu posiadanych świec (naiwne UTC)
+        start: Początek zakresu
+        end: Koniec zakresu (włącznie)
+        timeframe: Interwał (np. "1h", "5m")
+        merge_within: Łącz dziury oddzielone co najwyżej tyloma posiadanymi świecami
+    
+    Returns:
+        Lista (początek, koniec) brakujących zakresów (włącznie)
+    """
+    step = pd.Timedelta(timeframe)
+    grid = pd.date_range(_naive_utc(start).ceil(step), _naive_utc(end).floor(step), freq=step)
+    if len(grid) == 0:
+        return []
+    
+    missing = ~grid.isin(timestamps)
+    if not missing.any():
+        return []
+    
+    # Początki i końce serii brakujących świec
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], missing.astype(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2] - 1
+    return merge_ranges([(grid[a], grid[b]) for a, b in zip(starts, ends)], timeframe, merge_within)
+
+
+def merge_ranges(ranges: List[Range], timeframe: str, merge_within: int = 0) -> List[Range]:
+    """
+    Łączy posortowane zakresy oddzielone co najwyżej merge_within świecami.
+    
+    Args:
+        ranges: Posortowane rosnąco zakresy (początek, koniec) na siatce interwału
+        timeframe: Interwał
+        merge_within: Maksymalna liczba świec między łączonymi zakresami
+    """
+    if not ranges:
+        return []
+    step = pd.Timedelta(timeframe)
+    merged: List[List[pd.Timestamp]] = [list(ranges[0])]
+    for range_start, range_end in ranges[1:]:
+        if (range_start - merged[-1][1]) / step - 1 <= merge_within:
+            merged[-1][1] = range_end
+        else:
+            merged.append([range_start, range_end])
+    return [(a, b) for a, b in merged]
+
+
+class CandleCache:
+    """
+    Read-through cache świec OHLCV w lokalnej bazie.
+    """
+    
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        exchange: str = "dydx",
+        merge_within: int = FETCH_PAGE_CANDLES
+    ):
+        """
+        Inicjalizacja cache.
+        
+        Args:
+            db: DatabaseManager (domyślnie lokalny SQLite data/ai_blockchain.db)
+            exchange: Nazwa giełdy w tabeli ohlcv
+            merge_within: Łącz dziury oddzielone co najwyżej tyloma świecami (jedno pobranie)
+        """
+        if db is None:
+            db = DatabaseManager()
+            db.create_tables()
+        self.db = db
+        self.exchange = exchange
+        self.merge_within = merge_within
+    
+    def load(self, symbol: str, timeframe: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Świece z lokalnej bazy (indeks: naiwne UTC)."""
+        df = self.db.get_ohlcv(
+            self.exchange, symbol, timeframe,
+            start_date=_naive_utc(start).to_pydatetime(),
+            end_date=_naive_utc(end).to_pydatetime()
+        )
+        if df.empty:
+            return df
+        df.index = _naive_utc_index(df.index)
+        return df
+    
+    def get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        fetch: Optional[CandleFetcher] = None
+    ) -> pd.DataFrame:
+        """
+        Zwraca świece z zakresu, dociągając z giełdy tylko brakujące podzakresy.
+        
+        Args:
+            symbol: Symbol rynku
+            timeframe: Interwał
+            start: Początek zakresu
+            end: Koniec zakresu
+            fetch: Funkcja pobierająca świece z giełdy (None = tylko lokalnie)
+        
+        Returns:
+            DataFrame z indeksem timestamp (UTC) i kolumnami OHLCV
+        """
+        # Bieżąca (niezamknięta) świeca nie jest cache'owana
+        step = pd.Timedelta(timeframe)
+        last_closed = pd.Timestamp.now(tz=timezone.utc).tz_localize(None).floor(step) - step
+        end = min(_naive_utc(end), last_closed)
+        start = _naive_utc(start)
+        
+        cached = self.load(symbol, timeframe, start, end)
+        # Dziury w świecach, z pominięciem zakresów już pobranych z giełdy (indeks pokrycia bazy)
+        gaps = [
+            gap
+            for candle_gap in missing_ranges(cached.index, start, end, timeframe)
+            for gap in self.db.missing_ranges(self.exchange, symbol, timeframe, *candle_gap)
+        ]
+        gaps = merge_ranges(gaps, timeframe, merge_within=self.merge_within)
+        
+        if gaps and fetch is not None:
+            total = sum(int((b - a) / step) + 1 for a, b in gaps)
+            logger.info(f"Cache świec {symbol} {timeframe}: {len(cached)} lokalnie, pobieram {total} w {len(gaps)} zakresach")
+            fetched = []
+            for gap_start, gap_end in gaps:
+                df = fetch(symbol, timeframe, gap_start.to_pydatetime(), (gap_end + step).to_pydatetime())
+                if df is None or df.empty:
+                    continue
+                df = df.copy()
+                df.index = _naive_utc_index(df.index)
+                df = df[(df.index >= gap_start) & (df.index <= gap_end)]
+                if not df.empty:
+                    # Braki w zwróconym zakresie to dziury po stronie giełdy - nie pobieraj ich ponownie
+                    self.db.save_ohlcv(
+                        df, self.exchange, symbol, timeframe,
+                        coverage=(gap_start, df.index.max())
+                    )
+                    fetched.append(df)
+            if fetched:
+                cached = pd.concat([cached, *fetched]) if not cached.empty else pd.concat(fetched)
+                cached = cached[~cached.index.duplicated(keep="first")].sort_index()
+        elif not gaps:
+            logger.info(f"Cache świec {symbol} {timeframe}: {len(cached)} świec lokalnie (bez pobierania)")
+        
+        if cached.empty:
+            return cached
+        cached = cached[["open", "high", "low", "close", "volume"]]
+        cached.index = cached.index.tz_localize("UTC")
+        cached.index.name = "timestamp"
+        return cached
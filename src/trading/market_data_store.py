@@ -0,0 +1,194 @@
+"""
+Market Data Store
+=================
+Historyczne funding rates i open interest dla backtestów, dołączane do świec
+point-in-time (as-of): każda świeca dostaje ostatnią wartość znaną w jej czasie.
+Nigdy wartość z przyszłości i nie tylko przy dokładnym dopasowaniu timestampu
+(funding co 8h i OI co 5m-1h rzadko trafiają w znacznik świecy 1m).
+
+Dane: tabela tickers wypełniana przez scripts/load_funding_oi_data.py
+(DatabaseManager.get_funding_rates / get_open_interest). Serie symbolu są
+wczytywane raz i trzymane w pamięci procesu jako posortowane tablice int64 ns -
+kolejne okna backtestu i kolejne backtesty nie odpytują bazy ponownie.
+
+Użycie:
+    store = FundingOIStore.shared()
+    df = store.enrich(df, "BTC-USD")  # kolumny funding_rate, open_interest
+"""
+
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database.manager import DatabaseManager
+from src.trading.backtesting import to_epoch_ns
+
+
+# Maksymalny wiek wartości dołączanej do świecy - starsza to brak danych (np. dziura w historii)
+DEFAULT_MAX_AGE = {
+    'funding_rate': pd.Timedelta(hours=9),  # Okres funding Binance (8h) + zapas
+    'open_interest': pd.Timedelta(hours=2),
+}
+
+
+def asof_values(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    query: np.ndarray,
+    max_age_ns: Optional[int] = None
+) -> np.ndarray:
+    """
+    Złączenie as-of na posortowanych int64: ostatnia wartość z timestamps <= query.
+    
+    Args:
+        timestamps: Posortowane znaczniki czasu serii (int64 ns)
+        values: Wartości serii
+        query: Znaczniki czasu świec (int64 ns, dowolna kolejność)
+        max_age_ns: Maksymalny wiek wartości (None = bez limitu)
+    
+    Returns:
+        Tablica float z wartościami znanymi w czasie query (NaN gdy brak)
+    """
+    if not len(timestamps):
+        return np.full(len(query), np.nan)
+    position = np.searchsorted(timestamps, query, side='right') - 1
+    known = position >= 0
+    position = np.maximum(position, 0)
+    if max_age_ns is not None:
+        known &= (query - timestamps[position]) <= max_age_ns
+    return np.where(known, values[position], np.nan)
+
+
+def storage_symbols(symbol: str) -> Tuple[str, str]:
+    """
+    Symbole w tabeli tickers dla symbolu strategii (jak w load_funding_oi_data.py).
+    
+    Returns:
+        (symbol funding rates - spot, symbol open interest - perpetual), np.
+        "BTC-USD" -> ("BTC/USDC", "BTC/USDT:USDT")
+    """
+    base = re.split(r'[-/:]', symbol)[0].upper()
+    return f"{base}/USDC", f"{base}/USDT:USDT"
+
+
+class FundingOIStore:
+    """
+    Historia funding rates i open interest z bazy z dołączaniem as-of do świec.
+    """
+    
+    _shared: Dict[Tuple[Optional[str], str], 'FundingOIStore'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        db: Optional[DatabaseManager] = None,
+        exchange: str = "binance",
+        max_age: Optional[Dict[str, Optional[pd.Timedelta]]] = None
+    ):
+        """
+        Inicjalizacja store.
+        
+        Args:
+            db: DatabaseManager (domyślnie lokalny SQLite data/ai_blockchain.db)
+            exchange: Nazwa giełdy w tabeli tickers
+            max_age: Maksymalny wiek wartości per kolumna (domyślnie DEFAULT_MAX_AGE)
+        """
+        self.db = db if db is not None else DatabaseManager()
+        self.exchange = exchange
+        self.max_age = {**DEFAULT_MAX_AGE, **(max_age or {})}
+        # (kolumna, symbol w bazie) -> (timestamps int64 ns, wartości)
+        self._series: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, database_url: Optional[str] = None, exchange: str = "binance") -> 'FundingOIStore':
+        """Wspólna instancja dla bazy i giełdy - cache serii współdzielony między backtestami."""
+        key = (database_url, exchange)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(DatabaseManager(database_url=database_url), exchange=exchange)
+            return cls._shared[key]
+    
+    def series(self, column: str, db_symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Seria kolumny (funding_rate / open_interest) z cache lub bazy (cała historia symbolu)."""
+        key = (column, db_symbol)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = self._load(column, db_symbol)
+            return self._series[key]
+    
+    def _load(self, column: str, db_symbol: str) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            if column == 'funding_rate':
+                df = self.db.get_funding_rates(self.exchange, db_symbol)
+            else:
+                df = self.db.get_open_interest(self.exchange, db_symbol)
+        except SQLAlchemyError as e:
+            # Bez historii nie dodajemy kolumny - nie symulujemy danych
+            logger.warning(f"Nie udało się wczytać {column} dla {db_symbol}: {e}")
+            df = pd.DataFrame()
+        
+        if df.empty:
+            logger.warning(f"Brak historii {column} dla {self.exchange} {db_symbol} - kolumna nie będzie dodana")
+            return np.empty(0, dtype='i8'), np.empty(0)
+        
+        timestamps, _ = to_epoch_ns(df.index)
+        values = df[column].to_numpy(dtype=float)
+        order = np.argsort(timestamps, kind='stable')
+        logger.debug(f"Załadowano {len(df)} wartości {column} dla {db_symbol}")
+        return timestamps[order], values[order]
+    
+    def invalidate(self, db_symbol: Optional[str] = None):
+        """Usuwa serie z cache (np. po doładowaniu danych skryptem)."""
+        with self._lock:
+            for key in [k for k in self._series if db_symbol is None or k[1] == db_symbol]:
+                del self._series[key]
+    
+    def enrich(
+        self,
+        df: pd.DataFrame,
+        symbol: str,
+        funding_symbol: Optional[str] = None,
+        open_interest_symbol: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Dołącza funding_rate i open_interest znane w czasie każdej świecy.
+        
+        Kolumny już obecne w df nie są nadpisywane, a kolumny bez historii w bazie
+        nie są dodawane (strategia działa wtedy jak bez danych funding/OI).
+        
+        Args:
+            df: Świece (kolumna timestamp lub DatetimeIndex)
+            symbol: Symbol strategii (np. "BTC-USD")
+            funding_symbol: Symbol funding w bazie (domyślnie ze storage_symbols)
+            open_interest_symbol: Symbol OI w bazie (domyślnie ze storage_symbols)
+        
+        Returns:
+            Kopia df z kolumnami funding_rate i open_interest (NaN = brak wartości w czasie świecy)
+        """
+        default_funding, default_oi = storage_symbols(symbol)
+        db_symbols = {
+            'funding_rate': funding_symbol or default_funding,
+            'open_interest': open_interest_symbol or default_oi,
+        }
+        # to_epoch_ns zamiast asi8: read_parquet zwraca datetime64[us], asi8 dałoby mikrosekundy
+        times = df['timestamp'] if 'timestamp' in df.columns else df.index
+        query, _ = to_epoch_ns(times)
+        
+        columns = {}
+        for column, db_symbol in db_symbols.items():
+            if column in df.columns:
+                continue
+            timestamps, values = self.series(column, db_symbol)
+            if not len(timestamps):
+                continue
+            max_age = self.max_age.get(column)
+            columns[column] = asof_values(
+                timestamps, values, query, max_age.value if max_age is not None else None
+            )
+        return df.assign(**columns)
@@ -0,0 +1,530 @@
+"""
+Market Replay
+=============
+Przyspieszone odtwarzanie rynku dla stosu live (TradingBot, EnhancedTradingBot,
+PaperTradingEngine, strategie) - bez zmian w ścieżce kodu live.
+
+Replay składa się z trzech elementów:
+- VirtualClock - wirtualny czas; podczas odtwarzania `datetime.now()` /
+  `datetime.utcnow()` w modułach projektu (src/, scripts/) zwracają czas zegara,
+  więc limity sesji, cooldowny strategii, opened_at i wpisy TradeRegister
+  dostają czas z historii,
+- ReplayCollector - interfejs DydxCollector (fetch_candles, get_ticker,
+  get_tickers, get_orderbook, get_funding_rates) na nagranych/historycznych
+  danych; widoczne są tylko dane zamknięte przed chwilą zegara, świece wyższych
+  interwałów są agregowane ze świec bazowych (ostatnia - niezamknięta - jak na giełdzie),
+- VirtualEvent - podmienia `_stop_event` bota: czekanie na następny cykl
+  przesuwa zegar o interwał zamiast spać, więc pętla bota (_run_loop) działa
+  tak szybko, jak pozwala CPU.
+
+Użycie:
+    candles = {"BTC-USD": df_1m}  # indeks timestamp (UTC), kolumny OHLCV
+    with MarketReplay(candles, base_resolution="1m") as replay:
+        bot = EnhancedTradingBot(database_url=..., symbols=["BTC-USD"], check_interval=60,
+                                 dydx_collector=replay.collector, time_limit_seconds=86400)
+        result = replay.run(bot)
+    print(result['cycles'], result['speedup'])
+"""
+
+import bisect
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Event
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+
+_REAL_DATETIME = datetime
+
+# Katalogi projektu, w których modułach podmieniany jest `datetime`
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+PATCHED_DIRS = (PROJECT_ROOT / "src", PROJECT_ROOT / "scripts")
+
+
+def _utc_timestamp(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize("UTC")
+    return ts.tz_convert("UTC")
+
+
+def _utc_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Kopia posortowana po indeksie timestamp w UTC (naiwny indeks = UTC)."""
+    df = df.copy()
+    index = pd.DatetimeIndex(df.index)
+    df.index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    df.index.name = "timestamp"
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+class _VirtualDatetimeType(type):
+    """Metaklasa: wszystko poza now/utcnow/today z prawdziwego datetime."""
+    
+    def __instancecheck__(cls, obj) -> bool:
+        return isinstance(obj, _REAL_DATETIME)
+    
+    def __subclasscheck__(cls, subclass) -> bool:
+        return issubclass(subclass, _REAL_DATETIME)
+    
+    def __call__(cls, *args, **kwargs):
+        return _REAL_DATETIME(*args, **kwargs)
+    
+    def __getattr__(cls, name: str) -> Any:
+        return getattr(_REAL_DATETIME, name)
+
+
+class VirtualClock:
+    """
+    Wirtualny zegar replayu (UTC).
+    """
+    
+    def __init__(self, start: datetime):
+        """
+        Args:
+            start: Początkowy czas zegara (naiwny = UTC)
+        """
+        self._now = _utc_timestamp(start).to_pydatetime()
+        self._patched: List[tuple] = []
+    
+    def now(self, tz: Optional[timezone] = None) -> datetime:
+        """Jak datetime.now(): bez strefy - czas lokalny, naiwny."""
+        if tz is None:
+            return self._now.astimezone().replace(tzinfo=None)
+        return self._now.astimezone(tz)
+    
+    def utcnow(self) -> datetime:
+        """Jak datetime.utcnow(): naiwne UTC."""
+        return self._now.replace(tzinfo=None)
+    
+    def timestamp(self) -> pd.Timestamp:
+        """Czas zegara jako pd.Timestamp (UTC)."""
+        return pd.Timestamp(self._now)
+    
+    def advance(self, seconds: float):
+        """Przesuwa zegar do przodu."""
+        if seconds > 0:
+            self._now += timedelta(seconds=seconds)
+    
+    def set(self, value: datetime):
+        """Ustawia czas zegara (nie wcześniej niż bieżący)."""
+        value = _utc_timestamp(value).to_pydatetime()
+        if value < self._now:
+            raise ValueError(f"Zegar replayu nie może się cofać: {value} < {self._now}")
+        self._now = value
+    
+    def datetime_class(self) -> type:
+        """Zamiennik klasy datetime, którego now/utcnow/today czytają ten zegar."""
+        clock = self
+        
+        def now(cls, tz=None):
+            return clock.now(tz)
+        
+        def utcnow(cls):
+            return clock.utcnow()
+        
+        return _VirtualDatetimeType("datetime", (), {
+            '__module__': 'datetime',
+            'now': classmethod(now),
+            'utcnow': classmethod(utcnow),
+            'today': classmethod(lambda cls: clock.now()),
+        })
+    
+    def install(self, extra_modules: Iterable[Any] = ()):
+        """
+        Podmienia `datetime` w załadowanych modułach projektu (i w extra_modules).
+        
+        Moduły importowane później nie są objęte - bota i strategie tworzyć po install().
+        """
+        if self._patched:
+            return
+        virtual = self.datetime_class()
+        modules = [
+            module for module in list(sys.modules.values())
+            if module is not None and self._is_project_module(module)
+        ]
+        modules.extend(extra_modules)
+        for module in modules:
+            if module.__dict__.get('datetime') is _REAL_DATETIME and module.__name__ != __name__:
+                module.datetime = virtual
+                self._patched.append((module, _REAL_DATETIME))
+        logger.debug(f"Replay: wirtualny zegar w {len(self._patched)} modułach")
+    
+    def uninstall(self):
+        """Przywraca prawdziwy datetime."""
+        for module, original in self._patched:
+            module.datetime = original
+        self._patched = []
+    
+    @contextmanager
+    def installed(self, extra_modules: Iterable[Any] = ()):
+        """Context manager: install() / uninstall()."""
+        self.install(extra_modules)
+        try:
+            yield self
+        finally:
+            self.uninstall()
+    
+    @staticmethod
+    def _is_project_module(module) -> bool:
+        path = getattr(module, '__file__', None)
+        if not path:
+            return False
+        path = Path(path).resolve()
+        return any(directory in path.parents for directory in PATCHED_DIRS)
+
+
+class VirtualEvent(Event):
+    """
+    Event zatrzymania bota dla replayu: wait(timeout) przesuwa zegar o timeout.
+    
+    Po przekroczeniu końca danych event jest ustawiany - pętla bota kończy się
+    tak jak po stop().
+    """
+    
+    def __init__(self, clock: VirtualClock, end: datetime):
+        super().__init__()
+        self.clock = clock
+        self.end = _utc_timestamp(end)
+        self.waits = 0
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self.is_set():
+            return True
+        self.waits += 1
+        self.clock.advance(timeout or 0.0)
+        if self.clock.timestamp() > self.end:
+            self.set()
+        return self.is_set()
+
+
+class _ReplaySeries:
+    """Świece bazowe jednego symbolu z tablicami do wyszukiwania as-of."""
+    
+    # Agregacja kolumn przy budowaniu świec wyższych interwałów
+    AGGREGATIONS = {
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+        'volume': 'sum', 'usd_volume': 'sum', 'trades': 'sum'
+    }
+    _REDUCE = {'first': lambda a: a[0], 'max': np.max, 'min': np.min, 'last': lambda a: a[-1], 'sum': np.sum}
+    
+    def __init__(self, df: pd.DataFrame, step: pd.Timedelta):
+        df = _utc_frame(df)
+        self.df = df
+        self.step = step
+        self.starts = df.index.asi8
+        self.columns = [column for column in self.AGGREGATIONS if column in df.columns]
+        self.values = {column: df[column].to_numpy(dtype=float) for column in self.columns}
+        self.closes = self.values['close']
+        self.volume_cumsum = np.concatenate([[0.0], np.cumsum(self.values['volume'])])
+        self.resampled: Dict[str, tuple] = {}
+    
+    def visible(self, now: pd.Timestamp) -> int:
+        """Liczba świec bazowych zamkniętych w chwili now."""
+        return int(np.searchsorted(self.starts, (now - self.step).value, side="right"))
+    
+    def aggregated(self, resolution: str) -> tuple:
+        """Świece interwału resolution jako (początki ns, {kolumna: tablica}) - liczone raz."""
+        cached = self.resampled.get(resolution)
+        if cached is None:
+            df = self.df[self.columns].resample(pd.Timedelta(resolution), label="left", closed="left").agg(
+                {column: self.AGGREGATIONS[column] for column in self.columns}
+            ).dropna(subset=['close'])
+            cached = (df.index.asi8, {column: df[column].to_numpy(dtype=float) for column in self.columns})
+            self.resampled[resolution] = cached
+        return cached
+    
+    def candles(self, resolution: str, visible: int, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Świece interwału resolution z `visible` świec bazowych.
+        
+        Ostatnia świeca wyższego interwału jest agregowana tylko z widocznych
+        świec bazowych (niezamknięta, jak na giełdzie) - bez zaglądania w przyszłość.
+        """
+        if visible == 0:
+            return pd.DataFrame(columns=self.columns)
+        step = pd.Timedelta(resolution)
+        if step == self.step:
+            return self.df.iloc[0 if limit is None else max(0, visible - limit):visible]
+        
+        starts, values = self.aggregated(resolution)
+        bucket = self.starts[visible - 1] - self.starts[visible - 1] % step.value
+        closed = int(np.searchsorted(starts, bucket, side="left"))
+        first = 0 if limit is None else max(0, closed - limit + 1)
+        current = int(np.searchsorted(self.starts, bucket, side="left"))
+        
+        data = {
+            column: np.append(
+                values[column][first:closed],
+                self._REDUCE[self.AGGREGATIONS[column]](self.values[column][current:visible])
+            )
+            for column in self.columns
+        }
+        index = pd.DatetimeIndex(np.append(starts[first:closed], bucket), name="timestamp").tz_localize("UTC")
+        return pd.DataFrame(data, index=index)
+
+
+class ReplayCollector:
+    """
+    Odtwarzany rynek z interfejsem DydxCollector.
+    """
+    
+    RESOLUTIONS = ('1m', '5m', '15m', '30m', '1h', '4h', '1d')
+    
+    def __init__(
+        self,
+        candles: Dict[str, pd.DataFrame],
+        clock: Optional[VirtualClock] = None,
+        base_resolution: str = "1m",
+        orderbooks: Optional[Dict[str, Sequence[dict]]] = None,
+        funding_rates: Optional[Dict[str, pd.DataFrame]] = None,
+        spread_percent: float = 0.01
+    ):
+        """
+        Inicjalizacja kolektora replayu.
+        
+        Args:
+            candles: {symbol: świece bazowe} (indeks timestamp, kolumny OHLCV)
+            clock: Zegar replayu (domyślnie: zamknięcie pierwszej świecy)
+            base_resolution: Interwał świec bazowych
+            orderbooks: {symbol: nagrane orderbooki} ({'timestamp', 'bids', 'asks'}, rosnąco)
+            funding_rates: {symbol: historia funding} (indeks timestamp, kolumna funding_rate)
+            spread_percent: Spread syntetycznego orderbooka (gdy brak nagrań)
+        """
+        if not candles:
+            raise ValueError("Replay wymaga świec co najmniej jednego symbolu")
+        self.base_resolution = base_resolution
+        self.step = pd.Timedelta(base_resolution)
+        self.series = {
+            symbol: _ReplaySeries(df, self.step)
+            for symbol, df in candles.items() if df is not None and not df.empty
+        }
+        if not self.series:
+            raise ValueError("Replay wymaga niepustych świec")
+        self.clock = clock or VirtualClock(self.first_timestamp + self.step)
+        self.orderbooks = {
+            symbol: (list(books), [_utc_timestamp(book['timestamp']).value for book in books])
+            for symbol, books in (orderbooks or {}).items()
+        }
+        self.funding_rates = {
+            symbol: _utc_frame(df) for symbol, df in (funding_rates or {}).items()
+        }
+        self.spread_percent = spread_percent
+        self.api_calls = 0
+    
+    @property
+    def first_timestamp(self) -> pd.Timestamp:
+        """Początek pierwszej świecy bazowej."""
+        return min(series.df.index[0] for series in self.series.values())
+    
+    @property
+    def last_timestamp(self) -> pd.Timestamp:
+        """Zamknięcie ostatniej świecy bazowej."""
+        return max(series.df.index[-1] for series in self.series.values()) + self.step
+    
+    def _series(self, ticker: str) -> _ReplaySeries:
+        series = self.series.get(ticker)
+        if series is None:
+            raise ValueError(f"Brak danych replayu dla {ticker}")
+        return series
+    
+    def fetch_candles(
+        self,
+        ticker: str = "BTC-USD",
+        resolution: str = "1h",
+        limit: int = 100,
+        from_iso: Optional[str] = None,
+        to_iso: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Świece widoczne w chwili zegara (ostatnia wyższego interwału - niezamknięta).
+        
+        Returns:
+            DataFrame z indeksem timestamp i kolumnami OHLCV (jak DydxCollector)
+        """
+        self.api_calls += 1
+        series = self._series(ticker)
+        now = self.clock.timestamp()
+        if to_iso:
+            now = min(now, _utc_timestamp(to_iso))
+        df = series.candles(resolution, series.visible(now), limit)
+        if from_iso:
+            df = df[df.index >= _utc_timestamp(from_iso)]
+        return df.copy()
+    
+    def fetch_historical_candles(
+        self,
+        ticker: str = "BTC-USD",
+        resolution: str = "1h",
+        start_date: datetime = None,
+        end_date: datetime = None
+    ) -> pd.DataFrame:
+        """Historia świec do chwili zegara (bez limitu 100 świec)."""
+        series = self._series(ticker)
+        now = self.clock.timestamp()
+        if end_date is not None:
+            now = min(now, _utc_timestamp(end_date))
+        df = series.candles(resolution, series.visible(now))
+        if start_date is not None:
+            df = df[df.index >= _utc_timestamp(start_date)]
+        return df.copy()
+    
+    def get_ticker(self, ticker: str = "BTC-USD") -> dict:
+        """Ticker w chwili zegara (cena: zamknięcie ostatniej świecy bazowej)."""
+        self.api_calls += 1
+        return self._ticker(ticker)
+    
+    def get_tickers(self, tickers: List[str]) -> Dict[str, dict]:
+        """Tickery wielu rynków jednym zapytaniem (tylko symbole z danymi replayu)."""
+        self.api_calls += 1
+        return {ticker: self._ticker(ticker) for ticker in tickers if ticker in self.series}
+    
+    def _ticker(self, ticker: str) -> dict:
+        series = self._series(ticker)
+        now = self.clock.timestamp()
+        visible = series.visible(now)
+        if visible == 0:
+            return {'ticker': ticker, 'oracle_price': 0.0}
+        
+        price = series.closes[visible - 1]
+        day_ago = series.visible(now - pd.Timedelta(days=1))
+        reference = series.closes[day_ago - 1] if day_ago else series.df['open'].iloc[0]
+        return {
+            'ticker': ticker,
+            'oracle_price': float(price),
+            'price_change_24h': float(price - reference),
+            'volume_24h': float(series.volume_cumsum[visible] - series.volume_cumsum[day_ago]),
+            'trades_24h': 0,
+            'open_interest': 0.0,
+            'next_funding_rate': self._funding_rate(ticker, now),
+        }
+    
+    def get_orderbook(self, ticker: str = "BTC-USD") -> dict:
+        """Ostatni nagrany orderbook lub syntetyczny (jeden poziom wokół ceny)."""
+        self.api_calls += 1
+        now = self.clock.timestamp()
+        books, timestamps = self.orderbooks.get(ticker, ([], []))
+        position = bisect.bisect_right(timestamps, now.value)
+        if position:
+            book = books[position - 1]
+            return {
+                'ticker': ticker,
+                'bids': [tuple(level) for level in book.get('bids', [])],
+                'asks': [tuple(level) for level in book.get('asks', [])],
+                'timestamp': self.clock.now()
+            }
+        
+        series = self._series(ticker)
+        visible = series.visible(now)
+        price = float(series.closes[visible - 1]) if visible else 0.0
+        size = float(series.df['volume'].iloc[visible - 1]) if visible else 0.0
+        half_spread = price * self.spread_percent / 200
+        return {
+            'ticker': ticker,
+            'bids': [(price - half_spread, size)],
+            'asks': [(price + half_spread, size)],
+            'timestamp': self.clock.now()
+        }
+    
+    def _funding_rate(self, ticker: str, now: pd.Timestamp) -> float:
+        df = self.funding_rates.get(ticker)
+        if df is None or df.empty:
+            return 0.0
+        position = int(np.searchsorted(df.index.asi8, now.value, side="right"))
+        return float(df['funding_rate'].iloc[position - 1]) if position else 0.0
+    
+    def get_funding_rates(self, ticker: str = "BTC-USD", limit: int = 100) -> pd.DataFrame:
+        """Historia funding rates do chwili zegara."""
+        self.api_calls += 1
+        df = self.funding_rates.get(ticker)
+        if df is None:
+            return pd.DataFrame()
+        position = int(np.searchsorted(df.index.asi8, self.clock.timestamp().value, side="right"))
+        return df.iloc[max(0, position - min(limit, 100)):position].copy()
+
+
+class MarketReplay:
+    """
+    Przyspieszony replay rynku dla bota paper tradingu.
+    """
+    
+    def __init__(
+        self,
+        candles: Dict[str, pd.DataFrame],
+        base_resolution: str = "1m",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        extra_modules: Iterable[Any] = (),
+        **collector_kwargs
+    ):
+        """
+        Inicjalizacja replayu.
+        
+        Args:
+            candles: {symbol: świece bazowe}
+            base_resolution: Interwał świec bazowych
+            start: Początek replayu (domyślnie zamknięcie pierwszej świecy)
+            end: Koniec replayu (domyślnie zamknięcie ostatniej świecy)
+            extra_modules: Dodatkowe moduły z `datetime` do podmiany (np. skrypt __main__)
+            **collector_kwargs: orderbooks, funding_rates, spread_percent (ReplayCollector)
+        """
+        self.collector = ReplayCollector(candles, base_resolution=base_resolution, **collector_kwargs)
+        self.clock = self.collector.clock
+        if start is not None:
+            self.clock.set(start)
+        self.start = self.clock.timestamp()
+        self.end = _utc_timestamp(end) if end is not None else self.collector.last_timestamp
+        self.extra_modules = list(extra_modules)
+    
+    def __enter__(self) -> "MarketReplay":
+        self.clock.install(self.extra_modules)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.clock.uninstall()
+    
+    def run(self, bot) -> Dict[str, Any]:
+        """
+        Uruchamia pętlę bota (bot.start()) w czasie wirtualnym, do końca danych lub stop().
+        
+        Bot musi używać self.collector i być utworzony po zainstalowaniu zegara
+        (w bloku `with replay:`), żeby jego znaczniki czasu pochodziły z replayu.
+        
+        Returns:
+            Statystyki replayu i podsumowanie konta
+        """
+        installed = bool(self.clock._patched)
+        if not installed:
+            self.clock.install(self.extra_modules)
+        
+        event = VirtualEvent(self.clock, self.end)
+        bot._stop_event = event
+        started = time.perf_counter()
+        try:
+            bot.start()
+        finally:
+            if not installed:
+                self.clock.uninstall()
+        wall_seconds = time.perf_counter() - started
+        
+        virtual_seconds = (self.clock.timestamp() - self.start).total_seconds()
+        result = {
+            'start': self.start.to_pydatetime(),
+            'end': self.clock.timestamp().to_pydatetime(),
+            'cycles': event.waits,
+            'virtual_seconds': virtual_seconds,
+            'wall_seconds': wall_seconds,
+            'speedup': virtual_seconds / wall_seconds if wall_seconds > 0 else float('inf'),
+            'api_calls': self.collector.api_calls,
+            'account': bot.engine_pt.get_account_summary(),
+        }
+        logger.info(
+            f"Replay: {result['cycles']} cykli, {virtual_seconds / 3600:.1f}h w {wall_seconds:.1f}s "
+            f"(x{result['speedup']:.0f})"
+        )
+        return result
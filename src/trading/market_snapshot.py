@@ -0,0 +1,136 @@
+"""
+Market Snapshot
+===============
+Wspólny obraz rynku na jeden cykl dla wielu botów (strategia, konto).
+
+MarketSnapshot ma interfejs DydxCollector (get_ticker, fetch_candles, ...),
+więc można go przekazać do TradingBot i PaperTradingEngine zamiast kolektora:
+- tickery wszystkich symboli są pobierane jednym zapytaniem na cykl,
+- świece (symbol, interwał) są pobierane raz na cykl, a kolejne boty dostają
+  ostatnie N świec z pamięci (równoległe żądania tej samej serii czekają na
+  pierwsze pobranie),
+- pozostałe metody są przekazywane do kolektora.
+
+Użycie:
+    snapshot = MarketSnapshot(DydxCollector())
+    snapshot.refresh(["BTC-USD", "ETH-USD"])
+    df = snapshot.fetch_candles("BTC-USD", "1h", limit=50)
+"""
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+
+
+class MarketSnapshot:
+    """
+    Cache danych rynkowych na jeden cykl, współdzielony przez boty.
+    """
+    
+    def __init__(self, collector, candle_limit: int = 100):
+        """
+        Inicjalizacja snapshotu.
+        
+        Args:
+            collector: Kolektor giełdy (np. DydxCollector)
+            candle_limit: Minimalna liczba świec pobieranych dla serii
+        """
+        self.collector = collector
+        self.candle_limit = candle_limit
+        self.api_calls = 0
+        self._tickers: Dict[str, dict] = {}
+        self._candles: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._series_locks: Dict[Tuple[str, str], threading.Lock] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        # Metody spoza snapshotu (funding, orderbook, ...) - bezpośrednio z kolektora
+        if name == 'collector':
+            raise AttributeError(name)
+        return getattr(self.collector, name)
+    
+    def _count_call(self):
+        with self._lock:
+            self.api_calls += 1
+    
+    def refresh(self, symbols: Iterable[str]):
+        """
+        Rozpoczyna nowy cykl: czyści świece i pobiera tickery symboli.
+        
+        Args:
+            symbols: Symbole używane przez boty w tym cyklu
+        """
+        symbols = sorted(set(symbols))
+        with self._lock:
+            self._candles = {}
+            self._tickers = {}
+        if not symbols:
+            return
+        
+        try:
+            if hasattr(self.collector, 'get_tickers'):
+                tickers = self.collector.get_tickers(symbols)
+                self._count_call()
+            else:
+                tickers = {}
+                for symbol in symbols:
+                    tickers[symbol] = self.collector.get_ticker(symbol)
+                    self._count_call()
+        except Exception as e:
+            logger.warning(f"Błąd pobierania tickerów snapshotu: {e}")
+            return
+        with self._lock:
+            self._tickers = dict(tickers)
+    
+    def get_ticker(self, ticker: str = "BTC-USD") -> dict:
+        """Ticker z bieżącego cyklu (pobierany, jeśli symbolu nie było w refresh)."""
+        with self._lock:
+            cached = self._tickers.get(ticker)
+        if cached is not None:
+            return cached
+        
+        data = self.collector.get_ticker(ticker)
+        self._count_call()
+        with self._lock:
+            self._tickers[ticker] = data
+        return data
+    
+    def fetch_candles(
+        self,
+        ticker: str = "BTC-USD",
+        resolution: str = "1h",
+        limit: int = 100,
+        from_iso: Optional[str] = None,
+        to_iso: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Ostatnie świece serii z bieżącego cyklu (zakresy dat - bez cache).
+        
+        Returns:
+            Kopia ostatnich `limit` świec
+        """
+        if from_iso or to_iso:
+            self._count_call()
+            return self.collector.fetch_candles(ticker, resolution, limit=limit, from_iso=from_iso, to_iso=to_iso)
+        
+        key = (ticker, resolution)
+        with self._lock:
+            series_lock = self._series_locks.setdefault(key, threading.Lock())
+        
+        with series_lock:
+            with self._lock:
+                df = self._candles.get(key)
+            if df is None or (len(df) < limit and df.attrs.get('requested', 0) < limit):
+                requested = max(limit, self.candle_limit)
+                df = self.collector.fetch_candles(ticker, resolution, limit=requested)
+                self._count_call()
+                if df is None:
+                    df = pd.DataFrame()
+                # Giełda może zwrócić mniej świec niż żądano - nie ponawiaj w tym cyklu
+                df.attrs['requested'] = requested
+                with self._lock:
+                    self._candles[key] = df
+        
+        return df.tail(limit).copy()
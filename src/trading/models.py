@@ -10,7 +10,7 @@ import enum
 
 from sqlalchemy import (
     Column, String, Float, Integer, DateTime, 
-    ForeignKey, Boolean, Text, Enum as SQLEnum
+    ForeignKey, Boolean, Text, UniqueConstraint, Enum as SQLEnum
 )
 from sqlalchemy.orm import relationship
 
@@ -277,3 +277,44 @@ class PaperTrade(Base):
         delta = self.exit_time - self.entry_time
         return delta.total_seconds() / 60
 
+
+
+class PaperJournalCheckpoint(Base):
+    """
+    Ostatnia operacja dziennika write-behind zapisana w bazie (per konto).
+    
+    Aktualizowana w tej samej transakcji co zapisywane operacje - po awarii
+    odtwarzane są tylko operacje z dziennika o wyższym numerze.
+    """
+    __tablename__ = 'paper_journal_checkpoints'
+    
+    account_id = Column(Integer, ForeignKey('paper_accounts.id'), primary_key=True)
+    seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    
+    def __repr__(self):
+        return f"<PaperJournalCheckpoint account={self.account_id} seq={self.seq}>"
+
+
+class PaperIdBlock(Base):
+    """
+    Pula ID wierszy paper_positions / paper_trades zarezerwowana przez proces silnika.
+    
+    Każdy proces PaperTradingEngine nadaje ID tylko ze swoich pul, więc kilka
+    procesów może pisać do tej samej bazy. Unikalny start_id rozstrzyga wyścig
+    dwóch procesów rezerwujących jednocześnie (przegrany rezerwuje ponownie).
+    """
+    __tablename__ = 'paper_id_blocks'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(50), nullable=False)
+    start_id = Column(Integer, nullable=False)
+    end_id = Column(Integer, nullable=False)  # Włącznie
+    created_at = Column(DateTime, default=utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('table_name', 'start_id', name='uq_paper_id_block'),
+    )
+    
+    def __repr__(self):
+        return f"<PaperIdBlock {self.table_name} {self.start_id}-{self.end_id}>"
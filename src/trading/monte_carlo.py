@@ -0,0 +1,380 @@
+"""
+Monte Carlo Robustness
+======================
+Analiza odporności wyników backtestu na kolejność transakcji, losowość
+zwrotów i koszty wykonania.
+
+Pojedynczy BacktestResult to jedna ścieżka - ta sama lista transakcji w innej
+kolejności lub z gorszym slippage może dać zupełnie inny drawdown. Moduł
+generuje tysiące alternatywnych ścieżek z logu transakcji:
+- shuffle: permutacja kolejności transakcji (rozkład drawdownu),
+- resample: losowanie transakcji ze zwracaniem (rozkład zwrotu i drawdownu),
+- block_bootstrap: losowanie bloków kolejnych zwrotów (zachowuje serie wygranych/strat),
+- costs: perturbacja slippage i opłat per transakcja.
+
+Wszystkie symulacje są liczone macierzowo w NumPy (symulacje x transakcje),
+w partiach ograniczających zużycie pamięci - bez pętli Pythona per symulacja.
+
+Użycie:
+    analyzer = MonteCarloAnalyzer.from_result(result, seed=42)
+    mc = analyzer.shuffle(10_000)
+    low, high = mc.confidence_interval("max_drawdown", 0.95)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.trading.backtesting import BacktestResult
+
+
+METRICS = ("total_return", "max_drawdown", "final_balance")
+
+
+@dataclass
+class MonteCarloResult:
+    """Rozkłady metryk z symulacji Monte Carlo."""
+    method: str
+    n_simulations: int
+    initial_balance: float
+    total_returns: np.ndarray  # % per symulacja
+    max_drawdowns: np.ndarray  # % per symulacja
+    final_balances: np.ndarray
+    
+    # Wartości z oryginalnej ścieżki (do porównania)
+    original_return: float = 0.0
+    original_max_drawdown: float = 0.0
+    
+    params: Dict[str, Any] = field(default_factory=dict)
+    
+    def values(self, metric: str) -> np.ndarray:
+        """Zwraca tablicę wartości metryki (total_return, max_drawdown, final_balance)."""
+        if metric not in METRICS:
+            raise ValueError(f"Nieznana metryka: {metric} (dostępne: {', '.join(METRICS)})")
+        return {
+            "total_return": self.total_returns,
+            "max_drawdown": self.max_drawdowns,
+            "final_balance": self.final_balances
+        }[metric]
+    
+    def confidence_interval(self, metric: str, level: float = 0.95) -> Tuple[float, float]:
+        """
+        Przedział ufności (percentylowy) dla metryki.
+        
+        Args:
+            metric: total_return, max_drawdown lub final_balance
+            level: Poziom ufności (0.95 = percentyle 2.5 i 97.5)
+        """
+        tail = (1.0 - level) / 2.0 * 100.0
+        low, high = np.percentile(self.values(metric), [tail, 100.0 - tail])
+        return float(low), float(high)
+    
+    def percentiles(self, metric: str, q: Iterable[float] = (5, 25, 50, 75, 95)) -> Dict[float, float]:
+        """Percentyle metryki jako słownik {q: wartość}."""
+        q = list(q)
+        return dict(zip(q, np.percentile(self.values(metric), q).tolist()))
+    
+    @property
+    def probability_of_loss(self) -> float:
+        """Odsetek symulacji zakończonych stratą (0-1)."""
+        return float(np.mean(self.total_returns < 0))
+    
+    def probability_of_drawdown(self, threshold_percent: float) -> float:
+        """Odsetek symulacji z max drawdown >= threshold_percent (0-1)."""
+        return float(np.mean(self.max_drawdowns >= threshold_percent))
+    
+    def summary(self, level: float = 0.95) -> Dict[str, Any]:
+        """Podsumowanie rozkładów (do raportu lub JSON)."""
+        return {
+            "method": self.method,
+            "n_simulations": self.n_simulations,
+            "original_return": self.original_return,
+            "original_max_drawdown": self.original_max_drawdown,
+            "median_return": float(np.median(self.total_returns)),
+            "return_ci": self.confidence_interval("total_return", level),
+            "median_max_drawdown": float(np.median(self.max_drawdowns)),
+            "max_drawdown_ci": self.confidence_interval("max_drawdown", level),
+            "worst_max_drawdown": float(self.max_drawdowns.max()) if self.n_simulations else 0.0,
+            "probability_of_loss": self.probability_of_loss,
+            "params": self.params
+        }
+    
+    def __repr__(self):
+        if not self.n_simulations:
+            return f"MonteCarloResult(method={self.method}, n=0)"
+        dd_low, dd_high = self.confidence_interval("max_drawdown")
+        ret_low, ret_high = self.confidence_interval("total_return")
+        return (
+            f"MonteCarloResult("
+            f"method={self.method}, "
+            f"n={self.n_simulations}, "
+            f"return_95={ret_low:.2f}%..{ret_high:.2f}%, "
+            f"max_dd_95={dd_low:.2f}%..{dd_high:.2f}%, "
+            f"p_loss={self.probability_of_loss:.1%})"
+        )
+
+
+def max_drawdown_percent(equity: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown (%) dla każdego wiersza macierzy equity (symulacje x punkty).
+    
+    Args:
+        equity: Tablica 2D; pierwsza kolumna to kapitał początkowy
+    """
+    peaks = np.maximum.accumulate(equity, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = np.where(peaks > 0, (peaks - equity) / peaks, 1.0)
+    return drawdowns.max(axis=1) * 100.0
+
+
+class MonteCarloAnalyzer:
+    """
+    Symulacje Monte Carlo / bootstrap na logu transakcji backtestu.
+    
+    Transakcje są brane w kolejności zamknięcia (tak jak zapisuje je
+    BacktestEngine) - PnL realizuje się przy wyjściu z pozycji.
+    """
+    
+    def __init__(
+        self,
+        pnl: np.ndarray,
+        initial_balance: float = 10000.0,
+        notional: Optional[np.ndarray] = None,
+        fees: Optional[np.ndarray] = None,
+        seed: Optional[int] = None,
+        batch_size: int = 2000
+    ):
+        """
+        Inicjalizacja analizatora.
+        
+        Args:
+            pnl: PnL netto transakcji (po opłatach), w kolejności zamknięcia
+            initial_balance: Kapitał początkowy
+            notional: Obrót transakcji (wejście + wyjście) - podstawa perturbacji slippage
+            fees: Opłaty transakcji - podstawa perturbacji opłat
+            seed: Ziarno generatora (powtarzalne wyniki)
+            batch_size: Liczba symulacji liczonych naraz (limit pamięci: batch x transakcje)
+        """
+        self.pnl = np.asarray(pnl, dtype=np.float64)
+        self.initial_balance = float(initial_balance)
+        self.notional = np.zeros_like(self.pnl) if notional is None else np.asarray(notional, dtype=np.float64)
+        self.fees = np.zeros_like(self.pnl) if fees is None else np.asarray(fees, dtype=np.float64)
+        self.batch_size = max(1, int(batch_size))
+        self.rng = np.random.default_rng(seed)
+        
+        if not (len(self.pnl) == len(self.notional) == len(self.fees)):
+            raise ValueError("pnl, notional i fees muszą mieć tę samą długość")
+        
+        # Zwroty per transakcja względem kapitału przed transakcją (oryginalna ścieżka)
+        equity_before = self.initial_balance + np.concatenate(([0.0], np.cumsum(self.pnl)[:-1]))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.returns = np.where(equity_before > 0, self.pnl / equity_before, 0.0)
+        
+        original_equity = self._equity_from_pnl(self.pnl[np.newaxis, :])
+        self.original_return = float((original_equity[0, -1] / self.initial_balance - 1.0) * 100.0)
+        self.original_max_drawdown = float(max_drawdown_percent(original_equity)[0])
+    
+    @classmethod
+    def from_trades(
+        cls,
+        trades: Union[List[Dict[str, Any]], pd.DataFrame],
+        initial_balance: float = 10000.0,
+        **kwargs
+    ) -> "MonteCarloAnalyzer":
+        """
+        Tworzy analizator z listy transakcji BacktestEngine (lub DataFrame o tych kolumnach).
+        
+        Wymagana kolumna: pnl. Opcjonalne: entry_price, exit_price, size, fees, exit_time.
+        """
+        df = trades if isinstance(trades, pd.DataFrame) else pd.DataFrame(list(trades))
+        if df.empty:
+            return cls(np.array([]), initial_balance=initial_balance, **kwargs)
+        if "exit_time" in df.columns:
+            df = df.sort_values("exit_time", kind="stable")
+        
+        if {"entry_price", "exit_price", "size"}.issubset(df.columns):
+            notional = (df["entry_price"].to_numpy(float) + df["exit_price"].to_numpy(float)) * df["size"].abs().to_numpy(float)
+        else:
+            notional = None
+        fees = df["fees"].to_numpy(float) if "fees" in df.columns else None
+        return cls(df["pnl"].to_numpy(float), initial_balance=initial_balance, notional=notional, fees=fees, **kwargs)
+    
+    @classmethod
+    def from_result(cls, result: BacktestResult, **kwargs) -> "MonteCarloAnalyzer":
+        """Tworzy analizator z wyniku BacktestEngine.run_backtest (kolumnowy log transakcji)."""
+        log = result.trade_log
+        if len(log) == 0 and result.trades:
+            return cls.from_trades(result.trades, initial_balance=result.initial_balance, **kwargs)
+        return cls(
+            log['pnl'],
+            initial_balance=result.initial_balance,
+            notional=(log['entry_price'] + log['exit_price']) * np.abs(log['size']),
+            fees=log['fees'],
+            **kwargs
+        )
+    
+    @property
+    def n_trades(self) -> int:
+        return len(self.pnl)
+    
+    def _equity_from_pnl(self, pnl: np.ndarray) -> np.ndarray:
+        """Macierz equity (z kolumną kapitału początkowego) z macierzy PnL."""
+        equity = np.empty((pnl.shape[0], pnl.shape[1] + 1))
+        equity[:, 0] = self.initial_balance
+        np.cumsum(pnl, axis=1, out=equity[:, 1:])
+        equity[:, 1:] += self.initial_balance
+        return equity
+    
+    def _equity_from_returns(self, returns: np.ndarray) -> np.ndarray:
+        """Macierz equity (składana) z macierzy zwrotów per transakcja."""
+        equity = np.empty((returns.shape[0], returns.shape[1] + 1))
+        equity[:, 0] = self.initial_balance
+        np.cumprod(1.0 + returns, axis=1, out=equity[:, 1:])
+        equity[:, 1:] *= self.initial_balance
+        return equity
+    
+    def _simulate(self, method: str, n_simulations: int, build_equity, params: Dict[str, Any]) -> MonteCarloResult:
+        """
+        Uruchamia symulacje w partiach.
+        
+        Args:
+            build_equity: Funkcja (rozmiar partii) -> macierz equity (partia x punkty)
+        """
+        total_returns = np.empty(n_simulations)
+        max_drawdowns = np.empty(n_simulations)
+        final_balances = np.empty(n_simulations)
+        
+        if self.n_trades == 0:
+            total_returns[:] = 0.0
+            max_drawdowns[:] = 0.0
+            final_balances[:] = self.initial_balance
+        else:
+            for start in range(0, n_simulations, self.batch_size):
+                stop = min(start + self.batch_size, n_simulations)
+                equity = build_equity(stop - start)
+                final_balances[start:stop] = equity[:, -1]
+                max_drawdowns[start:stop] = max_drawdown_percent(equity)
+            total_returns[:] = (final_balances / self.initial_balance - 1.0) * 100.0
+        
+        result = MonteCarloResult(
+            method=method,
+            n_simulations=n_simulations,
+            initial_balance=self.initial_balance,
+            total_returns=total_returns,
+            max_drawdowns=max_drawdowns,
+            final_balances=final_balances,
+            original_return=self.original_return,
+            original_max_drawdown=self.original_max_drawdown,
+            params=params
+        )
+        logger.debug(f"Monte Carlo: {result}")
+        return result
+    
+    def shuffle(self, n_simulations: int = 10000) -> MonteCarloResult:
+        """
+        Permutacje kolejności transakcji (PnL w $ bez zmian).
+        
+        Zwrot końcowy jest identyczny we wszystkich ścieżkach - zmienia się drawdown.
+        """
+        def build(batch: int) -> np.ndarray:
+            pnl = self.rng.permuted(np.broadcast_to(self.pnl, (batch, self.n_trades)), axis=1)
+            return self._equity_from_pnl(pnl)
+        
+        return self._simulate("shuffle", n_simulations, build, {})
+    
+    def resample(self, n_simulations: int = 10000, n_trades: Optional[int] = None) -> MonteCarloResult:
+        """
+        Losowanie transakcji ze zwracaniem (bootstrap IID zwrotów per transakcja).
+        
+        Args:
+            n_trades: Długość ścieżki (domyślnie liczba transakcji w backteście)
+        """
+        length = n_trades or self.n_trades
+        
+        def build(batch: int) -> np.ndarray:
+            index = self.rng.integers(0, self.n_trades, size=(batch, length))
+            return self._equity_from_returns(self.returns[index])
+        
+        return self._simulate("resample", n_simulations, build, {"n_trades": length})
+    
+    def block_bootstrap(self, n_simulations: int = 10000, block_size: int = 5) -> MonteCarloResult:
+        """
+        Moving block bootstrap zwrotów per transakcja.
+        
+        Losuje bloki kolejnych transakcji, zachowując krótkoterminową zależność
+        (serie wygranych i strat), której nie widzi zwykły resampling.
+        
+        Args:
+            block_size: Długość bloku (w transakcjach)
+        """
+        block_size = max(1, min(int(block_size), self.n_trades or 1))
+        n_blocks = -(-self.n_trades // block_size)  # ceil
+        offsets = np.arange(block_size)
+        
+        def build(batch: int) -> np.ndarray:
+            starts = self.rng.integers(0, self.n_trades - block_size + 1, size=(batch, n_blocks))
+            index = (starts[:, :, np.newaxis] + offsets).reshape(batch, -1)[:, :self.n_trades]
+            return self._equity_from_returns(self.returns[index])
+        
+        return self._simulate("block_bootstrap", n_simulations, build, {"block_size": block_size})
+    
+    def perturb_costs(
+        self,
+        n_simulations: int = 10000,
+        slippage_percent: Tuple[float, float] = (0.0, 0.1),
+        fee_multiplier: Tuple[float, float] = (1.0, 2.0)
+    ) -> MonteCarloResult:
+        """
+        Perturbacja kosztów wykonania przy zachowaniu kolejności transakcji.
+        
+        Args:
+            slippage_percent: Zakres dodatkowego slippage w % obrotu, losowany per transakcja
+            fee_multiplier: Zakres mnożnika opłat, losowany per symulacja
+        """
+        slip_low, slip_high = slippage_percent
+        fee_low, fee_high = fee_multiplier
+        
+        def build(batch: int) -> np.ndarray:
+            slippage = self.rng.uniform(slip_low, slip_high, size=(batch, self.n_trades)) / 100.0
+            multiplier = self.rng.uniform(fee_low, fee_high, size=(batch, 1))
+            pnl = self.pnl - slippage * self.notional - (multiplier - 1.0) * self.fees
+            return self._equity_from_pnl(pnl)
+        
+        return self._simulate(
+            "costs", n_simulations, build,
+            {"slippage_percent": tuple(slippage_percent), "fee_multiplier": tuple(fee_multiplier)}
+        )
+    
+    def run_all(self, n_simulations: int = 10000, block_size: int = 5) -> Dict[str, MonteCarloResult]:
+        """Uruchamia wszystkie metody i zwraca słownik {metoda: wynik}."""
+        return {
+            "shuffle": self.shuffle(n_simulations),
+            "resample": self.resample(n_simulations),
+            "block_bootstrap": self.block_bootstrap(n_simulations, block_size=block_size),
+            "costs": self.perturb_costs(n_simulations)
+        }
+    
+    @staticmethod
+    def print_report(results: Dict[str, MonteCarloResult], level: float = 0.95):
+        """Wyświetla tabelę rozkładów dla wyników run_all()."""
+        print("\n" + "=" * 70)
+        print(f"🎲 MONTE CARLO (przedziały {level:.0%})")
+        print("=" * 70)
+        first = next(iter(results.values()), None)
+        if first is not None:
+            print(f"Oryginalna ścieżka: zwrot {first.original_return:+.2f}%, max DD {first.original_max_drawdown:.2f}%")
+        print(f"{'metoda':<16} {'zwrot (mediana)':>16} {'zwrot CI':>22} {'max DD CI':>20} {'P(strata)':>10}")
+        for name, mc in results.items():
+            summary = mc.summary(level)
+            ret_low, ret_high = summary["return_ci"]
+            dd_low, dd_high = summary["max_drawdown_ci"]
+            print(
+                f"{name:<16} {summary['median_return']:>15.2f}% "
+                f"{ret_low:>10.2f}%..{ret_high:>8.2f}% "
+                f"{dd_low:>8.2f}%..{dd_high:>8.2f}% "
+                f"{summary['probability_of_loss']:>9.1%}"
+            )
+        print("=" * 70)
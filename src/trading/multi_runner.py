@@ -0,0 +1,232 @@
+"""
+Multi Strategy Runner
+=====================
+Jeden proces obsługujący wiele par (strategia, konto) paper tradingu.
+
+Zamiast osobnego TradingBot na strategię (każdy z własnym kolektorem,
+silnikiem bazy i odpytywaniem API) runner:
+- pobiera dane rynkowe raz na symbol na cykl (MarketSnapshot),
+- wykonuje cykle botów równolegle: strategie obliczeniowe w puli CPU,
+  strategie LLM (czekające na API) w osobnej, większej puli I/O,
+- współdzieli jeden silnik bazy z pulą połączeń (sesja per bot).
+
+Użycie:
+    runner = MultiStrategyRunner("sqlite:///data/paper_trading.db", check_interval=300)
+    runner.add_bot(PiotrekBreakoutStrategy(config), "piotrek_bot", ["BTC-USD", "ETH-USD"])
+    runner.add_bot(PromptStrategy(config), "prompt_bot", ["BTC-USD"])
+    runner.start()
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from typing import Any, Dict, List, Optional, Type
+
+from loguru import logger
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from src.collectors.exchange.dydx_collector import DydxCollector
+from src.trading.market_snapshot import MarketSnapshot
+from src.trading.strategies.base_strategy import BaseStrategy
+from src.trading.trading_bot import TradingBot, create_trading_tables
+from src.utils.metrics import get_metrics
+
+
+def is_llm_strategy(strategy: BaseStrategy) -> bool:
+    """Strategia czekająca na API LLM (atrybut uses_llm lub analizator LLM)."""
+    uses_llm = getattr(strategy, 'uses_llm', None)
+    if uses_llm is not None:
+        return bool(uses_llm)
+    return hasattr(strategy, 'llm_analyzer')
+
+
+class MultiStrategyRunner:
+    """
+    Runner wielu botów paper tradingu ze wspólnym snapshotem rynku.
+    """
+    
+    def __init__(
+        self,
+        database_url: str = "sqlite:///data/paper_trading.db",
+        check_interval: int = 300,
+        collector: Optional[DydxCollector] = None,
+        db_engine: Optional[Engine] = None,
+        cpu_workers: int = 4,
+        llm_workers: int = 8,
+        candle_limit: int = 100
+    ):
+        """
+        Inicjalizacja runnera.
+        
+        Args:
+            database_url: URL bazy danych (jeden silnik dla wszystkich botów)
+            check_interval: Interwał cyklu (sekundy, liczony od startu cyklu)
+            collector: Kolektor giełdy (domyślnie DydxCollector)
+            db_engine: Gotowy silnik bazy (zamiast database_url)
+            cpu_workers: Wątki dla strategii obliczeniowych
+            llm_workers: Wątki dla strategii LLM (czekają na API)
+            candle_limit: Minimalna liczba świec pobieranych na serię
+        """
+        self.check_interval = check_interval
+        self.snapshot = MarketSnapshot(collector or DydxCollector(testnet=False), candle_limit=candle_limit)
+        
+        if db_engine is None:
+            db_engine = create_engine(database_url, echo=False, pool_pre_ping=True)
+        self.engine = db_engine
+        create_trading_tables(self.engine)
+        
+        self.bots: List[TradingBot] = []
+        self.cpu_workers = cpu_workers
+        self.llm_workers = llm_workers
+        self.metrics = get_metrics()
+        self.running = False
+        self._stopped = False
+        self._stop_event = Event()
+        self._cpu_pool: Optional[ThreadPoolExecutor] = None
+        self._llm_pool: Optional[ThreadPoolExecutor] = None
+    
+    def add_bot(
+        self,
+        strategy: BaseStrategy,
+        account_name: str,
+        symbols: List[str],
+        initial_balance: float = 10000.0,
+        bot_class: Type[TradingBot] = TradingBot,
+        **bot_kwargs
+    ) -> TradingBot:
+        """
+        Dodaje parę (strategia, konto).
+        
+        Args:
+            strategy: Strategia bota
+            account_name: Konto paper trading (unikalne w runnerze)
+            symbols: Symbole monitorowane przez bota
+            initial_balance: Początkowy kapitał
+            bot_class: Klasa bota (np. EnhancedTradingBot)
+            **bot_kwargs: Dodatkowe parametry bota (max_positions itp. ustawiać na zwróconym bocie)
+        
+        Returns:
+            Utworzony bot (bez własnej pętli)
+        """
+        if any(bot.engine_pt.account_name == account_name for bot in self.bots):
+            raise ValueError(f"Konto {account_name} jest już obsługiwane przez runner")
+        
+        bot = bot_class(
+            account_name=account_name,
+            initial_balance=initial_balance,
+            symbols=symbols,
+            strategy=strategy,
+            check_interval=self.check_interval,
+            db_engine=self.engine,
+            dydx_collector=self.snapshot,
+            **bot_kwargs
+        )
+        self.bots.append(bot)
+        logger.info(f"Runner: dodano {strategy.name} na koncie {account_name} ({'LLM' if is_llm_strategy(strategy) else 'CPU'})")
+        return bot
+    
+    def symbols(self) -> List[str]:
+        """Symbole wszystkich botów i ich otwartych pozycji."""
+        symbols = set()
+        for bot in self.bots:
+            symbols.update(bot.symbols)
+            symbols.update(position.symbol for position in bot.engine_pt.get_open_positions())
+        return sorted(symbols)
+    
+    def _pools(self):
+        if self._cpu_pool is None:
+            self._cpu_pool = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="runner-cpu")
+            self._llm_pool = ThreadPoolExecutor(max_workers=self.llm_workers, thread_name_prefix="runner-llm")
+        return self._cpu_pool, self._llm_pool
+    
+    def _run_bot_cycle(self, bot: TradingBot) -> Optional[Exception]:
+        try:
+            bot.run_cycle()
+            return None
+        except Exception as e:
+            logger.error(f"Błąd w cyklu {bot.strategy.name} ({bot.engine_pt.account_name}): {e}")
+            return e
+    
+    async def _run_cycle_async(self) -> Dict[str, Optional[Exception]]:
+        """Cykle wszystkich botów równolegle (pula zależna od rodzaju strategii)."""
+        loop = asyncio.get_running_loop()
+        cpu_pool, llm_pool = self._pools()
+        tasks = [
+            loop.run_in_executor(
+                llm_pool if is_llm_strategy(bot.strategy) else cpu_pool,
+                self._run_bot_cycle, bot
+            )
+            for bot in self.bots
+        ]
+        results = await asyncio.gather(*tasks)
+        return {bot.engine_pt.account_name: error for bot, error in zip(self.bots, results)}
+    
+    def run_cycle(self) -> Dict[str, Optional[Exception]]:
+        """
+        Jeden cykl: odświeżenie snapshotu i cykle wszystkich botów.
+        
+        Returns:
+            Słownik {konto: błąd lub None}
+        """
+        with self.metrics.span("multi_runner.refresh_snapshot"):
+            calls = self.snapshot.api_calls
+            self.snapshot.refresh(self.symbols())
+        
+        with self.metrics.span("multi_runner.run_cycle"):
+            results = asyncio.run(self._run_cycle_async())
+        
+        logger.info(
+            f"Runner: cykl {len(self.bots)} botów, "
+            f"{self.snapshot.api_calls - calls} zapytań do giełdy"
+        )
+        return results
+    
+    def start(self):
+        """Uruchamia pętlę runnera (blokująco, do stop())."""
+        self.running = True
+        self._stop_event.clear()
+        
+        for bot in self.bots:
+            bot.running = True
+            if not bot.trading_session:
+                bot._create_trading_session()
+        
+        logger.info(f"🚀 Uruchamiam runner: {len(self.bots)} botów, symbole: {self.symbols()}")
+        try:
+            while self.running and not self._stop_event.is_set():
+                started = time.monotonic()
+                self.run_cycle()
+                # Interwał liczony od startu cyklu
+                self._stop_event.wait(max(0.0, self.check_interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            logger.info("Przerwano przez użytkownika")
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """Zatrzymuje boty (zamyka sesje i zapisuje konta) oraz pule wątków."""
+        if self._stopped:
+            return
+        self._stopped = True
+        self.running = False
+        self._stop_event.set()
+        
+        for bot in self.bots:
+            try:
+                bot.stop()
+            except Exception as e:
+                logger.error(f"Błąd zatrzymywania bota {bot.engine_pt.account_name}: {e}")
+        
+        for pool in (self._cpu_pool, self._llm_pool):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._cpu_pool = self._llm_pool = None
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        """Podsumowanie kont wszystkich botów."""
+        return [
+            {'strategy': bot.strategy.name, **bot.engine_pt.get_account_summary()}
+            for bot in self.bots
+        ]
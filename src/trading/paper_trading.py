@@ -2,10 +2,16 @@
 Paper Trading Engine
 ====================
 Silnik do symulacji handlu na dYdX bez prawdziwych pieniędzy.
+
+Stan konta i otwartych pozycji jest trzymany w pamięci (PositionBook), a zmiany
+trafiają do bazy partiami w tle przez dziennik write-behind (position_book.py).
 """
 
+import atexit
+import weakref
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Union
 from decimal import Decimal
 from loguru import logger
 
@@ -15,8 +21,21 @@ from src.trading.models import (
     PaperAccount, PaperPosition, PaperOrder, PaperTrade,
     OrderSide, OrderType, OrderStatus, PositionStatus
 )
+from src.trading.position_book import (
+    PositionBook, PositionRecord, TradeRecord, PaperJournal, WriteBehindWriter,
+    _IdAllocator, default_journal_path, is_memory_database, make_session_factory
+)
 from src.collectors.exchange.dydx_collector import DydxCollector
 from src.utils.sound_notifier import get_sound_notifier
+from src.utils.metrics import get_metrics, timed
+
+
+# Notatki transakcji zamkniętych przez poziomy wyzwalające
+TRIGGER_NOTES = {
+    "liquidation": "Likwidacja przy ${price:.2f}",
+    "stop_loss": "SL triggered @ ${price:.2f}",
+    "take_profit": "TP triggered @ ${price:.2f}"
+}
 
 
 def utcnow():
@@ -34,6 +53,9 @@ class PaperTradingEngine:
     - Obliczanie PnL
     - Stop Loss / Take Profit
     - Tracking historii transakcji
+    
+    Gorąca ścieżka (pozycje, SL/TP, otwieranie i zamykanie) nie wykonuje zapytań
+    do bazy - zapis odbywa się w tle; flush() wymusza zapis oczekujących zmian.
     """
     
     def __init__(
@@ -41,7 +63,9 @@ class PaperTradingEngine:
         session: Session,
         account_name: str = "default",
         dydx_collector: Optional[DydxCollector] = None,
-        slippage_percent: float = 0.75
+        slippage_percent: float = 0.75,
+        journal_path: Optional[Union[str, Path]] = None,
+        flush_interval: float = 1.0
     ):
         """
         Inicjalizacja silnika.
@@ -51,17 +75,63 @@ class PaperTradingEngine:
             account_name: Nazwa konta paper trading
             dydx_collector: Kolektor dYdX (opcjonalnie, do pobierania cen)
             slippage_percent: Procent slippage przy zamykaniu pozycji (default 0.75%)
+            journal_path: Plik dziennika write-behind (domyślnie obok pliku bazy)
+            flush_interval: Odstęp zapisu partii do bazy w tle (sekundy)
         """
         self.session = session
         self.account_name = account_name
         self.dydx = dydx_collector or DydxCollector(testnet=False)
         self.slippage_percent = slippage_percent
+        self.metrics = get_metrics()
         
         # Pobierz lub utwórz konto
-        self.account = self._get_or_create_account(account_name)
+        account = self._get_or_create_account(account_name)
+        
+        # Dziennik write-behind; baza w pamięci jest zapisywana tylko z wątku silnika
+        memory_db = is_memory_database(session)
+        if journal_path is None and not memory_db:
+            journal_path = default_journal_path(session, account_name)
+        self.writer = WriteBehindWriter(
+            make_session_factory(session),
+            account.id,
+            PaperJournal(journal_path),
+            flush_interval=flush_interval,
+            shared_session=session if memory_db else None
+        )
+        
+        # Odtwórz operacje niezapisane przed awarią i wczytaj księgę
+        if self.writer.replay():
+            self.session.expire_all()
+        _IdAllocator.reserve(session, PaperPosition)
+        _IdAllocator.reserve(session, PaperTrade)
+        self.book = PositionBook.load(session, account)
+        self.account = self.book.account
+        
+        if not memory_db:
+            self.writer.start()
+        engine_ref = weakref.ref(self)
+        atexit.register(lambda: engine_ref() is not None and engine_ref().close())
         
         logger.info(f"Paper Trading Engine zainicjalizowany: {self.account} (slippage: {slippage_percent}%)")
     
+    def _commit(self):
+        """Commit sesji (mierzony jako etap paper_trading.db_commit)."""
+        with self.metrics.span("paper_trading.db_commit"):
+            self.session.commit()
+    
+    def flush(self):
+        """Zapisuje w bazie wszystkie oczekujące zmiany księgi."""
+        with self.metrics.span("paper_trading.db_commit"):
+            self.writer.flush()
+        self._commit()
+    
+    def close(self):
+        """Zapisuje oczekujące zmiany i zatrzymuje wątek zapisu."""
+        try:
+            self.writer.close(flush=True)
+        except Exception as e:
+            logger.error(f"Błąd zapisu przy zamykaniu konta {self.account_name}: {e}")
+    
     def _get_or_create_account(
         self,
         name: str,
@@ -80,11 +150,12 @@ class PaperTradingEngine:
                 peak_balance=initial_balance
             )
             self.session.add(account)
-            self.session.commit()
+            self._commit()
             logger.info(f"Utworzono nowe konto paper trading: {name} (${initial_balance})")
         
         return account
     
+    @timed("paper_trading.get_current_price")
     def get_current_price(self, symbol: str = "BTC-USD") -> float:
         """Pobiera aktualną cenę z dYdX."""
         try:
@@ -125,18 +196,11 @@ class PaperTradingEngine:
             'open_positions': len(open_positions)
         }
     
-    def get_open_positions(self, symbol: Optional[str] = None) -> List[PaperPosition]:
-        """Pobiera otwarte pozycje."""
-        query = self.session.query(PaperPosition).filter(
-            PaperPosition.account_id == self.account.id,
-            PaperPosition.status == PositionStatus.OPEN
-        )
-        
-        if symbol:
-            query = query.filter(PaperPosition.symbol == symbol)
-        
-        return query.all()
+    def get_open_positions(self, symbol: Optional[str] = None) -> List[PositionRecord]:
+        """Pobiera otwarte pozycje (z księgi w pamięci)."""
+        return self.book.open_positions(symbol)
     
+    @timed("paper_trading.open_position")
     def open_position(
         self,
         symbol: str,
@@ -147,7 +211,7 @@ class PaperTradingEngine:
         take_profit: Optional[float] = None,
         strategy: Optional[str] = None,
         notes: Optional[str] = None
-    ) -> Optional[PaperPosition]:
+    ) -> Optional[PositionRecord]:
         """
         Otwiera nową pozycję.
         
@@ -162,7 +226,7 @@ class PaperTradingEngine:
             notes: Notatki
             
         Returns:
-            PaperPosition lub None jeśli niewystarczające środki
+            PositionRecord lub None jeśli niewystarczające środki
         """
         # Pobierz aktualną cenę
         current_price = self.get_current_price(symbol)
@@ -200,7 +264,8 @@ class PaperTradingEngine:
         take_profit_float = float(take_profit) if take_profit is not None else None
         
         # Utwórz pozycję
-        position = PaperPosition(
+        position = PositionRecord(
+            id=_IdAllocator.next_id(self.session, PaperPosition),
             account_id=self.account.id,
             symbol=symbol,
             side=order_side,
@@ -211,6 +276,7 @@ class PaperTradingEngine:
             margin_used=required_margin,
             stop_loss=stop_loss_float,
             take_profit=take_profit_float,
+            opened_at=utcnow(),
             strategy=strategy,
             notes=notes
         )
@@ -218,26 +284,23 @@ class PaperTradingEngine:
         # Zaktualizuj saldo konta (zablokuj margin + opłata)
         self.account.current_balance = float(self.account.current_balance) - float(total_required)
         
-        self.session.add(position)
-        self.session.commit()
+        self.book.add(position)
+        # Zapis do bazy (pozycja, saldo, TradeRegister) w tle
+        self.writer.submit("open", {
+            "position": position.to_dict(),
+            "account": self.account.snapshot(),
+            "register": {
+                "entry_value_usd": position_value,
+                "margin_required": required_margin,
+                "margin_available_before": float(self.account.current_balance) + float(total_required),
+                "entry_fee": entry_fee
+            }
+        })
         
         # Odtwórz dźwięk powiadomienia
         sound_notifier = get_sound_notifier()
         sound_notifier.notify_position_opened(symbol, side)
         
-        # Utwórz TradeRegister (jeśli dostępny trading_session)
-        self._create_trade_register_entry(
-            position=position,
-            entry_price=current_price,
-            entry_size=size,
-            entry_value_usd=position_value,
-            margin_required=required_margin,
-            margin_available_before=float(self.account.current_balance) + float(total_required),
-            entry_fee=entry_fee,
-            strategy_name=strategy,
-            notes=notes
-        )
-        
         logger.success(
             f"Otwarto pozycję {order_side.value.upper()} {symbol}: "
             f"{size} @ ${current_price:.2f} (margin: ${required_margin:.2f}, fee: ${entry_fee:.2f})"
@@ -245,86 +308,14 @@ class PaperTradingEngine:
         
         return position
     
-    def _create_trade_register_entry(
-        self,
-        position: 'PaperPosition',
-        entry_price: float,
-        entry_size: float,
-        entry_value_usd: float,
-        margin_required: float,
-        margin_available_before: float,
-        entry_fee: float,
-        strategy_name: Optional[str] = None,
-        notes: Optional[str] = None
-    ):
-        """Tworzy wpis w TradeRegister przy otwieraniu pozycji."""
-        logger.debug(f"🔍 Próba utworzenia TradeRegister dla {position.symbol} @ {entry_price}")
-        try:
-            from src.trading.models_extended import TradeRegister, Strategy, TradingSession
-            logger.debug("✅ Import TradeRegister OK")
-            
-            # Pobierz strategię z bazy
-            strategy = None
-            if strategy_name:
-                strategy = self.session.query(Strategy).filter_by(
-                    name=strategy_name.lower().replace(" ", "_")
-                ).first()
-                logger.debug(f"Strategia: {strategy.name if strategy else 'nie znaleziona'}")
-            
-            # Pobierz aktywną sesję (jeśli istnieje)
-            trading_session = self.session.query(TradingSession).filter_by(
-                account_id=self.account.id,
-                ended_at=None
-            ).order_by(TradingSession.started_at.desc()).first()
-            logger.debug(f"TradingSession: {trading_session.session_id if trading_session else 'nie znaleziona'}")
-            
-            # Utwórz TradeRegister
-            logger.debug(f"Tworzenie TradeRegister: symbol={position.symbol}, side={position.side.value}")
-            trade_register = TradeRegister(
-                account_id=self.account.id,
-                strategy_id=strategy.id if strategy else None,
-                symbol=position.symbol,
-                side=position.side.value,
-                mode="paper",
-                entry_timestamp=position.opened_at,
-                entry_price=entry_price,
-                entry_size=entry_size,
-                entry_value_usd=entry_value_usd,
-                leverage=position.leverage,
-                margin_required=margin_required,
-                margin_available_before=margin_available_before,
-                stop_loss_price=position.stop_loss,
-                take_profit_price=position.take_profit,
-                fee_entry=entry_fee,
-                signal_reason=notes,
-                session_id=trading_session.session_id if trading_session else None,
-                notes=notes
-            )
-            
-            self.session.add(trade_register)
-            self.session.commit()
-            
-            logger.debug(f"✅ Utworzono TradeRegister ID: {trade_register.id} dla pozycji {position.symbol}")
-            
-            # Zapisz ID TradeRegister w pozycji (dla późniejszego zaktualizowania)
-            if position.notes:
-                position.notes = f"{position.notes} | TradeRegisterID: {trade_register.id}"
-            else:
-                position.notes = f"TradeRegisterID: {trade_register.id}"
-            self.session.commit()
-            
-        except Exception as e:
-            import traceback
-            logger.error(f"❌ Nie udało się utworzyć TradeRegister: {e}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            # Nie przerywamy procesu - TradeRegister jest opcjonalny
-    
+    @timed("paper_trading.close_position")
     def close_position(
         self,
         position_id: int,
         exit_reason: str = "manual",
-        notes: Optional[str] = None
-    ) -> Optional[PaperTrade]:
+        notes: Optional[str] = None,
+        price: Optional[float] = None
+    ) -> Optional[TradeRecord]:
         """
         Zamyka pozycję.
         
@@ -332,22 +323,19 @@ class PaperTradingEngine:
             position_id: ID pozycji
             exit_reason: Powód zamknięcia (manual, stop_loss, take_profit, liquidation)
             notes: Notatki
+            price: Cena zamknięcia (domyślnie aktualna cena z dYdX)
             
         Returns:
-            PaperTrade lub None
+            TradeRecord lub None
         """
-        position = self.session.query(PaperPosition).filter_by(
-            id=position_id,
-            account_id=self.account.id,
-            status=PositionStatus.OPEN
-        ).first()
+        position = self.book.get(position_id)
         
         if not position:
             logger.error(f"Nie znaleziono otwartej pozycji o ID {position_id}")
             return None
         
         # Pobierz aktualną cenę
-        current_price = self.get_current_price(position.symbol)
+        current_price = price if price is not None else self.get_current_price(position.symbol)
         
         # Konwertuj wszystkie wartości na standardowe Python types (nie numpy)
         current_price = float(current_price)
@@ -384,14 +372,16 @@ class PaperTradingEngine:
         )
         
         # Zamknij pozycję
+        exit_time = utcnow()
         position.status = PositionStatus.CLOSED
-        position.closed_at = utcnow()
+        position.closed_at = exit_time
         position.current_price = current_price
         position.unrealized_pnl = pnl
         position.unrealized_pnl_percent = pnl_percent
         
         # Utwórz rekord trade
-        trade = PaperTrade(
+        trade = TradeRecord(
+            id=_IdAllocator.next_id(self.session, PaperTrade),
             account_id=self.account.id,
             symbol=position.symbol,
             side=position.side,
@@ -400,7 +390,7 @@ class PaperTradingEngine:
             size=position.size,
             leverage=position.leverage,
             exit_price=effective_exit_price,  # Użyj ceny z uwzględnieniem slippage
-            exit_time=utcnow(),
+            exit_time=exit_time,
             entry_fee=entry_fee,
             exit_fee=exit_fee,
             total_fees=total_fees,
@@ -438,22 +428,14 @@ class PaperTradingEngine:
             if drawdown > max_drawdown:
                 self.account.max_drawdown = drawdown
         
-        self.session.add(trade)
-        self.session.commit()
-        
-        # Zaktualizuj TradeRegister (jeśli istnieje)
-        self._update_trade_register_on_exit(
-            position=position,
-            trade=trade,
-            exit_price=effective_exit_price,
-            exit_reason=exit_reason,
-            pnl_gross=pnl,
-            pnl_net=net_pnl,
-            pnl_percent=pnl_percent,
-            exit_fee=exit_fee,
-            slippage_amount=slippage_amount,
-            notes=notes
-        )
+        self.book.remove(position.id)
+        # Zapis do bazy (pozycja, transakcja, saldo, TradeRegister) w tle
+        self.writer.submit("close", {
+            "position": position.to_dict(),
+            "trade": trade.to_dict(),
+            "account": self.account.snapshot(),
+            "register": {"slippage_amount": slippage_amount, "notes": notes}
+        })
         
         emoji = "🟢" if net_pnl > 0 else "🔴"
         logger.success(
@@ -472,150 +454,64 @@ class PaperTradingEngine:
         
         return trade
     
-    def _update_trade_register_on_exit(
-        self,
-        position: 'PaperPosition',
-        trade: 'PaperTrade',
-        exit_price: float,
-        exit_reason: str,
-        pnl_gross: float,
-        pnl_net: float,
-        pnl_percent: float,
-        exit_fee: float,
-        slippage_amount: float,
-        notes: Optional[str] = None
-    ):
-        """Aktualizuje TradeRegister przy zamykaniu pozycji."""
-        try:
-            from src.trading.models_extended import TradeRegister
-            from datetime import datetime, timezone
-            
-            # Znajdź TradeRegister dla tej pozycji (po symbolu i czasie wejścia)
-            trade_register = self.session.query(TradeRegister).filter_by(
-                account_id=self.account.id,
-                symbol=position.symbol,
-                entry_timestamp=position.opened_at,
-                exit_timestamp=None  # Tylko otwarte
-            ).order_by(TradeRegister.created_at.desc()).first()
-            
-            if trade_register:
-                # Oblicz czas trwania - upewnij się, że obie daty mają timezone
-                exit_time = datetime.now(timezone.utc)
-                entry_time = trade_register.entry_timestamp
-                
-                # Jeśli entry_timestamp nie ma timezone, dodaj UTC
-                if entry_time.tzinfo is None:
-                    entry_time = entry_time.replace(tzinfo=timezone.utc)
-                
-                duration = (exit_time - entry_time).total_seconds()
-                
-                # Zaktualizuj TradeRegister
-                trade_register.paper_trade_id = trade.id
-                trade_register.exit_timestamp = exit_time
-                trade_register.exit_price = exit_price
-                trade_register.exit_reason = exit_reason
-                trade_register.pnl_gross = pnl_gross
-                trade_register.pnl_net = pnl_net
-                trade_register.pnl_percent = pnl_percent
-                trade_register.fee_exit = exit_fee
-                trade_register.fee_total = trade_register.fee_entry + exit_fee
-                trade_register.duration_seconds = int(duration)
-                trade_register.actual_exit_price = exit_price
-                trade_register.exit_slippage_percent = (slippage_amount / (position.size * exit_price)) * 100 if position.size * exit_price > 0 else 0
-                
-                # Sprawdź czy SL/TP zostały uruchomione
-                if exit_reason == "stop_loss":
-                    trade_register.stop_loss_triggered = True
-                elif exit_reason == "take_profit":
-                    trade_register.take_profit_triggered = True
-                
-                if notes:
-                    trade_register.notes = f"{trade_register.notes or ''} | {notes}".strip()
-                
-                self.session.commit()
-                logger.debug(f"Zaktualizowano TradeRegister ID: {trade_register.id}")
-            else:
-                logger.debug(f"Nie znaleziono TradeRegister dla pozycji {position.symbol} @ {position.entry_price}")
-                
-        except Exception as e:
-            logger.warning(f"Nie udało się zaktualizować TradeRegister: {e}")
-            # Nie przerywamy procesu - TradeRegister jest opcjonalny
-    
-    def check_stop_loss_take_profit(self) -> List[PaperTrade]:
+    def check_stop_loss_take_profit(self) -> List[TradeRecord]:
         """
         Sprawdza wszystkie otwarte pozycje pod kątem SL/TP.
         
+        Cena jest pobierana raz na symbol; pozostałe pozycje dostają aktualną wycenę.
+        
         Returns:
             Lista zamkniętych transakcji
         """
         closed_trades = []
-        open_positions = self.get_open_positions()
         
-        for position in open_positions:
-            current_price = self.get_current_price(position.symbol)
-            
-            # Sprawdź likwidację
-            if position.is_liquidated(current_price):
-                trade = self.close_position(
-                    position.id,
-                    exit_reason="liquidation",
-                    notes=f"Likwidacja przy ${current_price:.2f}"
-                )
-                if trade:
-                    closed_trades.append(trade)
+        for symbol in list(self.book.by_symbol):
+            current_price = self.get_current_price(symbol)
+            if current_price <= 0:
+                logger.warning(f"Brak ceny dla {symbol} - pomijam sprawdzenie SL/TP")
                 continue
             
-            # Sprawdź Stop Loss
-            if position.stop_loss:
-                if position.side == OrderSide.LONG and current_price <= position.stop_loss:
-                    trade = self.close_position(
-                        position.id,
-                        exit_reason="stop_loss",
-                        notes=f"SL triggered @ ${current_price:.2f}"
-                    )
-                    if trade:
-                        closed_trades.append(trade)
-                    continue
-                    
-                if position.side == OrderSide.SHORT and current_price >= position.stop_loss:
-                    trade = self.close_position(
-                        position.id,
-                        exit_reason="stop_loss",
-                        notes=f"SL triggered @ ${current_price:.2f}"
-                    )
-                    if trade:
-                        closed_trades.append(trade)
-                    continue
-            
-            # Sprawdź Take Profit
-            if position.take_profit:
-                if position.side == OrderSide.LONG and current_price >= position.take_profit:
-                    trade = self.close_position(
-                        position.id,
-                        exit_reason="take_profit",
-                        notes=f"TP triggered @ ${current_price:.2f}"
-                    )
-                    if trade:
-                        closed_trades.append(trade)
-                    continue
-                    
-                if position.side == OrderSide.SHORT and current_price <= position.take_profit:
-                    trade = self.close_position(
-                        position.id,
-                        exit_reason="take_profit",
-                        notes=f"TP triggered @ ${current_price:.2f}"
-                    )
-                    if trade:
-                        closed_trades.append(trade)
-                    continue
+            closed_trades.extend(self.on_price(symbol, current_price))
             
             # Aktualizuj unrealized PnL
-            pnl, pnl_percent = position.calculate_pnl(current_price)
-            position.current_price = current_price
-            position.unrealized_pnl = pnl
-            position.unrealized_pnl_percent = pnl_percent
+            for position in self.book.open_positions(symbol):
+                pnl, pnl_percent = position.calculate_pnl(current_price)
+                position.current_price = current_price
+                position.unrealized_pnl = pnl
+                position.unrealized_pnl_percent = pnl_percent
+                self.writer.mark(
+                    position.id,
+                    current_price=current_price,
+                    unrealized_pnl=pnl,
+                    unrealized_pnl_percent=pnl_percent
+                )
         
-        self.session.commit()
+        return closed_trades
+    
+    def on_price(self, symbol: str, price: float) -> List[TradeRecord]:
+        """
+        Zamyka pozycje symbolu, których likwidację, SL lub TP przekroczyła cena.
+        
+        Sprawdzane są tylko przekroczone poziomy (TriggerIndex), więc metoda
+        nadaje się do strumienia cen przy wielu otwartych pozycjach.
+        
+        Args:
+            symbol: Symbol rynku
+            price: Aktualna cena
+        
+        Returns:
+            Lista zamkniętych transakcji
+        """
+        closed_trades = []
+        for position_id, exit_reason in self.book.triggers.pop_triggered(symbol, price):
+            trade = self.close_position(
+                position_id,
+                exit_reason=exit_reason,
+                notes=TRIGGER_NOTES[exit_reason].format(price=price),
+                price=price
+            )
+            if trade:
+                closed_trades.append(trade)
         return closed_trades
     
     def get_trade_history(
@@ -624,6 +520,7 @@ class PaperTradingEngine:
         symbol: Optional[str] = None
     ) -> List[PaperTrade]:
         """Pobiera historię transakcji."""
+        self.flush()
         query = self.session.query(PaperTrade).filter(
             PaperTrade.account_id == self.account.id
         ).order_by(PaperTrade.exit_time.desc())
@@ -679,9 +576,11 @@ class PaperTradingEngine:
     def reset_account(self, initial_balance: float = 10000.0):
         """Resetuje konto do stanu początkowego."""
         # Zamknij wszystkie pozycje
+        closed_at = utcnow()
         for position in self.get_open_positions():
             position.status = PositionStatus.CLOSED
-            position.closed_at = utcnow()
+            position.closed_at = closed_at
+            self.book.remove(position.id)
         
         # Reset statystyk
         self.account.current_balance = initial_balance
@@ -693,6 +592,7 @@ class PaperTradingEngine:
         self.account.max_drawdown = 0.0
         self.account.peak_balance = initial_balance
         
-        self.session.commit()
+        self.writer.submit("reset", {"closed_at": closed_at.isoformat(), "account": self.account.snapshot()})
+        self.flush()
         logger.info(f"Konto {self.account.name} zresetowane do ${initial_balance}")
 
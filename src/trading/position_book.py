@@ -0,0 +1,775 @@
+"""
+Position Book
+=============
+Księga konta paper tradingu w pamięci z zapisem write-behind do bazy.
+
+- AccountRecord / PositionRecord / TradeRecord - lekkie rekordy (__slots__)
+  z tym samym interfejsem co modele ORM (calculate_pnl, win_rate, duration_minutes...),
+- PositionBook - autorytatywny stan konta: otwarte pozycje indeksowane po id i symbolu,
+- PaperJournal - dziennik operacji (JSON lines), dopisywany przed powrotem z open/close,
+- WriteBehindWriter - wątek przenoszący operacje partiami do bazy (PaperPosition,
+  PaperTrade, PaperAccount, TradeRegister); po awarii odtwarza operacje z dziennika
+  o numerze wyższym niż zapisany checkpoint.
+
+Gorąca ścieżka (get_open_positions, SL/TP, open/close) nie wykonuje zapytań do bazy.
+ID pozycji i transakcji są nadawane w procesie z pul zarezerwowanych w bazie
+(PaperIdBlock), więc kilka procesów może pisać do tych samych tabel paper_*.
+"""
+
+import json
+import os
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.trading.trigger_index import TriggerIndex, liquidation_price
+from src.trading.models import (
+    PaperAccount, PaperPosition, PaperTrade, PaperJournalCheckpoint, PaperIdBlock,
+    OrderSide, PositionStatus
+)
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Datetime z bazy (naiwne UTC) lub dziennika jako datetime ze strefą UTC."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Datetime jako naiwne UTC (tak jak zapisywane w bazie)."""
+    value = _as_utc(value)
+    return value.replace(tzinfo=None) if value is not None else None
+
+
+class JournalConflictError(RuntimeError):
+    """Operacji dziennika nie da się zastosować w bazie (kolizja ID lub brak wiersza konta)."""
+
+
+class AccountRecord:
+    """Stan konta paper trading w pamięci."""
+    
+    __slots__ = (
+        'id', 'name', 'initial_balance', 'current_balance', 'leverage',
+        'maker_fee', 'taker_fee', 'total_trades', 'winning_trades', 'losing_trades',
+        'total_pnl', 'max_drawdown', 'peak_balance'
+    )
+    
+    # Pola zapisywane w bazie przy każdej operacji (snapshot konta)
+    SNAPSHOT_FIELDS = (
+        'initial_balance', 'current_balance', 'total_trades', 'winning_trades',
+        'losing_trades', 'total_pnl', 'max_drawdown', 'peak_balance'
+    )
+    
+    win_rate = PaperAccount.win_rate
+    roi = PaperAccount.roi
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+    
+    @classmethod
+    def from_model(cls, account: PaperAccount) -> 'AccountRecord':
+        return cls(**{name: getattr(account, name) for name in cls.__slots__})
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+    
+    def __repr__(self):
+        return f"<PaperAccount {self.name}: ${self.current_balance:.2f}>"
+
+
+class PositionRecord:
+    """Otwarta pozycja paper trading w pamięci (interfejs jak PaperPosition)."""
+    
+    __slots__ = (
+        'id', 'account_id', 'symbol', 'side', 'size', 'entry_price', 'current_price',
+        'leverage', 'margin_used', 'stop_loss', 'take_profit', 'unrealized_pnl',
+        'unrealized_pnl_percent', 'status', 'opened_at', 'closed_at', 'strategy', 'notes'
+    )
+    
+    calculate_pnl = PaperPosition.calculate_pnl
+    is_liquidated = PaperPosition.is_liquidated
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+        if self.status is None:
+            self.status = PositionStatus.OPEN
+        if self.unrealized_pnl is None:
+            self.unrealized_pnl = 0.0
+        if self.unrealized_pnl_percent is None:
+            self.unrealized_pnl_percent = 0.0
+    
+    @classmethod
+    def from_model(cls, position: PaperPosition) -> 'PositionRecord':
+        record = cls(**{name: getattr(position, name) for name in cls.__slots__})
+        record.opened_at = _as_utc(record.opened_at)
+        record.closed_at = _as_utc(record.closed_at)
+        return record
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['side'] = self.side.value
+        data['status'] = self.status.value
+        data['opened_at'] = self.opened_at.isoformat() if self.opened_at else None
+        data['closed_at'] = self.closed_at.isoformat() if self.closed_at else None
+        return data
+    
+    def __repr__(self):
+        return f"<PaperPosition {self.symbol} {self.side.value} {self.size} @ {self.entry_price}>"
+
+
+class TradeRecord:
+    """Zamknięta transakcja paper trading w pamięci (interfejs jak PaperTrade)."""
+    
+    __slots__ = (
+        'id', 'account_id', 'symbol', 'side', 'entry_price', 'entry_time', 'size',
+        'leverage', 'exit_price', 'exit_time', 'entry_fee', 'exit_fee', 'total_fees',
+        'pnl', 'pnl_percent', 'net_pnl', 'strategy', 'exit_reason', 'notes'
+    )
+    
+    duration_minutes = PaperTrade.duration_minutes
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['side'] = self.side.value
+        data['entry_time'] = self.entry_time.isoformat()
+        data['exit_time'] = self.exit_time.isoformat()
+        return data
+    
+    def __repr__(self):
+        return f"<PaperTrade {self.symbol} {self.side.value}: ${self.net_pnl:.2f}>"
+
+
+class _IdAllocator:
+    """
+    Nadawanie ID wierszy w procesie (wspólne dla wszystkich kont jednej bazy).
+    
+    ID pochodzą z pul BLOCK_SIZE kolejnych wartości rezerwowanych w tabeli
+    paper_id_blocks w osobnej, od razu zatwierdzanej transakcji - inne procesy
+    na tej samej bazie dostają rozłączne pule. Baza w pamięci należy do jednego
+    procesu, więc tam wystarcza licznik od max(id) + 1.
+    """
+    
+    BLOCK_SIZE = 1000
+    MAX_RESERVE_ATTEMPTS = 10
+    
+    _lock = threading.Lock()
+    # (baza, tabela) -> [następne ID, ostatnie ID puli włącznie]
+    _blocks: Dict[Tuple[Any, str], List[int]] = {}
+    
+    @staticmethod
+    def _key(session: Session, model) -> Tuple[Any, str]:
+        # Każda baza w pamięci jest osobna mimo wspólnego URL
+        bind = session.get_bind()
+        database = id(bind) if is_memory_database(session) else str(bind.url)
+        return database, model.__tablename__
+    
+    @classmethod
+    def _reserve_block(cls, session: Session, model) -> List[int]:
+        if is_memory_database(session):
+            start = (session.query(func.max(model.id)).scalar() or 0) + 1
+            return [start, sys.maxsize]
+        
+        table = model.__tablename__
+        factory = sessionmaker(bind=session.get_bind())
+        for _ in range(cls.MAX_RESERVE_ATTEMPTS):
+            block_session = factory()
+            try:
+                start = max(
+                    block_session.query(func.max(model.id)).scalar() or 0,
+                    block_session.query(func.max(PaperIdBlock.end_id)).filter(
+                        PaperIdBlock.table_name == table
+                    ).scalar() or 0
+                ) + 1
+                block_session.add(PaperIdBlock(table_name=table, start_id=start, end_id=start + cls.BLOCK_SIZE - 1))
+                block_session.commit()
+                logger.debug(f"Zarezerwowano ID {table} {start}-{start + cls.BLOCK_SIZE - 1}")
+                return [start, start + cls.BLOCK_SIZE - 1]
+            except IntegrityError:
+                # Inny proces zarezerwował tę samą pulę - liczymy od nowa
+                block_session.rollback()
+            finally:
+                block_session.close()
+        raise RuntimeError(f"Nie udało się zarezerwować puli ID {table} po {cls.MAX_RESERVE_ATTEMPTS} próbach")
+    
+    @classmethod
+    def next_id(cls, session: Session, model) -> int:
+        key = cls._key(session, model)
+        with cls._lock:
+            block = cls._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                block = cls._blocks[key] = cls._reserve_block(session, model)
+            value = block[0]
+            block[0] += 1
+            return value
+    
+    @classmethod
+    def reserve(cls, session: Session, model):
+        """Przygotowuje pulę ID z wyprzedzeniem (pierwsze open/close bez zapytań do bazy)."""
+        key = cls._key(session, model)
+        with cls._lock:
+            block = cls._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                cls._blocks[key] = cls._reserve_block(session, model)
+
+
+class PositionBook:
+    """
+    Autorytatywny stan konta i otwartych pozycji w pamięci.
+    
+    Poziomy SL/TP/likwidacji otwartych pozycji są utrzymywane w TriggerIndex.
+    """
+    
+    def __init__(self, account: AccountRecord, positions: List[PositionRecord] = ()):
+        self.account = account
+        self.positions: Dict[int, PositionRecord] = {}
+        self.by_symbol: Dict[str, Dict[int, PositionRecord]] = {}
+        self.triggers = TriggerIndex()
+        for position in positions:
+            self.add(position)
+    
+    @classmethod
+    def load(cls, session: Session, account: PaperAccount) -> 'PositionBook':
+        """Wczytuje konto i otwarte pozycje z bazy (jedno zapytanie przy starcie)."""
+        positions = session.query(PaperPosition).filter(
+            PaperPosition.account_id == account.id,
+            PaperPosition.status == PositionStatus.OPEN
+        ).order_by(PaperPosition.id).all()
+        return cls(AccountRecord.from_model(account), [PositionRecord.from_model(p) for p in positions])
+    
+    def add(self, position: PositionRecord):
+        self.positions[position.id] = position
+        self.by_symbol.setdefault(position.symbol, {})[position.id] = position
+        self.triggers.add(
+            position.id, position.symbol, position.side.value,
+            stop_loss=position.stop_loss,
+            take_profit=position.take_profit,
+            liquidation=liquidation_price(position.side.value, position.entry_price, position.leverage)
+        )
+    
+    def remove(self, position_id: int) -> Optional[PositionRecord]:
+        position = self.positions.pop(position_id, None)
+        self.triggers.remove(position_id)
+        if position is not None:
+            symbol_positions = self.by_symbol.get(position.symbol, {})
+            symbol_positions.pop(position_id, None)
+            if not symbol_positions:
+                self.by_symbol.pop(position.symbol, None)
+        return position
+    
+    def get(self, position_id: int) -> Optional[PositionRecord]:
+        return self.positions.get(position_id)
+    
+    def open_positions(self, symbol: Optional[str] = None) -> List[PositionRecord]:
+        if symbol:
+            return list(self.by_symbol.get(symbol, {}).values())
+        return list(self.positions.values())
+
+
+class PaperJournal:
+    """
+    Dziennik operacji write-behind (JSON lines, jedna operacja na linię).
+    
+    Bez ścieżki (np. baza w pamięci) dziennik tylko numeruje operacje.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, fsync: bool = False):
+        """
+        Args:
+            path: Plik dziennika (None = bez zapisu na dysk)
+            fsync: Czy wymuszać zapis na dysk po każdej operacji
+        """
+        self.path = Path(path) if path else None
+        self.fsync = fsync
+        self.last_seq = 0
+        self._lock = threading.Lock()
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+    
+    def read(self) -> List[Dict[str, Any]]:
+        """Operacje zapisane w pliku (uszkodzona ostatnia linia po awarii jest pomijana)."""
+        if self.path is None or not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Pomijam uszkodzony wpis dziennika {self.path}")
+        if entries:
+            self.last_seq = max(self.last_seq, entries[-1]["seq"])
+        return entries
+    
+    def append(self, op: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Dopisuje operację i zwraca wpis z nadanym numerem."""
+        with self._lock:
+            self.last_seq += 1
+            entry = {"seq": self.last_seq, "op": op, "data": data}
+            if self._file is not None:
+                self._file.write(json.dumps(entry) + "\n")
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            return entry
+    
+    def truncate(self, flushed_seq: int):
+        """Czyści dziennik, jeśli wszystkie operacje są już w bazie."""
+        with self._lock:
+            if self._file is None or flushed_seq < self.last_seq:
+                return
+            self._file.truncate(0)
+            self._file.seek(0)
+    
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class WriteBehindWriter:
+    """
+    Zapis operacji księgi do bazy partiami w tle.
+    
+    Operacje (open, close, reset) trafiają do kolejki i dziennika; wątek co
+    flush_interval zapisuje wszystkie oczekujące operacje w jednej transakcji
+    razem z checkpointem. Wyceny pozycji (mark) nie są dziennikowane - zapisuje
+    się tylko ostatnią wycenę każdej pozycji.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        account_id: int,
+        journal: PaperJournal,
+        flush_interval: float = 1.0,
+        shared_session: Optional[Session] = None
+    ):
+        """
+        Args:
+            session_factory: Fabryka sesji wątku zapisu
+            account_id: ID konta
+            journal: Dziennik operacji
+            flush_interval: Odstęp między zapisami partii (sekundy, wątek z start())
+            shared_session: Sesja do zapisu bez wątku (np. baza w pamięci)
+        """
+        self.session_factory = session_factory
+        self.account_id = account_id
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.shared_session = shared_session
+        self.flushed_seq = 0
+        self.batches = 0
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._marks: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """Uruchamia wątek zapisu w tle (po odtworzeniu dziennika)."""
+        if self._thread is None and not self._stopped.is_set():
+            self._thread = threading.Thread(target=self._run, name=f"paper-writer-{self.account_id}", daemon=True)
+            self._thread.start()
+    
+    def _session(self) -> Session:
+        return self.shared_session if self.shared_session is not None else self.session_factory()
+    
+    def submit(self, op: str, data: Dict[str, Any]):
+        """Dziennikuje operację i dodaje ją do kolejki zapisu."""
+        entry = self.journal.append(op, data)
+        with self._lock:
+            self._pending.append(entry)
+    
+    def mark(self, position_id: int, **fields):
+        """Zapamiętuje ostatnią wycenę pozycji (zapis z najbliższą partią)."""
+        with self._lock:
+            self._marks[position_id] = fields
+    
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+    
+    def replay(self) -> int:
+        """
+        Zapisuje w bazie operacje z dziennika niezapisane przed awarią.
+        
+        Returns:
+            Liczba odtworzonych operacji
+        """
+        session = self._session()
+        try:
+            checkpoint = session.get(PaperJournalCheckpoint, self.account_id)
+            self.flushed_seq = checkpoint.seq if checkpoint else 0
+        finally:
+            if session is not self.shared_session:
+                session.close()
+        
+        entries = [e for e in self.journal.read() if e["seq"] > self.flushed_seq]
+        self.journal.last_seq = max(self.journal.last_seq, self.flushed_seq)
+        if entries:
+            logger.warning(f"Odtwarzam {len(entries)} operacji z dziennika {self.journal.path}")
+            with self._lock:
+                self._pending.extendleft(reversed(entries))
+            self.flush()
+        else:
+            self.journal.truncate(self.flushed_seq)
+        return len(entries)
+    
+    def _run(self):
+        # Operacje z całego odstępu trafiają do jednej partii
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Błąd zapisu write-behind konta {self.account_id}: {e}")
+    
+    def flush(self) -> int:
+        """
+        Zapisuje oczekujące operacje i wyceny w jednej transakcji.
+        
+        Returns:
+            Liczba zapisanych operacji
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries = list(self._pending)
+                marks, self._marks = self._marks, {}
+            if not entries and not marks:
+                return 0
+            
+            applied = 0
+            try:
+                self._write(entries, marks)
+                applied = len(entries)
+            except OperationalError:
+                # Błąd połączenia/blokady - operacje zostają w kolejce do kolejnej próby
+                self._restore_marks(marks)
+                raise
+            except Exception as e:
+                if not entries:
+                    self._restore_marks(marks)
+                    raise
+                # Partia odrzucona - zapis pojedynczy do pierwszej błędnej operacji. Błędna
+                # operacja i kolejne zostają w kolejce i dzienniku (checkpoint jej nie obejmuje)
+                logger.error(f"Błąd zapisu partii konta {self.account_id}: {e} - zapis pojedynczy")
+                try:
+                    for i, entry in enumerate(entries):
+                        self._write([entry], marks if i == len(entries) - 1 else {})
+                        applied = i + 1
+                except Exception as entry_error:
+                    failed = entries[applied]
+                    logger.error(
+                        f"Zapis konta {self.account_id} zatrzymany na operacji dziennika "
+                        f"{failed['seq']} ({failed['op']}): {entry_error}"
+                    )
+                    self._restore_marks(marks)
+                    raise
+                finally:
+                    self._mark_applied(entries[:applied])
+                return applied
+            
+            self._mark_applied(entries)
+            logger.debug(f"Write-behind konta {self.account_id}: {len(entries)} operacji, {len(marks)} wycen")
+            return len(entries)
+    
+    def _restore_marks(self, marks: Dict[int, Dict[str, Any]]):
+        with self._lock:
+            # Wyceny nowsze niż nieudana partia mają pierwszeństwo
+            self._marks = {**marks, **self._marks}
+    
+    def _mark_applied(self, entries: List[Dict[str, Any]]):
+        """Usuwa z kolejki operacje zapisane w bazie (razem z checkpointem)."""
+        with self._lock:
+            for _ in entries:
+                self._pending.popleft()
+        if entries:
+            self.flushed_seq = entries[-1]["seq"]
+            self.journal.truncate(self.flushed_seq)
+            self._update_trade_registers(entries)
+        self.batches += 1
+    
+    def _write(self, entries: List[Dict[str, Any]], marks: Dict[int, Dict[str, Any]]):
+        """Zapisuje operacje, wyceny i checkpoint w jednej transakcji."""
+        session = self._session()
+        try:
+            for entry in entries:
+                self._apply(session, entry)
+            for position_id, fields in marks.items():
+                session.query(PaperPosition).filter(
+                    PaperPosition.id == position_id,
+                    PaperPosition.account_id == self.account_id,
+                    PaperPosition.status == PositionStatus.OPEN
+                ).update(fields, synchronize_session=False)
+            if entries:
+                self._set_checkpoint(session, entries[-1]["seq"])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            if session is not self.shared_session:
+                session.close()
+    
+    def _set_checkpoint(self, session: Session, seq: int):
+        checkpoint = session.get(PaperJournalCheckpoint, self.account_id)
+        if checkpoint is None:
+            checkpoint = PaperJournalCheckpoint(account_id=self.account_id)
+            session.add(checkpoint)
+        checkpoint.seq = seq
+    
+    def close(self, flush: bool = True):
+        """Zatrzymuje wątek (domyślnie po zapisaniu oczekujących operacji)."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        try:
+            if flush:
+                self.flush()
+        finally:
+            self.journal.close()
+    
+    # === Zastosowanie operacji w bazie ===
+    
+    @staticmethod
+    def _position_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+        fields = dict(data)
+        fields['side'] = OrderSide(fields['side'])
+        fields['status'] = PositionStatus(fields['status'])
+        fields['opened_at'] = _naive_utc(fields['opened_at'])
+        fields['closed_at'] = _naive_utc(fields['closed_at'])
+        return fields
+    
+    def _check_existing(self, existing, model_name: str, row_id: int, account_id: int):
+        """
+        Wiersz o ID z dziennika już istnieje: ten sam wiersz konta (ponowienie) jest
+        pomijany, wiersz innego konta oznacza kolizję ID - zapis jest przerywany.
+        """
+        if existing.account_id != account_id or account_id != self.account_id:
+            raise JournalConflictError(
+                f"Kolizja ID {model_name} {row_id}: wiersz należy do konta {existing.account_id}, "
+                f"operacja do konta {self.account_id}"
+            )
+    
+    def _apply_account(self, session: Session, snapshot: Dict[str, Any]):
+        session.query(PaperAccount).filter(PaperAccount.id == self.account_id).update(
+            snapshot, synchronize_session=False
+        )
+    
+    def _apply(self, session: Session, entry: Dict[str, Any]):
+        op, data = entry["op"], entry["data"]
+        if op == "open":
+            fields = self._position_fields(data["position"])
+            existing = session.get(PaperPosition, fields['id'])
+            if existing is None:
+                session.add(PaperPosition(**fields))
+            else:
+                self._check_existing(existing, "paper_positions", fields['id'], fields['account_id'])
+            self._apply_account(session, data["account"])
+        elif op == "close":
+            fields = self._position_fields(data["position"])
+            updated = session.query(PaperPosition).filter(
+                PaperPosition.id == fields['id'],
+                PaperPosition.account_id == self.account_id
+            ).update({
+                name: fields[name]
+                for name in ('status', 'closed_at', 'current_price', 'unrealized_pnl', 'unrealized_pnl_percent')
+            }, synchronize_session=False)
+            if updated != 1:
+                raise JournalConflictError(
+                    f"Zamknięcie pozycji {fields['id']}: brak pozycji konta {self.account_id} w bazie"
+                )
+            trade = dict(data["trade"])
+            existing = session.get(PaperTrade, trade['id'])
+            if existing is None:
+                trade['side'] = OrderSide(trade['side'])
+                trade['entry_time'] = _naive_utc(trade['entry_time'])
+                trade['exit_time'] = _naive_utc(trade['exit_time'])
+                session.add(PaperTrade(**trade))
+            else:
+                self._check_existing(existing, "paper_trades", trade['id'], trade['account_id'])
+            self._apply_account(session, data["account"])
+        elif op == "reset":
+            session.query(PaperPosition).filter(
+                PaperPosition.account_id == self.account_id,
+                PaperPosition.status == PositionStatus.OPEN
+            ).update({
+                'status': PositionStatus.CLOSED,
+                'closed_at': _naive_utc(data["closed_at"])
+            }, synchronize_session=False)
+            self._apply_account(session, data["account"])
+        else:
+            raise JournalConflictError(f"Nieznana operacja dziennika: {op}")
+        session.flush()
+    
+    # === TradeRegister (opcjonalny, osobna transakcja jak wcześniej) ===
+    
+    def _update_trade_registers(self, entries: List[Dict[str, Any]]):
+        session = self._session()
+        try:
+            for entry in entries:
+                if entry["op"] == "open":
+                    self._create_trade_register_entry(session, entry["data"])
+                elif entry["op"] == "close":
+                    self._update_trade_register_on_exit(session, entry["data"])
+        finally:
+            if session is not self.shared_session:
+                session.close()
+    
+    def _create_trade_register_entry(self, session: Session, data: Dict[str, Any]):
+        """Tworzy wpis w TradeRegister dla otwartej pozycji."""
+        position, register = data["position"], data["register"]
+        try:
+            from src.trading.models_extended import TradeRegister, Strategy, TradingSession
+            
+            # Pobierz strategię z bazy
+            strategy = None
+            if position['strategy']:
+                strategy = session.query(Strategy).filter_by(
+                    name=position['strategy'].lower().replace(" ", "_")
+                ).first()
+            
+            # Pobierz aktywną sesję (jeśli istnieje)
+            trading_session = session.query(TradingSession).filter_by(
+                account_id=self.account_id,
+                ended_at=None
+            ).order_by(TradingSession.started_at.desc()).first()
+            
+            trade_register = TradeRegister(
+                account_id=self.account_id,
+                strategy_id=strategy.id if strategy else None,
+                symbol=position['symbol'],
+                side=position['side'],
+                mode="paper",
+                entry_timestamp=_naive_utc(position['opened_at']),
+                entry_price=position['entry_price'],
+                entry_size=position['size'],
+                entry_value_usd=register['entry_value_usd'],
+                leverage=position['leverage'],
+                margin_required=register['margin_required'],
+                margin_available_before=register['margin_available_before'],
+                stop_loss_price=position['stop_loss'],
+                take_profit_price=position['take_profit'],
+                fee_entry=register['entry_fee'],
+                signal_reason=position['notes'],
+                session_id=trading_session.session_id if trading_session else None,
+                notes=position['notes']
+            )
+            session.add(trade_register)
+            session.flush()
+            
+            # Zapisz ID TradeRegister w pozycji (dla późniejszego zaktualizowania)
+            notes = position['notes']
+            session.query(PaperPosition).filter(
+                PaperPosition.id == position['id'],
+                PaperPosition.account_id == self.account_id
+            ).update({
+                'notes': f"{notes} | TradeRegisterID: {trade_register.id}" if notes else f"TradeRegisterID: {trade_register.id}"
+            }, synchronize_session=False)
+            session.commit()
+            logger.debug(f"✅ Utworzono TradeRegister ID: {trade_register.id} dla pozycji {position['symbol']}")
+        except Exception as e:
+            session.rollback()
+            logger.error(f"❌ Nie udało się utworzyć TradeRegister: {e}")
+            # Nie przerywamy procesu - TradeRegister jest opcjonalny
+    
+    def _update_trade_register_on_exit(self, session: Session, data: Dict[str, Any]):
+        """Aktualizuje TradeRegister przy zamknięciu pozycji."""
+        position, trade, register = data["position"], data["trade"], data["register"]
+        try:
+            from src.trading.models_extended import TradeRegister
+            
+            # Znajdź TradeRegister dla tej pozycji (po symbolu i czasie wejścia)
+            trade_register = session.query(TradeRegister).filter_by(
+                account_id=self.account_id,
+                symbol=position['symbol'],
+                entry_timestamp=_naive_utc(position['opened_at']),
+                exit_timestamp=None  # Tylko otwarte
+            ).order_by(TradeRegister.created_at.desc()).first()
+            
+            if not trade_register:
+                logger.debug(f"Nie znaleziono TradeRegister dla pozycji {position['symbol']} @ {position['entry_price']}")
+                return
+            
+            exit_time = _as_utc(trade['exit_time'])
+            exit_price = trade['exit_price']
+            exit_value = position['size'] * exit_price
+            
+            trade_register.paper_trade_id = trade['id']
+            trade_register.exit_timestamp = exit_time
+            trade_register.exit_price = exit_price
+            trade_register.exit_reason = trade['exit_reason']
+            trade_register.pnl_gross = trade['pnl']
+            trade_register.pnl_net = trade['net_pnl']
+            trade_register.pnl_percent = trade['pnl_percent']
+            trade_register.fee_exit = trade['exit_fee']
+            trade_register.fee_total = trade_register.fee_entry + trade['exit_fee']
+            trade_register.duration_seconds = int((exit_time - _as_utc(position['opened_at'])).total_seconds())
+            trade_register.actual_exit_price = exit_price
+            trade_register.exit_slippage_percent = (register['slippage_amount'] / exit_value) * 100 if exit_value > 0 else 0
+            
+            # Sprawdź czy SL/TP zostały uruchomione
+            if trade['exit_reason'] == "stop_loss":
+                trade_register.stop_loss_triggered = True
+            elif trade['exit_reason'] == "take_profit":
+                trade_register.take_profit_triggered = True
+            
+            if register.get('notes'):
+                trade_register.notes = f"{trade_register.notes or ''} | {register['notes']}".strip()
+            
+            session.commit()
+            logger.debug(f"Zaktualizowano TradeRegister ID: {trade_register.id}")
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Nie udało się zaktualizować TradeRegister: {e}")
+            # Nie przerywamy procesu - TradeRegister jest opcjonalny
+
+
+def default_journal_path(session: Session, account_name: str) -> Optional[Path]:
+    """
+    Domyślny plik dziennika: obok pliku SQLite lub w data/paper_journal.
+    
+    Dla bazy w pamięci - None (brak trwałości do odtworzenia).
+    """
+    url = session.get_bind().url
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in account_name)
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            return None
+        db_path = Path(url.database)
+        return db_path.with_name(f"{db_path.stem}_journal") / f"{safe_name}.jsonl"
+    return Path(__file__).resolve().parents[2] / "data" / "paper_journal" / f"{safe_name}.jsonl"
+
+
+def is_memory_database(session: Session) -> bool:
+    """Baza SQLite w pamięci (połączenie per wątek - zapis tylko z wątku silnika)."""
+    url = session.get_bind().url
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def make_session_factory(session: Session) -> Callable[[], Session]:
+    """Fabryka sesji wątku zapisu na tym samym silniku co sesja silnika tradingu."""
+    return sessionmaker(bind=session.get_bind(), expire_on_commit=False)
@@ -0,0 +1,310 @@
+"""
+Backtest Result Store
+=====================
+Dyskowy cache wyników backtestu.
+
+Klucz uruchomienia to hash z:
+- kodu strategii (pliki źródłowe klasy i jej klas bazowych) i kodu silnika,
+- konfiguracji strategii,
+- ustawień silnika (kapitał, opłaty, slippage, dźwignia) i parametrów runu,
+- odcisku danych wejściowych (hash świec).
+
+Zmiana któregokolwiek elementu daje nowy klucz - powtórny run z tymi samymi
+danymi zwraca zapisany BacktestResult bez liczenia.
+
+Układ katalogu:
+    <katalog>/<klucz>/meta.json       - opis runu (strategia, parametry, statystyki)
+    <katalog>/<klucz>/equity.parquet  - BacktestResult.to_parquet
+    <katalog>/<klucz>/trades.parquet
+
+Użycie:
+    store = BacktestResultStore()
+    engine = BacktestEngine(result_store=store)
+    result = engine.run_backtest(strategy, "BTC-USD", df)  # drugi raz - z cache
+"""
+
+import hashlib
+import inspect
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.trading.backtesting import BacktestResult
+
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[2] / "data" / "backtest_results"
+
+# Statystyki zapisywane w meta.json (lista i porównanie runów bez czytania Parquet)
+SUMMARY_FIELDS = (
+    "total_return", "total_trades", "win_rate", "profit_factor",
+    "max_drawdown", "sharpe_ratio", "final_balance", "total_fees"
+)
+
+_source_hashes: Dict[str, str] = {}
+
+
+def _file_hash(path: str) -> str:
+    """Hash pliku źródłowego (cache per proces - pliki nie zmieniają się w trakcie runu)."""
+    digest = _source_hashes.get(path)
+    if digest is None:
+        digest = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        _source_hashes[path] = digest
+    return digest
+
+
+def strategy_fingerprint(strategy: Any) -> str:
+    """
+    Odcisk kodu strategii: hash plików źródłowych klasy i klas bazowych z projektu.
+    
+    Zmiana w strategii lub np. w BaseStrategy unieważnia zapisane wyniki.
+    """
+    digest = hashlib.sha256()
+    for cls in type(strategy).__mro__:
+        if cls is object:
+            continue
+        try:
+            path = inspect.getsourcefile(cls)
+        except TypeError:
+            continue
+        if path and Path(path).exists():
+            digest.update(f"{cls.__module__}.{cls.__qualname__}:{_file_hash(path)}".encode())
+    return digest.hexdigest()
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Odcisk danych wejściowych: hash wartości wszystkich kolumn i indeksu.
+    
+    Liczony wektorowo (pd.util.hash_pandas_object) - ~ms dla dziesiątek tysięcy świec.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha256(row_hashes.tobytes())
+    digest.update(json.dumps([str(c) for c in df.columns]).encode())
+    return digest.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+class BacktestResultStore:
+    """
+    Trwały cache wyników BacktestEngine.run_backtest.
+    """
+    
+    def __init__(self, directory: Union[str, Path, None] = None):
+        """
+        Inicjalizacja store'a.
+        
+        Args:
+            directory: Katalog wyników (domyślnie data/backtest_results)
+        """
+        self.directory = Path(directory) if directory else DEFAULT_STORE_DIR
+        self.hits = 0
+        self.misses = 0
+    
+    def make_key(
+        self,
+        strategy: Any,
+        symbol: str,
+        df: pd.DataFrame,
+        engine_settings: Dict[str, Any],
+        run_settings: Dict[str, Any]
+    ) -> str:
+        """
+        Wylicza klucz runu.
+        
+        Args:
+            strategy: Instancja strategii (kod + config)
+            symbol: Symbol pary
+            df: Dane wejściowe
+            engine_settings: Ustawienia silnika (kapitał, opłaty, slippage, dźwignia, wersja kodu)
+            run_settings: Parametry runu (position_size_percent, max_positions)
+        """
+        payload = {
+            "strategy": f"{type(strategy).__module__}.{type(strategy).__qualname__}",
+            "strategy_code": strategy_fingerprint(strategy),
+            "config": getattr(strategy, "config", {}),
+            "symbol": symbol,
+            "engine": engine_settings,
+            "run": run_settings,
+            "data": data_fingerprint(df),
+            "engine_code": _file_hash(inspect.getsourcefile(BacktestResult))
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=_json_default)
+        return hashlib.sha256(encoded.encode()).hexdigest()[:24]
+    
+    def _run_dir(self, key: str) -> Path:
+        return self.directory / key
+    
+    def get(self, key: str) -> Optional[BacktestResult]:
+        """Zwraca zapisany wynik lub None (uszkodzony wpis jest traktowany jak brak)."""
+        run_dir = self._run_dir(key)
+        if not (run_dir / "meta.json").exists():
+            self.misses += 1
+            return None
+        try:
+            result = BacktestResult.from_parquet(run_dir)
+        except Exception as e:
+            logger.warning(f"Nie udało się wczytać wyniku {key} z cache: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+    
+    def put(self, key: str, result: BacktestResult, meta: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Zapisuje wynik pod kluczem.
+        
+        meta.json jest zapisywany na końcu - jego obecność oznacza kompletny wpis.
+        Każdy zapis ma własny katalog tymczasowy, więc równoległe workery z tym
+        samym kluczem nie nadpisują sobie plików.
+        """
+        run_dir = self._run_dir(key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", suffix=".tmp", dir=self.directory))
+        stale_dir = tmp_dir.with_name(f"{tmp_dir.name}.old")
+        try:
+            result.to_parquet(tmp_dir)
+        
+            record = {
+                "key": key,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "symbol": result.symbol,
+                "strategy": result.strategy_name,
+                **(meta or {}),
+                "summary": {name: getattr(result, name) for name in SUMMARY_FIELDS}
+            }
+            (tmp_dir / "meta.json").write_text(
+                json.dumps(record, indent=2, default=_json_default), encoding="utf-8"
+            )
+            try:
+                tmp_dir.rename(run_dir)
+            except OSError:
+                # Wpis istnieje - odsuwamy go atomowo (bez rmtree w miejscu, które mógłby
+                # częściowo usunąć kompletny wpis innego workera) i wstawiamy nowy
+                try:
+                    run_dir.rename(stale_dir)
+                except FileNotFoundError:
+                    pass
+                try:
+                    tmp_dir.rename(run_dir)
+                except OSError:
+                    # Inny worker zdążył wstawić ten sam klucz (ten sam wynik) - zostaje jego wpis
+                    if not (run_dir / "meta.json").exists():
+                        raise
+                    logger.debug(f"Wynik {key} zapisany równolegle przez inny proces - pomijam")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        return run_dir
+    
+    def list_runs(self, strategy: Optional[str] = None, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lista zapisanych runów (najnowsze pierwsze).
+        
+        Args:
+            strategy: Filtr po nazwie strategii (podciąg, bez rozróżniania wielkości liter)
+            symbol: Filtr po symbolu
+        """
+        if not self.directory.exists():
+            return []
+        runs = []
+        for meta_path in self.directory.glob("*/meta.json"):
+            if meta_path.parent.name.startswith("."):
+                continue  # Zapis w toku (katalog tymczasowy)
+            try:
+                record = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if strategy and strategy.lower() not in str(record.get("strategy", "")).lower():
+                continue
+            if symbol and record.get("symbol") != symbol:
+                continue
+            record["size_bytes"] = sum(p.stat().st_size for p in meta_path.parent.iterdir())
+            runs.append(record)
+        return sorted(runs, key=lambda r: r.get("created_at", ""), reverse=True)
+    
+    def resolve(self, key_prefix: str) -> str:
+        """Rozwija prefiks klucza do pełnego klucza (ValueError, gdy brak lub niejednoznaczny)."""
+        matches = [p.name for p in self.directory.glob(f"{key_prefix}*") if (p / "meta.json").exists()]
+        if len(matches) != 1:
+            raise ValueError(
+                f"Prefiks '{key_prefix}' pasuje do {len(matches)} runów" if matches
+                else f"Brak runu o kluczu '{key_prefix}'"
+            )
+        return matches[0]
+    
+    def load(self, key_prefix: str) -> BacktestResult:
+        """Wczytuje wynik po kluczu lub jego prefiksie."""
+        return BacktestResult.from_parquet(self._run_dir(self.resolve(key_prefix)))
+    
+    def compare(self, key_prefixes: List[str]) -> pd.DataFrame:
+        """Tabela porównawcza runów (wiersze: runy, kolumny: statystyki i parametry)."""
+        runs = {r["key"]: r for r in self.list_runs()}
+        rows = []
+        for prefix in key_prefixes:
+            record = runs[self.resolve(prefix)]
+            rows.append({
+                "key": record["key"][:12],
+                "strategy": record.get("strategy"),
+                "symbol": record.get("symbol"),
+                **record.get("summary", {}),
+                **{f"param.{k}": v for k, v in (record.get("config") or {}).items()}
+            })
+        return pd.DataFrame(rows).set_index("key") if rows else pd.DataFrame()
+    
+    def prune(
+        self,
+        older_than: Optional[timedelta] = None,
+        keep_last: Optional[int] = None,
+        strategy: Optional[str] = None,
+        dry_run: bool = False
+    ) -> List[str]:
+        """
+        Usuwa zapisane runy.
+        
+        Args:
+            older_than: Usuń runy starsze niż podany wiek
+            keep_last: Zachowaj N najnowszych runów (per strategia)
+            strategy: Ogranicz do strategii (podciąg nazwy)
+            dry_run: Tylko zwróć klucze do usunięcia
+        
+        Returns:
+            Lista usuniętych (lub do usunięcia) kluczy
+        """
+        runs = self.list_runs(strategy=strategy)
+        to_remove = set()
+        
+        if older_than is not None:
+            cutoff = (datetime.now(timezone.utc) - older_than).isoformat(timespec="seconds")
+            to_remove.update(r["key"] for r in runs if r.get("created_at", "") < cutoff)
+        
+        if keep_last is not None:
+            seen: Dict[str, int] = {}
+            for record in runs:  # najnowsze pierwsze
+                name = record.get("strategy", "")
+                seen[name] = seen.get(name, 0) + 1
+                if seen[name] > keep_last:
+                    to_remove.add(record["key"])
+        
+        if older_than is None and keep_last is None:
+            to_remove.update(r["key"] for r in runs)
+        
+        if not dry_run:
+            for key in to_remove:
+                shutil.rmtree(self._run_dir(key), ignore_errors=True)
+            if to_remove:
+                logger.info(f"Usunięto {len(to_remove)} runów z {self.directory}")
+        return sorted(to_remove)
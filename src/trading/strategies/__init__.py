@@ -1,61 +1,140 @@
 """
 Strategie tradingowe.
+
+Klasy strategii są ładowane leniwie (przy pierwszym użyciu nazwy), więc import
+pakietu nie ciągnie zależności strategii, które nie są używane (LLM, scipy,
+kolektory sentymentu):
+
+    from src.trading.strategies import PiotrekBreakoutStrategy   # importuje tylko piotrek_strategy
+    strategy_class = get_strategy_class("under_human_strategy_1.4")
 """
 
-from .piotrek_strategy import PiotrekBreakoutStrategy
-from .scalping_strategy import ScalpingStrategy
-from .improved_breakout_strategy import ImprovedBreakoutStrategy
-from .funding_rate_arbitrage_strategy import FundingRateArbitrageStrategy
-from .sentiment_propagation_strategy import SentimentPropagationStrategy
-from .prompt_strategy import PromptStrategy
-from .prompt_strategy_v11 import PromptStrategyV11
-from .prompt_strategy_v12 import PromptStrategyV12
-from .piotr_swiec_strategy import PiotrSwiecStrategy
-from .piotr_swiec_prompt_strategy import PiotrSwiecPromptStrategy
-from .ultra_short_prompt_strategy import UltraShortPromptStrategy
-from .test_prompt_strategy import TestPromptStrategy
 # Import strategii - Python używa podkreśleń w importach nawet gdy plik ma kropki
 # Pliki: under_human_strategy_1.0.py → import jako under_human_strategy_1_0
+import importlib
 import importlib.util
 import sys
 from pathlib import Path
+from typing import List, Type
+
+from .base_strategy import BaseStrategy
 
 _strategies_dir = Path(__file__).parent
 
+# Klasa strategii -> plik modułu (bez .py)
+STRATEGY_MODULES = {
+    'PiotrekBreakoutStrategy': 'piotrek_strategy',
+    'ScalpingStrategy': 'scalping_strategy',
+    'ImprovedBreakoutStrategy': 'improved_breakout_strategy',
+    'FundingRateArbitrageStrategy': 'funding_rate_arbitrage_strategy',
+    'SentimentPropagationStrategy': 'sentiment_propagation_strategy',
+    'PromptStrategy': 'prompt_strategy',
+    'PromptStrategyV11': 'prompt_strategy_v11',
+    'PromptStrategyV12': 'prompt_strategy_v12',
+    'PiotrSwiecStrategy': 'piotr_swiec_strategy',
+    'PiotrSwiecPromptStrategy': 'piotr_swiec_prompt_strategy',
+    'UltraShortPromptStrategy': 'ultra_short_prompt_strategy',
+    'TestPromptStrategy': 'test_prompt_strategy',
+    'UnderhumanStrategyV10': 'under_human_strategy_1.0',
+    'UnderhumanStrategyV11': 'under_human_strategy_1.1',
+    'UnderhumanStrategyV12': 'under_human_strategy_1.2',
+    'UnderhumanStrategyV13': 'under_human_strategy_1.3',
+    'UnderhumanStrategyV14': 'under_human_strategy_1.4',
+    'UnderhumanStrategyV2': 'under_human_strategy_2.0',
+}
+
+# Nazwa strategii w konfiguracji/CLI -> klasa
+STRATEGY_NAMES = {
+    'piotrek_breakout_strategy': 'PiotrekBreakoutStrategy',
+    'scalping_strategy': 'ScalpingStrategy',
+    'improved_breakout_strategy': 'ImprovedBreakoutStrategy',
+    'funding_rate_arbitrage': 'FundingRateArbitrageStrategy',
+    'sentiment_propagation_strategy': 'SentimentPropagationStrategy',
+    'prompt_strategy': 'PromptStrategy',
+    'prompt_strategy_v11': 'PromptStrategyV11',
+    'prompt_strategy_v12': 'PromptStrategyV12',
+    'piotr_swiec_strategy': 'PiotrSwiecStrategy',
+    'piotr_swiec_prompt_strategy': 'PiotrSwiecPromptStrategy',
+    'ultra_short_prompt_strategy': 'UltraShortPromptStrategy',
+    'test_prompt_strategy': 'TestPromptStrategy',
+    'under_human_strategy_1.0': 'UnderhumanStrategyV10',
+    'under_human_strategy_1.1': 'UnderhumanStrategyV11',
+    'under_human_strategy_1.2': 'UnderhumanStrategyV12',
+    'under_human_strategy_1.3': 'UnderhumanStrategyV13',
+    'under_human_strategy_1.4': 'UnderhumanStrategyV14',
+    'under_human_strategy_2.0': 'UnderhumanStrategyV2',
+}
+
 # Helper do importowania plików z kropkami w nazwach
 def _import_strategy_module(module_name, file_name):
     """Importuje moduł z kropką w nazwie pliku używając importlib."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
     file_path = _strategies_dir / file_name
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     if spec and spec.loader:
         # Ustaw parent package dla relative importów
-        parent_name = __name__
-        if module_name not in sys.modules:
-            module = importlib.util.module_from_spec(spec)
-            module.__package__ = parent_name
-            sys.modules[module_name] = module
+        module = importlib.util.module_from_spec(spec)
+        module.__package__ = __name__
+        sys.modules[module_name] = module
+        try:
             spec.loader.exec_module(module)
-            return module
+        except BaseException:
+            del sys.modules[module_name]
+            raise
+        return module
     return None
 
-# Import wszystkich wersji under_human_strategy
-_module_1_0 = _import_strategy_module('under_human_strategy_1_0', 'under_human_strategy_1.0.py')
-_module_1_1 = _import_strategy_module('under_human_strategy_1_1', 'under_human_strategy_1.1.py')
-_module_1_2 = _import_strategy_module('under_human_strategy_1_2', 'under_human_strategy_1.2.py')
-_module_1_3 = _import_strategy_module('under_human_strategy_1_3', 'under_human_strategy_1.3.py')
-_module_1_4 = _import_strategy_module('under_human_strategy_1_4', 'under_human_strategy_1.4.py')
-_module_2_0 = _import_strategy_module('under_human_strategy_2_0', 'under_human_strategy_2.0.py')
-
-UnderhumanStrategyV10 = _module_1_0.UnderhumanStrategyV10 if _module_1_0 else None
-UnderhumanStrategyV11 = _module_1_1.UnderhumanStrategyV11 if _module_1_1 else None
-UnderhumanStrategyV12 = _module_1_2.UnderhumanStrategyV12 if _module_1_2 else None
-UnderhumanStrategyV13 = _module_1_3.UnderhumanStrategyV13 if _module_1_3 else None
-UnderhumanStrategyV14 = _module_1_4.UnderhumanStrategyV14 if _module_1_4 else None
-UnderhumanStrategyV2 = _module_2_0.UnderhumanStrategyV2 if _module_2_0 else None
-from .base_strategy import BaseStrategy
+
+def _load_strategy_module(module_file: str):
+    """Moduł strategii po nazwie pliku (pliki z kropką - przez importlib)."""
+    if '.' in module_file:
+        return _import_strategy_module(module_file.replace('.', '_'), f"{module_file}.py")
+    return importlib.import_module(f".{module_file}", __name__)
+
+
+def get_strategy_class(name: str) -> Type[BaseStrategy]:
+    """
+    Klasa strategii po nazwie klasy lub nazwie z konfiguracji (import przy pierwszym użyciu).
+
+    Args:
+        name: Np. "PiotrekBreakoutStrategy" lub "under_human_strategy_1.4"
+
+    Returns:
+        Klasa strategii
+
+    Raises:
+        ValueError: Nieznana strategia
+    """
+    class_name = STRATEGY_NAMES.get(name.lower(), name)
+    module_file = STRATEGY_MODULES.get(class_name)
+    if module_file is None:
+        raise ValueError(f"Nieznana strategia: {name} (dostępne: {', '.join(STRATEGY_NAMES)})")
+    strategy_class = getattr(_load_strategy_module(module_file), class_name)
+    globals()[class_name] = strategy_class
+    return strategy_class
+
+
+def available_strategies() -> List[str]:
+    """Nazwy strategii z konfiguracji/CLI."""
+    return list(STRATEGY_NAMES)
+
+
+def __getattr__(name: str):
+    # Leniwy import klas strategii (PEP 562)
+    if name in STRATEGY_MODULES:
+        return get_strategy_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(STRATEGY_MODULES))
+
 
 __all__ = [
     'BaseStrategy',
+    'get_strategy_class',
+    'available_strategies',
     'PiotrekBreakoutStrategy',
     'ScalpingStrategy',
     'ImprovedBreakoutStrategy',
@@ -75,4 +154,3 @@ __all__ = [
     'UnderhumanStrategyV14',
     'UnderhumanStrategyV2',
 ]
-
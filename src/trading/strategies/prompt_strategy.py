@@ -21,6 +21,7 @@ from src.analysis.llm.market_analyzer import MarketAnalyzerLLM
 from src.utils.api_logger import get_api_logger
 from src.analysis.market_news_analyzer import MarketNewsAnalyzer
 from src.utils.web_search import get_web_search_engine
+from src.utils.metrics import get_metrics
 
 
 class PromptStrategy(BaseStrategy):
@@ -390,12 +391,14 @@ class PromptStrategy(BaseStrategy):
                 sentiment_data = self.sentiment_cache[cache_key]
             else:
                 # Pobierz nowe dane
-                sentiment_data = self.news_analyzer.collect_market_sentiment(symbol)
+                with get_metrics().span("strategy.sentiment", strategy=self.name):
+                    sentiment_data = self.news_analyzer.collect_market_sentiment(symbol)
                 self.sentiment_cache[cache_key] = sentiment_data
                 self.sentiment_cache_time[cache_key] = now
         else:
             # Pierwsze pobranie
-            sentiment_data = self.news_analyzer.collect_market_sentiment(symbol)
+            with get_metrics().span("strategy.sentiment", strategy=self.name):
+                sentiment_data = self.news_analyzer.collect_market_sentiment(symbol)
             self.sentiment_cache[cache_key] = sentiment_data
             self.sentiment_cache_time[cache_key] = now
         
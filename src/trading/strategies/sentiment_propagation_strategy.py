@@ -17,6 +17,9 @@ Strategia:
 - Generuje sygnały BUY/SELL na podstawie wykrytych fal
 - Koreluje sentyment z cenami BTC
 
+Backtest (use_sentiment_snapshots=True): analiza as-of świecy z SentimentSnapshots
+zamiast run_full_analysis (który liczy okno względem bieżącej daty).
+
 Autor: AI Assistant
 Data: 2025-12-18
 """
@@ -31,7 +34,8 @@ from .base_strategy import BaseStrategy, TradingSignal, SignalType
 from src.collectors.sentiment import (
     SentimentWaveTracker,
     SentimentPropagationAnalyzer,
-    PropagationDirection
+    PropagationDirection,
+    SentimentSnapshots
 )
 
 
@@ -108,6 +112,12 @@ class SentimentPropagationStrategy(BaseStrategy):
         # Tryb backtestingu
         self._backtest_mode = self.config.get("_backtest_mode", False)
         
+        # Snapshoty point-in-time (backtest): budowane przy pierwszej analizie lub podane z zewnątrz
+        self.use_sentiment_snapshots = self.config.get("use_sentiment_snapshots", False)
+        self.snapshots: Optional[SentimentSnapshots] = None
+        if self._backtest_mode and not self.use_sentiment_snapshots:
+            logger.warning("Backtest bez use_sentiment_snapshots - analiza używa bieżących danych sentymentu (datetime.now)")
+        
         logger.info(f"Strategia {self.name} zainicjalizowana")
         logger.info(f"Kraje: {self.countries}, Query: {self.query}")
     
@@ -128,10 +138,14 @@ class SentimentPropagationStrategy(BaseStrategy):
         
         # Pobierz aktualną cenę
         current_price = float(df["close"].iloc[-1])
-        current_time = df.index[-1]
-        
-        # Sprawdź cache
-        if self._should_refresh_analysis(current_time):
+        current_time = self._candle_time(df, -1)
+        
+        if self.use_sentiment_snapshots:
+            # Analiza z danych dostępnych w chwili świecy (odczyt O(1))
+            results = self._get_snapshots(df).analysis_at(current_time)
+            self._last_analysis = results
+            self._last_analysis_time = current_time
+        elif self._should_refresh_analysis(current_time):  # Sprawdź cache
             logger.info("Aktualizuję analizę propagacji sentymentu...")
             
             try:
@@ -333,6 +347,30 @@ class SentimentPropagationStrategy(BaseStrategy):
         
         return None
     
+    def _get_snapshots(self, df: pd.DataFrame) -> SentimentSnapshots:
+        """Snapshoty sentymentu od pierwszej świecy do końca danych w bazie (budowane raz)."""
+        if self.snapshots is None:
+            # Błąd budowy przerywa backtest - puste snapshoty dałyby po cichu zero sygnałów
+            self.snapshots = SentimentSnapshots.from_database(
+                self.tracker.db,
+                symbol=self.symbol,
+                regions=self.countries,
+                start=self._candle_time(df, 0),
+                days_back=self.days_back,
+                analyzer=self.tracker.analyzer,
+                use_llm_data=self.tracker.use_llm_data,
+                query=self.query,
+                recent_wave_hours=self.recent_wave_hours
+            )
+        return self.snapshots
+    
+    @staticmethod
+    def _candle_time(df: pd.DataFrame, position: int):
+        """Czas świecy z kolumny timestamp (okna BacktestEngine mają RangeIndex) lub z indeksu."""
+        if 'timestamp' in df.columns:
+            return pd.Timestamp(df['timestamp'].iloc[position])
+        return df.index[position]
+    
     def _should_refresh_analysis(self, current_time: pd.Timestamp) -> bool:
         """Sprawdza czy należy odświeżyć analizę."""
         if self._last_analysis_time is None:
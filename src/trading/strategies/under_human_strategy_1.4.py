@@ -17,11 +17,13 @@ NIE zawiera (bo pogarszało wyniki w V1.2/V1.3):
 - Dynamiczny rozmiar pozycji
 """
 
+import os
 from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
 
 from .base_strategy import BaseStrategy, TradingSignal, SignalType
 from src.collectors.exchange.dydx_collector import DydxCollector
@@ -62,6 +64,12 @@ class UnderhumanStrategyV14(BaseStrategy):
         # Funding/OI
         self.funding_divergence_z = self.config.get("funding_divergence_z", 1.2)
         self.oi_divergence_z = self.config.get("oi_divergence_z", 1.2)
+        
+        # Historia funding/OI w backtestach (tabela tickers, scripts/load_funding_oi_data.py)
+        self.market_data_exchange = self.config.get("market_data_exchange", "binance")
+        self.funding_symbol = self.config.get("funding_symbol")  # Domyślnie np. BTC/USDC
+        self.open_interest_symbol = self.config.get("open_interest_symbol")  # Domyślnie np. BTC/USDT:USDT
+        self._market_data_store = None
 
         # Reaction delay
         self.delay_threshold = self.config.get("delay_threshold", 1.35)
@@ -325,9 +333,30 @@ class UnderhumanStrategyV14(BaseStrategy):
             return None
         return (bid_vol - ask_vol) / total
 
+    def _get_market_data_store(self):
+        """Wspólny (między backtestami) store historii funding/OI."""
+        if self._market_data_store is None:
+            from src.trading.market_data_store import FundingOIStore
+            self._market_data_store = FundingOIStore.shared(
+                database_url=os.getenv('DATABASE_URL'), exchange=self.market_data_exchange
+            )
+        return self._market_data_store
+
     def _enrich_df_with_market_data(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        if self._backtest_mode:
+            # Backtest: wartości znane w czasie każdej świecy (as-of), bez zaglądania w przyszłość
+            try:
+                return self._get_market_data_store().enrich(
+                    df, symbol,
+                    funding_symbol=self.funding_symbol,
+                    open_interest_symbol=self.open_interest_symbol
+                )
+            except (SQLAlchemyError, ImportError) as e:
+                # Baza niedostępna (zły DATABASE_URL, brak sterownika) - backtest bez funding/OI
+                logger.warning(f"Brak historii funding/OI dla backtestu: {e}")
+                return df.copy()
         df_enriched = df.copy()
-        if self._backtest_mode or self.dydx_collector is None:
+        if self.dydx_collector is None:
             return df_enriched
         try:
             if "funding_rate" not in df_enriched.columns:
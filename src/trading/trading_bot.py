@@ -13,6 +13,7 @@ from threading import Thread, Event
 from loguru import logger
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from src.collectors.exchange.dydx_collector import DydxCollector
@@ -20,6 +21,19 @@ from src.trading.paper_trading import PaperTradingEngine
 from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.trading.models import PaperPosition, OrderSide
+from src.utils.metrics import get_metrics, start_metrics_server
+
+
+def create_trading_tables(engine: Engine):
+    """Tworzy tabele tradingu - wszystkie Base muszą być zaimportowane."""
+    from src.trading.models import Base as TradingBase
+    from src.database.models import Base as DatabaseBase
+    
+    # Import modeli z models_extended (używają DatabaseBase)
+    from src.trading.models_extended import Strategy, TradeRegister, TradingSession
+    
+    TradingBase.metadata.create_all(engine)
+    DatabaseBase.metadata.create_all(engine)  # To tworzy też tabele z models_extended
 
 
 class TradingBot:
@@ -41,7 +55,10 @@ class TradingBot:
         symbols: List[str] = None,
         strategy: Optional[BaseStrategy] = None,
         check_interval: int = 60,  # sekundy
-        position_size_config: Optional[dict] = None
+        position_size_config: Optional[dict] = None,
+        metrics_port: Optional[int] = None,
+        db_engine: Optional[Engine] = None,
+        dydx_collector: Optional[DydxCollector] = None
     ):
         """
         Inicjalizacja bota.
@@ -53,30 +70,36 @@ class TradingBot:
             symbols: Lista symboli do monitorowania
             strategy: Strategia tradingowa
             check_interval: Interwał sprawdzania (sekundy)
+            metrics_port: Port lokalnego serwera metryk (/metrics, /metrics.json);
+                None = bez serwera (metryki włącza też METRICS_ENABLED=1)
+            db_engine: Współdzielony silnik bazy (tabele tworzy właściciel silnika);
+                None = własny silnik z database_url
+            dydx_collector: Współdzielony kolektor lub MarketSnapshot (None = nowy DydxCollector)
         """
         self.symbols = symbols or ["BTC-USD", "ETH-USD"]
         self.check_interval = check_interval
         self.running = False
         self._stop_event = Event()
         
-        # Baza danych
-        self.engine = create_engine(database_url, echo=False)
-        
-        # Utwórz tabele - wszystkie Base muszą być zaimportowane
-        from src.trading.models import Base as TradingBase
-        from src.database.models import Base as DatabaseBase
+        # Metryki czasów etapów cyklu
+        self.metrics = get_metrics()
+        self._metrics_server = None
+        if metrics_port:
+            self.metrics.enable()
+            self._metrics_server = start_metrics_server(metrics_port)
         
-        # Import modeli z models_extended (używają DatabaseBase)
-        from src.trading.models_extended import Strategy, TradeRegister, TradingSession
-        
-        TradingBase.metadata.create_all(self.engine)
-        DatabaseBase.metadata.create_all(self.engine)  # To tworzy też tabele z models_extended
+        # Baza danych
+        if db_engine is not None:
+            self.engine = db_engine
+        else:
+            self.engine = create_engine(database_url, echo=False)
+            create_trading_tables(self.engine)
         
         Session = sessionmaker(bind=self.engine)
         self.session = Session()
         
         # dYdX collector
-        self.dydx = DydxCollector(testnet=False)
+        self.dydx = dydx_collector or DydxCollector(testnet=False)
         
         # Paper trading engine
         # Pobierz slippage z konfiguracji strategii lub użyj domyślnego
@@ -301,17 +324,35 @@ class TradingBot:
         """Wykonuje jeden cykl sprawdzania."""
         logger.debug("--- Rozpoczynam cykl sprawdzania ---")
         
+        with self.metrics.span("trading_bot.run_cycle"):
+            self._run_cycle_stages()
+        
+        # 5. Pokaż statystyki API LLM (jeśli używane)
+        try:
+            from src.utils.api_logger import get_api_logger
+            api_logger = get_api_logger()
+            api_logger.print_session_stats()
+        except Exception:
+            pass  # Ignoruj błędy jeśli API logger nie jest dostępny
+    
+    def _run_cycle_stages(self):
+        """Etapy cyklu (każdy mierzony osobnym spanem)."""
+        metrics = self.metrics
+        
         # 1. Sprawdź SL/TP dla otwartych pozycji
-        closed_trades = self.engine_pt.check_stop_loss_take_profit()
+        with metrics.span("trading_bot.check_stop_loss_take_profit"):
+            closed_trades = self.engine_pt.check_stop_loss_take_profit()
         for trade in closed_trades:
             logger.info(f"🛑 Pozycja zamknięta przez SL/TP: {trade}")
         
         # 2. Sprawdź pozycje pod kątem strategii wyjścia
-        self.check_positions_for_exit()
+        with metrics.span("trading_bot.check_positions_for_exit"):
+            self.check_positions_for_exit()
         
         # 3. Szukaj nowych okazji
         for symbol in self.symbols:
-            df = self.get_market_data(symbol, limit=50)
+            with metrics.span("trading_bot.get_market_data", symbol=symbol):
+                df = self.get_market_data(symbol, limit=50)
             if df is None or df.empty:
                 logger.warning(f"⚠️  Brak danych dla {symbol} - pomijam")
                 continue
@@ -324,30 +365,25 @@ class TradingBot:
             timeframe = getattr(self.strategy, 'timeframe', '1h')
             logger.debug(f"📊 Analizuję {symbol} (strategia: {self.strategy.name}, timeframe: {timeframe}, dane: {len(df)} świec)")
             
-            signal = self.strategy.analyze(df, symbol)
+            with metrics.span("trading_bot.strategy_analyze", strategy=self.strategy.name, symbol=symbol):
+                signal = self.strategy.analyze(df, symbol)
             
             if signal:
                 logger.info(f"🎯 [{self.strategy.name}] Sygnał dla {symbol}: {signal}")
                 logger.info(f"   Powód: {signal.reason}")
-                self.process_signal(signal)
+                with metrics.span("trading_bot.process_signal", symbol=symbol):
+                    self.process_signal(signal)
             else:
                 logger.debug(f"   [{self.strategy.name}] Brak sygnału dla {symbol}")
         
         # 4. Pokaż podsumowanie
-        summary = self.engine_pt.get_account_summary()
+        with metrics.span("trading_bot.account_summary"):
+            summary = self.engine_pt.get_account_summary()
         logger.info(
             f"💰 Konto: ${summary['equity']:.2f} | "
             f"PnL: ${summary['total_pnl']:.2f} | "
             f"Pozycje: {summary['open_positions']}"
         )
-        
-        # 5. Pokaż statystyki API LLM (jeśli używane)
-        try:
-            from src.utils.api_logger import get_api_logger
-            api_logger = get_api_logger()
-            api_logger.print_session_stats()
-        except Exception:
-            pass  # Ignoruj błędy jeśli API logger nie jest dostępny
     
     def start(self, daemon: bool = False):
         """
@@ -380,7 +416,6 @@ class TradingBot:
         """Tworzy sesję tradingową w bazie danych."""
         try:
             from src.trading.models_extended import TradingSession, Strategy
-            from datetime import datetime, timezone
             
             # Pobierz strategię z bazy
             strategy = self.session.query(Strategy).filter_by(
@@ -453,6 +488,13 @@ class TradingBot:
         logger.info(f"Liczba transakcji: {stats['total_trades']}")
         logger.info(f"Win rate: {stats['win_rate']:.1f}%")
         logger.info(f"Max drawdown: {summary['max_drawdown']:.2f}%")
+        
+        # Zapisz oczekujące zmiany paper tradingu i zatrzymaj wątek zapisu
+        self.engine_pt.close()
+        
+        if self._metrics_server is not None:
+            self._metrics_server.shutdown()
+            self._metrics_server = None
     
     def _close_trading_session(self):
         """Zamyka sesję tradingową w bazie danych."""
@@ -460,8 +502,6 @@ class TradingBot:
             return
         
         try:
-            from datetime import datetime, timezone
-            
             # Odśwież sesję z bazy
             self.trading_session = self.session.query(type(self.trading_session)).filter_by(
                 id=self.trading_session.id
@@ -532,7 +572,8 @@ def main():
             'min_confidence': 5,
             'risk_reward_ratio': 2.0
         }),
-        check_interval=300  # 5 minut
+        check_interval=300,  # 5 minut
+        metrics_port=int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None
     )
     
     # Obsługa SIGINT (Ctrl+C)
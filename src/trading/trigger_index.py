@@ -0,0 +1,181 @@
+"""
+Trigger Index
+=============
+Indeks poziomów wyzwalających pozycji (stop loss, take profit, likwidacja)
+per symbol - wspólny dla PaperTradingEngine i BacktestEngine.
+
+Dla każdego symbolu dwa kopce:
+- "spadek" - wyzwalane, gdy cena <= poziom (SL i likwidacja LONG, TP SHORT),
+- "wzrost" - wyzwalane, gdy cena >= poziom (TP LONG, SL i likwidacja SHORT).
+
+Aktualizacja ceny zdejmuje z kopców tylko przekroczone poziomy - O(k log n)
+zamiast sprawdzania wszystkich otwartych pozycji. Usunięcie pozycji jest leniwe
+(wpisy usuniętych pozycji są pomijane przy zdejmowaniu).
+
+Użycie:
+    index = TriggerIndex()
+    index.add(1, "BTC-USD", "long", stop_loss=48000, take_profit=55000)
+    index.pop_triggered("BTC-USD", 47500)  # [(1, "stop_loss")]
+"""
+
+import heapq
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Kolejność powodów, gdy jedna cena przekracza kilka poziomów tej samej pozycji
+TRIGGER_PRIORITY = ("liquidation", "stop_loss", "take_profit")
+
+# (klucz kopca, licznik, id pozycji, wersja wpisu, powód)
+_Entry = Tuple[float, int, Hashable, int, str]
+
+
+def liquidation_price(side: str, entry_price: float, leverage: float) -> Optional[float]:
+    """
+    Cena likwidacji (strata 100% marginu, jak PaperPosition.is_liquidated).
+    
+    Returns:
+        Cena likwidacji lub None (LONG bez dźwigni nie jest likwidowany)
+    """
+    if not leverage or leverage <= 0:
+        return None
+    if _is_long(side):
+        price = entry_price * (1 - 1 / leverage)
+        return price if price > 0 else None
+    return entry_price * (1 + 1 / leverage)
+
+
+def _is_long(side) -> bool:
+    return str(getattr(side, "value", side)).lower() == "long"
+
+
+class _SymbolTriggers:
+    """Kopce poziomów jednego symbolu."""
+    
+    __slots__ = ("falls", "rises", "positions")
+    
+    def __init__(self):
+        # falls: max-kopiec (klucz = -poziom), rises: min-kopiec (klucz = poziom)
+        self.falls: List[_Entry] = []
+        self.rises: List[_Entry] = []
+        self.positions = 0
+    
+    def compact(self, is_live):
+        """Usuwa z kopców wpisy nieaktualnych pozycji."""
+        self.falls = [e for e in self.falls if is_live(e)]
+        self.rises = [e for e in self.rises if is_live(e)]
+        heapq.heapify(self.falls)
+        heapq.heapify(self.rises)
+
+
+class TriggerIndex:
+    """
+    Indeks poziomów SL/TP/likwidacji otwartych pozycji.
+    """
+    
+    def __init__(self):
+        self._symbols: Dict[str, _SymbolTriggers] = {}
+        # id pozycji -> (symbol, aktualna wersja wpisów)
+        self._positions: Dict[Hashable, Tuple[str, int]] = {}
+        self._counter = 0
+        self._version = 0
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def __contains__(self, position_id: Hashable) -> bool:
+        return position_id in self._positions
+    
+    def add(
+        self,
+        position_id: Hashable,
+        symbol: str,
+        side: str,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        liquidation: Optional[float] = None
+    ):
+        """
+        Rejestruje (lub zastępuje) poziomy pozycji.
+        
+        Args:
+            position_id: Identyfikator pozycji
+            symbol: Symbol rynku
+            side: "long"/"short" (lub OrderSide)
+            stop_loss: Cena stop loss
+            take_profit: Cena take profit
+            liquidation: Cena likwidacji
+        """
+        self.remove(position_id)
+        self._version += 1
+        version = self._version
+        self._positions[position_id] = (symbol, version)
+        triggers = self._symbols.get(symbol)
+        if triggers is None:
+            triggers = self._symbols[symbol] = _SymbolTriggers()
+        triggers.positions += 1
+        
+        long = _is_long(side)
+        levels = (("liquidation", liquidation), ("stop_loss", stop_loss), ("take_profit", take_profit))
+        for reason, level in levels:
+            if not level:
+                continue
+            level = float(level)
+            # LONG: SL i likwidacja przy spadku, TP przy wzroście; SHORT odwrotnie
+            falls = long != (reason == "take_profit")
+            self._counter += 1
+            if falls:
+                heapq.heappush(triggers.falls, (-level, self._counter, position_id, version, reason))
+            else:
+                heapq.heappush(triggers.rises, (level, self._counter, position_id, version, reason))
+    
+    def remove(self, position_id: Hashable):
+        """Usuwa pozycję z indeksu (wpisy w kopcach są pomijane przy zdejmowaniu)."""
+        entry = self._positions.pop(position_id, None)
+        if entry is None:
+            return
+        triggers = self._symbols[entry[0]]
+        triggers.positions -= 1
+        if triggers.positions == 0:
+            # Ostatnia pozycja symbolu - zwolnij kopce od razu
+            del self._symbols[entry[0]]
+        elif len(triggers.falls) + len(triggers.rises) > 6 * triggers.positions + 64:
+            # Wpisy usuniętych pozycji przeważają - przebuduj kopce (koszt zamortyzowany)
+            triggers.compact(self._is_live)
+    
+    def _is_live(self, entry: _Entry) -> bool:
+        current = self._positions.get(entry[2])
+        return current is not None and current[1] == entry[3]
+    
+    def pop_triggered(self, symbol: str, price: float) -> List[Tuple[Hashable, str]]:
+        """
+        Zdejmuje pozycje, których poziomy przekroczyła cena.
+        
+        Zdjęte pozycje są usuwane z indeksu.
+        
+        Args:
+            symbol: Symbol rynku
+            price: Aktualna cena
+        
+        Returns:
+            Lista (id pozycji, powód) w kolejności rejestracji poziomów
+        """
+        triggers = self._symbols.get(symbol)
+        if triggers is None:
+            return []
+        
+        hits: Dict[Hashable, Tuple[int, str]] = {}
+        for heap, crossed in (
+            (triggers.falls, lambda key: -key >= price),
+            (triggers.rises, lambda key: key <= price)
+        ):
+            while heap and crossed(heap[0][0]):
+                entry = heapq.heappop(heap)
+                if not self._is_live(entry):
+                    continue
+                _, counter, position_id, _, reason = entry
+                previous = hits.get(position_id)
+                if previous is None or TRIGGER_PRIORITY.index(reason) < TRIGGER_PRIORITY.index(previous[1]):
+                    hits[position_id] = (counter, reason)
+        
+        for position_id in hits:
+            self.remove(position_id)
+        return [(position_id, reason) for position_id, (_, reason) in sorted(hits.items(), key=lambda item: item[1][0])]
@@ -0,0 +1,391 @@
+"""
+Walk-Forward Optimization
+=========================
+Optymalizacja walk-forward na BacktestEngine: historia dzielona jest na foldy
+in-sample (optymalizacja parametrów) / out-of-sample (test), rolling lub anchored.
+Parametry każdego foldu są optymalizowane równolegle w procesach, krzywe kapitału
+out-of-sample są sklejane, a raport zawiera metryki stabilności.
+
+Dane są pobierane raz i przekazywane do każdego procesu roboczego tylko raz
+(initializer puli) - zadania niosą jedynie parametry i zakres indeksów foldu.
+
+Użycie:
+    optimizer = WalkForwardOptimizer(
+        PiotrekBreakoutStrategy, {"breakout_threshold": [0.5, 0.8]},
+        in_sample_candles=24 * 60, out_of_sample_candles=24 * 14, max_workers=4
+    )
+    result = optimizer.run(df, symbol="BTC-USD")
+"""
+
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.trading.backtesting import BacktestEngine, BacktestResult
+
+
+# run_backtest zaczyna analizę od 50. świecy - tyle historii dokleja się przed foldem
+WARMUP_CANDLES = 50
+
+Objective = Union[str, Callable[[BacktestResult], float]]
+
+
+@dataclass
+class WalkForwardFold:
+    """Fold walk-forward: zakresy indeksów (end wyłącznie) i wyniki."""
+    index: int
+    in_sample: Tuple[int, int]
+    out_of_sample: Tuple[int, int]
+    best_params: Dict[str, Any] = field(default_factory=dict)
+    in_sample_score: float = float("nan")
+    in_sample_return: float = 0.0      # %
+    out_of_sample_score: float = float("nan")
+    out_of_sample_return: float = 0.0  # %
+    out_of_sample_trades: int = 0
+    out_of_sample_max_drawdown: float = 0.0  # %
+    candidates: int = 0
+
+
+@dataclass
+class WalkForwardResult:
+    """Wyniki walk-forward: foldy, sklejona krzywa OOS i metryki stabilności."""
+    folds: List[WalkForwardFold] = field(default_factory=list)
+    equity_curve: pd.Series = field(default_factory=lambda: pd.Series(dtype=float))
+    
+    total_return: float = 0.0          # % (sklejone OOS)
+    max_drawdown: float = 0.0          # %
+    sharpe_ratio: float = 0.0
+    
+    # Stabilność
+    walk_forward_efficiency: float = 0.0  # zwrot OOS / zwrot IS (na świecę)
+    profitable_folds_percent: float = 0.0
+    out_of_sample_return_std: float = 0.0
+    parameter_stability: Dict[str, float] = field(default_factory=dict)  # udział foldów z dominującą wartością
+    
+    def __repr__(self):
+        return (
+            f"WalkForwardResult("
+            f"folds={len(self.folds)}, "
+            f"oos_return={self.total_return:.2f}%, "
+            f"max_dd={self.max_drawdown:.2f}%, "
+            f"wfe={self.walk_forward_efficiency:.2f}, "
+            f"profitable_folds={self.profitable_folds_percent:.0f}%)"
+        )
+
+
+def generate_param_grid(param_grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Zwraca wszystkie kombinacje parametrów z siatki."""
+    keys = list(param_grid)
+    return [dict(zip(keys, values)) for values in product(*(param_grid[key] for key in keys))]
+
+
+def score_result(result: BacktestResult, objective: Objective, min_trades: int = 1) -> float:
+    """
+    Ocena wyniku backtestu (większa = lepsza).
+    
+    Args:
+        result: Wynik backtestu
+        objective: Nazwa pola BacktestResult (np. "sharpe_ratio") lub funkcja
+        min_trades: Minimalna liczba transakcji (mniej = -inf)
+    """
+    if result.total_trades < min_trades:
+        return float("-inf")
+    value = objective(result) if callable(objective) else getattr(result, objective)
+    value = float(value)
+    return value if math.isfinite(value) else float("-inf")
+
+
+# === Procesy robocze ===
+# Stan procesu ustawiany raz przez initializer puli (lub lokalnie przy max_workers=1)
+
+_worker_df: Optional[pd.DataFrame] = None
+_worker_engine: Optional[BacktestEngine] = None
+_worker_settings: Dict[str, Any] = {}
+
+
+def _init_worker(df: pd.DataFrame, engine_kwargs: Dict[str, Any], settings: Dict[str, Any], quiet: bool = True):
+    global _worker_df, _worker_engine, _worker_settings
+    if quiet:
+        # Logi per świeca z wielu procesów tylko zaśmiecają wyjście i spowalniają
+        logger.remove()
+        import src.trading.backtesting as backtesting
+        backtesting.TQDM_AVAILABLE = False
+    _worker_df = df
+    _worker_engine = BacktestEngine(**engine_kwargs)
+    _worker_settings = settings
+
+
+def _run_window(strategy_class: Type, params: Dict[str, Any], start: int, end: int) -> BacktestResult:
+    """Backtest na świecach [start, end) z doklejoną rozgrzewką."""
+    window = _worker_df.iloc[max(0, start - WARMUP_CANDLES):end].reset_index(drop=True)
+    strategy = strategy_class({**_worker_settings["base_params"], **params})
+    return _worker_engine.run_backtest(
+        strategy=strategy,
+        symbol=_worker_settings["symbol"],
+        df=window,
+        position_size_percent=_worker_settings["position_size_percent"],
+        max_positions=_worker_settings["max_positions"]
+    )
+
+
+def _evaluate_task(task: Tuple[int, int, Type, Dict[str, Any], int, int]) -> Tuple[int, int, float, float]:
+    """Zadanie in-sample: zwraca (fold, kandydat, score, zwrot %) - bez pełnego wyniku (mniej IPC)."""
+    fold_index, candidate_index, strategy_class, params, start, end = task
+    try:
+        result = _run_window(strategy_class, params, start, end)
+    except Exception as e:
+        logger.warning(f"Fold {fold_index}: błąd backtestu dla {params}: {e}")
+        return fold_index, candidate_index, float("-inf"), 0.0
+    score = score_result(result, _worker_settings["objective"], _worker_settings["min_trades"])
+    return fold_index, candidate_index, score, result.total_return
+
+
+def _out_of_sample_task(task: Tuple[int, Type, Dict[str, Any], int, int]) -> Tuple[int, BacktestResult]:
+    fold_index, strategy_class, params, start, end = task
+    return fold_index, _run_window(strategy_class, params, start, end)
+
+
+class WalkForwardOptimizer:
+    """
+    Optymalizator walk-forward na BacktestEngine.
+    """
+    
+    def __init__(
+        self,
+        strategy_class: Type,
+        param_grid: Dict[str, Sequence[Any]],
+        base_params: Optional[Dict[str, Any]] = None,
+        in_sample_candles: int = 24 * 60,
+        out_of_sample_candles: int = 24 * 14,
+        step_candles: Optional[int] = None,
+        anchored: bool = False,
+        objective: Objective = "sharpe_ratio",
+        min_trades: int = 1,
+        max_workers: Optional[int] = None,
+        engine_kwargs: Optional[Dict[str, Any]] = None,
+        position_size_percent: float = 10.0,
+        max_positions: int = 1
+    ):
+        """
+        Args:
+            strategy_class: Klasa strategii (konstruktor przyjmuje dict konfiguracji)
+            param_grid: Siatka optymalizowanych parametrów {nazwa: [wartości]}
+            base_params: Stałe parametry strategii
+            in_sample_candles: Długość okna in-sample (świece)
+            out_of_sample_candles: Długość okna out-of-sample (świece)
+            step_candles: Przesunięcie między foldami (domyślnie = out_of_sample_candles)
+            anchored: True - in-sample zawsze od początku historii (rosnące okno)
+            objective: Kryterium wyboru parametrów (pole BacktestResult lub funkcja)
+            min_trades: Minimalna liczba transakcji in-sample, by kandydat był brany pod uwagę
+            max_workers: Liczba procesów (None = liczba CPU, 1 = bez puli)
+            engine_kwargs: Argumenty BacktestEngine (initial_balance, taker_fee, ...)
+            position_size_percent: % kapitału na pozycję
+            max_positions: Maksymalna liczba równoczesnych pozycji
+        """
+        if in_sample_candles <= WARMUP_CANDLES or out_of_sample_candles <= 0:
+            raise ValueError(f"in_sample_candles musi być > {WARMUP_CANDLES}, out_of_sample_candles > 0")
+        
+        self.strategy_class = strategy_class
+        self.candidates = generate_param_grid(param_grid) or [{}]
+        self.base_params = dict(base_params or {})
+        self.in_sample_candles = in_sample_candles
+        self.out_of_sample_candles = out_of_sample_candles
+        self.step_candles = step_candles or out_of_sample_candles
+        self.anchored = anchored
+        self.objective = objective
+        self.min_trades = min_trades
+        if max_workers is None:
+            max_workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self.engine_kwargs = dict(engine_kwargs or {})
+        self.initial_balance = self.engine_kwargs.setdefault("initial_balance", 10000.0)
+        self.position_size_percent = position_size_percent
+        self.max_positions = max_positions
+    
+    def split(self, n_candles: int) -> List[WalkForwardFold]:
+        """
+        Dzieli historię na foldy.
+        
+        Args:
+            n_candles: Liczba świec
+        
+        Returns:
+            Lista foldów (ostatni OOS może być krótszy, jeśli zostaje > połowa okna)
+        """
+        folds = []
+        oos_start = self.in_sample_candles
+        while oos_start < n_candles:
+            oos_end = min(oos_start + self.out_of_sample_candles, n_candles)
+            if oos_end - oos_start < max(self.out_of_sample_candles // 2, 1):
+                break
+            is_start = 0 if self.anchored else oos_start - self.in_sample_candles
+            folds.append(WalkForwardFold(
+                index=len(folds),
+                in_sample=(is_start, oos_start),
+                out_of_sample=(oos_start, oos_end)
+            ))
+            oos_start += self.step_candles
+        return folds
+    
+    def run(self, df: pd.DataFrame, symbol: str = "BTC-USD") -> WalkForwardResult:
+        """
+        Uruchamia walk-forward.
+        
+        Args:
+            df: DataFrame OHLCV z kolumną timestamp (posortowany chronologicznie)
+            symbol: Symbol pary
+        
+        Returns:
+            WalkForwardResult
+        """
+        df = df.reset_index(drop=True)
+        folds = self.split(len(df))
+        if not folds:
+            logger.error(f"Za mało danych na walk-forward: {len(df)} świec (IS={self.in_sample_candles}, OOS={self.out_of_sample_candles})")
+            return WalkForwardResult()
+        
+        settings = {
+            "symbol": symbol,
+            "base_params": self.base_params,
+            "objective": self.objective,
+            "min_trades": self.min_trades,
+            "position_size_percent": self.position_size_percent,
+            "max_positions": self.max_positions,
+        }
+        tasks = [
+            (fold.index, i, self.strategy_class, params, *fold.in_sample)
+            for fold in folds
+            for i, params in enumerate(self.candidates)
+        ]
+        workers = min(self.max_workers, len(tasks))
+        logger.info(
+            f"Walk-forward {getattr(self.strategy_class, '__name__', self.strategy_class)}: "
+            f"{len(folds)} foldów × {len(self.candidates)} kandydatów, {workers} procesów"
+        )
+        
+        if workers <= 1:
+            _init_worker(df, self.engine_kwargs, settings, quiet=False)
+            evaluations = [_evaluate_task(task) for task in tasks]
+            out_of_sample = [_out_of_sample_task(task) for task in self._select_best(folds, evaluations)]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(df, self.engine_kwargs, settings)
+            ) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                evaluations = list(pool.map(_evaluate_task, tasks, chunksize=chunksize))
+                out_of_sample = list(pool.map(_out_of_sample_task, self._select_best(folds, evaluations)))
+        
+        for fold_index, result in out_of_sample:
+            fold = folds[fold_index]
+            fold.out_of_sample_score = score_result(result, self.objective, min_trades=0)
+            fold.out_of_sample_return = result.total_return
+            fold.out_of_sample_trades = result.total_trades
+            fold.out_of_sample_max_drawdown = result.max_drawdown
+        
+        result = self._summarize(df, folds, dict(out_of_sample))
+        logger.success(f"Walk-forward zakończony: {result}")
+        return result
+    
+    def _select_best(self, folds: List[WalkForwardFold], evaluations) -> List[Tuple]:
+        """Wybiera najlepszych kandydatów in-sample i zwraca zadania out-of-sample."""
+        by_fold: Dict[int, List[Tuple[float, int, float]]] = {}
+        for fold_index, candidate_index, score, total_return in evaluations:
+            by_fold.setdefault(fold_index, []).append((score, -candidate_index, total_return))
+        
+        tasks = []
+        for fold in folds:
+            scored = by_fold.get(fold.index, [])
+            # Remis - pierwszy kandydat z siatki (deterministycznie)
+            score, negative_index, total_return = max(scored) if scored else (float("-inf"), 0, 0.0)
+            fold.best_params = self.candidates[-negative_index]
+            fold.in_sample_score = score
+            fold.in_sample_return = total_return
+            fold.candidates = len(scored)
+            tasks.append((fold.index, self.strategy_class, fold.best_params, *fold.out_of_sample))
+        return tasks
+    
+    def _summarize(
+        self,
+        df: pd.DataFrame,
+        folds: List[WalkForwardFold],
+        results: Dict[int, BacktestResult]
+    ) -> WalkForwardResult:
+        equity = self._stitch_equity(df, folds, results)
+        
+        total_return = (equity.iloc[-1] / self.initial_balance - 1) * 100 if len(equity) else 0.0
+        max_drawdown = float(((equity.cummax() - equity) / equity.cummax()).max() * 100) if len(equity) else 0.0
+        
+        returns = equity.pct_change().dropna()
+        sharpe = 0.0
+        if len(returns) > 1 and returns.std() > 0:
+            step = pd.Series(equity.index).diff().median()
+            periods_per_year = pd.Timedelta(days=365) / step if isinstance(step, pd.Timedelta) and step > pd.Timedelta(0) else 252
+            sharpe = float(returns.mean() / returns.std() * np.sqrt(periods_per_year))
+        
+        # Efektywność: średni zwrot OOS na świecę / średni zwrot IS na świecę
+        is_per_candle = np.mean([f.in_sample_return / (f.in_sample[1] - f.in_sample[0]) for f in folds])
+        oos_per_candle = np.mean([f.out_of_sample_return / (f.out_of_sample[1] - f.out_of_sample[0]) for f in folds])
+        efficiency = float(oos_per_candle / is_per_candle) if is_per_candle > 0 else 0.0
+        
+        stability = {}
+        for name in self.candidates[0]:
+            values = Counter(repr(f.best_params.get(name)) for f in folds)
+            stability[name] = values.most_common(1)[0][1] / len(folds)
+        
+        oos_returns = [f.out_of_sample_return for f in folds]
+        return WalkForwardResult(
+            folds=folds,
+            equity_curve=equity,
+            total_return=float(total_return),
+            max_drawdown=max_drawdown,
+            sharpe_ratio=sharpe,
+            walk_forward_efficiency=efficiency,
+            profitable_folds_percent=sum(r > 0 for r in oos_returns) / len(folds) * 100,
+            out_of_sample_return_std=float(np.std(oos_returns)),
+            parameter_stability=stability
+        )
+    
+    def _stitch_equity(
+        self,
+        df: pd.DataFrame,
+        folds: List[WalkForwardFold],
+        results: Dict[int, BacktestResult]
+    ) -> pd.Series:
+        """
+        Skleja krzywe kapitału OOS: każdy fold startuje z kapitałem końcowym poprzedniego.
+        
+        Przy step_candles < out_of_sample_candles foldy nakładają się - brany jest
+        tylko fragment do początku następnego foldu.
+        """
+        timestamps = df["timestamp"] if "timestamp" in df.columns else pd.Series(df.index)
+        capital = self.initial_balance
+        pieces = []
+        for position, fold in enumerate(folds):
+            result = results.get(fold.index)
+            if result is None:
+                continue
+            end = fold.out_of_sample[1]
+            if position + 1 < len(folds):
+                end = min(end, folds[position + 1].out_of_sample[0])
+            
+            # Pełna krzywa foldu zaczyna się świecę przed OOS (kapitał początkowy)
+            curve = result.equity_series()
+            curve = curve[curve.index <= pd.Timestamp(timestamps.iloc[end - 1])]
+            curve = curve * (capital / result.initial_balance)
+            capital = float(curve.iloc[-1])
+            pieces.append(curve)
+        
+        if not pieces:
+            return pd.Series(dtype=float)
+        equity = pd.concat(pieces)
+        return equity[~equity.index.duplicated(keep="last")]
@@ -3,91 +3,278 @@ API Logger
 ==========
 Moduł do logowania wszystkich requestów i odpowiedzi z API LLM.
 Logi są zapisywane TYLKO do pliku, bez wyświetlania w konsoli.
+
+Rekordy trafiają do kolejki i są zapisywane przez wątek w tle jako kompaktowy
+JSONL (jeden rekord = jedna linia), z rotacją dzienną i po rozmiarze oraz opcjonalną
+kompresją zrotowanych plików (gzip/zstd). Wywołujący nigdy nie czeka na dysk -
+przy pełnej kolejce rekord jest odrzucany i liczony w statystykach.
 """
 
 import os
 import json
-import sys
-from datetime import datetime
+import gzip
+import queue
+import shutil
+import atexit
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from loguru import logger
 
+from src.utils.metrics import LatencyHistogram, get_metrics
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _JsonlWriter:
+    """
+    Wątek zapisujący rekordy z kolejki do plików JSONL.
+    
+    Plik bieżący: {prefix}_{YYYY-MM-DD}.jsonl. Rotacja przy zmianie dnia lub
+    po przekroczeniu max_bytes; zrotowane pliki są kompresowane (w tym wątku).
+    """
+    
+    _STOP = object()
+    
+    def __init__(
+        self,
+        log_dir: Path,
+        prefix: str = "api_llm_requests",
+        max_bytes: int = 50 * 1024 * 1024,
+        compression: Optional[str] = None,
+        retention_days: int = 90,
+        max_queue: int = 10000
+    ):
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.retention_days = retention_days
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        
+        self._file = None
+        self._path: Optional[Path] = None
+        self._day: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name=f"{prefix}_writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Dodaje rekord do kolejki bez blokowania. Zwraca False, jeśli odrzucony."""
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Czeka aż kolejka zostanie zapisana (do timeout sekund)."""
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Zapisuje zaległe rekordy i zatrzymuje wątek."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self.queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            # Zbierz wszystko co czeka - jeden write/flush na paczkę
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            lines = []
+            events = []
+            for entry in batch:
+                if entry is self._STOP:
+                    stop = True
+                elif isinstance(entry, threading.Event):
+                    events.append(entry)
+                else:
+                    try:
+                        lines.append(json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str))
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"APILogger: nie można zserializować rekordu: {e}")
+            
+            if lines:
+                try:
+                    self._write("\n".join(lines) + "\n")
+                    self.written += len(lines)
+                except OSError as e:
+                    self.dropped += len(lines)
+                    logger.warning(f"APILogger: błąd zapisu logu: {e}")
+            
+            for event in events:
+                event.set()
+            if stop:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+    
+    def _write(self, data: str):
+        day = datetime.now().strftime('%Y-%m-%d')
+        if self._file is None or day != self._day or self._file.tell() >= self.max_bytes:
+            self._rotate(day)
+        self._file.write(data)
+        self._file.flush()
+    
+    def _rotate(self, day: str):
+        previous = self._path
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        
+        if previous is not None and previous.exists() and previous.stat().st_size > 0:
+            # Zrotowany plik dostaje kolejny numer: prefix_YYYY-MM-DD.N.jsonl
+            base = previous.name[:-len('.jsonl')]
+            n = 1
+            while any((self.log_dir / f"{base}.{n}.jsonl{ext}").exists() for ext in ('', '.gz', '.zst')):
+                n += 1
+            rotated = previous.rename(self.log_dir / f"{base}.{n}.jsonl")
+            self._compress(rotated)
+            self._cleanup()
+        
+        self._day = day
+        self._path = self.log_dir / f"{self.prefix}_{day}.jsonl"
+        self._file = open(self._path, 'a', encoding='utf-8')
+    
+    def _compress(self, path: Path):
+        if not self.compression:
+            return
+        try:
+            if self.compression == 'zstd' and zstandard is not None:
+                target = path.with_name(path.name + '.zst')
+                with open(path, 'rb') as src, open(target, 'wb') as dst:
+                    zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+            else:
+                target = path.with_name(path.name + '.gz')
+                with open(path, 'rb') as src, gzip.open(target, 'wb', compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst)
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"APILogger: błąd kompresji {path.name}: {e}")
+    
+    def _cleanup(self):
+        """Usuwa logi starsze niż retention_days."""
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        for path in self.log_dir.glob(f"{self.prefix}_*.jsonl*"):
+            try:
+                if datetime.fromtimestamp(path.stat().st_mtime) < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+# Jeden wątek zapisu na katalog logów (kilka instancji APILogger nie przeplata linii).
+# Ustawienia rotacji/kompresji ustala pierwszy logger danego katalogu.
+_writers: Dict[Path, _JsonlWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(log_dir: Path, **kwargs) -> _JsonlWriter:
+    key = log_dir.resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _JsonlWriter(log_dir, **kwargs)
+            _writers[key] = writer
+            return writer
+    
+    current = {
+        "prefix": writer.prefix,
+        "max_bytes": writer.max_bytes,
+        "compression": writer.compression,
+        "retention_days": writer.retention_days,
+        "max_queue": writer.queue.maxsize
+    }
+    mismatched = {
+        name: (current[name], value) for name, value in kwargs.items()
+        if name in current and current[name] != value
+    }
+    if mismatched:
+        details = ", ".join(f"{name}={old!r} (żądano {new!r})" for name, (old, new) in mismatched.items())
+        logger.warning(
+            f"APILogger: katalog {key} ma już wątek zapisu z innymi ustawieniami - "
+            f"używam istniejących: {details}"
+        )
+    return writer
+
+
+@atexit.register
+def _close_writers():
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
+
 
 class APILogger:
     """
     Logger dla requestów i odpowiedzi API LLM.
     
-    Zapisuje wszystkie requesty i odpowiedzi do osobnego pliku logu.
+    Zapisuje wszystkie requesty i odpowiedzi do osobnego pliku logu (JSONL).
     Logi NIE są wyświetlane w konsoli - tylko zapisywane do pliku.
     """
     
-    def __init__(self, log_dir: str = "logs"):
+    def __init__(
+        self,
+        log_dir: str = "logs",
+        max_bytes: int = 50 * 1024 * 1024,
+        compression: Optional[str] = None,
+        retention_days: int = 90,
+        max_queue: int = 10000
+    ):
         """
         Inicjalizacja loggera.
         
         Args:
             log_dir: Katalog do zapisu logów
+            max_bytes: Rozmiar pliku, po którym następuje rotacja
+            compression: Kompresja zrotowanych plików - 'gzip', 'zstd' lub None
+                (domyślnie z API_LOG_COMPRESSION; zstd wymaga pakietu zstandard)
+            retention_days: Ile dni przechowywać logi
+            max_queue: Maksymalna liczba rekordów czekających na zapis
         """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         
-        # Utwórz całkowicie nowy logger tylko do pliku (bez wyświetlania w konsoli)
-        # Używamy unikalnej nazwy, aby odróżnić nasze logi od innych
-        self.logger_name = "api_llm_file_only"
-        
-        # Usuń domyślny handler konsoli (jeśli istnieje)
-        # Następnie dodamy go z powrotem z filtrem, który odrzuca nasze logi
-        logger.remove()  # Usuń wszystkie domyślne handlery
-        
-        # Dodaj handler konsoli z filtrem, który odrzuca logi z naszą nazwą
-        def console_filter(record):
-            """Filtr odrzucający logi z api_llm_file_only"""
-            extra = record.get("extra", {})
-            # Odrzuć logi z naszą nazwą - nie wyświetlaj ich w konsoli
-            return extra.get("name") != self.logger_name
-        
-        logger.add(
-            sys.stderr,  # Domyślny handler konsoli
-            level="INFO",
-            format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <level>{message}</level>",
-            filter=console_filter,
-            colorize=True
-        )
-        
-        # Dodaj handler do pliku z filtrem
-        # Ten handler będzie akceptował tylko logi z naszą nazwą
-        # i nie będzie propagował ich do innych handlerów (konsola)
-        log_file = self.log_dir / f"api_llm_requests_{datetime.now().strftime('%Y-%m-%d')}.log"
-        
-        # Funkcja filtrująca - akceptuje tylko logi z naszą nazwą
-        def api_log_filter(record):
-            """Filtr akceptujący tylko logi z api_llm_file_only"""
-            # Sprawdź czy record ma naszą nazwę w extra
-            extra = record.get("extra", {})
-            # Tylko logi z naszą nazwą przejdą przez filtr
-            # Wszystkie inne logi zostaną odrzucone przez ten handler
-            return extra.get("name") == self.logger_name
+        compression = compression or os.getenv('API_LOG_COMPRESSION') or None
+        if compression == 'zstd' and zstandard is None:
+            logger.warning("APILogger: brak pakietu zstandard - używam gzip")
+            compression = 'gzip'
         
-        handler_id = logger.add(
-            str(log_file),
-            rotation="1 day",
-            retention="90 days",  # Przechowuj logi przez 90 dni
-            level="INFO",
-            format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {message}",
-            encoding="utf-8",
-            filter=api_log_filter,
-            enqueue=False,  # Nie używaj kolejki, aby uniknąć propagacji
-            colorize=False  # Wyłącz kolory (niepotrzebne w pliku)
+        self._writer = _get_writer(
+            self.log_dir,
+            max_bytes=max_bytes,
+            compression=compression,
+            retention_days=retention_days,
+            max_queue=max_queue
         )
         
-        # Zapisz ID handlera
-        self._handler_id = handler_id
-        
-        # Utwórz bindowany logger z naszą nazwą
-        self.api_logger = logger.bind(name=self.logger_name)
-        
-        # Statystyki tokenów i kosztów w sesji
+        # Statystyki tokenów i kosztów w sesji (aktualizowane przyrostowo)
+        self._stats_lock = threading.Lock()
         self.session_stats = {
             "total_input_tokens": 0,
             "total_output_tokens": 0,
@@ -95,6 +282,8 @@ class APILogger:
             "total_errors": 0,
             "model_usage": {}  # {model: {"input": int, "output": int}}
         }
+        # {(provider, model): {"calls", "errors", "input_tokens", "output_tokens", "cost_usd", "latency"}}
+        self._counters: Dict[Tuple[str, str], Dict[str, Any]] = {}
         
         # Cenniki modeli (USD za 1M tokenów) - input/output
         self.model_pricing = {
@@ -133,27 +322,19 @@ class APILogger:
             max_tokens: Maksymalna liczba tokenów (opcjonalnie)
             metadata: Dodatkowe metadane (symbol, strategy, etc.)
         """
-        request_data = {
+        # Serializacja odbywa się w wątku zapisu - tu tylko kopia referencji
+        self._writer.submit({
             "type": "REQUEST",
             "timestamp": datetime.now().isoformat(),
             "provider": provider,
             "model": model,
-            "messages": messages,
+            "messages": list(messages),
             "parameters": {
                 "temperature": temperature,
                 "max_tokens": max_tokens
             },
-            "metadata": metadata or {}
-        }
-        
-        # Formatuj jako JSON dla czytelności
-        log_message = json.dumps(request_data, ensure_ascii=False, indent=2)
-        
-        # Loguj tylko do pliku (bez wyświetlania w konsoli)
-        # Używamy opt(depth=2, colors=False) aby całkowicie pominąć propagację do konsoli
-        # Dodatkowo używamy opt() z parametrem depth=2 aby całkowicie pominąć propagację
-        # Używamy opt() z parametrem depth=2 aby całkowicie pominąć propagację do konsoli
-        self.api_logger.opt(depth=2, colors=False).info(f"=== API REQUEST ===\n{log_message}")
+            "metadata": dict(metadata) if metadata else {}
+        })
     
     def log_response(
         self,
@@ -179,7 +360,7 @@ class APILogger:
             metadata: Dodatkowe metadane (symbol, strategy, etc.)
             error: Błąd (jeśli wystąpił)
         """
-        response_data = {
+        self._writer.submit({
             "type": "RESPONSE",
             "timestamp": datetime.now().isoformat(),
             "provider": provider,
@@ -193,23 +374,56 @@ class APILogger:
             "performance": {
                 "response_time_ms": response_time_ms
             },
-            "metadata": metadata or {},
+            "metadata": dict(metadata) if metadata else {},
             "error": error
-        }
-        
-        # Formatuj jako JSON dla czytelności
-        log_message = json.dumps(response_data, ensure_ascii=False, indent=2)
+        })
         
-        # Loguj tylko do pliku (bez wyświetlania w konsoli)
-        # Używamy opt(depth=2) aby całkowicie pominąć propagację do konsoli
-        if error:
-            self.api_logger.opt(depth=2, colors=False).error(f"=== API RESPONSE (ERROR) ===\n{log_message}")
-            self.session_stats["total_errors"] += 1
-        else:
-            self.api_logger.opt(depth=2, colors=False).info(f"=== API RESPONSE ===\n{log_message}")
+        self._update_stats(provider, model, input_tokens, output_tokens, response_time_ms, error)
+        # Czas wywołania LLM jako etap cyklu (wszystkie strategie promptowe logują przez APILogger)
+        get_metrics().observe("llm.call", response_time_ms, provider=provider, model=model)
+    
+    def _update_stats(
+        self,
+        provider: str,
+        model: str,
+        input_tokens: Optional[int],
+        output_tokens: Optional[int],
+        response_time_ms: Optional[float],
+        error: Optional[str]
+    ):
+        """Przyrostowa aktualizacja liczników sesji i per provider/model."""
+        with self._stats_lock:
+            counters = self._counters.get((provider, model))
+            if counters is None:
+                counters = {
+                    "calls": 0,
+                    "errors": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "cost_usd": 0.0,
+                    "latency": LatencyHistogram()
+                }
+                self._counters[(provider, model)] = counters
+            
+            counters["calls"] += 1
+            if response_time_ms is not None:
+                counters["latency"].add(response_time_ms)
+            
+            if error:
+                counters["errors"] += 1
+                self.session_stats["total_errors"] += 1
+                return
             
             # Aktualizuj statystyki sesji (tylko jeśli są tokeny)
             if input_tokens or output_tokens:
+                pricing = self.model_pricing.get(model, {"input": 0.0, "output": 0.0})
+                counters["input_tokens"] += (input_tokens or 0)
+                counters["output_tokens"] += (output_tokens or 0)
+                counters["cost_usd"] += (
+                    (input_tokens or 0) / 1_000_000 * pricing["input"]
+                    + (output_tokens or 0) / 1_000_000 * pricing["output"]
+                )
+                
                 self.session_stats["total_input_tokens"] += (input_tokens or 0)
                 self.session_stats["total_output_tokens"] += (output_tokens or 0)
                 self.session_stats["total_requests"] += 1
@@ -270,6 +484,15 @@ class APILogger:
             error=error
         )
     
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Czeka na zapisanie zaległych rekordów.
+        
+        Returns:
+            True jeśli kolejka została opróżniona przed upływem timeout
+        """
+        return self._writer.flush(timeout)
+    
     def get_session_stats(self) -> Dict[str, Any]:
         """
         Zwraca statystyki sesji (tokeny i koszty).
@@ -277,42 +500,49 @@ class APILogger:
         Returns:
             Słownik ze statystykami
         """
-        total_tokens = self.session_stats["total_input_tokens"] + self.session_stats["total_output_tokens"]
-        
-        # Oblicz koszt w USD
-        total_cost_usd = 0.0
-        cost_by_model = {}
-        
-        for model, usage in self.session_stats["model_usage"].items():
-            pricing = self.model_pricing.get(model, {"input": 0.0, "output": 0.0})
+        with self._stats_lock:
+            total_tokens = self.session_stats["total_input_tokens"] + self.session_stats["total_output_tokens"]
             
-            # Koszt w USD (cena za 1M tokenów)
-            input_cost = (usage["input"] / 1_000_000) * pricing["input"]
-            output_cost = (usage["output"] / 1_000_000) * pricing["output"]
-            model_cost = input_cost + output_cost
+            total_cost_usd = 0.0
+            cost_by_model = {}
+            for model, usage in self.session_stats["model_usage"].items():
+                model_cost = sum(
+                    c["cost_usd"] for (_, counter_model), c in self._counters.items() if counter_model == model
+                )
+                total_cost_usd += model_cost
+                cost_by_model[model] = {
+                    "input_tokens": usage["input"],
+                    "output_tokens": usage["output"],
+                    "cost_usd": model_cost,
+                    "cost_pln": model_cost * self.usd_to_pln
+                }
             
-            total_cost_usd += model_cost
-            cost_by_model[model] = {
-                "input_tokens": usage["input"],
-                "output_tokens": usage["output"],
-                "cost_usd": model_cost,
-                "cost_pln": model_cost * self.usd_to_pln
+            by_provider_model = {
+                f"{provider}/{model}": {
+                    "calls": c["calls"],
+                    "errors": c["errors"],
+                    "input_tokens": c["input_tokens"],
+                    "output_tokens": c["output_tokens"],
+                    "cost_usd": c["cost_usd"],
+                    "cost_pln": c["cost_usd"] * self.usd_to_pln,
+                    "latency": c["latency"].summary()
+                }
+                for (provider, model), c in self._counters.items()
+            }
+            
+            return {
+                "total_input_tokens": self.session_stats["total_input_tokens"],
+                "total_output_tokens": self.session_stats["total_output_tokens"],
+                "total_tokens": total_tokens,
+                "total_requests": self.session_stats["total_requests"],
+                "total_errors": self.session_stats["total_errors"],
+                "total_cost_usd": total_cost_usd,
+                "total_cost_pln": total_cost_usd * self.usd_to_pln,
+                "cost_by_model": cost_by_model,
+                "by_provider_model": by_provider_model,
+                "dropped_records": self._writer.dropped,
+                "usd_to_pln_rate": self.usd_to_pln
             }
-        
-        # Koszt w PLN
-        total_cost_pln = total_cost_usd * self.usd_to_pln
-        
-        return {
-            "total_input_tokens": self.session_stats["total_input_tokens"],
-            "total_output_tokens": self.session_stats["total_output_tokens"],
-            "total_tokens": total_tokens,
-            "total_requests": self.session_stats["total_requests"],
-            "total_errors": self.session_stats["total_errors"],
-            "total_cost_usd": total_cost_usd,
-            "total_cost_pln": total_cost_pln,
-            "cost_by_model": cost_by_model,
-            "usd_to_pln_rate": self.usd_to_pln
-        }
     
     def print_session_stats(self):
         """
@@ -0,0 +1,301 @@
+"""
+Metrics
+=======
+Lekkie metryki czasów etapów (spany, histogramy p50/p95/p99, liczniki)
+dla cyklu tradingowego, z eksportem jako JSON i w formacie tekstowym Prometheusa.
+
+Użycie:
+    metrics = get_metrics()
+    with metrics.span("trading_bot.get_market_data", symbol="BTC-USD"):
+        ...
+
+Metryki są domyślnie wyłączone (METRICS_ENABLED=1 lub metrics.enable()) -
+wtedy span() zwraca współdzielony pusty kontekst, a observe()/increment()
+kończą się na sprawdzeniu flagi.
+"""
+
+import os
+import json
+import math
+import threading
+from functools import wraps
+from time import perf_counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from loguru import logger
+
+
+class LatencyHistogram:
+    """
+    Histogram czasów odpowiedzi z kubełkami logarytmicznymi (~5% rozdzielczości).
+    
+    Aktualizacja O(1), percentyle liczone z kubełków - bez trzymania próbek.
+    """
+    
+    _BASE = 1.05
+    
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, value_ms: float):
+        value_ms = max(float(value_ms), 0.0)
+        index = int(math.log(value_ms + 1.0, self._BASE))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.max = max(self.max, value_ms)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Zwraca przybliżony percentyl q (0-100) w ms lub None, gdy brak próbek."""
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Środek kubełka [BASE^i - 1, BASE^(i+1) - 1)
+                low = self._BASE ** index - 1.0
+                high = self._BASE ** (index + 1) - 1.0
+                return min((low + high) / 2.0, self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max if self.count else None
+        }
+
+
+class _NullSpan:
+    """Pusty kontekst używany, gdy metryki są wyłączone."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Mierzy czas bloku (perf_counter) i zapisuje go w histogramie etapu."""
+    
+    __slots__ = ("registry", "name", "labels", "start")
+    
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, (perf_counter() - self.start) * 1000, **self.labels)
+        if exc_type is not None:
+            self.registry.increment(f"{self.name}.errors", **self.labels)
+        return False
+
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class MetricsRegistry:
+    """
+    Rejestr metryk: histogramy czasów etapów i liczniki, etykietowane.
+    """
+    
+    def __init__(self, enabled: bool = False, prefix: str = "ai_blockchain"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._histograms: Dict[LabelKey, LatencyHistogram] = {}
+        self._counters: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+    
+    def span(self, name: str, **labels):
+        """
+        Kontekst mierzący czas etapu.
+        
+        Args:
+            name: Nazwa etapu (np. "trading_bot.strategy_analyze")
+            **labels: Etykiety (np. symbol="BTC-USD")
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+    
+    def observe(self, name: str, value_ms: float, **labels):
+        """Dodaje pomiar czasu (ms) do histogramu etapu."""
+        if not self.enabled or value_ms is None:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.add(value_ms)
+    
+    def increment(self, name: str, value: float = 1, **labels):
+        """Zwiększa licznik."""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Zwraca stan metryk jako słownik (do JSON).
+        
+        Returns:
+            {"stages": [{"name", "labels", "count", "avg_ms", "p50_ms", ...}], "counters": [...]}
+        """
+        with self._lock:
+            stages = [
+                {"name": name, "labels": dict(labels), **histogram.summary()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"enabled": self.enabled, "stages": stages, "counters": counters}
+    
+    def to_prometheus(self) -> str:
+        """Zwraca metryki w formacie tekstowym Prometheusa (summary + counter)."""
+        def fmt_labels(name: str, labels: Tuple[Tuple[str, str], ...], extra: Tuple = ()) -> str:
+            pairs = (("stage", name),) + labels + extra
+            escaped = (
+                '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+                for k, v in pairs
+            )
+            return "{" + ",".join(escaped) + "}"
+        
+        latency = f"{self.prefix}_stage_latency_ms"
+        events = f"{self.prefix}_events_total"
+        lines = [
+            f"# HELP {latency} Czas etapu w milisekundach",
+            f"# TYPE {latency} summary"
+        ]
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f"{latency}{fmt_labels(name, labels, (('quantile', q),))} {histogram.percentile(q * 100):.3f}")
+                lines.append(f"{latency}_sum{fmt_labels(name, labels)} {histogram.total:.3f}")
+                lines.append(f"{latency}_count{fmt_labels(name, labels)} {histogram.count}")
+            lines.append(f"# HELP {events} Liczniki zdarzeń")
+            lines.append(f"# TYPE {events} counter")
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{events}{fmt_labels(name, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def timed(name: str, **labels) -> Callable:
+    """
+    Dekorator mierzący czas wywołania funkcji w globalnym rejestrze.
+    
+    Args:
+        name: Nazwa etapu
+        **labels: Stałe etykiety
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            registry = get_metrics()
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            with registry.span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_metrics_server(
+    port: int = 9464,
+    host: str = "127.0.0.1",
+    registry: Optional[MetricsRegistry] = None
+) -> ThreadingHTTPServer:
+    """
+    Uruchamia lokalny serwer HTTP z metrykami w wątku w tle.
+    
+    Endpointy:
+        /metrics - format tekstowy Prometheusa
+        /metrics.json - snapshot JSON
+    
+    Returns:
+        Instancja serwera (server.shutdown() zatrzymuje)
+    """
+    registry = registry or get_metrics()
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                content_type = "application/json"
+            elif self.path.startswith("/metrics"):
+                body = registry.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass  # Bez logowania każdego scrape'a
+    
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics_server", daemon=True)
+    thread.start()
+    logger.info(f"📈 Metryki dostępne na http://{host}:{server.server_port}/metrics")
+    return server
+
+
+# Singleton instance
+_metrics_instance: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Zwraca singleton instance MetricsRegistry.
+    
+    Returns:
+        MetricsRegistry instance (włączony, jeśli METRICS_ENABLED=1)
+    """
+    global _metrics_instance
+    if _metrics_instance is None:
+        enabled = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+        _metrics_instance = MetricsRegistry(enabled=enabled)
+    return _metrics_instance
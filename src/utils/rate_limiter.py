@@ -0,0 +1,77 @@
+"""
+Rate Limiter
+============
+Asynchroniczny budżet zapytań do API jednej giełdy.
+
+Kolektory są synchroniczne (requests, ccxt), więc wywołania trafiają do puli
+wątków, a limiter pilnuje:
+- minimalnego odstępu między startami kolejnych zapytań (zapytania/s),
+- maksymalnej liczby zapytań w locie.
+
+Użycie:
+    limiter = AsyncRateLimiter(requests_per_second=10, max_concurrent=8)
+    df = await limiter.call(collector.fetch_candles, ticker="BTC-USD", executor=pool)
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Optional
+
+
+class AsyncRateLimiter:
+    """
+    Limiter zapytań dla asyncio (odstęp między startami + limit równoległości).
+    
+    Tworzony wewnątrz działającej pętli zdarzeń (używa asyncio.Lock/Semaphore).
+    """
+    
+    def __init__(self, requests_per_second: float, max_concurrent: int = 4):
+        """
+        Inicjalizacja limitera.
+        
+        Args:
+            requests_per_second: Maksymalna liczba startów zapytań na sekundę
+            max_concurrent: Maksymalna liczba zapytań wykonywanych jednocześnie
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second musi być dodatnie")
+        self.interval = 1.0 / requests_per_second
+        self.max_concurrent = max_concurrent
+        self.requests = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+    
+    async def acquire_slot(self):
+        """Czeka na najbliższy wolny termin startu zapytania."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self.requests += 1
+    
+    async def call(
+        self,
+        func: Callable[..., Any],
+        *args,
+        executor: Optional[Executor] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Wykonuje blokującą funkcję w puli wątków w ramach budżetu.
+        
+        Args:
+            func: Funkcja synchroniczna (np. metoda kolektora)
+            executor: Pula wątków (domyślnie pula pętli zdarzeń)
+        
+        Returns:
+            Wynik funkcji
+        """
+        async with self._semaphore:
+            await self.acquire_slot()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
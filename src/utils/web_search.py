@@ -15,6 +15,8 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 from loguru import logger
 
+from src.utils.metrics import timed
+
 
 class WebSearchEngine:
     """
@@ -64,6 +66,7 @@ class WebSearchEngine:
         else:
             raise ValueError(f"Nieznany provider: {provider}. Dostępne: duckduckgo (darmowe), google, serper")
     
+    @timed("web_search.search")
     def search(
         self,
         query: str,
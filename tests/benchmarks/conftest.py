@@ -0,0 +1,195 @@
+"""
+Fixtures benchmarków.
+
+Lekki odpowiednik pytest-benchmark (działa offline, bez dodatkowych zależności):
+fixture `bench` mierzy wywołanie w kilku rundach (perf_counter), a na końcu sesji
+wyniki są porównywane z tests/benchmarks/baseline.json jako % zmiany mediany.
+
+Uruchomienie:
+    pytest tests/benchmarks --run-benchmarks [--bench-size medium]
+    pytest tests/benchmarks --run-benchmarks --bench-save         # nowy baseline
+    pytest tests/benchmarks --run-benchmarks --bench-max-regression 25
+"""
+
+import json
+import platform
+import statistics
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+from loguru import logger
+
+from tests.benchmarks.synthetic import BENCH_SIZES
+
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Wyniki sesji: nazwa benchmarku -> statystyki (tylko zaliczone testy)
+_results: Dict[str, Dict[str, Any]] = {}
+_failed: set = set()
+
+
+def load_baseline(size: str) -> Dict[str, Dict[str, Any]]:
+    """Wczytuje wyniki bazowe dla rozmiaru danych (pusty słownik, gdy brak pliku)."""
+    if not BASELINE_PATH.exists():
+        return {}
+    data = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    return data.get("results", {}).get(size, {})
+
+
+def regression_percent(median_s: float, baseline: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Zwraca zmianę mediany względem baseline w % (dodatnia = wolniej)."""
+    if not baseline or not baseline.get("median_s"):
+        return None
+    return (median_s / baseline["median_s"] - 1.0) * 100.0
+
+
+class BenchRunner:
+    """
+    Mierzy czas wywołania funkcji w kilku rundach.
+    
+    Użycie:
+        result = bench(func, arg, rounds=5)
+        result = bench(func, setup=lambda: ((fresh_arg,), {}))  # setup poza pomiarem
+    """
+    
+    def __init__(self, name: str, default_rounds: int = 5):
+        self.name = name
+        self.default_rounds = default_rounds
+        self.timings: List[float] = []
+        self.extra: Dict[str, Any] = {}
+    
+    def __call__(
+        self,
+        func: Callable,
+        *args,
+        rounds: Optional[int] = None,
+        warmup: int = 1,
+        setup: Optional[Callable[[], tuple]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Wywołuje func warmup + rounds razy i zapisuje czasy rund.
+        
+        Args:
+            func: Mierzona funkcja
+            rounds: Liczba mierzonych rund (domyślnie default_rounds)
+            warmup: Liczba rund rozgrzewkowych (niemierzonych)
+            setup: Funkcja zwracająca (args, kwargs) dla każdej rundy - poza pomiarem
+        
+        Returns:
+            Wynik ostatniego wywołania
+        """
+        rounds = rounds or self.default_rounds
+        result = None
+        for i in range(warmup + rounds):
+            call_args, call_kwargs = setup() if setup else (args, kwargs)
+            start = perf_counter()
+            result = func(*call_args, **call_kwargs)
+            elapsed = perf_counter() - start
+            if i >= warmup:
+                self.timings.append(elapsed)
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": len(self.timings),
+            "min_s": min(self.timings),
+            "median_s": statistics.median(self.timings),
+            "mean_s": statistics.fmean(self.timings),
+            **self.extra
+        }
+
+
+@pytest.fixture(scope="session")
+def bench_size(request) -> str:
+    """Nazwa rozmiaru danych (--bench-size / BENCH_SIZE)."""
+    return request.config.getoption("--bench-size")
+
+
+@pytest.fixture(scope="session")
+def sizes(bench_size) -> Dict[str, int]:
+    """Rozmiary syntetycznych danych dla bieżącego --bench-size."""
+    return BENCH_SIZES[bench_size]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quiet_logs():
+    """Wycisza logi projektu - logowanie per świeca zaburza pomiary."""
+    logger.disable("src")
+    yield
+    logger.enable("src")
+
+
+@pytest.fixture
+def bench(request, bench_size):
+    """Mierzy wywołanie i porównuje medianę z baseline."""
+    runner = BenchRunner(request.node.name)
+    yield runner
+    
+    if not runner.timings or runner.name in _failed:
+        return
+    stats = runner.stats()
+    _results[runner.name] = stats
+    
+    max_regression = request.config.getoption("--bench-max-regression")
+    delta = regression_percent(stats["median_s"], load_baseline(bench_size).get(runner.name))
+    if max_regression is not None and delta is not None and delta > max_regression:
+        pytest.fail(
+            f"{runner.name}: mediana {stats['median_s'] * 1000:.1f} ms "
+            f"(+{delta:.1f}% względem baseline, limit {max_regression:.0f}%)"
+        )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Zapamiętuje nieudane benchmarki - ich czasy nie trafiają do wyników."""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call" and report.failed:
+        _failed.add(item.name)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Tabela wyników z % zmiany względem baseline."""
+    if not _results:
+        return
+    size = config.getoption("--bench-size")
+    baseline = load_baseline(size)
+    
+    terminalreporter.section(f"benchmarki ({size})")
+    terminalreporter.write_line(f"{'benchmark':<58} {'mediana':>11} {'baseline':>11} {'zmiana':>9}")
+    for name, stats in sorted(_results.items()):
+        base = baseline.get(name)
+        delta = regression_percent(stats["median_s"], base)
+        base_text = f"{base['median_s'] * 1000:.1f} ms" if base else "-"
+        delta_text = f"{delta:+.1f}%" if delta is not None else "nowy"
+        line = f"{name:<58} {stats['median_s'] * 1000:>8.1f} ms {base_text:>11} {delta_text:>9}"
+        if "target_s" in stats:
+            status = "OK" if stats["median_s"] <= stats["target_s"] else "ponad cel"
+            line += f"  (cel {stats['target_s']:.0f} s: {status})"
+        terminalreporter.write_line(line)
+    
+    if config.getoption("--bench-save"):
+        _save_baseline(size)
+        terminalreporter.write_line(f"Zapisano baseline: {BASELINE_PATH}")
+
+
+def _save_baseline(size: str):
+    """Zapisuje wyniki sesji jako baseline dla rozmiaru (pozostałe rozmiary bez zmian)."""
+    data = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    results = data.setdefault("results", {})
+    stored = results.setdefault(size, {})
+    for name, stats in _results.items():
+        stored[name] = {key: (round(value, 6) if isinstance(value, float) else value)
+                        for key, value in stats.items()}
+    data["machine"] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine()
+    }
+    data["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    BASELINE_PATH.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
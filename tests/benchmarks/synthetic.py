@@ -0,0 +1,68 @@
+"""
+Syntetyczne dane do benchmarków
+===============================
+Rozmiary danych i deterministyczny (seed) generator regionalnego sentymentu -
+benchmarki działają offline, bez API i bazy. Świece OHLCV: generate_ohlcv
+z src.database.synthetic_data.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Rozmiary danych dla --bench-size
+# (backtest jest pętlą per świeca, dlatego ma osobny, mniejszy rozmiar)
+BENCH_SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"candles": 2_000, "backtest_candles": 300, "candles_1m": 5_000, "sentiment_hours": 24 * 14},
+    "medium": {"candles": 8_760, "backtest_candles": 2_000, "candles_1m": 50_000, "sentiment_hours": 24 * 90},
+    "large": {"candles": 35_040, "backtest_candles": 8_760, "candles_1m": 200_000, "sentiment_hours": 24 * 365},
+}
+
+DEFAULT_REGIONS = ["US", "CN", "JP", "KR", "DE", "GB", "SG", "AU"]
+
+
+def generate_regional_sentiment(
+    hours: int,
+    regions: Optional[List[str]] = None,
+    start: str = "2024-01-01",
+    max_lag_hours: int = 12,
+    n_waves: Optional[int] = None,
+    seed: int = 42
+) -> pd.DataFrame:
+    """
+    Generuje godzinowy sentyment regionów z falami propagującymi się z opóźnieniem.
+    
+    Każdy region to wspólny sygnał przesunięty o stały lag regionu + szum,
+    plus nagłe skoki (fale) startujące w losowym regionie.
+    
+    Args:
+        hours: Liczba godzin
+        regions: Lista regionów (domyślnie DEFAULT_REGIONS)
+        start: Początek zakresu
+        max_lag_hours: Maksymalne opóźnienie regionu względem sygnału bazowego
+        n_waves: Liczba fal (domyślnie ~1 na 3 dni)
+        seed: Ziarno generatora
+    
+    Returns:
+        DataFrame (index: timestamp, kolumny: regiony, wartości -1..1)
+    """
+    regions = regions or DEFAULT_REGIONS
+    rng = np.random.default_rng(seed)
+    padded = hours + max_lag_hours
+    
+    base = np.cumsum(rng.normal(0.0, 0.05, padded))
+    base = np.tanh(base - pd.Series(base).rolling(48, min_periods=1).mean().to_numpy())
+    
+    n_waves = n_waves if n_waves is not None else max(1, hours // 72)
+    for t in rng.integers(0, padded - 6, size=n_waves):
+        base[t:t + 6] += rng.choice([-1.0, 1.0]) * 0.8
+    
+    lags = rng.integers(0, max_lag_hours + 1, size=len(regions))
+    data = {
+        region: np.clip(base[max_lag_hours - lag:max_lag_hours - lag + hours]
+                        + rng.normal(0.0, 0.08, hours), -1.0, 1.0)
+        for region, lag in zip(regions, lags)
+    }
+    return pd.DataFrame(data, index=pd.date_range(start=start, periods=hours, freq="1h"))
@@ -0,0 +1,80 @@
+"""
+Benchmarki BacktestEngine.run_backtest dla strategii działających offline.
+"""
+
+import pytest
+
+from src.database.synthetic_data import generate_ohlcv
+
+
+pytestmark = pytest.mark.benchmark
+
+STRATEGIES = [
+    "PiotrekBreakoutStrategy",
+    "ImprovedBreakoutStrategy",
+    "ScalpingStrategy",
+    "PiotrSwiecStrategy",
+    "FundingRateArbitrageStrategy",
+    "SentimentPropagationStrategy",
+    "UnderhumanStrategyV10",
+    "UnderhumanStrategyV11",
+    "UnderhumanStrategyV12",
+    "UnderhumanStrategyV13",
+    "UnderhumanStrategyV14",
+    "UnderhumanStrategyV2",
+]
+
+# Docstring BacktestEngine: "rok w ~10 sekund"
+YEAR_OF_HOURLY_CANDLES = 8_760
+YEAR_TARGET_SECONDS = 10.0
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """BacktestEngine bez progress bara, z pustą bazą SQLite (strategie UNDERHUMAN czytają z bazy)."""
+    import src.trading.backtesting as backtesting
+    
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'bench.db'}")
+    monkeypatch.setattr(backtesting, "TQDM_AVAILABLE", False)
+    return backtesting.BacktestEngine(initial_balance=10000.0)
+
+
+def make_strategy(name: str):
+    """Tworzy świeżą instancję strategii w trybie backtestingu (bez API)."""
+    import src.trading.strategies as strategies
+    
+    return getattr(strategies, name)({"_backtest_mode": True})
+
+
+@pytest.mark.parametrize("strategy_name", STRATEGIES)
+def test_run_backtest(bench, engine, sizes, strategy_name):
+    """Test czasu backtestu strategii na syntetycznych świecach 1h."""
+    df = generate_ohlcv(sizes["backtest_candles"], timestamp_column=True)
+    bench.extra["candles"] = len(df)
+    
+    result = bench(
+        engine.run_backtest,
+        rounds=2,
+        warmup=0,
+        setup=lambda: ((make_strategy(strategy_name), "BTC-USD", df), {})
+    )
+    
+    assert result.initial_balance == 10000.0
+
+
+@pytest.mark.slow
+def test_run_backtest_year_of_hourly_candles(bench, engine, bench_size):
+    """Test deklaracji z docstringa BacktestEngine: rok świec 1h w ~10 sekund."""
+    if bench_size != "large":
+        pytest.skip("Tylko dla --bench-size large")
+    df = generate_ohlcv(YEAR_OF_HOURLY_CANDLES, timestamp_column=True)
+    bench.extra.update({"candles": len(df), "target_s": YEAR_TARGET_SECONDS})
+    
+    result = bench(
+        engine.run_backtest,
+        rounds=1,
+        warmup=0,
+        setup=lambda: ((make_strategy("PiotrekBreakoutStrategy"), "BTC-USD", df), {})
+    )
+    
+    assert result.initial_balance == 10000.0
@@ -0,0 +1,66 @@
+"""
+Benchmarki DatabaseManager na SQLite (zapis i odczyt świec).
+"""
+
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.database.synthetic_data import generate_ohlcv
+
+
+pytestmark = pytest.mark.benchmark
+
+EXCHANGE = "binance"
+SYMBOL = "BTC/USDC"
+
+
+@pytest.fixture
+def candles_1m(sizes):
+    return generate_ohlcv(sizes["candles_1m"], freq="1min", volatility=0.0008)
+
+
+@pytest.fixture
+def filled_db(tmp_path, candles_1m):
+    """Baza z zapisanymi świecami 1m (i rollupami)."""
+    db = DatabaseManager(database_url=f"sqlite:///{tmp_path / 'bench.db'}")
+    db.create_tables()
+    db.save_ohlcv(candles_1m, EXCHANGE, SYMBOL, "1m")
+    return db
+
+
+def test_save_ohlcv_1m(bench, tmp_path, candles_1m):
+    """Test czasu zapisu świec 1m do pustej bazy (z odświeżeniem rollupów)."""
+    counter = iter(range(100))
+    
+    def fresh_db():
+        db = DatabaseManager(database_url=f"sqlite:///{tmp_path / f'bench_{next(counter)}.db'}")
+        db.create_tables()
+        return (db,), {}
+    
+    bench.extra["candles"] = len(candles_1m)
+    saved = bench(
+        lambda db: db.save_ohlcv(candles_1m, EXCHANGE, SYMBOL, "1m"),
+        rounds=3,
+        setup=fresh_db
+    )
+    
+    assert saved == len(candles_1m)
+
+
+def test_get_ohlcv_1m_range(bench, filled_db, candles_1m):
+    """Test czasu odczytu pełnego zakresu świec 1m."""
+    start, end = candles_1m.index[0].to_pydatetime(), candles_1m.index[-1].to_pydatetime()
+    bench.extra["candles"] = len(candles_1m)
+    
+    df = bench(filled_db.get_ohlcv, EXCHANGE, SYMBOL, "1m", start_date=start, end_date=end)
+    
+    assert len(df) == len(candles_1m)
+
+
+def test_get_ohlcv_1h_rollup(bench, filled_db, candles_1m):
+    """Test czasu odczytu świec 1h z rollupów."""
+    bench.extra["candles"] = len(candles_1m)
+    
+    df = bench(filled_db.get_ohlcv, EXCHANGE, SYMBOL, "1h")
+    
+    assert len(df) > 0
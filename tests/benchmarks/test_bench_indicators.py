@@ -0,0 +1,22 @@
+"""
+Benchmarki TechnicalAnalyzer.
+"""
+
+import pytest
+
+from src.analysis.technical.indicators import TechnicalAnalyzer
+from src.database.synthetic_data import generate_ohlcv
+
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_add_all_indicators(bench, sizes):
+    """Test czasu dodania wszystkich wskaźników."""
+    df = generate_ohlcv(sizes["candles"])
+    bench.extra["candles"] = len(df)
+    
+    result = bench(lambda: TechnicalAnalyzer(df).add_all_indicators().get_dataframe())
+    
+    assert len(result) == len(df)
+    assert "rsi" in result.columns
@@ -0,0 +1,37 @@
+"""
+Benchmarki symulacji Monte Carlo na logu transakcji.
+"""
+
+import numpy as np
+import pytest
+
+from src.trading.monte_carlo import MonteCarloAnalyzer
+
+
+pytestmark = pytest.mark.benchmark
+
+N_SIMULATIONS = 10000
+
+
+@pytest.fixture
+def analyzer():
+    rng = np.random.default_rng(42)
+    n = 500
+    return MonteCarloAnalyzer(
+        rng.normal(5, 60, n),
+        notional=np.full(n, 2000.0),
+        fees=np.full(n, 1.0),
+        seed=42
+    )
+
+
+@pytest.mark.parametrize("method", ["shuffle", "resample", "block_bootstrap", "perturb_costs"])
+def test_monte_carlo_10k(bench, analyzer, method):
+    """Test czasu 10 000 symulacji (cel: < 1 s na metodę)."""
+    bench.extra["simulations"] = N_SIMULATIONS
+    bench.extra["trades"] = analyzer.n_trades
+    bench.extra["target_s"] = 1.0
+    
+    result = bench(getattr(analyzer, method), N_SIMULATIONS, rounds=3)
+    
+    assert result.n_simulations == N_SIMULATIONS
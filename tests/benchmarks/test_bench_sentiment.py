@@ -0,0 +1,77 @@
+"""
+Benchmarki analizy propagacji sentymentu między regionami.
+"""
+
+import pytest
+
+from src.collectors.sentiment.sentiment_propagation_analyzer import SentimentPropagationAnalyzer
+from src.collectors.sentiment.sentiment_snapshots import SentimentSnapshots
+from src.collectors.sentiment.streaming_lag_tracker import StreamingLagTracker
+from src.collectors.sentiment.timezone_aware_analyzer import TimezoneAwareAnalyzer
+from tests.benchmarks.synthetic import generate_regional_sentiment
+
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def sentiment_df(sizes):
+    return generate_regional_sentiment(sizes["sentiment_hours"])
+
+
+def test_compute_lag_matrix(bench, sentiment_df):
+    """Test czasu macierzy opóźnień między regionami."""
+    analyzer = SentimentPropagationAnalyzer(max_lag_hours=24)
+    bench.extra["hours"] = len(sentiment_df)
+    
+    results = bench(analyzer.compute_lag_matrix, sentiment_df, rounds=3)
+    
+    assert len(results) > 0
+
+
+def test_detect_sentiment_waves(bench, sentiment_df):
+    """Test czasu wykrywania fal sentymentu."""
+    analyzer = SentimentPropagationAnalyzer()
+    bench.extra["hours"] = len(sentiment_df)
+    
+    waves = bench(analyzer.detect_sentiment_waves, sentiment_df, threshold_std=1.5)
+    
+    assert isinstance(waves, list)
+
+
+def test_add_activity_features(bench, sentiment_df):
+    """Test czasu dodania cech aktywności regionów."""
+    analyzer = TimezoneAwareAnalyzer()
+    bench.extra["hours"] = len(sentiment_df)
+    
+    df = bench(analyzer.add_activity_features, sentiment_df)
+    
+    assert len(df) == len(sentiment_df)
+
+
+def test_build_sentiment_snapshots(bench, sentiment_df):
+    """Test czasu budowy godzinowych snapshotów point-in-time (okno 7 dni)."""
+    analyzer = SentimentPropagationAnalyzer(max_lag_hours=24, use_timezone_aware=False)
+    bench.extra["hours"] = len(sentiment_df)
+    
+    snapshots = bench(SentimentSnapshots.build, sentiment_df, analyzer=analyzer, days_back=7, rounds=3)
+    
+    assert len(snapshots) == len(sentiment_df)
+
+
+def test_streaming_lag_update(bench, sentiment_df):
+    """Test czasu nowego punktu godzinowego + macierzy lag-ów w StreamingLagTracker (okno 7 dni)."""
+    analyzer = SentimentPropagationAnalyzer(max_lag_hours=24, use_timezone_aware=False)
+    tracker = StreamingLagTracker(list(sentiment_df.columns), window_hours=7 * 24, analyzer=analyzer)
+    tracker.sync(sentiment_df.iloc[:-24])
+    rows = iter(sentiment_df.iloc[-24:].iterrows())
+    bench.extra["hours"] = len(sentiment_df)
+    
+    def step():
+        timestamp, row = next(rows)
+        tracker.update(timestamp, row.to_dict())
+        return tracker.lag_matrix()
+    
+    lag_matrix = bench(step, rounds=20)
+    
+    assert len(lag_matrix) > 0
@@ -0,0 +1,85 @@
+"""
+Benchmarki czasu startu skryptów CLI (import modułów + argparse).
+
+Każdy pomiar to osobny proces `python scripts/<skrypt>.py --help`; czas importu
+to czas procesu minus czas startu pustego interpretera.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import pytest
+
+
+pytestmark = pytest.mark.benchmark
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+SCRIPTS = [
+    "backtest_from_csv",
+    "backtest",
+    "optimize_strategy",
+    "run_paper_trading",
+    "run_paper_trading_enhanced",
+    "run_multi_strategy",
+    "replay_paper_trading",
+    "run_underhuman_strategy",
+]
+
+# Cel: --help i prosty backtest poniżej 1 s importu
+IMPORT_TARGET_SECONDS = 1.0
+FAST_SCRIPTS = {"backtest_from_csv"}
+
+SIMPLE_BACKTEST_IMPORTS = (
+    "from src.trading.backtesting import BacktestEngine; "
+    "from src.trading.strategies import PiotrekBreakoutStrategy"
+)
+
+
+def run_python(*args: str):
+    """Uruchamia interpreter w katalogu projektu; błąd procesu przerywa test."""
+    result = subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return result
+
+
+@pytest.fixture(scope="module")
+def interpreter_startup() -> float:
+    """Mediana czasu startu pustego interpretera (odejmowana od pomiarów)."""
+    timings = []
+    for _ in range(5):
+        start = perf_counter()
+        run_python("-c", "pass")
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+def import_seconds(bench, interpreter_startup: float) -> float:
+    """Mediana czasu importu z pomiarów bench (czas procesu - start interpretera)."""
+    seconds = max(median(bench.timings) - interpreter_startup, 0.0)
+    bench.extra.update({"import_s": seconds, "interpreter_s": interpreter_startup})
+    return seconds
+
+
+@pytest.mark.parametrize("script", SCRIPTS)
+def test_script_help_startup(bench, interpreter_startup, script):
+    """Test czasu `--help` skryptu (import wszystkich modułów ładowanych na starcie)."""
+    result = bench(run_python, f"scripts/{script}.py", "--help", rounds=3)
+    
+    assert "usage:" in result.stdout
+    seconds = import_seconds(bench, interpreter_startup)
+    if script in FAST_SCRIPTS:
+        assert seconds < IMPORT_TARGET_SECONDS, f"{script} --help: import {seconds:.2f} s"
+
+
+def test_simple_backtest_imports(bench, interpreter_startup):
+    """Test czasu importu dla prostego backtestu (BacktestEngine + jedna strategia)."""
+    bench(run_python, "-c", SIMPLE_BACKTEST_IMPORTS, rounds=3)
+    
+    seconds = import_seconds(bench, interpreter_startup)
+    assert seconds < IMPORT_TARGET_SECONDS, f"import backtestu: {seconds:.2f} s"
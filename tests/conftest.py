@@ -67,3 +67,35 @@ def skip_if_no_api_key():
             pytest.skip(f"Brak {key_name} - pomijam test integracyjny")
     return _skip_if_no_key
 
+
+
+def pytest_addoption(parser):
+    """Opcje benchmarków (tests/benchmarks)."""
+    group = parser.getgroup("benchmarks", "Benchmarki wydajności")
+    group.addoption(
+        "--run-benchmarks", action="store_true", default=False,
+        help="Uruchom benchmarki (domyślnie pomijane)"
+    )
+    group.addoption(
+        "--bench-size", default=os.getenv("BENCH_SIZE", "small"),
+        choices=["small", "medium", "large"],
+        help="Rozmiar syntetycznych danych benchmarków"
+    )
+    group.addoption(
+        "--bench-save", action="store_true", default=False,
+        help="Zapisz wyniki jako nowy baseline (tests/benchmarks/baseline.json)"
+    )
+    group.addoption(
+        "--bench-max-regression", type=float, default=None,
+        help="Oblej benchmark wolniejszy od baseline o więcej niż N%%"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Pomija benchmarki, jeśli nie podano --run-benchmarks."""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmark - uruchom z --run-benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
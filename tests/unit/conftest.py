@@ -0,0 +1,33 @@
+"""
+Wspólne fixtures dla testów analizy propagacji sentymentu.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.collectors.sentiment.sentiment_propagation_analyzer import SentimentPropagationAnalyzer
+
+
+@pytest.fixture
+def make_sentiment():
+    """Fabryka sentymentu godzinowego: JP powtarza US z opóźnieniem 3h, CN z opóźnieniem 6h."""
+    def _make(hours: int = 200, seed: int = 0, cn_gap: bool = False) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        base = np.cumsum(rng.normal(size=hours + 10)) * 0.1
+        index = pd.date_range("2025-01-01", periods=hours, freq="1h", tz="UTC")
+        df = pd.DataFrame({
+            'US': base[10:] + rng.normal(0, 0.05, hours),
+            'JP': base[7:-3] + rng.normal(0, 0.05, hours),
+            'CN': base[4:-6] + rng.normal(0, 0.05, hours),
+        }, index=index)
+        if cn_gap:
+            df.iloc[60:63, 2] = np.nan  # luka w CN
+        return df
+    
+    return _make
+
+
+@pytest.fixture
+def analyzer():
+    return SentimentPropagationAnalyzer(max_lag_hours=12, min_samples=24, use_timezone_aware=False)
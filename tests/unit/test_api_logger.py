@@ -0,0 +1,130 @@
+"""
+Testy jednostkowe dla APILogger.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from loguru import logger
+
+from src.utils.api_logger import APILogger, LatencyHistogram
+
+
+class TestAPILogger:
+    """Testy dla klasy APILogger."""
+    
+    def test_writes_compact_jsonl(self, tmp_path):
+        """Test zapisu request/response jako jednej linii JSON na rekord."""
+        api_logger = APILogger(log_dir=str(tmp_path))
+        
+        api_logger.log_request_response_pair(
+            provider="anthropic",
+            model="claude-3-5-haiku-20241022",
+            messages=[{"role": "user", "content": "Jaki trend BTC?"}],
+            response_text="Wzrostowy",
+            input_tokens=1000,
+            output_tokens=200,
+            response_time_ms=850.0,
+            metadata={"symbol": "BTC-USD"}
+        )
+        assert api_logger.flush()
+        
+        files = list(tmp_path.glob("api_llm_requests_*.jsonl"))
+        assert len(files) == 1
+        lines = files[0].read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        
+        request, response = [json.loads(line) for line in lines]
+        assert request["type"] == "REQUEST"
+        assert request["messages"][0]["content"] == "Jaki trend BTC?"
+        assert response["type"] == "RESPONSE"
+        assert response["usage"]["total_tokens"] == 1200
+        assert response["metadata"]["symbol"] == "BTC-USD"
+    
+    def test_incremental_stats_per_provider_model(self, tmp_path):
+        """Test liczników per provider/model (wywołania, tokeny, koszt, latencja)."""
+        api_logger = APILogger(log_dir=str(tmp_path))
+        model = "claude-3-5-haiku-20241022"
+        
+        for latency in [100.0, 200.0, 300.0, 400.0]:
+            api_logger.log_response("anthropic", model, "ok", input_tokens=1_000_000,
+                                    output_tokens=0, response_time_ms=latency)
+        api_logger.log_response("anthropic", model, "", response_time_ms=5000.0, error="timeout")
+        
+        stats = api_logger.get_session_stats()
+        
+        assert stats["total_requests"] == 4
+        assert stats["total_errors"] == 1
+        assert stats["total_cost_usd"] == pytest.approx(1.0)
+        assert stats["cost_by_model"][model]["cost_pln"] == pytest.approx(4.0)
+        
+        counters = stats["by_provider_model"][f"anthropic/{model}"]
+        assert counters["calls"] == 5
+        assert counters["errors"] == 1
+        assert counters["latency"]["count"] == 5
+        assert counters["latency"]["p50_ms"] == pytest.approx(300.0, rel=0.05)
+        assert counters["latency"]["max_ms"] == 5000.0
+    
+    def test_size_rotation_with_gzip(self, tmp_path):
+        """Test rotacji po rozmiarze z kompresją zrotowanych plików."""
+        api_logger = APILogger(log_dir=str(tmp_path), max_bytes=2000, compression="gzip")
+        
+        for i in range(20):
+            api_logger.log_request("openai", "gpt-4", [{"role": "user", "content": "x" * 200}],
+                                   metadata={"i": i})
+            assert api_logger.flush()
+        
+        rotated = sorted(tmp_path.glob("api_llm_requests_*.jsonl.gz"))
+        assert rotated
+        
+        records = []
+        for path in rotated:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f)
+        for path in tmp_path.glob("api_llm_requests_*.jsonl"):
+            records.extend(json.loads(line) for line in path.read_text(encoding="utf-8").splitlines())
+        
+        assert sorted(r["metadata"]["i"] for r in records) == list(range(20))
+    
+    def test_full_queue_does_not_block(self, tmp_path):
+        """Test odrzucania rekordów przy pełnej kolejce zamiast blokowania."""
+        api_logger = APILogger(log_dir=str(tmp_path), max_queue=1)
+        
+        for _ in range(200):
+            api_logger.log_request("openai", "gpt-4", [{"role": "user", "content": "x"}])
+        api_logger.flush()
+        
+        stats = api_logger.get_session_stats()
+        assert stats["dropped_records"] > 0
+    
+    def test_shared_writer_warns_on_different_settings(self, tmp_path):
+        """Test ostrzeżenia, gdy drugi logger tego samego katalogu żąda innej rotacji/kompresji."""
+        messages = []
+        sink_id = logger.add(messages.append, level="WARNING")
+        try:
+            first = APILogger(log_dir=str(tmp_path), max_bytes=2000)
+            second = APILogger(log_dir=str(tmp_path), max_bytes=2000)
+            assert not messages
+            third = APILogger(log_dir=str(tmp_path), max_bytes=5000, compression="gzip")
+        finally:
+            logger.remove(sink_id)
+        
+        assert first._writer is second._writer is third._writer
+        assert third._writer.max_bytes == 2000
+        assert len(messages) == 1
+        assert "max_bytes=2000 (żądano 5000)" in messages[0]
+        assert "compression=None (żądano 'gzip')" in messages[0]
+
+
+def test_latency_histogram_percentiles():
+    """Test percentyli histogramu (rozdzielczość ~5%)."""
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.add(float(value))
+    
+    assert histogram.percentile(50) == pytest.approx(500, rel=0.05)
+    assert histogram.percentile(99) == pytest.approx(990, rel=0.05)
+    assert histogram.summary()["count"] == 1000
+    assert LatencyHistogram().percentile(50) is None
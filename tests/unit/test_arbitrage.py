@@ -2,14 +2,17 @@
 Testy jednostkowe dla ArbitrageScanner.
 """
 
+import numpy as np
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from src.strategies.arbitrage import (
     ArbitrageScanner,
     ArbitrageOpportunity,
-    ArbitrageType
+    ArbitrageType,
+    DepthArbitrageScanner,
+    DepthBooks
 )
 
 
@@ -241,3 +244,90 @@ class TestArbitrageScanner:
             assert isinstance(report, str)
             assert "ARBITRAŻU" in report or "ARBITRAGE" in report
 
+
+
+class TestDepthBooks:
+    """Testy dla klasy DepthBooks."""
+    
+    def test_walk_depth(self):
+        """Test VWAP po kilku poziomach i braku płynności."""
+        books = DepthBooks(n_assets=2, depth=5)
+        books.update(0, bids=[(99.0, 1.0), (98.0, 2.0)], asks=[(100.0, 1.0), (101.0, 2.0)], timestamp=0.0)
+        books.update(1, bids=[(9.0, 1.0)], asks=[(10.0, 1.0)], timestamp=0.0)
+        
+        quantity = books.buy_quantity(201.0)
+        proceeds = books.sell_proceeds(np.array([2.0, 2.0]))
+        
+        # 100 USD na poziomie 100, 101 USD na poziomie 101 -> 2 BTC; drugi asset ma tylko 10 USD
+        assert quantity[0] == pytest.approx(2.0)
+        assert np.isnan(quantity[1])
+        assert proceeds[0] == pytest.approx(99.0 + 98.0)
+        assert np.isnan(proceeds[1])
+    
+    def test_incremental_update(self):
+        """Test zmian poziomów (wielkość 0 usuwa poziom)."""
+        books = DepthBooks(n_assets=1, depth=5)
+        books.update(0, bids=[(99.0, 1.0)], asks=[(100.0, 1.0), (101.0, 1.0)], timestamp=0.0)
+        
+        books.update(0, bids=[], asks=[(100.0, 0.0), (100.5, 3.0)], timestamp=1.0, snapshot=False)
+        
+        assert list(books.price['asks'][0, :2]) == [100.5, 101.0]
+        assert books.count['asks'][0] == 2
+        assert books.count['bids'][0] == 1
+
+
+class TestDepthArbitrageScanner:
+    """Testy dla klasy DepthArbitrageScanner."""
+    
+    def test_executable_spread_with_fees_and_funding(self):
+        """Test okazji: VWAP dla notional, opłaty taker i funding nogi perpetual."""
+        emitted = []
+        scanner = DepthArbitrageScanner(
+            assets=["BTC", "ETH"], notional_usd=100_000, min_profit=0.1, on_opportunity=emitted.append
+        )
+        scanner.set_funding_rate("dydx", "BTC", 0.0001)
+        
+        scanner.update_book("binance", "BTC", bids=[(49_990.0, 5.0)], asks=[(50_000.0, 1.0), (50_100.0, 5.0)])
+        assert scanner.update_book("dydx", "BTC", bids=[(50_500.0, 1.0), (50_400.0, 5.0)], asks=[(50_510.0, 5.0)])
+        
+        opp = emitted[0]
+        quantity = 1.0 + 50_000.0 / 50_100.0
+        proceeds = 50_500.0 + (quantity - 1.0) * 50_400.0
+        assert opp.exchange_buy == "binance" and opp.exchange_sell == "dydx"
+        assert opp.price_buy == pytest.approx(100_000 / quantity)
+        assert opp.spread_usd == pytest.approx(proceeds - 100_000)
+        # Short perpetual na dYdX otrzymuje funding
+        assert opp.funding_cost_percent == pytest.approx(-0.01)
+        assert opp.net_profit_percent == pytest.approx(opp.spread_percent - 0.15 + 0.01)
+        assert opp.latency_ms is not None and opp.latency_ms >= 0
+        
+        # Ta sama okazja nie jest emitowana ponownie, znika po wyrównaniu cen
+        assert scanner.update_book("binance", "ETH", bids=[(3_000.0, 50.0)], asks=[(3_001.0, 50.0)]) == []
+        scanner.update_book("dydx", "BTC", bids=[(50_000.0, 10.0)], asks=[(50_010.0, 10.0)])
+        assert scanner.opportunities() == []
+        assert scanner.stats == {'updates': 4, 'emitted': 1, 'closed': 1}
+    
+    def test_stale_book_ignored(self):
+        """Test pominięcia okazji ze starego orderbooka."""
+        scanner = DepthArbitrageScanner(assets=["BTC"], max_book_age=5.0)
+        
+        scanner.update_book("binance", "BTC", bids=[(49_990.0, 5.0)], asks=[(50_000.0, 5.0)],
+                            timestamp=datetime.now() - timedelta(seconds=60))
+        
+        assert scanner.update_book("dydx", "BTC", bids=[(51_000.0, 5.0)], asks=[(51_010.0, 5.0)]) == []
+    
+    def test_poll_books(self):
+        """Test rundy pobierania orderbooków i funding z kolektorów."""
+        binance = MagicMock()
+        binance.get_orderbook.return_value = {'bids': [(99.0, 1000.0)], 'asks': [(100.0, 1000.0)]}
+        dydx = MagicMock()
+        dydx.get_orderbook.return_value = {'bids': [(101.0, 1000.0)], 'asks': [(101.1, 1000.0)]}
+        dydx.get_tickers.return_value = {'SOL-USD': {'next_funding_rate': 0.0002}}
+        
+        with DepthArbitrageScanner(assets=["SOL"], collectors={'binance': binance, 'dydx': dydx}) as scanner:
+            opportunities = scanner.run(duration=0.05, interval=0.01)
+        
+        assert [opp.symbol for opp in opportunities] == ["SOL"]
+        assert opportunities[0].funding_rate == 0.0002
+        binance.get_orderbook.assert_called_with("SOL/USDT")
+        dydx.get_orderbook.assert_called_with("SOL-USD")
@@ -0,0 +1,108 @@
+"""
+Testy jednostkowe dla BacktestEngine i BacktestResult.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.synthetic_data import generate_ohlcv
+from src.trading.backtesting import BacktestEngine, BacktestResult, TRADE_DTYPE, longest_run
+from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+
+
+class AlternatingStrategy(BaseStrategy):
+    """Strategia testowa: long co `period` świec, wyjście po `hold` świecach."""
+    
+    name = "TestAlternating"
+    
+    def analyze(self, df, symbol="BTC-USD"):
+        if df.index[-1] % self.config.get("period", 7) == 0:
+            return TradingSignal(signal_type=SignalType.BUY, symbol=symbol, confidence=5.0,
+                                 price=df["close"].iloc[-1], strategy=self.name)
+        return None
+    
+    def should_close_position(self, df, entry_price, side, current_pnl_percent):
+        if abs(current_pnl_percent) >= self.config.get("exit_percent", 0.5):
+            return TradingSignal(signal_type=SignalType.CLOSE, symbol="BTC-USD", confidence=5.0,
+                                 price=df["close"].iloc[-1])
+        return None
+
+
+@pytest.fixture
+def ohlcv_df():
+    """300 świec 1h (UTC)."""
+    df = generate_ohlcv(300, seed=3, timestamp_column=True)
+    df["timestamp"] = df["timestamp"].dt.tz_localize("UTC")
+    return df
+
+
+@pytest.fixture
+def result(ohlcv_df):
+    engine = BacktestEngine(slippage_percent=0.05)
+    return engine.run_backtest(AlternatingStrategy({"period": 30}), "BTC-USD", ohlcv_df)
+
+
+class TestBacktestResultColumnar:
+    """Testy kolumnowego wyniku backtestu."""
+    
+    def test_full_resolution_equity(self, result, ohlcv_df):
+        """Test krzywej kapitału: punkt na każdą świecę, ostatni = kapitał końcowy."""
+        assert result.equity.dtype == np.float64
+        assert len(result.equity) == len(ohlcv_df) - 49
+        assert result.equity[0] == result.initial_balance
+        assert result.equity[-1] == pytest.approx(result.final_balance)
+        assert result.equity_series().index[0] == ohlcv_df["timestamp"].iloc[49]
+        assert result.equity_series().index.tz is not None
+    
+    def test_trade_log_matches_trades(self, result):
+        """Test zgodności logu kolumnowego z listą transakcji."""
+        assert result.total_trades > 2
+        assert result.trade_log.dtype == TRADE_DTYPE
+        np.testing.assert_allclose(result.trade_log["pnl"], [t["pnl"] for t in result.trades])
+        assert (result.trade_log["duration_seconds"] > 0).all()
+        assert result.trades[0]["duration_seconds"] == result.trade_log["duration_seconds"][0]
+    
+    def test_statistics_from_arrays(self, result):
+        """Test statystyk liczonych z pełnej krzywej i logu transakcji."""
+        pnl = result.trade_log["pnl"]
+        peaks = np.maximum.accumulate(result.equity)
+        
+        assert result.winning_trades == int((pnl > 0).sum())
+        assert result.total_profit - result.total_loss == pytest.approx(pnl.sum())
+        assert result.max_drawdown == pytest.approx(((peaks - result.equity) / peaks).max() * 100)
+        assert len(result.equity_curve) <= 1001
+    
+    def test_open_position_does_not_drop_equity(self, ohlcv_df):
+        """Test equity z marginem otwartej pozycji (bez kosztów brak skoku przy otwarciu)."""
+        engine = BacktestEngine(taker_fee=0.0, slippage_percent=0.0)
+        flat = ohlcv_df.assign(close=100.0, open=100.0, high=100.0, low=100.0)
+        
+        result = engine.run_backtest(AlternatingStrategy({"period": 30}), "BTC-USD", flat)
+        
+        np.testing.assert_allclose(result.equity, result.initial_balance)
+        assert result.max_drawdown == 0.0
+    
+    def test_parquet_roundtrip(self, result, tmp_path):
+        """Test zapisu i odczytu archiwum Parquet."""
+        result.to_parquet(tmp_path / "run")
+        
+        loaded = BacktestResult.from_parquet(tmp_path / "run")
+        
+        assert loaded.total_return == pytest.approx(result.total_return)
+        assert loaded.max_drawdown == pytest.approx(result.max_drawdown)
+        assert loaded.strategy_name == "TestAlternating"
+        np.testing.assert_array_equal(loaded.equity, result.equity)
+        np.testing.assert_array_equal(loaded.trade_log, result.trade_log)
+        pd.testing.assert_series_equal(loaded.equity_series(), result.equity_series())
+        assert loaded.trades[0]["side"] == result.trades[0]["side"]
+        assert loaded.trades[0]["entry_time"] == result.trades[0]["entry_time"]
+
+
+class TestLongestRun:
+    """Testy pomocnika serii."""
+    
+    def test_longest_run(self):
+        """Test najdłuższej serii True."""
+        assert longest_run(np.array([True, True, False, True, True, True, False])) == 3
+        assert longest_run(np.array([False, False])) == 0
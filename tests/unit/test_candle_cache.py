@@ -0,0 +1,127 @@
+"""
+Testy jednostkowe dla lokalnego cache świec.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.trading.backtesting import BacktestEngine
+from src.trading.candle_cache import CandleCache, missing_ranges
+
+
+class FakeExchange:
+    """Giełda testowa: deterministyczne świece 1h, zapamiętuje zapytania."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, symbol, timeframe, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        index = pd.date_range(start, end, freq=timeframe, tz="UTC", name="timestamp")
+        close = 100.0 + index.hour.to_numpy(dtype=float)
+        return pd.DataFrame({
+            "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0
+        }, index=index)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    db = DatabaseManager(database_url=f"sqlite:///{tmp_path / 'candles.db'}")
+    db.create_tables()
+    return CandleCache(db=db, merge_within=0)
+
+
+class TestMissingRanges:
+    """Testy wyznaczania brakujących podzakresów."""
+    
+    def test_gaps_on_grid(self):
+        """Test dziur na początku, w środku i na końcu zakresu."""
+        have = pd.date_range("2024-01-01 02:00", "2024-01-01 05:00", freq="1h").append(
+            pd.date_range("2024-01-01 08:00", "2024-01-01 09:00", freq="1h")
+        )
+        
+        gaps = missing_ranges(have, datetime(2024, 1, 1), datetime(2024, 1, 1, 11), "1h")
+        
+        assert gaps == [
+            (pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-01 01:00")),
+            (pd.Timestamp("2024-01-01 06:00"), pd.Timestamp("2024-01-01 07:00")),
+            (pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-01 11:00"))
+        ]
+    
+    def test_merge_close_gaps(self):
+        """Test łączenia dziur oddzielonych kilkoma świecami."""
+        have = pd.DatetimeIndex(["2024-01-01 02:00", "2024-01-01 03:00"])
+        
+        gaps = missing_ranges(have, datetime(2024, 1, 1), datetime(2024, 1, 1, 5), "1h", merge_within=2)
+        
+        assert gaps == [(pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-01 05:00"))]
+    
+    def test_full_coverage(self):
+        """Test braku dziur przy pełnym pokryciu."""
+        have = pd.date_range("2024-01-01", periods=24, freq="1h")
+        
+        assert missing_ranges(have, have[0], have[-1], "1h") == []
+
+
+class TestCandleCache:
+    """Testy read-through cache."""
+    
+    def test_second_read_is_local(self, cache):
+        """Test: drugi odczyt tego samego okresu bez zapytań do giełdy."""
+        exchange = FakeExchange()
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 3)
+        
+        first = cache.get_candles("BTC-USD", "1h", start, end, fetch=exchange)
+        second = cache.get_candles("BTC-USD", "1h", start, end, fetch=exchange)
+        
+        assert len(exchange.calls) == 1
+        assert len(first) == len(second) == 49
+        pd.testing.assert_frame_equal(first, second)
+        assert str(second.index.tz) == "UTC"
+    
+    def test_extension_fetches_only_missing(self, cache):
+        """Test: rozszerzony zakres pobiera tylko brakujący fragment."""
+        exchange = FakeExchange()
+        cache.get_candles("BTC-USD", "1h", datetime(2024, 1, 2), datetime(2024, 1, 3), fetch=exchange)
+        
+        df = cache.get_candles("BTC-USD", "1h", datetime(2024, 1, 1), datetime(2024, 1, 3), fetch=exchange)
+        
+        assert len(df) == 49
+        assert df.index.is_monotonic_increasing
+        gap_start, gap_end = exchange.calls[-1]
+        assert gap_start == pd.Timestamp("2024-01-01 00:00")
+        assert gap_end <= pd.Timestamp("2024-01-02 00:00")
+    
+    def test_exchange_hole_not_refetched(self, cache):
+        """Test: świec, których giełda nie ma, nie pobiera się przy każdym odczycie."""
+        class HoleyExchange(FakeExchange):
+            def __call__(self, symbol, timeframe, start, end):
+                df = super().__call__(symbol, timeframe, start, end)
+                return df[df.index.hour != 5]
+        
+        exchange = HoleyExchange()
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 1, 12)
+        
+        first = cache.get_candles("BTC-USD", "1h", start, end, fetch=exchange)
+        second = cache.get_candles("BTC-USD", "1h", start, end, fetch=exchange)
+        
+        assert len(exchange.calls) == 1
+        assert len(first) == len(second) == 12
+    
+    def test_engine_uses_cache(self, cache):
+        """Test BacktestEngine.fetch_historical_data przez cache (bez kolektora dYdX)."""
+        exchange = FakeExchange()
+        engine = BacktestEngine(candle_cache=cache)
+        engine._fetch_from_exchange = exchange
+        
+        df = engine.fetch_historical_data("BTC-USD", "1h", datetime(2024, 1, 1), datetime(2024, 1, 2))
+        engine.fetch_historical_data("BTC-USD", "1h", datetime(2024, 1, 1), datetime(2024, 1, 2))
+        
+        assert len(exchange.calls) == 1
+        assert "timestamp" in df.columns
+        assert len(df) == 25
+        assert engine._dydx is None
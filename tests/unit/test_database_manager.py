@@ -2,13 +2,38 @@
 Testy jednostkowe dla DatabaseManager.
 """
 
+import threading
 import pytest
 import pandas as pd
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, MagicMock
 
 from src.database.manager import DatabaseManager
-from src.database.models import OHLCV, Signal
+from src.database.models import OHLCV, Signal, LLMSentimentAnalysis, Ticker
+
+
+def _add_llm_sentiment(db, timestamp, region, score, market_impact='medium', symbol='BTC/USDC'):
+    """Dodaje pojedynczą analizę sentymentu LLM do bazy."""
+    with db.get_session() as session:
+        session.add(LLMSentimentAnalysis(
+            timestamp=timestamp,
+            symbol=symbol,
+            region=region,
+            language='en',
+            llm_model='test-model',
+            input_tokens=10,
+            output_tokens=5,
+            total_tokens=15,
+            cost_pln=0.01,
+            sentiment='neutral',
+            score=score,
+            confidence=0.8,
+            fud_level=0.1,
+            fomo_level=0.2,
+            market_impact=market_impact,
+            prompt='prompt',
+            response='response'
+        ))
 
 
 class TestDatabaseManager:
@@ -68,6 +93,30 @@ class TestDatabaseManager:
         # Drugi zapis powinien zwrócić 0 (duplikaty)
         assert count2 == 0
     
+    def test_save_ohlcv_batch(self, temp_db_path):
+        """Test zapisu świec wielu symboli jedną transakcją z jednym odświeżeniem rollupów na symbol."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        index = pd.date_range('2025-01-01 00:00', periods=120, freq='1min', tz='UTC')
+        df_1m = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 1.0}, index=index)
+        db.save_ohlcv(df_1m.iloc[:60], "binance", "BTC/USDC", "1m")
+        
+        with patch.object(db, 'refresh_ohlcv_rollups', wraps=db.refresh_ohlcv_rollups) as refresh:
+            saved = db.save_ohlcv_batch([
+                ("binance", "BTC/USDC", df_1m, None),
+                ("binance", "ETH/USDC", df_1m, (index[0], index[-1] + pd.Timedelta(minutes=5))),
+                ("dydx", "BTC-USD", df_1m.iloc[:0], None),
+            ])
+        
+        assert saved == {("binance", "BTC/USDC"): 60, ("binance", "ETH/USDC"): 120}
+        assert sorted(call.args[:2] for call in refresh.call_args_list) == [
+            ("binance", "BTC/USDC"), ("binance", "ETH/USDC")
+        ]
+        assert db.get_ohlcv("binance", "BTC/USDC", "1h")['volume'].tolist() == [60.0, 60.0]
+        assert db.missing_ranges("binance", "ETH/USDC", "1m", index[0], index[-1] + pd.Timedelta(minutes=5)) == []
+        assert db.save_ohlcv_batch([("binance", "ETH/USDC", df_1m, None)]) == {("binance", "ETH/USDC"): 0}
+    
     def test_get_ohlcv(self, temp_db_path, sample_ohlcv_dataframe):
         """Test pobierania danych OHLCV."""
         db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
@@ -161,4 +210,324 @@ class TestDatabaseManager:
         
         assert isinstance(available, pd.DataFrame)
         assert len(available) >= 2  # Co najmniej 2 kombinacje exchange:symbol:timeframe
+    
+    def test_llm_sentiment_timeseries_grouped(self, temp_db_path):
+        """Test agregacji sentymentu LLM po regionach i godzinach."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        base = (datetime.utcnow() - timedelta(hours=5)).replace(minute=0, second=0, microsecond=0)
+        _add_llm_sentiment(db, base + timedelta(minutes=10), 'US', 0.2, 'low')
+        _add_llm_sentiment(db, base + timedelta(minutes=40), 'US', 0.6, 'high')
+        _add_llm_sentiment(db, base + timedelta(hours=1, minutes=5), 'CN', -0.4)
+        _add_llm_sentiment(db, base + timedelta(hours=2, minutes=5), 'US', 0.0)
+        db.refresh_llm_sentiment_hourly()
+        
+        df = db.get_llm_sentiment_timeseries('BTC/USDC', days_back=1, resolution_hours=1.0)
+        
+        assert set(df.columns) == {'US', 'CN'}
+        assert len(df) == 3
+        assert df['US'].iloc[0] == pytest.approx(0.4)
+        assert df.attrs['market_impact']['US'].iloc[0] == 'high'
+        assert df.attrs['confidence']['CN'].iloc[1] == pytest.approx(0.8)
+    
+    def test_llm_sentiment_hourly_incremental_refresh(self, temp_db_path):
+        """Test przyrostowego odświeżania godzinowego rollupu."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        base = datetime(2025, 1, 1, 10, 0)
+        _add_llm_sentiment(db, base + timedelta(minutes=15), 'US', 0.5)
+        
+        assert db.refresh_llm_sentiment_hourly() == 1
+        
+        # Nowa analiza w tej samej godzinie i w kolejnej
+        _add_llm_sentiment(db, base + timedelta(minutes=45), 'US', -0.5)
+        _add_llm_sentiment(db, base + timedelta(hours=1, minutes=5), 'US', 1.0)
+        
+        assert len(db.get_llm_sentiment_hourly('BTC/USDC')) == 1  # odczyt nie odświeża
+        hourly = db.get_llm_sentiment_hourly('BTC/USDC', refresh=True)
+        
+        assert len(hourly) == 2
+        assert hourly['samples'].tolist() == [2, 1]
+        assert hourly['score'].iloc[0] == pytest.approx(0.0)
+        assert hourly['score'].iloc[1] == pytest.approx(1.0)
+    
+    def test_llm_sentiment_hourly_concurrent_refresh(self, temp_db_path):
+        """Test równoległego odświeżania tych samych przedziałów (upsert zamiast DELETE + INSERT)."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        base = datetime(2025, 1, 1, 10, 0)
+        for hour in range(3):
+            _add_llm_sentiment(db, base + timedelta(hours=hour, minutes=15), 'US', 0.1 * hour)
+        db.refresh_llm_sentiment_hourly()
+        _add_llm_sentiment(db, base + timedelta(hours=2, minutes=30), 'US', 0.6)
+        
+        errors = []
+        
+        def refresh():
+            try:
+                db.refresh_llm_sentiment_hourly(start_date=base)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=refresh) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        hourly = db.get_llm_sentiment_hourly('BTC/USDC')
+        assert errors == []
+        assert hourly['samples'].tolist() == [1, 1, 2]
+        assert hourly['score'].iloc[2] == pytest.approx(0.4)
+    
+    def test_get_ohlcv_routes_to_rollup(self, temp_db_path):
+        """Test odczytu wyższych interwałów z rollupu świec 1m."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        index = pd.date_range('2025-01-01 00:00', periods=120, freq='1min')
+        df_1m = pd.DataFrame({
+            'open': range(120),
+            'high': [x + 0.5 for x in range(120)],
+            'low': [x - 0.5 for x in range(120)],
+            'close': [x + 0.25 for x in range(120)],
+            'volume': [1.0] * 120
+        }, index=index, dtype=float)
+        db.save_ohlcv(df_1m, "binance", "BTC/USDC", "1m")
+        
+        result = db.get_ohlcv("binance", "BTC/USDC", "1h")
+        
+        assert len(result) == 2
+        first = result.iloc[0]
+        assert first['open'] == 0.0
+        assert first['high'] == 59.5
+        assert first['low'] == -0.5
+        assert first['close'] == 59.25
+        assert first['volume'] == 60.0
+        
+        # Nowe świece 1m trafiają do rollupu przy zapisie
+        late = pd.DataFrame({
+            'open': [200.0], 'high': [300.0], 'low': [100.0], 'close': [250.0], 'volume': [5.0]
+        }, index=[pd.Timestamp('2025-01-01 02:00')])
+        db.save_ohlcv(late, "binance", "BTC/USDC", "1m")
+        
+        assert len(db.get_ohlcv("binance", "BTC/USDC", "1h")) == 3
+        result = db.get_ohlcv("binance", "BTC/USDC", "4h")
+        assert len(result) == 1
+        assert result['high'].iloc[0] == 300.0
+        assert result['close'].iloc[0] == 250.0
+        assert result['volume'].iloc[0] == 125.0
+    
+    def test_get_ohlcv_webapp_timeframes_from_rollup(self, temp_db_path):
+        """Test interwałów wykresu webapp (30m, 3h, 12h, 2d) czytanych z rollupu 1m."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        index = pd.date_range('2025-01-01 00:00', periods=6 * 60, freq='1min')
+        df_1m = pd.DataFrame({
+            'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 1.0
+        }, index=index)
+        db.save_ohlcv(df_1m, "binance", "BTC/USDC", "1m")
+        
+        assert len(db.get_ohlcv("binance", "BTC/USDC", "30m")) == 12
+        three_hours = db.get_ohlcv("binance", "BTC/USDC", "3h")
+        assert len(three_hours) == 2
+        assert three_hours['volume'].tolist() == [180.0, 180.0]
+        assert db.get_ohlcv("binance", "BTC/USDC", "12h")['volume'].tolist() == [360.0]
+        assert db.get_ohlcv("binance", "BTC/USDC", "2d")['volume'].tolist() == [360.0]
+    
+    def test_ohlcv_rollup_concurrent_refresh(self, temp_db_path):
+        """Test równoległego odświeżania rollupu OHLCV (upsert) i odczytu bez odświeżania."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        index = pd.date_range('2025-01-01 00:00', periods=90, freq='1min')
+        df_1m = pd.DataFrame({
+            'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 1.0
+        }, index=index)
+        db.save_ohlcv(df_1m, "binance", "BTC/USDC", "1m")
+        
+        # Świeca 1m z pominięciem save_ohlcv - odczyt nie przelicza rollupu
+        with db.get_session() as session:
+            session.add(OHLCV(
+                timestamp=datetime(2025, 1, 1, 1, 30), exchange="binance", symbol="BTC/USDC", timeframe="1m",
+                open=1.0, high=5.0, low=0.5, close=1.5, volume=1.0
+            ))
+        assert db.get_ohlcv("binance", "BTC/USDC", "1h")['high'].tolist() == [2.0, 2.0]
+        
+        errors = []
+        
+        def refresh():
+            try:
+                db.refresh_ohlcv_rollups("binance", "BTC/USDC", start_date=index[0], end_date="2025-01-01 01:30")
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=refresh) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        result = db.get_ohlcv("binance", "BTC/USDC", "1h")
+        assert result['high'].tolist() == [2.0, 5.0]
+        assert result['volume'].tolist() == [60.0, 31.0]
+    
+    def test_get_ohlcv_fingerprint(self, temp_db_path, sample_ohlcv_data):
+        """Test odcisku danych OHLCV zmieniającego się po dopisaniu świec."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        
+        empty = db.get_ohlcv_fingerprint("binance", "BTC/USDT", "1h")
+        assert empty['count'] == 0
+        assert empty['last_timestamp'] is None
+        
+        db.save_ohlcv(sample_ohlcv_data, "binance", "BTC/USDT", "1h")
+        before = db.get_ohlcv_fingerprint("binance", "BTC/USDT", "1h")
+        assert before['count'] == len(sample_ohlcv_data)
+        assert before['last_timestamp'] == sample_ohlcv_data.index.max()
+        
+        # Nowe świece 1m (źródło rollupów) też zmieniają odcisk
+        late = pd.DataFrame({
+            'open': [1.0], 'high': [1.0], 'low': [1.0], 'close': [1.0], 'volume': [1.0]
+        }, index=[sample_ohlcv_data.index.max() + pd.Timedelta(minutes=1)])
+        db.save_ohlcv(late, "binance", "BTC/USDT", "1m")
+        assert db.get_ohlcv_fingerprint("binance", "BTC/USDT", "1h") != before
 
+
+def _ohlcv_frame(start, periods, freq='1h'):
+    """Świece testowe na siatce interwału."""
+    index = pd.date_range(start, periods=periods, freq=freq)
+    return pd.DataFrame({
+        'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1.0
+    }, index=index)
+
+
+class TestOHLCVCoverage:
+    """Testy indeksu pokrycia OHLCV."""
+    
+    @pytest.fixture
+    def db(self, temp_db_path):
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        return db
+    
+    def test_ranges_merged_on_save(self, db):
+        """Test scalania zakresów: dziura znika po zapisaniu brakujących świec."""
+        df = _ohlcv_frame("2024-01-01", 10)
+        db.save_ohlcv(df.iloc[:3], "binance", "BTC/USDC", "1h")
+        db.save_ohlcv(df.iloc[6:], "binance", "BTC/USDC", "1h")
+        
+        assert db.get_ohlcv_coverage("binance", "BTC/USDC", "1h") == [
+            (pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-01 02:00")),
+            (pd.Timestamp("2024-01-01 06:00"), pd.Timestamp("2024-01-01 09:00"))
+        ]
+        
+        db.save_ohlcv(df.iloc[2:7], "binance", "BTC/USDC", "1h")
+        
+        assert db.get_ohlcv_coverage("binance", "BTC/USDC", "1h") == [
+            (pd.Timestamp("2024-01-01 00:00"), pd.Timestamp("2024-01-01 09:00"))
+        ]
+    
+    def test_latest_timestamp_is_newest(self, db):
+        """Test: latest_timestamp zwraca najnowszą, a nie najstarszą świecę."""
+        db.save_ohlcv(_ohlcv_frame("2024-01-01", 48), "binance", "BTC/USDC", "1h")
+        
+        assert db.latest_timestamp("binance", "BTC/USDC", "1h") == datetime(2024, 1, 2, 23)
+        assert db.latest_timestamp("binance", "ETH/USDC", "1h") is None
+    
+    def test_missing_ranges(self, db):
+        """Test brakujących zakresów na początku, w środku i na końcu okna."""
+        df = _ohlcv_frame("2024-01-01", 10)
+        db.save_ohlcv(df.iloc[:3], "binance", "BTC/USDC", "1h")
+        db.save_ohlcv(df.iloc[6:], "binance", "BTC/USDC", "1h")
+        
+        gaps = db.missing_ranges(
+            "binance", "BTC/USDC", "1h", datetime(2023, 12, 31, 22, 30), datetime(2024, 1, 1, 12)
+        )
+        
+        assert gaps == [
+            (pd.Timestamp("2023-12-31 23:00"), pd.Timestamp("2023-12-31 23:00")),
+            (pd.Timestamp("2024-01-01 03:00"), pd.Timestamp("2024-01-01 05:00")),
+            (pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-01 12:00"))
+        ]
+        assert db.missing_ranges("binance", "BTC/USDC", "1h", df.index[0], df.index[2]) == []
+    
+    def test_explicit_coverage_marks_exchange_holes(self, db):
+        """Test: zakres pobrany z giełdy nie jest dziurą, nawet bez części świec."""
+        df = _ohlcv_frame("2024-01-01", 10)
+        df = df[df.index.hour != 4]
+        db.save_ohlcv(df, "dydx", "BTC-USD", "1h", coverage=(df.index[0], df.index[-1]))
+        
+        assert db.missing_ranges("dydx", "BTC-USD", "1h", df.index[0], df.index[-1]) == []
+    
+    def test_coverage_built_for_existing_candles(self, db):
+        """Test budowy indeksu dla świec zapisanych z pominięciem save_ohlcv."""
+        with db.get_session() as session:
+            for hour in (0, 1, 2, 5):
+                session.add(OHLCV(
+                    timestamp=datetime(2024, 1, 1, hour), exchange="binance", symbol="BTC/USDC",
+                    timeframe="1h", open=1.0, high=1.0, low=1.0, close=1.0, volume=1.0
+                ))
+        
+        assert db.latest_timestamp("binance", "BTC/USDC", "1h") == datetime(2024, 1, 1, 5)
+        assert db.missing_ranges(
+            "binance", "BTC/USDC", "1h", datetime(2024, 1, 1), datetime(2024, 1, 1, 5)
+        ) == [(pd.Timestamp("2024-01-01 03:00"), pd.Timestamp("2024-01-01 04:00"))]
+    
+    def test_available_data_from_coverage(self, db):
+        """Test podsumowania danych z indeksu pokrycia (liczba świec i dziur)."""
+        df = _ohlcv_frame("2024-01-01", 10)
+        db.save_ohlcv(df.iloc[:3], "binance", "BTC/USDC", "1h")
+        db.save_ohlcv(df.iloc[6:], "binance", "BTC/USDC", "1h")
+        db.save_ohlcv(_ohlcv_frame("2024-01-01", 30, freq='1min'), "dydx", "BTC-USD", "1m")
+        
+        available = db.get_available_data().set_index(['exchange', 'symbol', 'timeframe'])
+        
+        assert available.loc[('binance', 'BTC/USDC', '1h'), 'candle_count'] == 7
+        assert available.loc[('binance', 'BTC/USDC', '1h'), 'gaps'] == 1
+        assert available.loc[('dydx', 'BTC-USD', '1m'), 'candle_count'] == 30
+        assert available.loc[('dydx', 'BTC-USD', '1m'), 'gaps'] == 0
+    
+    def test_available_data_indexes_series_without_coverage(self, db):
+        """Test: seria zapisana z pominięciem save_ohlcv pojawia się w podsumowaniu."""
+        db.save_ohlcv(_ohlcv_frame("2024-01-01", 3), "binance", "BTC/USDC", "1h")
+        with db.get_session() as session:
+            for hour in (0, 1, 2, 5):
+                session.add(OHLCV(
+                    timestamp=datetime(2024, 1, 1, hour), exchange="binance", symbol="ETH/USDC",
+                    timeframe="1h", open=1.0, high=1.0, low=1.0, close=1.0, volume=1.0
+                ))
+        
+        available = db.get_available_data().set_index(['exchange', 'symbol', 'timeframe'])
+        
+        assert available.loc[('binance', 'BTC/USDC', '1h'), 'candle_count'] == 3
+        assert available.loc[('binance', 'ETH/USDC', '1h'), 'candle_count'] == 4
+        assert available.loc[('binance', 'ETH/USDC', '1h'), 'gaps'] == 1
+
+
+class TestTickerBatch:
+    """Testy zapisu tickerów wielu symboli jedną partią."""
+    
+    def test_save_tickers_batch_skips_duplicates(self, temp_db_path):
+        """Test zapisu partii tickerów z pominięciem istniejących."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        db.create_tables()
+        timestamp = datetime(2024, 1, 1, 12)
+        df = pd.DataFrame([
+            {'timestamp': timestamp, 'exchange': 'binance', 'symbol': 'BTC/USDC', 'price': 42000.0, 'bid': 41999.0},
+            {'timestamp': timestamp, 'exchange': 'binance', 'symbol': 'ETH/USDC', 'price': 2200.0, 'bid': None},
+            {'timestamp': timestamp, 'exchange': 'dydx', 'symbol': 'BTC-USD', 'price': 42001.0, 'bid': float('nan')},
+        ])
+        
+        assert db.save_tickers_batch(df) == 3
+        assert db.save_tickers_batch(df) == 0
+        
+        with db.get_session() as session:
+            rows = session.query(Ticker).order_by(Ticker.symbol).all()
+        assert [r.symbol for r in rows] == ['BTC-USD', 'BTC/USDC', 'ETH/USDC']
+        assert rows[0].bid is None
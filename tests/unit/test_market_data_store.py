@@ -0,0 +1,132 @@
+"""
+Testy jednostkowe dla historii funding/OI z dołączaniem as-of.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.trading.market_data_store import FundingOIStore, asof_values, storage_symbols
+from src.trading.strategies import UnderhumanStrategyV14
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store z funding co 8h i OI co 1h zapisanymi jak w load_funding_oi_data.py."""
+    db = DatabaseManager(database_url=f"sqlite:///{tmp_path / 'market.db'}")
+    db.create_tables()
+    
+    funding_index = pd.date_range("2024-01-01", periods=3, freq="8h", name="timestamp")
+    db.save_funding_rates(
+        pd.DataFrame({'funding_rate': [0.0001, 0.0003, -0.0002], 'price': 40000.0}, index=funding_index),
+        exchange="binance", symbol="BTC/USDC"
+    )
+    oi_index = pd.date_range("2024-01-01", periods=6, freq="1h", name="timestamp")
+    db.save_open_interest(
+        pd.DataFrame({'open_interest': np.arange(6) * 10.0 + 100.0, 'price': 40000.0}, index=oi_index),
+        exchange="binance", symbol="BTC/USDT:USDT"
+    )
+    return FundingOIStore(db=db)
+
+
+def make_candles(start: str, periods: int, freq: str = "30min") -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq=freq, tz="UTC", name="timestamp")
+    return pd.DataFrame({'close': 40000.0}, index=index)
+
+
+class TestAsofValues:
+    """Testy złączenia as-of na tablicach int64."""
+    
+    def test_last_known_value(self):
+        """Test: wartość z ostatniego znacznika <= świecy, NaN przed pierwszym i po max_age."""
+        timestamps = np.array([10, 20, 30], dtype='i8')
+        values = np.array([1.0, 2.0, 3.0])
+        
+        result = asof_values(timestamps, values, np.array([5, 10, 19, 20, 45, 100], dtype='i8'), max_age_ns=20)
+        
+        np.testing.assert_array_equal(result, [np.nan, 1.0, 1.0, 2.0, 3.0, np.nan])
+        assert np.isnan(asof_values(np.empty(0, dtype='i8'), np.empty(0), np.array([1]))).all()
+    
+    def test_storage_symbols(self):
+        """Test symboli tabeli tickers dla symbolu strategii."""
+        assert storage_symbols("BTC-USD") == ("BTC/USDC", "BTC/USDT:USDT")
+        assert storage_symbols("eth/usdc") == ("ETH/USDC", "ETH/USDT:USDT")
+
+
+class TestFundingOIStore:
+    """Testy FundingOIStore."""
+    
+    def test_enrich_point_in_time(self, store):
+        """Test: świece dostają wartości znane w ich czasie, bez zaglądania w przyszłość."""
+        df = make_candles("2023-12-31 23:30", periods=20)
+        
+        enriched = store.enrich(df, "BTC-USD")
+        
+        funding = enriched['funding_rate']
+        assert np.isnan(funding.iloc[0])  # Przed pierwszym funding
+        assert funding.loc["2024-01-01 07:30"] == 0.0001
+        assert funding.loc["2024-01-01 08:00"] == 0.0003
+        oi = enriched['open_interest']
+        assert oi.loc["2024-01-01 02:30"] == 120.0
+        assert oi.loc["2024-01-01 06:30"] == 150.0
+        # OI starsze niż 2h to brak danych
+        assert np.isnan(oi.loc["2024-01-01 07:30"])
+        assert 'funding_rate' not in df.columns
+    
+    def test_series_cached_per_symbol(self, store, monkeypatch):
+        """Test: baza odpytywana raz na symbol, kolejne okna z pamięci."""
+        calls = []
+        original = store.db.get_funding_rates
+        monkeypatch.setattr(store.db, "get_funding_rates", lambda *a, **k: calls.append(a) or original(*a, **k))
+        
+        for start in ("2024-01-01 00:00", "2024-01-01 05:00", "2024-01-01 10:00"):
+            store.enrich(make_candles(start, periods=10), "BTC-USD")
+        
+        assert len(calls) == 1
+        store.invalidate("BTC/USDC")
+        store.enrich(make_candles("2024-01-01", periods=2), "BTC-USD")
+        assert len(calls) == 2
+    
+    def test_timestamp_column_and_existing_columns(self, store):
+        """Test kolumny timestamp i pozostawienia istniejących kolumn."""
+        df = make_candles("2024-01-01 09:00", periods=2).reset_index()
+        df['open_interest'] = 1.0
+        
+        enriched = store.enrich(df, "BTC-USD")
+        
+        assert list(enriched['funding_rate']) == [0.0003, 0.0003]
+        assert list(enriched['open_interest']) == [1.0, 1.0]
+    
+    def test_microsecond_timestamps(self, store):
+        """Test: kolumna timestamp datetime64[us] (jak z read_parquet) daje te same wartości co ns."""
+        df = make_candles("2024-01-01 04:00", periods=4).reset_index()
+        df_us = df.assign(timestamp=df['timestamp'].astype('datetime64[us, UTC]'))
+        
+        enriched = store.enrich(df_us, "BTC-USD")
+        
+        assert list(enriched['funding_rate']) == [0.0001] * 4
+        assert list(enriched['open_interest']) == [140.0, 140.0, 150.0, 150.0]
+        pd.testing.assert_frame_equal(enriched, store.enrich(df, "BTC-USD").assign(timestamp=df_us['timestamp']))
+    
+    def test_no_history(self, tmp_path):
+        """Test: bez historii w bazie kolumny nie są dodawane."""
+        store = FundingOIStore(db=DatabaseManager(database_url=f"sqlite:///{tmp_path / 'empty.db'}"))
+        
+        enriched = store.enrich(make_candles("2024-01-01", periods=3), "BTC-USD")
+        
+        assert list(enriched.columns) == ['close']
+
+
+class TestUnderhumanV14Backtest:
+    """Testy wzbogacania danych w trybie backtestingu."""
+    
+    def test_backtest_mode_uses_store(self, store):
+        """Test: UnderhumanStrategyV14 w backtestach dostaje historię funding/OI."""
+        strategy = UnderhumanStrategyV14({"_backtest_mode": True})
+        strategy._market_data_store = store
+        
+        enriched = strategy._enrich_df_with_market_data(make_candles("2024-01-01 04:00", periods=4), "BTC-USD")
+        
+        assert list(enriched['funding_rate']) == [0.0001] * 4
+        assert list(enriched['open_interest']) == [140.0, 140.0, 150.0, 150.0]
@@ -0,0 +1,140 @@
+"""
+Testy jednostkowe dla przyspieszonego replayu rynku.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.trading.paper_trading as paper_trading
+from src.trading.market_replay import MarketReplay, ReplayCollector, VirtualClock
+from src.trading.models_extended import TradingSession
+from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+from src.trading.trading_bot import TradingBot
+
+
+def make_candles(minutes: int = 600, start: str = "2024-01-01") -> pd.DataFrame:
+    """Świece 1m z rosnącą ceną (close = 100 + minuta)."""
+    index = pd.date_range(start, periods=minutes, freq="1min", tz="UTC", name="timestamp")
+    close = 100.0 + np.arange(minutes)
+    return pd.DataFrame(
+        {'open': close - 0.5, 'high': close + 1.0, 'low': close - 1.0, 'close': close, 'volume': 1.0},
+        index=index
+    )
+
+
+class BuyFirstStrategy(BaseStrategy):
+    """Strategia kupująca przy pierwszej analizie."""
+    
+    name = "BuyFirst"
+    timeframe = "1h"
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.analyzed_at = []
+    
+    def analyze(self, df, symbol="BTC-USD"):
+        self.analyzed_at.append(df.index[-1])
+        if len(self.analyzed_at) > 1:
+            return None
+        price = float(df['close'].iloc[-1])
+        return TradingSignal(
+            signal_type=SignalType.BUY, symbol=symbol, confidence=8, price=price,
+            stop_loss=price * 0.5, take_profit=price + 120.0, strategy=self.name
+        )
+
+
+class TestVirtualClock:
+    """Testy VirtualClock."""
+    
+    def test_install_patches_project_modules(self):
+        """Test podmiany datetime.now w modułach projektu i przywrócenia."""
+        clock = VirtualClock(datetime(2024, 1, 1, 12, 0))
+        
+        with clock.installed():
+            assert paper_trading.utcnow() == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+            clock.advance(90)
+            assert paper_trading.datetime.now(timezone.utc) == datetime(2024, 1, 1, 12, 1, 30, tzinfo=timezone.utc)
+            assert isinstance(datetime(2020, 1, 1), paper_trading.datetime)
+            assert paper_trading.datetime(2020, 1, 1) == datetime(2020, 1, 1)
+        
+        assert paper_trading.datetime is datetime
+        assert paper_trading.utcnow().year > 2024
+    
+    def test_clock_never_goes_back(self):
+        """Test blokady cofania zegara."""
+        clock = VirtualClock(datetime(2024, 1, 1))
+        
+        with pytest.raises(ValueError):
+            clock.set(datetime(2023, 12, 31))
+
+
+class TestReplayCollector:
+    """Testy ReplayCollector."""
+    
+    def test_no_lookahead(self):
+        """Test: widoczne tylko zamknięte świece bazowe, bieżąca godzina agregowana z nich."""
+        df = make_candles()
+        clock = VirtualClock(datetime(2024, 1, 1, 2, 30))
+        collector = ReplayCollector({"BTC-USD": df}, clock=clock)
+        
+        hourly = collector.fetch_candles("BTC-USD", "1h", limit=10)
+        
+        visible = df[df.index < "2024-01-01 02:30"]
+        expected = visible.resample("1h").agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        )
+        pd.testing.assert_frame_equal(hourly, expected, check_freq=False, check_names=False)
+        assert collector.get_ticker("BTC-USD")['oracle_price'] == visible['close'].iloc[-1]
+        assert len(collector.fetch_candles("BTC-USD", "1m", limit=5)) == 5
+        assert collector.fetch_candles("BTC-USD", "1m", limit=5).index[-1] == visible.index[-1]
+    
+    def test_tickers_and_orderbook(self):
+        """Test tickerów jednym zapytaniem i syntetycznego orderbooka."""
+        collector = ReplayCollector(
+            {"BTC-USD": make_candles(), "ETH-USD": make_candles()},
+            clock=VirtualClock(datetime(2024, 1, 1, 1, 0))
+        )
+        
+        tickers = collector.get_tickers(["BTC-USD", "ETH-USD", "SOL-USD"])
+        book = collector.get_orderbook("BTC-USD")
+        
+        assert sorted(tickers) == ["BTC-USD", "ETH-USD"]
+        assert tickers["ETH-USD"]['oracle_price'] == 159.0
+        assert book['bids'][0][0] < 159.0 < book['asks'][0][0]
+        assert collector.api_calls == 2
+
+
+class TestMarketReplay:
+    """Testy MarketReplay z TradingBot."""
+    
+    def test_bot_runs_in_virtual_time(self, tmp_path):
+        """Test: pętla bota w czasie wirtualnym, znaczniki czasu z replayu."""
+        strategy = BuyFirstStrategy()
+        
+        with MarketReplay({"BTC-USD": make_candles()}, start=datetime(2024, 1, 1, 1, 0)) as replay:
+            bot = TradingBot(
+                database_url=f"sqlite:///{tmp_path / 'replay.db'}",
+                symbols=["BTC-USD"],
+                strategy=strategy,
+                check_interval=300,
+                dydx_collector=replay.collector
+            )
+            result = replay.run(bot)
+        
+        # 01:00 -> koniec danych (10:00) co 5 minut
+        assert result['cycles'] == 109
+        assert result['end'] == datetime(2024, 1, 1, 10, 5, tzinfo=timezone.utc)
+        assert strategy.analyzed_at[0] == pd.Timestamp("2024-01-01 00:00", tz="UTC")
+        
+        trades = bot.engine_pt.get_trade_history()
+        assert len(trades) == 1
+        assert trades[0].exit_reason == "take_profit"
+        assert trades[0].entry_time == datetime(2024, 1, 1, 1, 0)
+        assert trades[0].exit_time == datetime(2024, 1, 1, 3, 0)
+        
+        session = bot.session.query(TradingSession).one()
+        assert session.started_at == datetime(2024, 1, 1, 1, 0)
+        assert session.duration_seconds == 9 * 3600 + 5 * 60
@@ -0,0 +1,73 @@
+"""
+Testy jednostkowe dla metryk czasów etapów.
+"""
+
+import json
+import urllib.request
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, start_metrics_server
+
+
+class TestMetricsRegistry:
+    """Testy dla klasy MetricsRegistry."""
+    
+    def test_disabled_records_nothing(self):
+        """Test braku pomiarów przy wyłączonych metrykach."""
+        metrics = MetricsRegistry(enabled=False)
+        
+        with metrics.span("stage"):
+            pass
+        metrics.observe("stage", 10.0)
+        metrics.increment("events")
+        
+        snapshot = metrics.snapshot()
+        assert snapshot["stages"] == []
+        assert snapshot["counters"] == []
+    
+    def test_span_records_latency_and_errors(self):
+        """Test zapisu czasu spanu i licznika błędów."""
+        metrics = MetricsRegistry(enabled=True)
+        
+        for value in [10.0, 20.0, 30.0]:
+            metrics.observe("trading_bot.get_market_data", value, symbol="BTC-USD")
+        with pytest.raises(ValueError):
+            with metrics.span("dydx.request", endpoint="/candles"):
+                raise ValueError("timeout")
+        
+        snapshot = metrics.snapshot()
+        stages = {s["name"]: s for s in snapshot["stages"]}
+        
+        market_data = stages["trading_bot.get_market_data"]
+        assert market_data["labels"] == {"symbol": "BTC-USD"}
+        assert market_data["count"] == 3
+        assert market_data["p50_ms"] == pytest.approx(20.0, rel=0.05)
+        assert stages["dydx.request"]["count"] == 1
+        assert snapshot["counters"][0]["name"] == "dydx.request.errors"
+    
+    def test_prometheus_text_format(self):
+        """Test eksportu w formacie Prometheusa."""
+        metrics = MetricsRegistry(enabled=True)
+        metrics.observe("llm.call", 1200.0, model='claude "x"')
+        
+        text = metrics.to_prometheus()
+        
+        assert "# TYPE ai_blockchain_stage_latency_ms summary" in text
+        assert 'ai_blockchain_stage_latency_ms_count{stage="llm.call",model="claude \\"x\\""} 1' in text
+        assert 'quantile="0.99"' in text
+    
+    def test_http_server(self):
+        """Test lokalnego serwera HTTP z metrykami."""
+        metrics = MetricsRegistry(enabled=True)
+        metrics.observe("trading_bot.run_cycle", 50.0)
+        server = start_metrics_server(port=0, registry=metrics)
+        try:
+            base = f"http://127.0.0.1:{server.server_port}"
+            snapshot = json.loads(urllib.request.urlopen(f"{base}/metrics.json").read())
+            text = urllib.request.urlopen(f"{base}/metrics").read().decode("utf-8")
+        finally:
+            server.shutdown()
+        
+        assert snapshot["stages"][0]["name"] == "trading_bot.run_cycle"
+        assert 'stage="trading_bot.run_cycle"' in text
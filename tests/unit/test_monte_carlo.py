@@ -0,0 +1,100 @@
+"""
+Testy jednostkowe dla analizy Monte Carlo wyników backtestu.
+"""
+
+import numpy as np
+import pytest
+
+from src.trading.backtesting import BacktestResult
+from src.trading.monte_carlo import MonteCarloAnalyzer, max_drawdown_percent
+
+
+@pytest.fixture
+def trades():
+    """Log transakcji w formacie BacktestEngine (100 transakcji, lekki zysk)."""
+    rng = np.random.default_rng(7)
+    return [
+        {
+            "exit_time": i,
+            "pnl": float(pnl),
+            "entry_price": 100.0,
+            "exit_price": 101.0,
+            "size": 10.0,
+            "fees": 1.0
+        }
+        for i, pnl in enumerate(rng.normal(10, 80, 100))
+    ]
+
+
+class TestMaxDrawdown:
+    """Testy wektorowego max drawdown."""
+    
+    def test_rows_are_independent(self):
+        """Test drawdownu liczonego osobno dla każdej ścieżki."""
+        equity = np.array([
+            [100.0, 120.0, 90.0, 130.0],
+            [100.0, 110.0, 121.0, 133.1]
+        ])
+        
+        np.testing.assert_allclose(max_drawdown_percent(equity), [25.0, 0.0])
+
+
+class TestMonteCarloAnalyzer:
+    """Testy symulacji na logu transakcji."""
+    
+    def test_original_path_matches_trades(self, trades):
+        """Test zwrotu oryginalnej ścieżki z sumy PnL."""
+        analyzer = MonteCarloAnalyzer.from_trades(trades, initial_balance=10000.0)
+        
+        expected = sum(t["pnl"] for t in trades) / 10000.0 * 100
+        assert analyzer.original_return == pytest.approx(expected)
+    
+    def test_shuffle_preserves_final_balance(self, trades):
+        """Test permutacji: stały wynik końcowy, zmienny drawdown."""
+        mc = MonteCarloAnalyzer.from_trades(trades, seed=1).shuffle(500)
+        
+        np.testing.assert_allclose(mc.total_returns, mc.original_return)
+        assert mc.max_drawdowns.std() > 0
+        assert mc.max_drawdowns.min() >= 0
+    
+    def test_seed_is_reproducible(self, trades):
+        """Test powtarzalności wyników przy tym samym ziarnie (niezależnie od partii)."""
+        first = MonteCarloAnalyzer.from_trades(trades, seed=3, batch_size=64).resample(300)
+        second = MonteCarloAnalyzer.from_trades(trades, seed=3, batch_size=64).resample(300)
+        
+        np.testing.assert_array_equal(first.total_returns, second.total_returns)
+    
+    def test_bootstrap_produces_return_distribution(self, trades):
+        """Test rozkładu zwrotów z bootstrapu i przedziału ufności."""
+        analyzer = MonteCarloAnalyzer.from_trades(trades, seed=2)
+        
+        for mc in (analyzer.resample(2000), analyzer.block_bootstrap(2000, block_size=10)):
+            low, high = mc.confidence_interval("total_return", 0.9)
+            assert low < mc.original_return < high
+            assert 0.0 <= mc.probability_of_loss <= 1.0
+    
+    def test_cost_perturbation_only_worsens(self, trades):
+        """Test perturbacji kosztów: wyniki nie lepsze niż oryginał."""
+        mc = MonteCarloAnalyzer.from_trades(trades, seed=4).perturb_costs(
+            1000, slippage_percent=(0.0, 0.2), fee_multiplier=(1.0, 3.0)
+        )
+        
+        assert (mc.total_returns <= mc.original_return + 1e-9).all()
+        assert mc.total_returns.min() < mc.original_return
+    
+    def test_from_result_and_empty_log(self):
+        """Test wyniku bez transakcji - ścieżki płaskie."""
+        result = BacktestResult(initial_balance=5000.0, trades=[])
+        
+        mc = MonteCarloAnalyzer.from_result(result, seed=0).shuffle(10)
+        
+        assert mc.n_simulations == 10
+        np.testing.assert_array_equal(mc.final_balances, 5000.0)
+        assert mc.summary()["probability_of_loss"] == 0.0
+    
+    def test_unknown_metric_raises(self, trades):
+        """Test błędu dla nieznanej metryki."""
+        mc = MonteCarloAnalyzer.from_trades(trades, seed=0).shuffle(10)
+        
+        with pytest.raises(ValueError):
+            mc.confidence_interval("sharpe")
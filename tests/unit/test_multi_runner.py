@@ -0,0 +1,166 @@
+"""
+Testy jednostkowe dla runnera wielu strategii i wspólnego snapshotu rynku.
+"""
+
+import threading
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from src.trading.market_snapshot import MarketSnapshot
+from src.trading.multi_runner import MultiStrategyRunner, is_llm_strategy
+from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+
+
+class FakeCollector:
+    """Kolektor zliczający zapytania do giełdy."""
+    
+    def __init__(self, price: float = 50000.0):
+        self.price = price
+        self.calls = Counter()
+        self.lock = threading.Lock()
+    
+    def _count(self, name):
+        with self.lock:
+            self.calls[name] += 1
+    
+    def get_ticker(self, ticker="BTC-USD"):
+        self._count("get_ticker")
+        return {'ticker': ticker, 'oracle_price': self.price}
+    
+    def get_tickers(self, tickers):
+        self._count("get_tickers")
+        return {ticker: {'ticker': ticker, 'oracle_price': self.price} for ticker in tickers}
+    
+    def fetch_candles(self, ticker="BTC-USD", resolution="1h", limit=100, from_iso=None, to_iso=None):
+        self._count(f"fetch_candles:{ticker}:{resolution}")
+        index = pd.date_range("2025-01-01", periods=limit, freq="h", tz="UTC", name="timestamp")
+        return pd.DataFrame(
+            {'open': self.price, 'high': self.price, 'low': self.price, 'close': self.price, 'volume': 1.0},
+            index=index
+        )
+    
+    def get_funding_rates(self, ticker="BTC-USD", limit=100):
+        return pd.DataFrame({'funding_rate': [0.0001]})
+
+
+class BuyOnceStrategy(BaseStrategy):
+    """Strategia kupująca raz na symbol."""
+    
+    name = "BuyOnce"
+    
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.seen = set()
+        self.candles = []
+    
+    def analyze(self, df, symbol="BTC-USD"):
+        self.candles.append(len(df))
+        if symbol in self.seen:
+            return None
+        self.seen.add(symbol)
+        price = float(df['close'].iloc[-1])
+        return TradingSignal(
+            signal_type=SignalType.BUY, symbol=symbol, confidence=8, price=price,
+            stop_loss=price * 0.9, take_profit=price * 1.2, strategy=self.name
+        )
+
+
+class FakeLLMStrategy(BuyOnceStrategy):
+    """Strategia oznaczona jako LLM."""
+    
+    name = "FakeLLM"
+    uses_llm = True
+
+
+@pytest.fixture
+def runner(tmp_path):
+    collector = FakeCollector()
+    runner = MultiStrategyRunner(
+        database_url=f"sqlite:///{tmp_path / 'multi.db'}",
+        check_interval=60,
+        collector=collector
+    )
+    yield runner
+    runner.stop()
+
+
+class TestMarketSnapshot:
+    """Testy MarketSnapshot."""
+    
+    def test_candles_fetched_once_per_series(self):
+        """Test: jedna seria świec na cykl, mniejsze limity z pamięci."""
+        collector = FakeCollector()
+        snapshot = MarketSnapshot(collector, candle_limit=100)
+        snapshot.refresh(["BTC-USD"])
+        
+        assert len(snapshot.fetch_candles("BTC-USD", "1h", limit=50)) == 50
+        assert len(snapshot.fetch_candles("BTC-USD", "1h", limit=20)) == 20
+        assert collector.calls["fetch_candles:BTC-USD:1h"] == 1
+        
+        # Większy limit niż pobrany - jedno dodatkowe pobranie
+        assert len(snapshot.fetch_candles("BTC-USD", "1h", limit=200)) == 200
+        assert collector.calls["fetch_candles:BTC-USD:1h"] == 2
+        
+        snapshot.refresh(["BTC-USD"])
+        snapshot.fetch_candles("BTC-USD", "1h", limit=50)
+        assert collector.calls["fetch_candles:BTC-USD:1h"] == 3
+    
+    def test_tickers_in_one_request(self):
+        """Test: tickery symboli jednym zapytaniem na cykl."""
+        collector = FakeCollector()
+        snapshot = MarketSnapshot(collector)
+        snapshot.refresh(["BTC-USD", "ETH-USD"])
+        
+        assert snapshot.get_ticker("ETH-USD")['oracle_price'] == 50000.0
+        assert snapshot.get_ticker("BTC-USD")['oracle_price'] == 50000.0
+        assert collector.calls["get_tickers"] == 1
+        assert collector.calls["get_ticker"] == 0
+    
+    def test_delegates_other_methods(self):
+        """Test przekazywania pozostałych metod do kolektora."""
+        snapshot = MarketSnapshot(FakeCollector())
+        
+        assert snapshot.get_funding_rates("BTC-USD")['funding_rate'].iloc[0] == 0.0001
+
+
+class TestMultiStrategyRunner:
+    """Testy MultiStrategyRunner."""
+    
+    def test_shared_market_data(self, runner):
+        """Test: N botów, dane rynkowe pobierane raz na symbol na cykl."""
+        symbols = ["BTC-USD", "ETH-USD"]
+        strategies = [BuyOnceStrategy() for _ in range(3)] + [FakeLLMStrategy()]
+        for i, strategy in enumerate(strategies):
+            runner.add_bot(strategy, f"account_{i}", symbols)
+        collector = runner.snapshot.collector
+        
+        results = runner.run_cycle()
+        
+        assert list(results.values()) == [None] * 4
+        assert collector.calls["get_tickers"] == 1
+        assert collector.calls["get_ticker"] == 0
+        for symbol in symbols:
+            assert collector.calls[f"fetch_candles:{symbol}:1h"] == 1
+        for bot in runner.bots:
+            assert sorted(p.symbol for p in bot.engine_pt.get_open_positions()) == symbols
+            assert bot.engine is runner.engine
+    
+    def test_accounts_are_separate(self, runner):
+        """Test: każdy bot ma własne konto paper trading."""
+        first = runner.add_bot(BuyOnceStrategy(), "first", ["BTC-USD"])
+        second = runner.add_bot(BuyOnceStrategy(), "second", ["BTC-USD"], initial_balance=5000.0)
+        
+        runner.run_cycle()
+        
+        assert first.engine_pt.account.id != second.engine_pt.account.id
+        assert len(first.engine_pt.get_open_positions()) == 1
+        assert len(second.engine_pt.get_open_positions()) == 1
+        with pytest.raises(ValueError):
+            runner.add_bot(BuyOnceStrategy(), "first", ["ETH-USD"])
+    
+    def test_llm_strategy_detection(self):
+        """Test rozpoznawania strategii LLM."""
+        assert is_llm_strategy(FakeLLMStrategy())
+        assert not is_llm_strategy(BuyOnceStrategy())
@@ -16,6 +16,7 @@ from src.trading.models import (
     OrderSide, OrderType, OrderStatus, PositionStatus
 )
 from src.trading.paper_trading import PaperTradingEngine
+from src.trading.position_book import JournalConflictError, _IdAllocator
 from src.trading.strategies.piotrek_strategy import PiotrekBreakoutStrategy
 from src.trading.strategies.base_strategy import TradingSignal, SignalType
 
@@ -312,6 +313,182 @@ class TestPaperTradingEngine:
         assert 'profit_factor' in stats
 
 
+class TestPriceTriggers:
+    """Testy zamykania pozycji przez indeks poziomów SL/TP."""
+    
+    def test_on_price_closes_only_crossed(self, paper_engine, mock_dydx):
+        """Test zamykania na strumieniu cen tylko przekroczonych pozycji."""
+        stops = [49000.0, 48000.0, 47000.0]
+        positions = [
+            paper_engine.open_position("BTC-USD", "long", 0.01, stop_loss=stop)
+            for stop in stops
+        ]
+        calls = mock_dydx.get_ticker.call_count
+        
+        trades = paper_engine.on_price("BTC-USD", 47500.0)
+        
+        assert [t.exit_reason for t in trades] == ["stop_loss", "stop_loss"]
+        assert [p.id for p in paper_engine.get_open_positions()] == [positions[2].id]
+        # Zamknięcie po cenie ze strumienia, bez pobierania ceny
+        assert mock_dydx.get_ticker.call_count == calls
+        assert paper_engine.on_price("BTC-USD", 47500.0) == []
+    
+    def test_liquidation_with_leverage(self, paper_engine, mock_dydx):
+        """Test likwidacji pozycji z dźwignią przed stop loss."""
+        paper_engine.open_position("BTC-USD", "long", 0.1, leverage=10.0, stop_loss=40000.0)
+        
+        trades = paper_engine.on_price("BTC-USD", 44000.0)
+        
+        assert [t.exit_reason for t in trades] == ["liquidation"]
+
+
+class TestWriteBehindPositionBook:
+    """Testy księgi pozycji w pamięci z zapisem write-behind."""
+    
+    @staticmethod
+    def _file_engine(tmp_path, mock_dydx, account_name="wb_account", **kwargs):
+        engine = create_engine(f"sqlite:///{tmp_path / 'paper.db'}", echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        return PaperTradingEngine(
+            session=session,
+            account_name=account_name,
+            dydx_collector=mock_dydx,
+            **kwargs
+        ), session
+    
+    def test_hot_path_without_sql(self, paper_engine, mock_dydx, db_session):
+        """Test braku zapytań SQL przy otwieraniu, SL/TP i zamykaniu pozycji."""
+        from sqlalchemy import event
+        
+        statements = []
+        bind = db_session.get_bind()
+        listener = lambda *args: statements.append(args[2])
+        event.listen(bind, "before_cursor_execute", listener)
+        try:
+            positions = [
+                paper_engine.open_position("BTC-USD", "long", 0.001, stop_loss=45000.0)
+                for _ in range(20)
+            ]
+            assert len(paper_engine.get_open_positions("BTC-USD")) == 20
+            assert paper_engine.check_stop_loss_take_profit() == []
+            paper_engine.close_position(positions[0].id)
+            assert len(paper_engine.get_open_positions()) == 19
+        finally:
+            event.remove(bind, "before_cursor_execute", listener)
+        
+        assert statements == []
+    
+    def test_flush_persists_book(self, paper_engine, mock_dydx, db_session):
+        """Test zapisu pozycji, transakcji i salda konta przy flush()."""
+        first = paper_engine.open_position("BTC-USD", "long", 0.05)
+        second = paper_engine.open_position("ETH-USD", "short", 0.05)
+        trade = paper_engine.close_position(first.id)
+        paper_engine.flush()
+        
+        db_session.expire_all()
+        open_rows = db_session.query(PaperPosition).filter_by(status=PositionStatus.OPEN).all()
+        assert [p.id for p in open_rows] == [second.id]
+        assert db_session.get(PaperPosition, first.id).status == PositionStatus.CLOSED
+        assert db_session.get(PaperTrade, trade.id).net_pnl == pytest.approx(trade.net_pnl)
+        account = db_session.query(PaperAccount).filter_by(name="test_account").one()
+        assert account.current_balance == pytest.approx(paper_engine.account.current_balance)
+        assert account.total_trades == 1
+    
+    def test_background_flush(self, tmp_path, mock_dydx):
+        """Test zapisu w tle bez jawnego flush()."""
+        import time
+        
+        engine, session = self._file_engine(tmp_path, mock_dydx, flush_interval=0.05)
+        position = engine.open_position("BTC-USD", "long", 0.1)
+        
+        deadline = time.time() + 5
+        while engine.writer.pending() and time.time() < deadline:
+            time.sleep(0.02)
+        
+        session.expire_all()
+        assert engine.writer.pending() == 0
+        assert session.get(PaperPosition, position.id) is not None
+        engine.close()
+        session.close()
+    
+    def test_replay_journal_after_crash(self, tmp_path, mock_dydx):
+        """Test odtworzenia z dziennika operacji niezapisanych przed awarią."""
+        engine, session = self._file_engine(tmp_path, mock_dydx, flush_interval=60)
+        kept = engine.open_position("BTC-USD", "long", 0.05)
+        closed = engine.open_position("ETH-USD", "long", 0.05)
+        trade = engine.close_position(closed.id)
+        balance = engine.account.current_balance
+        assert engine.writer.pending() == 3
+        # Awaria: wątek zatrzymany bez zapisu oczekujących operacji
+        engine.writer.close(flush=False)
+        session.close()
+        
+        restarted, session = self._file_engine(tmp_path, mock_dydx)
+        
+        assert [p.id for p in restarted.get_open_positions()] == [kept.id]
+        assert restarted.account.current_balance == pytest.approx(balance)
+        assert [t.id for t in restarted.get_trade_history()] == [trade.id]
+        restarted.close()
+        session.close()
+    
+    def test_processes_get_disjoint_ids(self, tmp_path, mock_dydx, monkeypatch):
+        """Test: dwa procesy na jednej bazie nadają rozłączne ID i zamykają tylko swoje wiersze."""
+        monkeypatch.setattr(_IdAllocator, "_blocks", {})
+        first, first_session = self._file_engine(tmp_path, mock_dydx, account_name="first", flush_interval=60)
+        # Drugi proces - własny stan alokatora
+        monkeypatch.setattr(_IdAllocator, "_blocks", {})
+        second, second_session = self._file_engine(tmp_path, mock_dydx, account_name="second", flush_interval=60)
+        
+        a = first.open_position("BTC-USD", "long", 0.05)
+        b = second.open_position("BTC-USD", "long", 0.05)
+        assert a.id != b.id
+        second.close_position(b.id)
+        first.flush()
+        second.flush()
+        
+        first_session.expire_all()
+        assert first_session.get(PaperPosition, a.id).status == PositionStatus.OPEN
+        assert first_session.get(PaperPosition, a.id).account_id == first.account.id
+        assert first_session.get(PaperPosition, b.id).status == PositionStatus.CLOSED
+        assert first_session.get(PaperPosition, b.id).account_id == second.account.id
+        first.close()
+        second.close()
+        first_session.close()
+        second_session.close()
+    
+    def test_id_conflict_stops_flush(self, tmp_path, mock_dydx):
+        """Test: kolizja ID z wierszem innego konta zatrzymuje zapis bez przesuwania checkpointu."""
+        first, first_session = self._file_engine(tmp_path, mock_dydx, account_name="first", flush_interval=60)
+        second, second_session = self._file_engine(tmp_path, mock_dydx, account_name="second", flush_interval=60)
+        taken = first.open_position("BTC-USD", "long", 0.05)
+        first.flush()
+        
+        ok = second.open_position("ETH-USD", "long", 0.05)
+        clash = {
+            "position": {**ok.to_dict(), "id": taken.id},
+            "account": second.account.snapshot(),
+            "register": {}
+        }
+        second.writer.submit("open", clash)
+        second.open_position("SOL-USD", "long", 0.05)
+        
+        with pytest.raises(JournalConflictError):
+            second.writer.flush()
+        
+        # Operacja przed kolizją zapisana, kolizja i kolejne czekają w kolejce i dzienniku
+        assert second.writer.pending() == 2
+        assert second.writer.flushed_seq == 1
+        second_session.expire_all()
+        assert second_session.get(PaperPosition, ok.id) is not None
+        assert second_session.get(PaperPosition, taken.id).account_id == first.account.id
+        assert len(second.writer.journal.read()) == 3
+        first.close()
+        second.close()
+        first_session.close()
+        second_session.close()
+
+
 class TestPiotrekStrategy:
     """Testy dla strategii Piotrka."""
     
@@ -0,0 +1,67 @@
+"""
+Testy jednostkowe dla asynchronicznego limitera zapytań.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.utils.rate_limiter import AsyncRateLimiter
+
+
+class TestAsyncRateLimiter:
+    """Testy AsyncRateLimiter."""
+    
+    def test_spacing_between_requests(self):
+        """Test: starty zapytań rozłożone co 1/requests_per_second."""
+        starts = []
+        
+        async def run():
+            limiter = AsyncRateLimiter(requests_per_second=20, max_concurrent=10)
+            await asyncio.gather(*(limiter.call(lambda: starts.append(time.monotonic())) for _ in range(5)))
+            return limiter
+        
+        limiter = asyncio.run(run())
+        
+        assert limiter.requests == 5
+        gaps = [b - a for a, b in zip(sorted(starts), sorted(starts)[1:])]
+        assert min(gaps) >= 0.04
+    
+    def test_concurrency_limit(self):
+        """Test: nie więcej zapytań w locie niż max_concurrent."""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+        
+        def blocking_call():
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+        
+        async def run():
+            limiter = AsyncRateLimiter(requests_per_second=1000, max_concurrent=2)
+            await asyncio.gather(*(limiter.call(blocking_call) for _ in range(6)))
+        
+        asyncio.run(run())
+        
+        assert state["peak"] == 2
+    
+    def test_calls_run_concurrently(self):
+        """Test: blokujące wywołania nakładają się w czasie (pula wątków)."""
+        async def run():
+            limiter = AsyncRateLimiter(requests_per_second=1000, max_concurrent=4)
+            return await asyncio.gather(*(limiter.call(time.sleep, 0.1) for _ in range(4)))
+        
+        started = time.monotonic()
+        asyncio.run(run())
+        
+        assert time.monotonic() - started < 0.3
+    
+    def test_invalid_rate(self):
+        """Test walidacji budżetu zapytań."""
+        with pytest.raises(ValueError):
+            AsyncRateLimiter(requests_per_second=0)
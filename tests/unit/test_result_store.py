@@ -0,0 +1,122 @@
+"""
+Testy jednostkowe dla cache wyników backtestu.
+"""
+
+import shutil
+import threading
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.synthetic_data import generate_ohlcv
+from src.trading.backtesting import BacktestEngine
+from src.trading.result_store import BacktestResultStore, data_fingerprint
+from tests.unit.test_backtesting import AlternatingStrategy
+
+
+@pytest.fixture
+def ohlcv_df():
+    return generate_ohlcv(200, seed=5, timestamp_column=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BacktestResultStore(tmp_path / "results")
+
+
+class TestBacktestResultStore:
+    """Testy cache wyników."""
+    
+    def test_repeat_run_is_served_from_cache(self, store, ohlcv_df, monkeypatch):
+        """Test zwrotu zapisanego wyniku przy powtórnym runie."""
+        engine = BacktestEngine(result_store=store)
+        first = engine.run_backtest(AlternatingStrategy({"period": 20}), "BTC-USD", ohlcv_df)
+        
+        # Strategia nie powinna być wywołana przy trafieniu w cache
+        monkeypatch.setattr(AlternatingStrategy, "analyze", lambda *a, **k: pytest.fail("brak cache"))
+        second = engine.run_backtest(AlternatingStrategy({"period": 20}), "BTC-USD", ohlcv_df)
+        
+        assert (store.hits, store.misses) == (1, 1)
+        assert second.total_return == pytest.approx(first.total_return)
+        np.testing.assert_array_equal(second.equity, first.equity)
+    
+    def test_key_changes_with_inputs(self, store, ohlcv_df):
+        """Test klucza zależnego od configu, ustawień silnika i danych."""
+        strategy = AlternatingStrategy({"period": 20})
+        engine = BacktestEngine()
+        run = {"position_size_percent": 10.0, "max_positions": 1}
+        base = store.make_key(strategy, "BTC-USD", ohlcv_df, engine.settings(), run)
+        
+        assert base == store.make_key(AlternatingStrategy({"period": 20}), "BTC-USD", ohlcv_df.copy(), engine.settings(), run)
+        assert base != store.make_key(AlternatingStrategy({"period": 21}), "BTC-USD", ohlcv_df, engine.settings(), run)
+        assert base != store.make_key(strategy, "BTC-USD", ohlcv_df, BacktestEngine(slippage_percent=0.2).settings(), run)
+        assert base != store.make_key(strategy, "BTC-USD", ohlcv_df, engine.settings(), {**run, "max_positions": 2})
+        
+        changed = ohlcv_df.copy()
+        changed.loc[150, "close"] *= 1.0001
+        assert data_fingerprint(changed) != data_fingerprint(ohlcv_df)
+    
+    def test_list_compare_and_prune(self, store, ohlcv_df):
+        """Test listy, porównania i czyszczenia runów."""
+        engine = BacktestEngine(result_store=store)
+        for period in (10, 20, 30):
+            engine.run_backtest(AlternatingStrategy({"period": period}), "BTC-USD", ohlcv_df)
+        
+        runs = store.list_runs(strategy="alternating")
+        assert len(runs) == 3
+        assert {r["config"]["period"] for r in runs} == {10, 20, 30}
+        
+        table = store.compare([r["key"][:10] for r in runs[:2]])
+        assert list(table.columns[:3]) == ["strategy", "symbol", "total_return"]
+        assert "param.period" in table.columns
+        
+        assert store.prune(older_than=timedelta(days=1)) == []
+        assert len(store.prune(keep_last=1, dry_run=True)) == 2
+        assert len(store.list_runs()) == 3
+        store.prune(keep_last=1)
+        assert len(store.list_runs()) == 1
+    
+    def test_parallel_put_same_key(self, store, ohlcv_df, monkeypatch):
+        """Test równoległych zapisów tego samego klucza i przegranego wyścigu o rename."""
+        result = BacktestEngine().run_backtest(AlternatingStrategy({"period": 20}), "BTC-USD", ohlcv_df)
+        errors = []
+        
+        def worker():
+            try:
+                store.put("samekey", result)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert store.get("samekey").total_return == pytest.approx(result.total_return)
+        
+        # Inny proces wstawia wpis między odsunięciem starego a rename - jego wpis zostaje
+        run_dir = store.directory / "samekey"
+        real_rename = Path.rename
+        
+        def racing_rename(path, target):
+            moved = real_rename(path, target)
+            if path == run_dir:
+                shutil.copytree(target, run_dir)
+            return moved
+        
+        monkeypatch.setattr(Path, "rename", racing_rename)
+        assert store.put("samekey", result, meta={"config": {"period": 99}}) == run_dir
+        
+        assert [p.name for p in store.directory.iterdir()] == ["samekey"]
+        assert [r["key"] for r in store.list_runs()] == ["samekey"]
+        assert "config" not in store.list_runs()[0]
+    
+    def test_resolve_unknown_prefix(self, store):
+        """Test błędu dla nieistniejącego klucza."""
+        with pytest.raises(ValueError):
+            store.resolve("deadbeef")
@@ -0,0 +1,136 @@
+"""
+Testy jednostkowe dla snapshotów analizy propagacji sentymentu (point-in-time).
+"""
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.collectors.sentiment.sentiment_snapshots import SentimentSnapshots
+from src.trading.backtesting import BacktestEngine
+from src.trading.strategies.base_strategy import SignalType
+from src.trading.strategies.sentiment_propagation_strategy import SentimentPropagationStrategy
+
+
+class TestSentimentSnapshots:
+    """Testy SentimentSnapshots."""
+    
+    def test_matches_full_analysis_on_window(self, analyzer, make_sentiment):
+        """Test: snapshot = pełna analiza okna days_back zamkniętych godzin przed granicą."""
+        df = make_sentiment(24 * 6, cn_gap=True)
+        snapshots = SentimentSnapshots.build(df, analyzer=analyzer, days_back=2, start="2025-01-02 12:00")
+        
+        for boundary in snapshots.times[::11]:
+            window = df[df.index < boundary].iloc[-48:]
+            lag_matrix = analyzer.compute_lag_matrix(window)
+            got = snapshots.lag_matrix_at(boundary)
+            
+            assert len(got) == len(lag_matrix)
+            for (a, b), expected in lag_matrix.items():
+                assert got[f"{a}-{b}"]['lag_hours'] == pytest.approx(expected.lag_hours)
+                assert got[f"{a}-{b}"]['correlation'] == pytest.approx(expected.correlation, abs=1e-5)
+                assert got[f"{a}-{b}"]['confidence'] == pytest.approx(expected.confidence, abs=1e-5)
+                assert got[f"{a}-{b}"]['direction'] == expected.direction.value
+            
+            waves = analyzer.detect_sentiment_waves(window)
+            recent = [w for w in waves if w.wave_time > boundary - pd.Timedelta(hours=24)]
+            results = snapshots.analysis_at(boundary)
+            assert results['summary']['waves_detected'] == len(waves)
+            assert [(w['origin'], w['affected_regions']) for w in results['waves']] == [
+                (w.origin_region, w.affected_regions) for w in recent
+            ]
+    
+    def test_no_lookahead(self, analyzer, make_sentiment):
+        """Test: zmiana danych po granicy nie zmienia snapshotu (także kubełek otwarty w chwili granicy)."""
+        df = make_sentiment(24 * 6, cn_gap=True)
+        boundary = pd.Timestamp("2025-01-04 10:00", tz="UTC")
+        future = df.copy()
+        future.loc[future.index >= boundary] = 5.0
+        
+        a = SentimentSnapshots.build(df, analyzer=analyzer, days_back=2)
+        b = SentimentSnapshots.build(future, analyzer=analyzer, days_back=2)
+        
+        i = a.index_of(boundary)
+        np.testing.assert_array_equal(a.lag_hours[:i + 1], b.lag_hours[:i + 1])
+        np.testing.assert_array_equal(a.leader[:i + 1], b.leader[:i + 1])
+        assert a.analysis_at(boundary) == b.analysis_at(boundary)
+        assert not np.array_equal(a.lag_hours[i + 1:], b.lag_hours[i + 1:], equal_nan=True)
+    
+    def test_lookup(self, analyzer, make_sentiment):
+        """Test odczytu: ostatnia granica <= czas świecy, poza zakresem None."""
+        snapshots = SentimentSnapshots.build(make_sentiment(24 * 6, cn_gap=True), analyzer=analyzer, days_back=2, start="2025-01-03")
+        
+        assert snapshots.times[0] == pd.Timestamp("2025-01-03", tz="UTC")
+        assert snapshots.index_of(pd.Timestamp("2025-01-03 05:59")) == 5  # naiwny czas = UTC
+        assert snapshots.analysis_at("2025-01-03 05:59") is snapshots.analysis_at("2025-01-03 05:00")
+        assert snapshots.analysis_at("2025-01-02 23:00") is None
+        assert snapshots.analysis_at("2025-02-01") is None
+        assert snapshots.analysis_at("2025-01-04 00:00")['leader_region']['region'] == "US"
+        assert SentimentSnapshots.build(pd.DataFrame(columns=['US'])).analysis_at("2025-01-03") is None
+
+
+class TestStrategyWithSnapshots:
+    """Testy SentimentPropagationStrategy z use_sentiment_snapshots."""
+    
+    @patch('src.trading.strategies.sentiment_propagation_strategy.SentimentWaveTracker')
+    def test_analyze_reads_snapshot(self, mock_tracker_class):
+        """Test: analiza z snapshotu dla czasu świecy, bez run_full_analysis."""
+        strategy = SentimentPropagationStrategy({
+            'countries': ['US', 'JP', 'CN'], 'use_sentiment_snapshots': True, '_backtest_mode': True
+        })
+        strategy.snapshots = Mock()
+        strategy.snapshots.analysis_at.return_value = {
+            'leader_region': {'region': 'US', 'avg_lead_hours': 4.5},
+            'summary': {'trading_signals': [{
+                'type': 'bearish', 'origin': 'US', 'strength': 0.8,
+                'expected_propagation': ['JP', 'CN'], 'message': 'Fala negatywna z US.'
+            }]}
+        }
+        index = pd.date_range("2025-01-01", periods=60, freq="1h")
+        df = pd.DataFrame({'close': np.linspace(100.0, 110.0, 60)}, index=index)
+        
+        signal = strategy.analyze(df, "BTC-USD")
+        
+        assert signal.signal_type == SignalType.SELL
+        strategy.snapshots.analysis_at.assert_called_once_with(index[-1])
+        strategy.tracker.run_full_analysis.assert_not_called()
+    
+    @patch('src.trading.strategies.sentiment_propagation_strategy.SentimentWaveTracker')
+    def test_backtest_engine_windows(self, mock_tracker_class, analyzer, make_sentiment):
+        """Test: okna BacktestEngine (RangeIndex + kolumna timestamp) czytają snapshoty dla czasu świecy."""
+        strategy = SentimentPropagationStrategy({
+            'countries': ['US', 'JP', 'CN'], 'use_sentiment_snapshots': True, '_backtest_mode': True,
+            'min_wave_strength': 0.3, 'min_confidence': 3.0
+        })
+        sentiment = make_sentiment(24 * 6, cn_gap=True)
+        starts = []
+        
+        def from_database(db, start, days_back, **kwargs):
+            starts.append(start)
+            return SentimentSnapshots.build(sentiment, analyzer=analyzer, days_back=2, start=start)
+        
+        ohlcv = pd.DataFrame({
+            'timestamp': pd.date_range("2025-01-03", periods=90, freq="1h"),
+            'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.0, 'volume': 1.0
+        })
+        with patch.object(SentimentSnapshots, 'from_database', side_effect=from_database):
+            result = BacktestEngine().run_backtest(strategy, "BTC-USD", ohlcv)
+        
+        assert starts == [pd.Timestamp("2025-01-03")]
+        assert result.total_trades > 0
+        strategy.tracker.run_full_analysis.assert_not_called()
+    
+    @patch('src.trading.strategies.sentiment_propagation_strategy.SentimentWaveTracker')
+    def test_snapshot_build_error_propagates(self, mock_tracker_class):
+        """Test: błąd budowy snapshotów przerywa analizę zamiast dawać puste snapshoty."""
+        strategy = SentimentPropagationStrategy({
+            'countries': ['US', 'JP', 'CN'], 'use_sentiment_snapshots': True, '_backtest_mode': True
+        })
+        df = pd.DataFrame({'close': [100.0]}, index=pd.date_range("2025-01-03", periods=1, freq="1h"))
+        
+        with patch.object(SentimentSnapshots, 'from_database', side_effect=RuntimeError("brak bazy")):
+            with pytest.raises(RuntimeError, match="brak bazy"):
+                strategy.analyze(df, "BTC-USD")
+        assert strategy.snapshots is None
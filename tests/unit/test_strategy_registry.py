@@ -0,0 +1,78 @@
+"""
+Testy jednostkowe dla leniwego rejestru strategii.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.trading import strategies
+from src.trading.strategies import get_strategy_class
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def loaded_modules_after(code: str) -> set:
+    """Moduły załadowane w świeżym interpreterze po wykonaniu code."""
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+class TestLazyImports:
+    """Testy leniwego ładowania strategii."""
+    
+    def test_package_import_skips_heavy_dependencies(self):
+        """Test: import pakietu i jednej strategii nie ładuje scipy, sentymentu ani SQLAlchemy."""
+        modules = loaded_modules_after(
+            "from src.trading.backtesting import BacktestEngine\n"
+            "from src.trading.strategies import PiotrekBreakoutStrategy"
+        )
+        
+        assert "src.trading.strategies.piotrek_strategy" in modules
+        assert "src.trading.strategies.prompt_strategy" not in modules
+        assert "src.collectors.sentiment" not in modules
+        assert "scipy" not in modules
+        assert "sqlalchemy" not in modules
+    
+    def test_sentiment_strategy_skips_unused_collectors(self):
+        """Test: strategia sentymentu nie ładuje klientów Twittera/Reddita ani matplotlib."""
+        modules = loaded_modules_after(
+            "from src.trading.strategies import SentimentPropagationStrategy"
+        )
+        
+        assert "src.collectors.sentiment.sentiment_wave_tracker" in modules
+        assert "src.collectors.sentiment.twitter_collector" not in modules
+        assert "src.collectors.sentiment.reddit_collector" not in modules
+        assert "matplotlib" not in modules
+
+
+class TestGetStrategyClass:
+    """Testy get_strategy_class."""
+    
+    def test_resolves_config_and_class_names(self):
+        """Test nazw z konfiguracji (także plików z kropką) i nazw klas."""
+        v14 = get_strategy_class("under_human_strategy_1.4")
+        
+        assert v14.__name__ == "UnderhumanStrategyV14"
+        assert get_strategy_class("UnderhumanStrategyV14") is v14
+        assert strategies.UnderhumanStrategyV14 is v14
+        assert get_strategy_class("Piotrek_Breakout_Strategy").__name__ == "PiotrekBreakoutStrategy"
+        assert sys.modules["under_human_strategy_1_4"].UnderhumanStrategyV14 is v14
+    
+    def test_unknown_strategy(self):
+        """Test błędu dla nieznanej strategii."""
+        with pytest.raises(ValueError, match="Nieznana strategia"):
+            get_strategy_class("no_such_strategy")
+        with pytest.raises(AttributeError):
+            strategies.NoSuchStrategy
+    
+    def test_every_registered_strategy_is_importable(self):
+        """Test: każda nazwa z rejestru wskazuje istniejącą klasę."""
+        for name in strategies.available_strategies():
+            assert issubclass(get_strategy_class(name), strategies.BaseStrategy)
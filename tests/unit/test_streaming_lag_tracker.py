@@ -0,0 +1,130 @@
+"""
+Testy jednostkowe dla StreamingLagTracker (przyrostowa macierz lag-ów).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.collectors.sentiment.sentiment_wave_tracker import SentimentWaveTracker
+from src.collectors.sentiment.streaming_lag_tracker import (
+    StreamingLagTracker,
+    published_path,
+    read_published
+)
+
+
+def assert_same_matrix(got, expected):
+    assert set(got) == set(expected)
+    for pair, result in expected.items():
+        assert got[pair].lag_hours == result.lag_hours
+        assert got[pair].direction == result.direction
+        assert got[pair].correlation == pytest.approx(result.correlation, abs=1e-9)
+        assert got[pair].confidence == pytest.approx(result.confidence, abs=1e-9)
+
+
+class TestStreamingLagTracker:
+    """Testy StreamingLagTracker."""
+    
+    def test_matches_compute_lag_matrix_after_evictions(self, analyzer, make_sentiment):
+        """Test: po wielu aktualizacjach i usunięciach z okna wynik = compute_lag_matrix okna."""
+        df = make_sentiment()
+        tracker = StreamingLagTracker(['US', 'JP', 'CN'], window_hours=72, analyzer=analyzer)
+        
+        for end in (30, 72, 131, 200):
+            tracker.sync(df.iloc[:end])
+            window = df.iloc[max(0, end - 72):end]
+            assert len(tracker) == len(window)
+            assert_same_matrix(tracker.lag_matrix(), analyzer.compute_lag_matrix(window))
+        
+        assert tracker.lag('US', 'JP').lag_hours < 0  # US wyprzedza JP
+        assert tracker.leader_region()[0] == 'US'
+    
+    def test_gap_uses_detect_lag_on_window(self, analyzer, make_sentiment):
+        """Test: luka dłuższa niż fill_limit - para liczona jak detect_lag na danych okna."""
+        df = make_sentiment()
+        df.iloc[150:158, 2] = np.nan
+        tracker = StreamingLagTracker(['US', 'JP', 'CN'], window_hours=72, analyzer=analyzer, fill_limit=0)
+        
+        tracker.sync(df)
+        
+        window = df.iloc[-72:]
+        assert tracker.window_frame()['CN'].isna().sum() == 8
+        assert_same_matrix(tracker.lag_matrix(), analyzer.compute_lag_matrix(window))
+    
+    def test_revised_bucket(self, analyzer, make_sentiment):
+        """Test: poprawiony kubełek w oknie = tracker zbudowany od razu z poprawionych danych."""
+        df = make_sentiment(120)
+        tracker = StreamingLagTracker(['US', 'JP', 'CN'], window_hours=72, analyzer=analyzer)
+        tracker.sync(df)
+        tracker.lag_matrix()
+        
+        revised = df.copy()
+        revised.iloc[100] = [0.5, -0.5, 0.25]
+        assert tracker.update(revised.index[100], revised.iloc[100].to_dict())
+        assert not tracker.update(revised.index[100], revised.iloc[100].to_dict())
+        assert not tracker.update(revised.index[10], {'US': 1.0})  # starszy niż okno
+        assert not tracker.update(revised.index[100], {'US': np.nan})  # NaN nie czyści wartości
+        
+        assert_same_matrix(tracker.lag_matrix(), analyzer.compute_lag_matrix(revised.iloc[-72:]))
+    
+    def test_missing_buckets_filled_with_last_value(self, analyzer):
+        """Test: brakujące kubełki i regiony wypełniane ostatnią wartością do fill_limit."""
+        tracker = StreamingLagTracker(['US', 'JP'], window_hours=48, analyzer=analyzer, fill_limit=2)
+        
+        tracker.update("2025-01-01 00:00", {'US': 1.0, 'JP': 2.0})
+        tracker.update("2025-01-01 04:30", {'US': 3.0})
+        
+        frame = tracker.window_frame()
+        assert tracker.last_bucket == pd.Timestamp("2025-01-01 04:00", tz="UTC")
+        assert frame['US'].iloc[[0, 1, 2, 4]].tolist() == [1.0, 1.0, 1.0, 3.0]
+        assert np.isnan(frame['US'].iloc[3])
+        assert frame['JP'].iloc[:3].tolist() == [2.0, 2.0, 2.0]
+        assert frame['JP'].iloc[3:].isna().all()
+
+
+class TestPublishedLagMatrix:
+    """Testy publikacji macierzy przez daemon i odczytu w SentimentWaveTracker."""
+    
+    def test_publish_round_trip(self, analyzer, tmp_path, make_sentiment):
+        """Test: publish -> read_published odtwarza macierz, stary lub brakujący plik -> None."""
+        tracker = StreamingLagTracker(['US', 'JP', 'CN'], window_hours=72, analyzer=analyzer)
+        tracker.sync(make_sentiment())
+        path = published_path("llm", "BTC/USDC", tmp_path)
+        
+        tracker.publish(path, symbol="BTC/USDC", source="llm")
+        published = read_published(path)
+        
+        assert path.name == "lag_tracker_llm_BTC_USDC.json"
+        assert published['symbol'] == "BTC/USDC"
+        assert published['points'] == 72
+        assert published['leader_region']['region'] == 'US'
+        assert_same_matrix(published['lag_matrix'], tracker.lag_matrix())
+        assert read_published(path, max_age_hours=0.0) is None
+        assert read_published(tmp_path / "missing.json") is None
+    
+    def test_wave_tracker_uses_published_matrix(self, analyzer, tmp_path, make_sentiment):
+        """Test: świeża macierz daemona zastępuje liczenie, inaczej lokalny tracker."""
+        df = make_sentiment(24 * 7)
+        wave_tracker = SentimentWaveTracker(cache_dir=tmp_path, use_database=False)
+        wave_tracker.analyzer = analyzer
+        
+        local = wave_tracker._lag_matrix(df, "BTC/USDC", "bitcoin", days_back=7)
+        assert_same_matrix(local, analyzer.compute_lag_matrix(df))
+        
+        published = StreamingLagTracker(['US', 'JP', 'CN', 'KR'], window_hours=7 * 24, analyzer=analyzer)
+        published.sync(df.iloc[:-24].assign(KR=0.0))
+        source = "llm" if wave_tracker.use_llm_data else "gdelt"
+        name = "BTC/USDC" if wave_tracker.use_llm_data else "bitcoin"
+        published.publish(published_path(source, name, tmp_path))
+        
+        other = make_sentiment(24 * 7, seed=1)
+        assert_same_matrix(
+            wave_tracker._lag_matrix(other, "ETH/USDC", "ethereum", days_back=7),
+            analyzer.compute_lag_matrix(other)
+        )
+        assert len(wave_tracker.lag_trackers) == 2  # osobny tracker na symbol
+        
+        got = wave_tracker._lag_matrix(df, "BTC/USDC", "bitcoin", days_back=7)
+        assert set(got) == {pair for pair in published.lag_matrix() if 'KR' not in pair}
+        assert got[('US', 'JP')].correlation == pytest.approx(published.lag('US', 'JP').correlation)
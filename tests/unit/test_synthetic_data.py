@@ -0,0 +1,146 @@
+"""
+Testy jednostkowe dla generatora syntetycznych danych rynkowych.
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.database.synthetic_data import (
+    SyntheticMarketGenerator,
+    DataSink,
+    DatabaseSink,
+    ParquetSink,
+    generate_ohlcv
+)
+
+
+class TestSyntheticMarketGenerator:
+    """Testy dla klasy SyntheticMarketGenerator."""
+    
+    def test_chunks_cover_range_with_valid_candles(self):
+        """Test pokrycia zakresu paczkami i poprawności świec OHLC."""
+        generator = SyntheticMarketGenerator(
+            symbols=["BTC/USDC", "ETH/USDC"], start="2024-01-01", end="2024-01-02 06:00", chunk_hours=12
+        )
+        
+        chunks = list(generator.iter_chunks())
+        ohlcv = pd.concat([chunk["ohlcv"] for chunk in chunks])
+        
+        assert len(chunks) == 3
+        assert len(ohlcv) == 2 * 30 * 60
+        assert ohlcv.groupby("symbol")["timestamp"].is_monotonic_increasing.all()
+        assert (ohlcv["high"] >= ohlcv[["open", "close"]].max(axis=1)).all()
+        assert (ohlcv["low"] <= ohlcv[["open", "close"]].min(axis=1)).all()
+        assert (ohlcv["volume"] > 0).all()
+        # Ciągłość ceny między paczkami
+        btc = ohlcv[ohlcv["symbol"] == "BTC/USDC"].reset_index(drop=True)
+        assert (btc["open"].iloc[1:].to_numpy() == btc["close"].iloc[:-1].to_numpy()).all()
+    
+    def test_deterministic_for_seed(self):
+        """Test powtarzalności danych dla tego samego seeda."""
+        first = next(SyntheticMarketGenerator(symbols=2, seed=7).iter_chunks())
+        second = next(SyntheticMarketGenerator(symbols=2, seed=7).iter_chunks())
+        other = next(SyntheticMarketGenerator(symbols=2, seed=8).iter_chunks())
+        
+        for name in first:
+            pd.testing.assert_frame_equal(first[name], second[name])
+        assert not first["ohlcv"]["close"].equals(other["ohlcv"]["close"])
+    
+    def test_funding_rate_changes_only_on_settlement(self):
+        """Test zmiany funding rate tylko co 8h."""
+        generator = SyntheticMarketGenerator(symbols=1, start="2024-01-01", end="2024-01-03", chunk_hours=24)
+        
+        tickers = pd.concat([chunk["tickers"] for chunk in generator.iter_chunks()]).set_index("timestamp")
+        changed = tickers["funding_rate"].diff().fillna(0) != 0
+        
+        assert len(tickers) == 48
+        assert (tickers.index[changed].hour % 8 == 0).all()
+        assert (tickers["ask"] > tickers["bid"]).all()
+        assert (tickers["open_interest"] > 0).all()
+    
+    def test_sentiment_propagation_lags_recoverable(self):
+        """Test odtworzenia wstrzykniętych opóźnień propagacji z korelacji wzajemnej."""
+        generator = SyntheticMarketGenerator(
+            symbols=1, start="2024-01-01", end="2024-02-01", chunk_hours=24 * 7,
+            propagation_lags={"US": 0, "JP": 5, "AU": 9}
+        )
+        
+        gdelt = pd.concat([chunk["gdelt_sentiment"] for chunk in generator.iter_chunks()])
+        tone = gdelt.pivot(index="timestamp", columns="region", values="tone")
+        
+        for region, lag in [("JP", 5), ("AU", 9)]:
+            best = max(range(13), key=lambda shift: tone["US"].corr(tone[region].shift(-shift)))
+            assert best == lag
+    
+    def test_unknown_region_lag_raises(self):
+        """Test błędu dla regionu bez zdefiniowanego opóźnienia."""
+        with pytest.raises(ValueError):
+            SyntheticMarketGenerator(regions=["US", "XX"], propagation_lags={"US": 0})
+    
+    def test_generate_ohlcv_valid_and_deterministic(self):
+        """Test pojedynczej serii świec: poprawne OHLC, ten sam seed = te same dane."""
+        df = generate_ohlcv(500, freq="1h", seed=7)
+        
+        assert len(df) == 500
+        assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+        assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+        assert (df["open"].iloc[1:].to_numpy() == df["close"].iloc[:-1].to_numpy()).all()
+        pd.testing.assert_frame_equal(df, generate_ohlcv(500, freq="1h", seed=7))
+        assert list(generate_ohlcv(10, timestamp_column=True).columns)[0] == "timestamp"
+
+
+class TestSinks:
+    """Testy zapisu do bazy i Parquet."""
+    
+    def test_data_sink_requires_write(self):
+        """Test: DataSink bez write nie daje się utworzyć."""
+        class IncompleteSink(DataSink):
+            pass
+        
+        with pytest.raises(TypeError):
+            IncompleteSink()
+    
+    def test_database_sink_writes_tables(self, temp_db_path):
+        """Test zapisu do tabel i odczytu przez DatabaseManager (duplikaty pomijane)."""
+        db = DatabaseManager(database_url=f"sqlite:///{temp_db_path}")
+        generator = SyntheticMarketGenerator(symbols=["BTC/USDC"], start="2024-01-01", end="2024-01-02")
+        
+        written = generator.generate(DatabaseSink(db))
+        rerun = generator.generate(DatabaseSink(db))
+        
+        assert "orderbook" not in written
+        assert written["ohlcv"] == 1440
+        assert rerun["ohlcv"] == 0
+        assert len(db.get_ohlcv("synthetic", "BTC/USDC", "1m")) == 1440
+        assert len(db.get_ohlcv("synthetic", "BTC/USDC", "1h")) == 24
+        assert len(db.get_funding_rates("synthetic", "BTC/USDC")) == 24
+        
+        assert db.latest_timestamp("synthetic", "BTC/USDC", "1m") == datetime(2024, 1, 1, 23, 59)
+        
+        # Kolejny dzień bulk insertem (bez save_ohlcv) - indeks pokrycia nadąża
+        SyntheticMarketGenerator(symbols=["BTC/USDC"], start="2024-01-02", end="2024-01-03").generate(
+            DatabaseSink(db), datasets=["ohlcv"]
+        )
+        available = db.get_available_data().set_index(["exchange", "symbol", "timeframe"])
+        assert available.loc[("synthetic", "BTC/USDC", "1m"), "candle_count"] == 2880
+        assert available.loc[("synthetic", "BTC/USDC", "1m"), "gaps"] == 0
+        assert db.latest_timestamp("synthetic", "BTC/USDC", "1m") == datetime(2024, 1, 2, 23, 59)
+        assert db.missing_ranges("synthetic", "BTC/USDC", "1m", datetime(2024, 1, 1), datetime(2024, 1, 2, 23, 59)) == []
+        assert written["llm_sentiment"] == 24 * len(generator.regions)
+        assert written["gdelt_sentiment"] == 24 * len(generator.regions)
+    
+    def test_parquet_sink_roundtrip(self, tmp_path):
+        """Test zapisu paczek Parquet i odczytu z filtrem symbolu."""
+        generator = SyntheticMarketGenerator(symbols=2, start="2024-01-01", end="2024-01-03", chunk_hours=24)
+        
+        written = generator.generate(ParquetSink(tmp_path), datasets=["ohlcv", "orderbook"])
+        
+        assert len(list((tmp_path / "ohlcv").glob("part-*.parquet"))) == 2
+        eth = ParquetSink.read(tmp_path, "ohlcv", symbol="ETH/USDC")
+        assert len(eth) == written["ohlcv"] // 2
+        book = ParquetSink.read(tmp_path, "orderbook")
+        assert set(book["side"]) == {"bid", "ask"}
+        assert len(book) == 2 * 48 * 2 * generator.orderbook_levels
@@ -0,0 +1,193 @@
+"""
+Testy jednostkowe dla TelegramNotifier (kolejka powiadomień w tle) z lokalnym stubem Bot API.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.collectors.sentiment.telegram_collector import TelegramCollector
+from src.collectors.sentiment.telegram_notifier import BATCH_SEPARATOR, TelegramNotifier
+
+
+class TelegramStub:
+    """Lokalny serwer udający sendMessage Bot API (kolejne odpowiedzi z listy, potem 200)."""
+    
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.delay = 0.0
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(stub.delay)
+                stub.requests.append((self.path, body))
+                status, payload = stub.responses.pop(0) if stub.responses else (200, {'ok': True, 'result': {}})
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/bot"
+    
+    @property
+    def texts(self):
+        return [body['text'] for _, body in self.requests]
+
+
+@pytest.fixture
+def stub():
+    server = TelegramStub()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def collector(stub):
+    return TelegramCollector(bot_token="test_token", chat_id="42", api_base_url=stub.url)
+
+
+class TestTelegramNotifier:
+    """Testy TelegramNotifier."""
+    
+    def test_signal_alert_does_not_block(self, stub):
+        """Test: alert z async_notifications wraca od razu, wysyłka w tle."""
+        stub.delay = 0.5
+        collector = TelegramCollector(
+            bot_token="test_token", chat_id="42", api_base_url=stub.url, async_notifications=True
+        )
+        
+        start = time.monotonic()
+        result = collector.send_signal_alert("BTC/USDT", "buy", 50000.0, "test_strategy")
+        elapsed = time.monotonic() - start
+        
+        assert result == {'ok': True, 'queued': True}
+        assert elapsed < 0.2
+        assert collector.notifier.flush(timeout=5)
+        assert stub.requests[0][0] == "/bottest_token/sendMessage"
+        assert stub.requests[0][1]['chat_id'] == "42"
+        assert "BTC/USDT" in stub.texts[0]
+        collector.notifier.close()
+    
+    def test_coalesces_messages_in_window(self, collector, stub):
+        """Test: wiadomości z okna koalescencji wysłane jednym sendMessage."""
+        notifier = TelegramNotifier(collector, coalesce_seconds=0.3)
+        
+        for i in range(3):
+            notifier.submit(f"sygnał {i}")
+        assert notifier.flush(timeout=5)
+        notifier.submit("późny sygnał")
+        notifier.close()
+        
+        assert stub.texts == [BATCH_SEPARATOR.join(f"sygnał {i}" for i in range(3)), "późny sygnał"]
+        assert notifier.stats['sent'] == 2
+        assert notifier.stats['messages_sent'] == 4
+    
+    def test_batch_respects_max_batch_and_length(self, collector, stub):
+        """Test: paczka ograniczona liczbą wiadomości i limitem długości Telegrama."""
+        notifier = TelegramNotifier(collector, coalesce_seconds=0.2, max_batch=2)
+        
+        for text in ("a", "b", "c", "x" * 4090, "d"):
+            notifier.submit(text)
+        notifier.close()
+        
+        assert stub.texts == [f"a{BATCH_SEPARATOR}b", "c", "x" * 4090, "d"]
+    
+    def test_retry_with_backoff(self, collector, stub):
+        """Test: błąd 500 i 429 (retry_after) ponawiane, potem sukces."""
+        stub.responses = [
+            (500, {'ok': False}),
+            (429, {'ok': False, 'parameters': {'retry_after': 0.2}})
+        ]
+        notifier = TelegramNotifier(collector, coalesce_seconds=0, retry_delay=0.05)
+        
+        start = time.monotonic()
+        notifier.submit("alert")
+        assert notifier.flush(timeout=5)
+        elapsed = time.monotonic() - start
+        notifier.close()
+        
+        assert stub.texts == ["alert"] * 3
+        assert elapsed >= 0.25  # 0.05s backoff + 0.2s z retry_after
+        assert notifier.stats['retries'] == 2
+        assert notifier.stats['sent'] == 1
+        assert notifier.stats['failed'] == 0
+    
+    def test_gives_up_after_max_retries(self, collector, stub):
+        """Test: po max_retries nieudanych próbach paczka odrzucona, kolejne wiadomości wysyłane."""
+        stub.responses = [(500, {'ok': False})] * 2
+        notifier = TelegramNotifier(collector, coalesce_seconds=0, max_retries=2, retry_delay=0.01)
+        
+        notifier.submit("zgubiony")
+        assert notifier.flush(timeout=5)
+        notifier.submit("następny")
+        notifier.close()
+        
+        assert stub.texts == ["zgubiony", "zgubiony", "następny"]
+        assert notifier.stats['failed'] == 1
+    
+    def test_client_error_not_retried(self, collector, stub):
+        """Test: błąd 400 odrzuca paczkę od razu, bez ponawiania."""
+        stub.responses = [(400, {'ok': False, 'description': "Bad Request: can't parse entities"})]
+        notifier = TelegramNotifier(collector, coalesce_seconds=0, retry_delay=0.01)
+        
+        notifier.submit("<b>zły html")
+        assert notifier.flush(timeout=5)
+        notifier.submit("następny")
+        notifier.close()
+        
+        assert stub.texts == ["<b>zły html", "następny"]
+        assert notifier.stats['retries'] == 0
+        assert notifier.stats['failed'] == 1
+        assert notifier.stats['sent'] == 1
+    
+    def test_connection_error_retried(self, stub):
+        """Test: błąd połączenia ponawiany do max_retries."""
+        stub.server.shutdown()
+        stub.server.server_close()
+        collector = TelegramCollector(bot_token="test_token", chat_id="42", api_base_url=stub.url)
+        notifier = TelegramNotifier(collector, coalesce_seconds=0, max_retries=3, retry_delay=0.01)
+        
+        notifier.submit("alert")
+        notifier.close()
+        
+        assert notifier.stats['retries'] == 2
+        assert notifier.stats['failed'] == 1
+    
+    def test_drop_oldest_when_full(self, collector, stub):
+        """Test: przy pełnej kolejce odrzucana jest najstarsza wiadomość."""
+        stub.delay = 0.3
+        notifier = TelegramNotifier(collector, max_queue=3, coalesce_seconds=0, max_batch=1)
+        
+        notifier.submit("w trakcie")
+        while not notifier._in_flight:
+            time.sleep(0.01)
+        for i in range(5):
+            assert notifier.submit(f"m{i}")
+        notifier.close()
+        
+        assert notifier.stats['dropped'] == 2
+        assert stub.texts == ["w trakcie", "m2", "m3", "m4"]
+        assert not notifier.submit("po zamknięciu")
+    
+    def test_missing_chat_id_raises_on_submit(self, stub):
+        """Test: brak chat_id zgłaszany przy alercie, a nie w wątku w tle."""
+        collector = TelegramCollector(bot_token="test_token", api_base_url=stub.url, async_notifications=True)
+        
+        with pytest.raises(ValueError, match="chat_id"):
+            collector.send_market_report("Raport")
+        collector.notifier.close()
+        
+        assert stub.requests == []
@@ -0,0 +1,84 @@
+"""
+Testy jednostkowe dla indeksu poziomów SL/TP/likwidacji.
+"""
+
+import pytest
+
+from src.trading.models import PaperPosition, OrderSide
+from src.trading.trigger_index import TriggerIndex, liquidation_price
+
+
+class TestTriggerIndex:
+    """Testy dla TriggerIndex."""
+    
+    def test_long_and_short_levels(self):
+        """Test kierunków wyzwalania dla LONG i SHORT."""
+        index = TriggerIndex()
+        index.add("long", "BTC-USD", "long", stop_loss=48000, take_profit=55000)
+        index.add("short", "BTC-USD", "short", stop_loss=52000, take_profit=45000)
+        
+        assert index.pop_triggered("BTC-USD", 50000) == []
+        assert index.pop_triggered("BTC-USD", 47000) == [("long", "stop_loss")]
+        assert index.pop_triggered("BTC-USD", 44000) == [("short", "take_profit")]
+        assert len(index) == 0
+    
+    def test_pops_only_crossed_positions(self):
+        """Test zdejmowania tylko pozycji z przekroczonymi poziomami."""
+        index = TriggerIndex()
+        for i in range(100):
+            index.add(i, "BTC-USD", "long", stop_loss=40000 + i * 100)
+        index.add("eth", "ETH-USD", "long", stop_loss=100000)
+        
+        hits = index.pop_triggered("BTC-USD", 49850)
+        
+        assert sorted(position_id for position_id, _ in hits) == list(range(99, 100))
+        hits = index.pop_triggered("BTC-USD", 45000)
+        assert sorted(position_id for position_id, _ in hits) == list(range(50, 99))
+        assert len(index) == 51
+        assert "eth" in index
+    
+    def test_removed_position_not_triggered(self):
+        """Test pomijania usuniętych i zastąpionych poziomów."""
+        index = TriggerIndex()
+        index.add(1, "BTC-USD", "long", stop_loss=48000)
+        index.add(2, "BTC-USD", "long", stop_loss=48000)
+        index.remove(1)
+        index.add(2, "BTC-USD", "long", stop_loss=40000)
+        
+        assert index.pop_triggered("BTC-USD", 47000) == []
+        assert index.pop_triggered("BTC-USD", 39000) == [(2, "stop_loss")]
+    
+    def test_priority_liquidation_first(self):
+        """Test priorytetu likwidacji przed stop loss przy jednej cenie."""
+        index = TriggerIndex()
+        index.add(1, "BTC-USD", OrderSide.LONG, stop_loss=45000, liquidation=47500)
+        
+        assert index.pop_triggered("BTC-USD", 40000) == [(1, "liquidation")]
+    
+    def test_compaction_after_many_removals(self):
+        """Test przebudowy kopców po usunięciu większości pozycji."""
+        index = TriggerIndex()
+        for i in range(1000):
+            index.add(i, "BTC-USD", "short", stop_loss=60000 + i, take_profit=40000 - i)
+        for i in range(990):
+            index.remove(i)
+        
+        triggers = index._symbols["BTC-USD"]
+        assert len(triggers.falls) + len(triggers.rises) < 200
+        assert len(index.pop_triggered("BTC-USD", 70000)) == 10
+    
+    @pytest.mark.parametrize("side,leverage", [
+        (OrderSide.LONG, 2.0), (OrderSide.LONG, 10.0), (OrderSide.SHORT, 1.0), (OrderSide.SHORT, 5.0)
+    ])
+    def test_liquidation_price_matches_position(self, side, leverage):
+        """Test zgodności ceny likwidacji z PaperPosition.is_liquidated."""
+        position = PaperPosition(side=side, entry_price=50000.0, size=0.1, leverage=leverage)
+        price = liquidation_price(side, 50000.0, leverage)
+        step = 1.0 if side == OrderSide.LONG else -1.0
+        
+        assert position.is_liquidated(price - step)
+        assert not position.is_liquidated(price + step)
+    
+    def test_long_without_leverage_never_liquidated(self):
+        """Test braku ceny likwidacji dla LONG bez dźwigni."""
+        assert liquidation_price("long", 50000.0, 1.0) is None
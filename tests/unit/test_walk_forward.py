@@ -0,0 +1,114 @@
+"""
+Testy jednostkowe dla optymalizacji walk-forward.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.database.synthetic_data import generate_ohlcv
+from src.trading.strategies.base_strategy import BaseStrategy, TradingSignal, SignalType
+from src.trading.walk_forward import WalkForwardOptimizer, WARMUP_CANDLES
+
+
+class MomentumStrategy(BaseStrategy):
+    """Prosta strategia momentum do testów (szybka, deterministyczna)."""
+    
+    name = "TestMomentum"
+    
+    def analyze(self, df, symbol="BTC-USD"):
+        lookback = self.config.get("lookback", 5)
+        if len(df) <= lookback:
+            return None
+        close = df["close"].iloc[-1]
+        signal_type = SignalType.BUY if close > df["close"].iloc[-1 - lookback] else SignalType.SELL
+        return TradingSignal(signal_type=signal_type, symbol=symbol, confidence=5.0, price=close, strategy=self.name)
+    
+    def should_close_position(self, df, entry_price, side, current_pnl_percent):
+        exit_percent = self.config.get("exit_percent", 1.0)
+        if abs(current_pnl_percent) >= exit_percent:
+            return TradingSignal(signal_type=SignalType.CLOSE, symbol="BTC-USD", confidence=5.0, price=df["close"].iloc[-1])
+        return None
+
+
+@pytest.fixture
+def ohlcv_df():
+    """Świece 1h (kolumna timestamp jak w BacktestEngine)."""
+    return generate_ohlcv(600, seed=1, timestamp_column=True)
+
+
+def make_optimizer(**kwargs):
+    params = dict(
+        strategy_class=MomentumStrategy,
+        param_grid={"lookback": [3, 10], "exit_percent": [0.5, 2.0]},
+        in_sample_candles=200,
+        out_of_sample_candles=100,
+        objective="total_return",
+        max_workers=1,
+        engine_kwargs={"slippage_percent": 0.0, "taker_fee": 0.0}
+    )
+    params.update(kwargs)
+    return WalkForwardOptimizer(**params)
+
+
+class TestWalkForwardSplit:
+    """Testy podziału na foldy."""
+    
+    def test_rolling_folds(self):
+        """Test okien rolling: stała długość in-sample, OOS bez nakładania."""
+        folds = make_optimizer().split(600)
+        
+        assert [f.in_sample for f in folds] == [(0, 200), (100, 300), (200, 400), (300, 500)]
+        assert [f.out_of_sample for f in folds] == [(200, 300), (300, 400), (400, 500), (500, 600)]
+    
+    def test_anchored_folds(self):
+        """Test okien anchored: in-sample zawsze od początku."""
+        folds = make_optimizer(anchored=True).split(560)
+        
+        assert all(f.in_sample[0] == 0 for f in folds)
+        assert [f.out_of_sample[1] for f in folds] == [300, 400, 500, 560]
+    
+    def test_in_sample_must_exceed_warmup(self):
+        """Test błędu dla okna in-sample krótszego niż rozgrzewka backtestu."""
+        with pytest.raises(ValueError):
+            make_optimizer(in_sample_candles=WARMUP_CANDLES)
+
+
+class TestWalkForwardRun:
+    """Testy uruchomienia walk-forward."""
+    
+    def test_run_selects_params_and_stitches_equity(self, ohlcv_df):
+        """Test wyboru parametrów per fold i sklejenia krzywej OOS."""
+        optimizer = make_optimizer()
+        
+        result = optimizer.run(ohlcv_df)
+        
+        assert len(result.folds) == 4
+        for fold in result.folds:
+            assert fold.best_params in optimizer.candidates
+            assert fold.candidates == len(optimizer.candidates)
+        # Krzywa OOS: od świecy przed pierwszym foldem OOS, kapitał przenoszony między foldami
+        assert result.equity_curve.index[0] == ohlcv_df["timestamp"].iloc[199]
+        assert result.equity_curve.iloc[0] == pytest.approx(optimizer.initial_balance)
+        assert len(result.equity_curve) == 401
+        assert result.equity_curve.index.is_monotonic_increasing
+        compounded = np.prod([1 + f.out_of_sample_return / 100 for f in result.folds])
+        assert result.total_return == pytest.approx((compounded - 1) * 100, rel=1e-6)
+        assert set(result.parameter_stability) == {"lookback", "exit_percent"}
+        assert all(0 < share <= 1 for share in result.parameter_stability.values())
+    
+    def test_parallel_matches_serial(self, ohlcv_df):
+        """Test zgodności wyników w procesach z wynikami sekwencyjnymi."""
+        serial = make_optimizer().run(ohlcv_df)
+        parallel = make_optimizer(max_workers=2).run(ohlcv_df)
+        
+        assert [f.best_params for f in parallel.folds] == [f.best_params for f in serial.folds]
+        assert parallel.total_return == pytest.approx(serial.total_return)
+        pd.testing.assert_series_equal(parallel.equity_curve, serial.equity_curve)
+    
+    def test_too_little_data_returns_empty_result(self, ohlcv_df):
+        """Test pustego wyniku przy zbyt krótkiej historii."""
+        result = make_optimizer().run(ohlcv_df.iloc[:200])
+        
+        assert result.folds == []
+        assert result.total_return == 0.0
@@ -11,6 +11,9 @@ from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 import json
+import hashlib
+import threading
+from collections import OrderedDict
 
 # Dodaj ścieżkę projektu
 project_root = Path(__file__).parent.parent.parent
@@ -28,6 +31,11 @@ from src.database.manager import DatabaseManager
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 app = Flask(__name__)
 CORS(app)  # Włącz CORS dla frontendu
 
@@ -59,6 +67,154 @@ REGION_COORDINATES = {
 }
 
 
+class CandleRangeCache:
+    """
+    Cache LRU odpowiedzi /api/btc/candles w pamięci procesu.
+    
+    Każdy wpis pamięta odcisk danych (DatabaseManager.get_ohlcv_fingerprint),
+    z którego został zbudowany - przy odczycie odcisk jest porównywany
+    z bieżącym, więc nowe świece (w tym 1m zasilające rollupy) unieważniają wpis.
+    """
+    
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+    
+    def put(self, key: tuple, entry: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+candle_cache = CandleRangeCache(max_entries=int(os.getenv('CANDLE_CACHE_SIZE', 64)))
+
+# Maksymalna liczba świec w jednej odpowiedzi /api/btc/candles
+MAX_RANGE_CANDLES = int(os.getenv('MAX_RANGE_CANDLES', 20000))
+
+
+# Zapytanie GDELT, pod którym daemon zapisuje sentyment kryptowalut
+GDELT_CRYPTO_QUERY = "bitcoin OR BTC OR cryptocurrency"
+
+
+def gdelt_score_timeseries(df: pd.DataFrame) -> pd.DataFrame:
+    """Pivot danych GDELT na time series score (kolumna na region, tone / 100)."""
+    if df.empty or 'tone' not in df.columns:
+        return df
+    # Konwertuj tone (-100 do +100) na score (-1.0 do 1.0)
+    df = df.assign(score=df['tone'] / 100.0)
+    return df.pivot_table(
+        values='score',
+        index='timestamp',
+        columns='region',
+        aggfunc='mean'
+    )
+
+
+def sentiment_timeseries_payload(
+    df: pd.DataFrame,
+    source: str,
+    symbol: str,
+    days_back: int,
+    resolution_hours: float
+) -> tuple:
+    """
+    Odpowiedź /api/sentiment/timeseries (wspólna dla Flask i ASGI).
+    
+    Args:
+        df: Time series (kolumna na region); dla LLM z metrykami w df.attrs
+        
+    Returns:
+        (słownik JSON, kod HTTP)
+    """
+    if df.empty:
+        return {
+            "error": "Brak danych dla podanych parametrów",
+            "data": {},
+            "timestamps": [],
+            "regions": []
+        }, 404
+    
+    # Pobierz dodatkowe wartości z attrs DataFrame (tylko LLM)
+    attrs = df.attrs if source == 'llm' else {}
+    confidence_df = attrs.get('confidence', pd.DataFrame())
+    fud_level_df = attrs.get('fud_level', pd.DataFrame())
+    fomo_level_df = attrs.get('fomo_level', pd.DataFrame())
+    market_impact_df = attrs.get('market_impact', pd.DataFrame())
+    
+    # Konwertuj DataFrame na format JSON
+    timestamps = [ts.isoformat() for ts in df.index]
+    regions_list = df.columns.tolist()
+    
+    # Dane dla każdego regionu
+    data = {}
+    for region in regions_list:
+        region_data = {
+            "scores": df[region].fillna(0).tolist(),
+            "coordinates": REGION_COORDINATES.get(region, {"lat": 0, "lng": 0, "name": region})
+        }
+        
+        if not confidence_df.empty and region in confidence_df.columns:
+            region_data["confidence"] = confidence_df[region].fillna(0.5).tolist()
+        if not fud_level_df.empty and region in fud_level_df.columns:
+            region_data["fud_level"] = fud_level_df[region].fillna(0).tolist()
+        if not fomo_level_df.empty and region in fomo_level_df.columns:
+            region_data["fomo_level"] = fomo_level_df[region].fillna(0).tolist()
+        if not market_impact_df.empty and region in market_impact_df.columns:
+            # Konwertuj market_impact na liczby (high=3, medium=2, low=1)
+            impact_values = market_impact_df[region].fillna('medium').tolist()
+            region_data["market_impact"] = [
+                3 if v == 'high' else (2 if v == 'medium' else 1) 
+                for v in impact_values
+            ]
+        
+        data[region] = region_data
+    
+    return {
+        "timestamps": timestamps,
+        "regions": regions_list,
+        "data": data,
+        "metadata": {
+            "symbol": symbol,
+            "source": source,
+            "days_back": days_back,
+            "resolution_hours": resolution_hours,
+            "total_points": len(timestamps)
+        }
+    }, 200
+
+
+def sentiment_range_payload(min_ts, max_ts, total_records: int) -> Dict[str, Any]:
+    """Odpowiedź /api/sentiment/range (wspólna dla Flask i ASGI)."""
+    def _iso(value):
+        if value is None:
+            return None
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    
+    return {
+        "min_timestamp": _iso(min_ts),
+        "max_timestamp": _iso(max_ts),
+        "total_records": total_records
+    }
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
@@ -96,84 +252,19 @@ def get_sentiment_timeseries():
                 days_back=days_back,
                 resolution_hours=resolution_hours
             )
-            
-            # Pobierz dodatkowe wartości z attrs DataFrame
-            confidence_df = df.attrs.get('confidence', pd.DataFrame()) if hasattr(df, 'attrs') else pd.DataFrame()
-            fud_level_df = df.attrs.get('fud_level', pd.DataFrame()) if hasattr(df, 'attrs') else pd.DataFrame()
-            fomo_level_df = df.attrs.get('fomo_level', pd.DataFrame()) if hasattr(df, 'attrs') else pd.DataFrame()
-            market_impact_df = df.attrs.get('market_impact', pd.DataFrame()) if hasattr(df, 'attrs') else pd.DataFrame()
         else:  # gdelt
             # Dla GDELT używamy innej metody
             start_date = datetime.now(timezone.utc) - timedelta(days=days_back)
             end_date = datetime.now(timezone.utc)
-            df = db.get_gdelt_sentiment(
-                query="bitcoin OR BTC OR cryptocurrency",
+            df = gdelt_score_timeseries(db.get_gdelt_sentiment(
+                query=GDELT_CRYPTO_QUERY,
                 regions=regions,
                 start_date=start_date,
                 end_date=end_date
-            )
-            
-            if not df.empty and 'tone' in df.columns:
-                # Konwertuj tone (-100 do +100) na score (-1.0 do 1.0)
-                df['score'] = df['tone'] / 100.0
-                # Pivot na time series
-                df = df.pivot_table(
-                    values='score',
-                    index='timestamp',
-                    columns='region',
-                    aggfunc='mean'
-                )
+            ))
         
-        if df.empty:
-            return jsonify({
-                "error": "Brak danych dla podanych parametrów",
-                "data": {},
-                "timestamps": [],
-                "regions": []
-            }), 404
-        
-        # Konwertuj DataFrame na format JSON
-        timestamps = [ts.isoformat() for ts in df.index]
-        regions_list = df.columns.tolist()
-        
-        # Dane dla każdego regionu
-        data = {}
-        for region in regions_list:
-            region_data = {
-                "scores": df[region].fillna(0).tolist(),
-                "coordinates": REGION_COORDINATES.get(region, {"lat": 0, "lng": 0, "name": region})
-            }
-            
-            # Dodaj dodatkowe wartości jeśli są dostępne (tylko dla LLM)
-            if source == 'llm':
-                if not confidence_df.empty and region in confidence_df.columns:
-                    region_data["confidence"] = confidence_df[region].fillna(0.5).tolist()
-                if not fud_level_df.empty and region in fud_level_df.columns:
-                    region_data["fud_level"] = fud_level_df[region].fillna(0).tolist()
-                if not fomo_level_df.empty and region in fomo_level_df.columns:
-                    region_data["fomo_level"] = fomo_level_df[region].fillna(0).tolist()
-                if not market_impact_df.empty and region in market_impact_df.columns:
-                    # Konwertuj market_impact na liczby (high=3, medium=2, low=1)
-                    impact_values = market_impact_df[region].fillna('medium').tolist()
-                    region_data["market_impact"] = [
-                        3 if v == 'high' else (2 if v == 'medium' else 1) 
-                        for v in impact_values
-                    ]
-            
-            data[region] = region_data
-        
-        return jsonify({
-            "timestamps": timestamps,
-            "regions": regions_list,
-            "data": data,
-            "metadata": {
-                "symbol": symbol,
-                "source": source,
-                "days_back": days_back,
-                "resolution_hours": resolution_hours,
-                "total_points": len(timestamps)
-            }
-        })
+        payload, status = sentiment_timeseries_payload(df, source, symbol, days_back, resolution_hours)
+        return jsonify(payload), status
     
     except Exception as e:
         logger.error(f"Błąd pobierania danych sentymentu: {e}")
@@ -197,24 +288,13 @@ def get_sentiment_range():
         if source == 'llm':
             df = db.get_llm_sentiment_analysis(symbol=symbol)
         else:  # gdelt
-            df = db.get_gdelt_sentiment(query="bitcoin OR BTC OR cryptocurrency")
+            df = db.get_gdelt_sentiment(query=GDELT_CRYPTO_QUERY)
         
         if df.empty:
-            return jsonify({
-                "min_timestamp": None,
-                "max_timestamp": None,
-                "total_records": 0
-            })
+            return jsonify(sentiment_range_payload(None, None, 0))
         
         timestamps = df.index if hasattr(df.index, 'min') else df['timestamp']
-        min_ts = timestamps.min()
-        max_ts = timestamps.max()
-        
-        return jsonify({
-            "min_timestamp": min_ts.isoformat() if hasattr(min_ts, 'isoformat') else str(min_ts),
-            "max_timestamp": max_ts.isoformat() if hasattr(max_ts, 'isoformat') else str(max_ts),
-            "total_records": len(df)
-        })
+        return jsonify(sentiment_range_payload(timestamps.min(), timestamps.max(), len(df)))
     
     except Exception as e:
         logger.error(f"Błąd pobierania zakresu danych: {e}")
@@ -229,145 +309,118 @@ def get_regions():
     })
 
 
-def resample_ohlcv(df: pd.DataFrame, target_timeframe: str) -> pd.DataFrame:
-    """
-    Agreguje dane OHLCV do wyższego timeframe.
-    
-    Args:
-        df: DataFrame z danymi OHLCV (index: timestamp, kolumny: open, high, low, close, volume)
-        target_timeframe: Docelowy timeframe (np. '1h', '4h', '1d')
-        
-    Returns:
-        DataFrame z zagregowanymi danymi
+def calculate_indicator_series(df: pd.DataFrame) -> pd.DataFrame:
     """
-    if df.empty:
-        return df
-    
-    # Upewnij się, że index jest timezone-aware (UTC)
-    if df.index.tz is None:
-        df.index = df.index.tz_localize('UTC')
-    elif df.index.tz != timezone.utc:
-        df.index = df.index.tz_convert('UTC')
-    
-    # Mapowanie timeframe na pandas resample rule
-    timeframe_map = {
-        '1m': '1T',
-        '5m': '5T',
-        '15m': '15T',
-        '30m': '30T',
-        '1h': '1H',
-        '2h': '2H',
-        '4h': '4H',
-        '6h': '6H',
-        '8h': '8H',
-        '12h': '12H',
-        '1d': '1D',
-        '3d': '3D',
-        '1w': '1W',
-        '1M': '1M'
-    }
+    Oblicza wskaźniki techniczne dla każdej świecy (wektorowo).
     
-    resample_rule = timeframe_map.get(target_timeframe)
-    if not resample_rule:
-        logger.warning(f"Nieznany timeframe: {target_timeframe}, używam 1H")
-        resample_rule = '1H'
-    
-    # Agreguj OHLCV
-    resampled = df.resample(resample_rule).agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }).dropna()
-    
-    return resampled
-
-
-def calculate_indicators(df: pd.DataFrame) -> Dict[str, Any]:
-    """
-    Oblicza wskaźniki techniczne dla danych OHLCV.
+    Wartość w wierszu i odpowiada wskaźnikom policzonym na danych do świecy i
+    włącznie (bez zaglądania w przyszłość) - tak jak calculate_indicators().
     
     Args:
         df: DataFrame z danymi OHLCV (kolumny: open, high, low, close, volume)
         
     Returns:
-        Dict ze wskaźnikami
+        DataFrame ze wskaźnikami (ten sam indeks co df, NaN gdy za mało danych)
     """
-    if df.empty or len(df) < 2:
-        return {}
-    
     close = df['close']
     high = df['high']
     low = df['low']
     volume = df['volume']
     
-    indicators = {}
+    indicators = pd.DataFrame(index=df.index)
     
     # SMA (Simple Moving Average) - 20, 50, 200
     for period in [20, 50, 200]:
-        if len(close) >= period:
-            indicators[f'sma_{period}'] = close.rolling(window=period).mean().iloc[-1]
+        indicators[f'sma_{period}'] = close.rolling(window=period).mean()
     
     # EMA (Exponential Moving Average) - 12, 26
     for period in [12, 26]:
-        if len(close) >= period:
-            indicators[f'ema_{period}'] = close.ewm(span=period, adjust=False).mean().iloc[-1]
+        ema = close.ewm(span=period, adjust=False).mean()
+        indicators[f'ema_{period}'] = ema.where(np.arange(len(close)) >= period - 1)
     
     # RSI (Relative Strength Index) - 14
-    if len(close) >= 14:
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        indicators['rsi'] = 100 - (100 / (1 + rs.iloc[-1]))
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    indicators['rsi'] = 100 - (100 / (1 + rs))
     
     # MACD
-    if len(close) >= 26:
-        ema_12 = close.ewm(span=12, adjust=False).mean()
-        ema_26 = close.ewm(span=26, adjust=False).mean()
-        macd_line = ema_12 - ema_26
-        signal_line = macd_line.ewm(span=9, adjust=False).mean()
-        indicators['macd'] = macd_line.iloc[-1]
-        indicators['macd_signal'] = signal_line.iloc[-1]
-        indicators['macd_histogram'] = (macd_line - signal_line).iloc[-1]
+    ema_12 = close.ewm(span=12, adjust=False).mean()
+    ema_26 = close.ewm(span=26, adjust=False).mean()
+    macd_line = ema_12 - ema_26
+    signal_line = macd_line.ewm(span=9, adjust=False).mean()
+    has_macd = np.arange(len(close)) >= 25
+    indicators['macd'] = macd_line.where(has_macd)
+    indicators['macd_signal'] = signal_line.where(has_macd)
+    indicators['macd_histogram'] = (macd_line - signal_line).where(has_macd)
     
     # Bollinger Bands
-    if len(close) >= 20:
-        sma_20 = close.rolling(window=20).mean()
-        std_20 = close.rolling(window=20).std()
-        indicators['bb_upper'] = (sma_20 + (std_20 * 2)).iloc[-1]
-        indicators['bb_middle'] = sma_20.iloc[-1]
-        indicators['bb_lower'] = (sma_20 - (std_20 * 2)).iloc[-1]
-        indicators['bb_width'] = ((indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']) * 100
+    sma_20 = close.rolling(window=20).mean()
+    std_20 = close.rolling(window=20).std()
+    indicators['bb_upper'] = sma_20 + (std_20 * 2)
+    indicators['bb_middle'] = sma_20
+    indicators['bb_lower'] = sma_20 - (std_20 * 2)
+    indicators['bb_width'] = ((indicators['bb_upper'] - indicators['bb_lower']) / indicators['bb_middle']) * 100
     
     # ATR (Average True Range) - 14
-    if len(close) >= 14:
-        high_low = high - low
-        high_close = np.abs(high - close.shift())
-        low_close = np.abs(low - close.shift())
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        indicators['atr'] = tr.rolling(window=14).mean().iloc[-1]
-        indicators['atr_percent'] = (indicators['atr'] / close.iloc[-1]) * 100
+    high_low = high - low
+    high_close = np.abs(high - close.shift())
+    low_close = np.abs(low - close.shift())
+    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+    indicators['atr'] = tr.rolling(window=14).mean()
+    indicators['atr_percent'] = (indicators['atr'] / close) * 100
     
     # Volume indicators
-    if len(volume) >= 20:
-        indicators['volume_sma_20'] = volume.rolling(window=20).mean().iloc[-1]
-        indicators['volume_ratio'] = volume.iloc[-1] / indicators['volume_sma_20'] if indicators['volume_sma_20'] > 0 else 1.0
+    volume_sma_20 = volume.rolling(window=20).mean()
+    indicators['volume_sma_20'] = volume_sma_20
+    indicators['volume_ratio'] = (volume / volume_sma_20).where(volume_sma_20 > 0, 1.0).where(volume_sma_20.notna())
     
     # Price change
-    if len(close) >= 2:
-        indicators['price_change'] = close.iloc[-1] - close.iloc[-2]
-        indicators['price_change_percent'] = ((close.iloc[-1] - close.iloc[-2]) / close.iloc[-2]) * 100
+    indicators['price_change'] = close - close.shift(1)
+    indicators['price_change_percent'] = ((close - close.shift(1)) / close.shift(1)) * 100
     
-    # 24h change
-    if len(close) >= 24:
-        indicators['price_change_24h'] = close.iloc[-1] - close.iloc[-24]
-        indicators['price_change_24h_percent'] = ((close.iloc[-1] - close.iloc[-24]) / close.iloc[-24]) * 100
+    # 24h change (iloc[-1] vs iloc[-24])
+    indicators['price_change_24h'] = close - close.shift(23)
+    indicators['price_change_24h_percent'] = ((close - close.shift(23)) / close.shift(23)) * 100
     
     return indicators
 
 
+def calculate_indicators(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Oblicza wskaźniki techniczne dla danych OHLCV.
+    
+    Args:
+        df: DataFrame z danymi OHLCV (kolumny: open, high, low, close, volume)
+        
+    Returns:
+        Dict ze wskaźnikami dla ostatniej świecy
+    """
+    if df.empty or len(df) < 2:
+        return {}
+    
+    last = calculate_indicator_series(df).iloc[-1]
+    return {k: v for k, v in last.items() if not pd.isna(v)}
+
+
+def ohlcv_fallback_sources(exchange: str, symbol: str) -> List[tuple]:
+    """
+    Zwraca alternatywne pary (exchange, symbol) do użycia, gdy brak danych OHLCV.
+    """
+    fallbacks = []
+    # Spróbuj dydx zamiast binance
+    if exchange == 'binance':
+        fallbacks.append(('dydx', symbol))
+    # Spróbuj BTC-USD zamiast BTC/USDC
+    if symbol == 'BTC/USDC':
+        fallbacks.append((exchange, 'BTC-USD'))
+    # Spróbuj dydx + BTC-USD
+    if exchange == 'binance' and symbol == 'BTC/USDC':
+        fallbacks.append(('dydx', 'BTC-USD'))
+    return fallbacks
+
+
 @app.route('/api/btc/price', methods=['GET'])
 def get_btc_price():
     """
@@ -499,6 +552,8 @@ def get_btc_price():
                 use_aggregation = False
         
         # Pobierz dane OHLCV (tylko jeśli nie używamy agregacji)
+        # DatabaseManager.get_ohlcv sam sięga do rollupów (OHLCV_ROLLUP_TIMEFRAMES, m.in. 30m/3h/12h/2d) z 1m,
+        # jeśli brak natywnych świec danego interwału
         if not use_aggregation:
             df = db.get_ohlcv(
                 exchange=exchange,
@@ -507,101 +562,21 @@ def get_btc_price():
                 start_date=start_date,
                 end_date=end_date
             )
-        # Jeśli use_aggregation jest True, df już został utworzony przez agregację w linii 437
-        
-        # Jeśli brak danych dla żądanego timeframe, spróbuj pobrać 1m i zagregować
-        if df.empty and timeframe != '1m':
-            logger.info(f"Brak danych dla {exchange}:{symbol} {timeframe}, próbuję pobrać 1m i zagregować...")
-            # Ogranicz lookback_hours dla 1m, żeby nie pobierać zbyt dużo danych
-            # Dla 1h potrzebujemy max 200h * 60 = 12,000 świec 1m, ale to za dużo
-            # Ograniczmy do max 5000 świec 1m (ok. 83h) - wystarczy dla większości wskaźników
-            max_1m_candles = 5000
-            # Przelicz lookback_hours na liczbę świec 1m
-            estimated_1m_candles = lookback_hours * 60
-            if estimated_1m_candles > max_1m_candles:
-                # Ogranicz start_date, żeby nie pobierać zbyt dużo
-                limited_start_date = end_date - pd.Timedelta(minutes=max_1m_candles)
-                logger.info(f"Ograniczam zakres 1m do {max_1m_candles} świec (zamiast {estimated_1m_candles})")
-            else:
-                limited_start_date = start_date
-            
-            df_1m = db.get_ohlcv(
-                exchange=exchange,
-                symbol=symbol,
-                timeframe='1m',
-                start_date=limited_start_date,
-                end_date=end_date,
-                limit=max_1m_candles  # Dodaj limit jako zabezpieczenie
-            )
-            if not df_1m.empty:
-                df = resample_ohlcv(df_1m, timeframe)
-                logger.info(f"Zagregowano {len(df_1m)} świec 1m do {len(df)} świec {timeframe}")
+        # Jeśli use_aggregation jest True, df już został utworzony przez agregację powyżej
         
         # Jeśli nadal brak danych, spróbuj alternatywnych symboli/exchange
         if df.empty:
-            # Spróbuj dydx zamiast binance
-            if exchange == 'binance':
-                df = db.get_ohlcv(
-                    exchange='dydx',
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    start_date=start_date,
-                    end_date=end_date
-                )
-                # Jeśli brak danych dla żądanego timeframe, spróbuj 1m i zagreguj
-                if df.empty and timeframe != '1m':
-                    df_1m = db.get_ohlcv(
-                        exchange='dydx',
-                        symbol=symbol,
-                        timeframe='1m',
-                        start_date=start_date,
-                        end_date=end_date
-                    )
-                    if not df_1m.empty:
-                        df = resample_ohlcv(df_1m, timeframe)
-                        logger.info(f"Zagregowano dydx {len(df_1m)} świec 1m do {len(df)} świec {timeframe}")
-            # Spróbuj BTC-USD zamiast BTC/USDC
-            if df.empty and symbol == 'BTC/USDC':
-                df = db.get_ohlcv(
-                    exchange=exchange,
-                    symbol='BTC-USD',
-                    timeframe=timeframe,
-                    start_date=start_date,
-                    end_date=end_date
-                )
-                # Jeśli brak danych dla żądanego timeframe, spróbuj 1m i zagreguj
-                if df.empty and timeframe != '1m':
-                    df_1m = db.get_ohlcv(
-                        exchange=exchange,
-                        symbol='BTC-USD',
-                        timeframe='1m',
-                        start_date=start_date,
-                        end_date=end_date
-                    )
-                    if not df_1m.empty:
-                        df = resample_ohlcv(df_1m, timeframe)
-                        logger.info(f"Zagregowano BTC-USD {len(df_1m)} świec 1m do {len(df)} świec {timeframe}")
-            # Spróbuj dydx + BTC-USD
-            if df.empty and exchange == 'binance' and symbol == 'BTC/USDC':
+            for fallback_exchange, fallback_symbol in ohlcv_fallback_sources(exchange, symbol):
                 df = db.get_ohlcv(
-                    exchange='dydx',
-                    symbol='BTC-USD',
+                    exchange=fallback_exchange,
+                    symbol=fallback_symbol,
                     timeframe=timeframe,
                     start_date=start_date,
                     end_date=end_date
                 )
-                # Jeśli brak danych dla żądanego timeframe, spróbuj 1m i zagreguj
-                if df.empty and timeframe != '1m':
-                    df_1m = db.get_ohlcv(
-                        exchange='dydx',
-                        symbol='BTC-USD',
-                        timeframe='1m',
-                        start_date=start_date,
-                        end_date=end_date
-                    )
-                    if not df_1m.empty:
-                        df = resample_ohlcv(df_1m, timeframe)
-                        logger.info(f"Zagregowano dydx BTC-USD {len(df_1m)} świec 1m do {len(df)} świec {timeframe}")
+                if not df.empty:
+                    logger.info(f"Użyto danych {fallback_exchange}:{fallback_symbol} {timeframe}")
+                    break
         
         # Sprawdź czy mamy dane
         if df.empty:
@@ -651,18 +626,15 @@ def get_btc_price():
             # Jeśli używamy agregacji, df już zawiera jedną świecę dla target_timestamp
             closest_timestamp = target_timestamp
             closest_candle = df_sorted.iloc[0]
-            # Dla wskaźników potrzebujemy więcej danych - pobierz dane 1m dla lookback_hours
+            # Dla wskaźników potrzebujemy więcej danych - świece timeframe dla lookback_hours
+            # (natywne lub z rollupu 1m)
             df_for_indicators = db.get_ohlcv(
                 exchange=exchange,
                 symbol=symbol,
-                timeframe='1m',
+                timeframe=timeframe,
                 start_date=start_date,
-                end_date=target_timestamp + pd.Timedelta(minutes=1),
-                limit=5000
+                end_date=target_timestamp
             )
-            if not df_for_indicators.empty:
-                # Agreguj do timeframe dla wskaźników
-                df_for_indicators = resample_ohlcv(df_for_indicators, timeframe)
         else:
             # Użyj argmin z unix timestamp, żeby uniknąć problemów z timezone
             # Konwertuj index do unix timestamp (nanoseconds) - użyj .view('int64') dla szybkiej konwersji
@@ -720,6 +692,204 @@ def get_btc_price():
         }), 500
 
 
+def _to_utc(value) -> pd.Timestamp:
+    """
+    Konwertuje wartość na pd.Timestamp w UTC (naive traktowane jako UTC).
+    
+    Raises:
+        ValueError: Gdy wartości nie da się sparsować jako czasu (także pusty napis / NaT)
+    """
+    ts = pd.Timestamp(value)
+    if pd.isna(ts):
+        raise ValueError(f"Nieprawidłowy czas: {value!r}")
+    if ts.tzinfo is None:
+        return ts.tz_localize('UTC')
+    return ts.tz_convert('UTC')
+
+
+def _columnar_json(df: pd.DataFrame) -> bytes:
+    """
+    Serializuje DataFrame kolumnowo: {"timestamp": [ms, ...], "close": [...], ...}.
+    NaN zamieniane są na null.
+    """
+    columns = {"timestamp": (df.index.asi8 // 1_000_000).tolist()}
+    for name in df.columns:
+        values = df[name].astype(float)
+        columns[name] = values.astype(object).where(values.notna(), None).tolist()
+    return json.dumps(columns, separators=(',', ':')).encode('utf-8')
+
+
+def _arrow_ipc(df: pd.DataFrame) -> bytes:
+    """Serializuje DataFrame do strumienia Arrow IPC (timestamp jako kolumna)."""
+    table = pa.Table.from_pandas(df.rename_axis('timestamp').reset_index(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _candle_response(entry: Dict[str, Any]):
+    """Buduje odpowiedź z wpisu cache z obsługą If-None-Match / If-Modified-Since."""
+    response = app.response_class(entry['body'], mimetype=entry['mimetype'])
+    response.set_etag(entry['etag'])
+    if entry['last_modified'] is not None:
+        response.last_modified = entry['last_modified']
+    response.cache_control.no_cache = True  # Zawsze rewaliduj (tanie 304)
+    response.headers['X-Candle-Source'] = f"{entry['exchange']}:{entry['symbol']}"
+    response.headers['X-Candle-Count'] = str(entry['count'])
+    return response.make_conditional(request)
+
+
+@app.route('/api/btc/candles', methods=['GET'])
+def get_btc_candles():
+    """
+    Pobiera cały zakres świec wraz ze wskaźnikami technicznymi w jednym żądaniu.
+    
+    Dane zwracane są kolumnowo (JSON: {"columns": {"timestamp": [...], "close": [...]}}
+    lub Arrow IPC stream). Wskaźniki w każdym wierszu liczone są tylko z danych
+    do tej świecy włącznie - jak w /api/btc/price dla pojedynczego timestampu.
+    Odpowiedzi są cache'owane (LRU) i mają ETag/Last-Modified.
+    
+    Query params:
+        start: Początek zakresu ISO (domyślnie: end - 24h)
+        end: Koniec zakresu ISO (domyślnie: teraz)
+        exchange: Giełda (domyślnie: binance)
+        symbol: Symbol (domyślnie: BTC/USDC)
+        timeframe: Interwał (domyślnie: 1h)
+        lookback_hours: Ile godzin przed start pobrać do rozgrzania wskaźników (domyślnie: 200)
+        indicators: Czy dołączyć wskaźniki - 'true'/'false' (domyślnie: true)
+        format: 'json' lub 'arrow' (domyślnie: json)
+    """
+    try:
+        exchange = request.args.get('exchange', 'binance')
+        symbol = request.args.get('symbol', 'BTC/USDC')
+        timeframe = request.args.get('timeframe', '1h')
+        try:
+            lookback_hours = int(request.args.get('lookback_hours', 200))
+        except ValueError:
+            return jsonify({"error": f"Nieprawidłowy lookback_hours: {request.args.get('lookback_hours')}"}), 400
+        if lookback_hours < 0:
+            return jsonify({"error": "lookback_hours nie może być ujemny"}), 400
+        with_indicators = request.args.get('indicators', 'true').lower() != 'false'
+        output_format = request.args.get('format', 'json').lower()
+        
+        if output_format not in ('json', 'arrow'):
+            return jsonify({"error": f"Nieobsługiwany format: {output_format}"}), 400
+        if output_format == 'arrow' and pa is None:
+            return jsonify({"error": "Format arrow wymaga pakietu pyarrow"}), 406
+        
+        end_str = request.args.get('end', None)
+        start_str = request.args.get('start', None)
+        try:
+            end_date = _to_utc(end_str) if end_str else _to_utc(datetime.now(timezone.utc)).floor('min')
+            start_date = _to_utc(start_str) if start_str else end_date - pd.Timedelta(hours=24)
+        except ValueError as e:
+            return jsonify({"error": f"Nieprawidłowy zakres start/end: {e}"}), 400
+        if start_date > end_date:
+            return jsonify({"error": "start musi być wcześniejszy niż end"}), 400
+        
+        try:
+            candle_td = pd.to_timedelta(timeframe)
+        except ValueError:
+            return jsonify({"error": f"Nieprawidłowy timeframe: {timeframe}"}), 400
+        if (end_date - start_date) / candle_td > MAX_RANGE_CANDLES:
+            return jsonify({
+                "error": f"Zakres przekracza {MAX_RANGE_CANDLES} świec - zawęź zakres lub zwiększ timeframe"
+            }), 400
+        
+        fetch_start = start_date - pd.Timedelta(hours=lookback_hours) if with_indicators else start_date
+        cache_key = (
+            exchange, symbol, timeframe, start_date.value, end_date.value,
+            lookback_hours, with_indicators, output_format
+        )
+        
+        cached = candle_cache.get(cache_key)
+        if cached is not None:
+            fingerprint = db.get_ohlcv_fingerprint(
+                cached['exchange'], cached['symbol'], timeframe, fetch_start, end_date
+            )
+            if fingerprint == cached['fingerprint']:
+                return _candle_response(cached)
+            candle_cache.invalidate(cache_key)
+        
+        df = pd.DataFrame()
+        fingerprint = None
+        for source_exchange, source_symbol in [(exchange, symbol)] + ohlcv_fallback_sources(exchange, symbol):
+            # Odcisk przed odczytem - świeca dopisana w międzyczasie tylko unieważni wpis
+            fingerprint = db.get_ohlcv_fingerprint(
+                source_exchange, source_symbol, timeframe, fetch_start, end_date
+            )
+            df = db.get_ohlcv(
+                exchange=source_exchange,
+                symbol=source_symbol,
+                timeframe=timeframe,
+                start_date=fetch_start,
+                end_date=end_date
+            )
+            if not df.empty:
+                break
+        
+        if df.empty:
+            return jsonify({
+                "error": "Brak danych OHLCV dla podanych parametrów",
+                "exchange": exchange,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "count": 0,
+                "columns": {}
+            }), 200
+        
+        df = df.sort_index()
+        df.index = pd.DatetimeIndex(df.index).tz_localize(None).tz_localize('UTC')
+        candles = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+        if with_indicators:
+            candles = pd.concat([candles, calculate_indicator_series(candles)], axis=1)
+        candles = candles[candles.index >= start_date]
+        
+        if output_format == 'arrow':
+            body = _arrow_ipc(candles)
+            mimetype = 'application/vnd.apache.arrow.stream'
+        else:
+            meta = json.dumps({
+                "exchange": source_exchange,
+                "symbol": source_symbol,
+                "timeframe": timeframe,
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat(),
+                "count": len(candles),
+            }, separators=(',', ':'))
+            body = meta[:-1].encode('utf-8') + b',"columns":' + _columnar_json(candles) + b'}'
+            mimetype = 'application/json'
+        
+        etag_source = repr((cache_key, source_exchange, source_symbol, sorted(
+            (k, str(v)) for k, v in fingerprint.items()
+        )))
+        last_modified = fingerprint['last_modified']
+        entry = {
+            'body': body,
+            'mimetype': mimetype,
+            'etag': hashlib.sha1(etag_source.encode('utf-8')).hexdigest(),
+            'last_modified': last_modified.replace(tzinfo=timezone.utc) if last_modified else None,
+            'fingerprint': fingerprint,
+            'exchange': source_exchange,
+            'symbol': source_symbol,
+            'count': len(candles),
+        }
+        candle_cache.put(cache_key, entry)
+        return _candle_response(entry)
+    
+    except Exception as e:
+        import traceback
+        error_trace = traceback.format_exc()
+        logger.error(f"Błąd pobierania zakresu świec BTC: {e}\n{error_trace}")
+        return jsonify({
+            "error": str(e),
+            "error_type": type(e).__name__
+        }), 500
+
+
 if __name__ == '__main__':
     port = int(os.getenv('FLASK_PORT', 5001))  # Zmieniono na 5001 (5000 zajęty przez AirPlay)
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Backend ASGI dla aplikacji wizualizacji sentymentu
+==================================================
+FastAPI (uvicorn) przed istniejącym Flask API:
+
+- /api/stream - kanał Server-Sent Events z nowymi świecami i punktami sentymentu
+  zapisywanymi przez daemony (zamiast odpytywania z frontendu)
+- /api/btc/candles/stream - strumieniowanie dużych zakresów świec (NDJSON, kolumnowo)
+- /api/sentiment/timeseries, /api/sentiment/range - asynchroniczne odczyty sentymentu
+  (te same zapytania i format odpowiedzi co w Flask API)
+- pozostałe endpointy (/api/btc/price, /api/btc/candles, ...) obsługuje aplikacja
+  Flask zamontowana przez WSGI - każde żądanie w puli wątków, więc nie blokują
+  pętli zdarzeń ani innych żądań.
+
+Odczyty po stronie ASGI idą przez pulę połączeń asynchronicznego silnika SQLAlchemy
+(asyncpg dla PostgreSQL, aiosqlite dla SQLite).
+
+Uruchomienie (z katalogu webapp/backend):
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+
+import os
+import sys
+import json
+import asyncio
+from pathlib import Path
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pandas as pd
+from fastapi import FastAPI, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from loguru import logger
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:
+    from fastapi.middleware.wsgi import WSGIMiddleware
+
+from app import (
+    app as flask_app, db, ohlcv_fallback_sources, _to_utc,
+    GDELT_CRYPTO_QUERY, gdelt_score_timeseries, sentiment_timeseries_payload, sentiment_range_payload
+)
+from src.database.models import OHLCV, OHLCVRollup, LLMSentimentAnalysis, GDELTSentiment
+
+
+# Co ile sekund kanał live sprawdza nowe wiersze w bazie
+LIVE_POLL_INTERVAL = float(os.getenv('LIVE_POLL_INTERVAL', 2.0))
+# Zakład (sekundy) przed znacznikiem: wiersze zatwierdzone z opóźnieniem i poprawione świece
+LIVE_OVERLAP_SECONDS = float(os.getenv('LIVE_OVERLAP_SECONDS', 300.0))
+# Maksymalna liczba wierszy jednej tabeli w jednym odpytaniu
+LIVE_POLL_LIMIT = 10000
+# Co ile sekund wysyłać komentarz keep-alive w SSE
+SSE_HEARTBEAT_SECONDS = 15.0
+# Maksymalna liczba zaległych zdarzeń na subskrybenta (najstarsze są odrzucane)
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+def to_naive_utc(value) -> datetime:
+    """Konwertuje wartość na naiwny datetime UTC (tak jak timestampy zapisane w bazie)."""
+    return _to_utc(value).tz_localize(None).to_pydatetime()
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Zamienia URL bazy na wariant z asynchronicznym sterownikiem.
+
+    postgresql:// / postgresql+psycopg2:// -> postgresql+asyncpg://
+    sqlite:/// -> sqlite+aiosqlite:///
+    """
+    scheme, sep, rest = database_url.partition('://')
+    base = scheme.split('+')[0]
+    if base in ('postgresql', 'postgres'):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if base == 'sqlite':
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return database_url
+
+
+class AsyncMarketReader:
+    """
+    Odczyty świec i sentymentu przez asynchroniczny silnik z pulą połączeń.
+
+    Tylko odczyt - zapis (i odświeżanie rollupów) pozostaje w DatabaseManager.
+    """
+
+    def __init__(self, database_url: str, pool_size: int = 10, max_overflow: int = 10):
+        pool_config = {}
+        if 'postgres' in database_url:
+            pool_config = {
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+                'pool_timeout': 30,
+                'pool_pre_ping': True
+            }
+        self.engine: AsyncEngine = create_async_engine(to_async_url(database_url), **pool_config)
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+    async def latest_times(self) -> Dict[str, Optional[datetime]]:
+        """Najnowszy czas świecy i analizy sentymentu (punkt startowy kanału live)."""
+        async with self.engine.connect() as conn:
+            candle = (await conn.execute(select(func.max(OHLCV.timestamp)))).scalar()
+            sentiment = (await conn.execute(select(func.max(LLMSentimentAnalysis.timestamp)))).scalar()
+        return {'candle': candle, 'sentiment': sentiment}
+
+    async def candles_since(self, since: Optional[datetime], limit: int = LIVE_POLL_LIMIT) -> List[Dict[str, Any]]:
+        """Świece z czasem >= since (rosnąco po czasie)."""
+        stmt = select(
+            OHLCV.id, OHLCV.timestamp, OHLCV.exchange, OHLCV.symbol, OHLCV.timeframe,
+            OHLCV.open, OHLCV.high, OHLCV.low, OHLCV.close, OHLCV.volume
+        )
+        if since is not None:
+            stmt = stmt.where(OHLCV.timestamp >= since)
+        stmt = stmt.order_by(OHLCV.timestamp, OHLCV.id).limit(limit)
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(stmt)).mappings().all()
+        return [dict(r) for r in rows]
+
+    async def sentiment_since(self, since: Optional[datetime], limit: int = LIVE_POLL_LIMIT) -> List[Dict[str, Any]]:
+        """Analizy sentymentu LLM z czasem >= since (rosnąco po czasie)."""
+        m = LLMSentimentAnalysis
+        stmt = select(
+            m.id, m.timestamp, m.symbol, m.region, m.sentiment, m.score,
+            m.confidence, m.fud_level, m.fomo_level, m.market_impact
+        )
+        if since is not None:
+            stmt = stmt.where(m.timestamp >= since)
+        stmt = stmt.order_by(m.timestamp, m.id).limit(limit)
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(stmt)).mappings().all()
+        return [dict(r) for r in rows]
+
+    async def llm_sentiment_timeseries(
+        self,
+        symbol: str,
+        regions: Optional[List[str]],
+        days_back: int,
+        resolution_hours: float
+    ) -> pd.DataFrame:
+        """Jak DatabaseManager.get_llm_sentiment_timeseries (to samo zapytanie i układ szeroki)."""
+        stmt, bucket_seconds = db.llm_sentiment_timeseries_query(symbol, regions, days_back, resolution_hours)
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(stmt)).all()
+        return db.llm_sentiment_wide(db.llm_sentiment_frame(rows), regions, bucket_seconds)
+
+    async def gdelt_sentiment(
+        self,
+        regions: Optional[List[str]],
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """Tone GDELT dla zapytania kryptowalut (kolumny: region, tone; Index: timestamp)."""
+        g = GDELTSentiment
+        stmt = select(g.timestamp, g.region, g.tone).where(
+            g.query == GDELT_CRYPTO_QUERY,
+            g.timestamp >= to_naive_utc(start_date),
+            g.timestamp <= to_naive_utc(end_date)
+        )
+        if regions:
+            stmt = stmt.where(g.region.in_(regions))
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(stmt.order_by(g.timestamp))).all()
+        if not rows:
+            return pd.DataFrame()
+        df = pd.DataFrame(rows, columns=['timestamp', 'region', 'tone'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df.set_index('timestamp')
+
+    async def sentiment_range(self, symbol: str, source: str) -> Dict[str, Any]:
+        """Zakres dostępnych danych sentymentu (min/max timestamp, liczba rekordów) jednym zapytaniem."""
+        if source == 'llm':
+            table = LLMSentimentAnalysis
+            condition = table.symbol == symbol
+        else:
+            table = GDELTSentiment
+            condition = table.query == GDELT_CRYPTO_QUERY
+        stmt = select(func.min(table.timestamp), func.max(table.timestamp), func.count()).where(condition)
+        async with self.engine.connect() as conn:
+            min_ts, max_ts, total = (await conn.execute(stmt)).one()
+        return sentiment_range_payload(min_ts, max_ts, total)
+
+    async def has_native_ohlcv(self, exchange: str, symbol: str, timeframe: str) -> bool:
+        stmt = select(OHLCV.id).where(
+            OHLCV.exchange == exchange,
+            OHLCV.symbol == symbol,
+            OHLCV.timeframe == timeframe
+        ).limit(1)
+        async with self.engine.connect() as conn:
+            return (await conn.execute(stmt)).first() is not None
+
+    async def stream_ohlcv(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_size: int = 5000
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Strumieniuje świece z zakresu porcjami po chunk_size (rosnąco po czasie).
+
+        Jak DatabaseManager.get_ohlcv: gdy brak natywnych świec interwału,
+        czyta rollup zagregowany ze świec 1m.
+        """
+        start = to_naive_utc(start_date)
+        end = to_naive_utc(end_date)
+
+        if await self.has_native_ohlcv(exchange, symbol, timeframe):
+            table, time_col = OHLCV, OHLCV.timestamp
+            filters = [OHLCV.timeframe == timeframe]
+        elif timeframe in db.OHLCV_ROLLUP_TIMEFRAMES:
+            # Rollup odświeżany jest przy zapisie 1m (daemon) - odczyt niczego nie zapisuje
+            table, time_col = OHLCVRollup, OHLCVRollup.bucket
+            filters = [OHLCVRollup.timeframe == timeframe]
+        else:
+            return
+
+        stmt = select(
+            time_col.label('timestamp'), table.open, table.high, table.low, table.close, table.volume
+        ).where(
+            table.exchange == exchange,
+            table.symbol == symbol,
+            time_col >= start,
+            time_col <= end,
+            *filters
+        ).order_by(time_col)
+
+        async with self.engine.connect() as conn:
+            result = await conn.stream(stmt.execution_options(yield_per=chunk_size))
+            async for partition in result.partitions(chunk_size):
+                yield pd.DataFrame(
+                    partition, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+                ).set_index('timestamp')
+
+
+class LiveFeed:
+    """
+    Kanał live: jedno zadanie odpytuje bazę o nowe wiersze i rozsyła zdarzenia
+    do kolejek wszystkich subskrybentów.
+
+    Odpytywanie idzie po czasie wiersza od znacznika pomniejszonego o overlap,
+    a nie po id: w PostgreSQL id z sekwencji jest nadawane przed commitem, więc
+    wiersz z niższym id zatwierdzony później byłby pominięty na zawsze. Wiersze
+    z zakładki są deduplikowane po kluczu i treści - poprawiona w miejscu
+    świeca jest wysyłana ponownie, niezmieniona nie.
+
+    Koszt odpytywania nie rośnie z liczbą klientów, a wolny klient
+    traci najstarsze zdarzenia zamiast blokować pozostałych.
+    """
+
+    def __init__(
+        self,
+        reader: AsyncMarketReader,
+        poll_interval: float = LIVE_POLL_INTERVAL,
+        overlap_seconds: float = LIVE_OVERLAP_SECONDS
+    ):
+        self.reader = reader
+        self.poll_interval = poll_interval
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._watermarks: Optional[Dict[str, Optional[datetime]]] = None
+        # Zdarzenie -> klucz wiersza (czas, ...) -> ostatnio wysłana treść
+        self._seen: Dict[str, Dict[tuple, tuple]] = {'candle': {}, 'sentiment': {}}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, payload: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((event, payload))
+
+    async def poll_once(self):
+        """Jedno odpytanie bazy - publikuje nowe i poprawione świece oraz punkty sentymentu."""
+        if not self._subscribers:
+            # Bez słuchaczy nie czytamy zaległości - po podłączeniu startujemy od bieżącego stanu
+            self._watermarks = None
+            return
+        first = self._watermarks is None
+        if first:
+            self._watermarks = await self.reader.latest_times()
+            self._seen = {'candle': {}, 'sentiment': {}}
+
+        candles = await self.reader.candles_since(self._since('candle'))
+        self._collect('candle', candles, lambda c: (c['timestamp'], c['exchange'], c['symbol'], c['timeframe']), first)
+        points = await self.reader.sentiment_since(self._since('sentiment'))
+        self._collect('sentiment', points, lambda p: (p['timestamp'], p['id']), first)
+
+    def _since(self, event: str) -> Optional[datetime]:
+        watermark = self._watermarks[event]
+        return None if watermark is None else watermark - self.overlap
+
+    def _collect(self, event: str, rows: List[Dict[str, Any]], key, prime: bool):
+        """Publikuje wiersze nowe lub zmienione od ostatniego odpytania (prime: tylko zapamiętuje zakładkę)."""
+        seen = self._seen[event]
+        for row in rows:
+            row_key = key(row)
+            content = tuple(row.values())
+            if seen.get(row_key) == content:
+                continue
+            seen[row_key] = content
+            watermark = self._watermarks[event]
+            if watermark is None or row['timestamp'] > watermark:
+                self._watermarks[event] = row['timestamp']
+            if not prime:
+                self.publish(event, row)
+
+        # Klucze sprzed zakładki nie wrócą w kolejnych odpytaniach
+        since = self._since(event)
+        if since is not None:
+            for row_key in [k for k in seen if k[0] < since]:
+                del seen[row_key]
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Błąd odpytywania kanału live: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> str:
+    data = json.dumps(payload, default=_json_default, separators=(',', ':'))
+    return f"event: {event}\nid: {event}-{payload.get('id', '')}\ndata: {data}\n\n"
+
+
+def _matches(event: str, payload: Dict[str, Any], filters: Dict[str, Optional[str]]) -> bool:
+    """Czy zdarzenie pasuje do filtrów subskrybenta (None = dowolna wartość)."""
+    if event == 'candle':
+        keys = ('exchange', 'symbol', 'timeframe')
+    else:
+        keys = ('sentiment_symbol', 'region')
+    for key in keys:
+        expected = filters.get(key)
+        field = 'symbol' if key == 'sentiment_symbol' else key
+        if expected is not None and payload.get(field) != expected:
+            return False
+    return True
+
+
+reader = AsyncMarketReader(
+    db.database_url,
+    pool_size=int(os.getenv('ASYNC_DB_POOL_SIZE', 10)),
+    max_overflow=int(os.getenv('ASYNC_DB_MAX_OVERFLOW', 10))
+)
+live_feed = LiveFeed(reader)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    live_feed.start()
+    yield
+    await live_feed.stop()
+    await reader.dispose()
+
+
+app = FastAPI(title="Sentiment Visualization API", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+
+@app.get('/api/health')
+async def health():
+    """Health check endpoint."""
+    return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+
+@app.get('/api/stream')
+async def stream_events(
+    request: Request,
+    channels: str = Query('candles,sentiment'),
+    exchange: Optional[str] = None,
+    symbol: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    sentiment_symbol: Optional[str] = None,
+    region: Optional[str] = None
+):
+    """
+    Server-Sent Events z nowymi świecami (event: candle) i punktami sentymentu
+    (event: sentiment) zapisywanymi przez daemony.
+
+    Query params:
+        channels: Kanały oddzielone przecinkami - candles, sentiment (domyślnie: oba)
+        exchange / symbol / timeframe: Filtr świec (domyślnie: wszystkie)
+        sentiment_symbol / region: Filtr sentymentu (domyślnie: wszystkie)
+    """
+    wanted = {c.strip() for c in channels.split(',') if c.strip()}
+    events = {name for channel, name in (('candles', 'candle'), ('sentiment', 'sentiment')) if channel in wanted}
+    filters = {
+        'exchange': exchange,
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'sentiment_symbol': sentiment_symbol,
+        'region': region.upper() if region else None
+    }
+    queue = live_feed.subscribe()
+
+    async def event_source():
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event, payload = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event in events and _matches(event, payload, filters):
+                    yield _sse(event, payload)
+        finally:
+            live_feed.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.get('/api/sentiment/timeseries')
+async def get_sentiment_timeseries(
+    symbol: str = 'BTC/USDC',
+    regions: Optional[str] = None,
+    days_back: int = 7,
+    resolution_hours: float = 1.0,
+    source: str = 'llm'
+):
+    """
+    Dane sentymentu jako time series (jak /api/sentiment/timeseries w Flask).
+
+    Query params:
+        symbol: Symbol kryptowaluty (domyślnie: BTC/USDC)
+        regions: Lista regionów oddzielona przecinkami (domyślnie: wszystkie)
+        days_back: Dni wstecz (domyślnie: 7)
+        resolution_hours: Rozdzielczość w godzinach (domyślnie: 1.0)
+        source: Źródło danych - 'llm' lub 'gdelt' (domyślnie: 'llm')
+    """
+    try:
+        region_list = [r.strip().upper() for r in regions.split(',')] if regions else None
+
+        if source == 'llm':
+            df = await reader.llm_sentiment_timeseries(symbol, region_list, days_back, resolution_hours)
+        else:  # gdelt
+            end_date = datetime.now(timezone.utc)
+            df = gdelt_score_timeseries(
+                await reader.gdelt_sentiment(region_list, end_date - timedelta(days=days_back), end_date)
+            )
+
+        payload, status = sentiment_timeseries_payload(df, source, symbol, days_back, resolution_hours)
+        return JSONResponse(payload, status_code=status)
+
+    except Exception as e:
+        logger.error(f"Błąd pobierania danych sentymentu: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get('/api/sentiment/range')
+async def get_sentiment_range(symbol: str = 'BTC/USDC', source: str = 'llm'):
+    """
+    Zakres dostępnych danych (min/max timestamp).
+
+    Query params:
+        symbol: Symbol kryptowaluty (domyślnie: BTC/USDC)
+        source: Źródło danych - 'llm' lub 'gdelt' (domyślnie: 'llm')
+    """
+    try:
+        return await reader.sentiment_range(symbol, source)
+    except Exception as e:
+        logger.error(f"Błąd pobierania zakresu danych: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get('/api/btc/candles/stream')
+async def stream_candles(
+    start: str,
+    end: Optional[str] = None,
+    exchange: str = 'binance',
+    symbol: str = 'BTC/USDC',
+    timeframe: str = '1h',
+    chunk_size: int = Query(5000, ge=100, le=50000)
+):
+    """
+    Strumieniuje duży zakres świec bez budowania całej odpowiedzi w pamięci.
+
+    Każda linia (NDJSON) to porcja w układzie kolumnowym:
+    {"timestamp": [ms, ...], "open": [...], "high": [...], "low": [...], "close": [...], "volume": [...]}.
+    Wskaźniki dla zakresu zwraca /api/btc/candles.
+    """
+    try:
+        start_date = _to_utc(start)
+        end_date = _to_utc(end) if end else _to_utc(datetime.now(timezone.utc))
+    except ValueError as e:
+        return JSONResponse({"error": f"Nieprawidłowy zakres start/end: {e}"}, status_code=400)
+    if start_date > end_date:
+        return JSONResponse({"error": "start musi być wcześniejszy niż end"}, status_code=400)
+
+    # Wybierz źródło z danymi (te same alternatywy co w /api/btc/price)
+    source = None
+    for source_exchange, source_symbol in [(exchange, symbol)] + ohlcv_fallback_sources(exchange, symbol):
+        if (await reader.has_native_ohlcv(source_exchange, source_symbol, timeframe)
+                or await reader.has_native_ohlcv(source_exchange, source_symbol, '1m')):
+            source = (source_exchange, source_symbol)
+            break
+    if source is None:
+        return JSONResponse({"error": "Brak danych OHLCV dla podanych parametrów"}, status_code=200)
+
+    async def body():
+        async for chunk in reader.stream_ohlcv(
+            source[0], source[1], timeframe, start_date, end_date, chunk_size=chunk_size
+        ):
+            columns = {"timestamp": (pd.DatetimeIndex(chunk.index).asi8 // 1_000_000).tolist()}
+            for name in chunk.columns:
+                columns[name] = chunk[name].astype(float).tolist()
+            yield json.dumps(columns, separators=(',', ':')) + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type='application/x-ndjson',
+        headers={'X-Candle-Source': f"{source[0]}:{source[1]}"}
+    )
+
+
+# Pozostałe endpointy (m.in. /api/btc/price, /api/btc/candles) obsługuje aplikacja Flask (w puli wątków)
+app.mount('/', WSGIMiddleware(flask_app))
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('FLASK_PORT', 5001))  # Ten sam port co Flask (5000 zajęty przez AirPlay)
+    logger.info(f"Uruchamiam ASGI API na porcie {port}")
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -200,7 +200,7 @@ start_backend() {
     # Uruchom backend
     cd "$BACKEND_DIR"
     source venv/bin/activate
-    python app.py > /tmp/flask_backend.log 2>&1 &
+    python asgi.py > /tmp/flask_backend.log 2>&1 &
     local backend_pid=$!
     
     # Zapisz PID
@@ -230,6 +230,7 @@ function App() {
   const [mapReady, setMapReady] = useState(false) // Czy mapa jest gotowa (mapRef.current ustawiony)
   const [daysBack, setDaysBack] = useState(1) // Domyślnie 1 dzień (dla testów z 12h danych)
   const [resolutionHours, setResolutionHours] = useState(1/60) // Domyślnie 1 minuta
+  const [liveVersion, setLiveVersion] = useState(0) // Zwiększane, gdy kanał live zgłosi nowy sentyment
   const mapRef = useRef(null) // Ref do mapy dla AdvancedMarkerElement
   const markersRef = useRef([]) // Ref do markerów, żeby je usunąć przy zmianie
   const pinsRef = useRef(new Map()) // Ref do PinElement dla każdego markera (region -> PinElement)
@@ -240,7 +241,10 @@ function App() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        setLoading(true)
+        // Odświeżenie z kanału live nie pokazuje ekranu ładowania
+        if (liveVersion === 0) {
+          setLoading(true)
+        }
         // Konwertuj daysBack na int (jeśli jest ułamkowy z godzin, zaokrąglij w górę)
         const daysBackInt = Math.ceil(daysBack)
         const params = {
@@ -272,7 +276,29 @@ function App() {
     }
 
     fetchData()
-  }, [daysBack, resolutionHours]) // Pobierz dane gdy zmienią się parametry
+  }, [daysBack, resolutionHours, liveVersion]) // Pobierz dane gdy zmienią się parametry lub przyjdą nowe
+
+  // Kanał live (SSE) - nowe punkty sentymentu zapisane przez daemony zamiast odpytywania
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return
+
+    let refreshTimeout = null
+    const source = new EventSource('/api/stream?channels=sentiment&sentiment_symbol=BTC/USDC')
+    source.addEventListener('sentiment', () => {
+      // Daemon zapisuje wiele regionów naraz - odśwież raz po serii zdarzeń
+      if (refreshTimeout) clearTimeout(refreshTimeout)
+      refreshTimeout = setTimeout(() => setLiveVersion(v => v + 1), 2000)
+    })
+    source.onerror = () => {
+      // EventSource sam wznawia połączenie; backend Flask bez /api/stream zwróci 404
+      console.warn('⚠️ Kanał live niedostępny')
+    }
+
+    return () => {
+      if (refreshTimeout) clearTimeout(refreshTimeout)
+      source.close()
+    }
+  }, [])
 
   // Pobierz zakres czasowy
   useEffect(() => {
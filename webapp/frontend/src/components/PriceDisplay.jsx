@@ -27,12 +27,67 @@ function resolutionHoursToTimeframe(resolutionHours) {
   return '1d'
 }
 
+// Ile świec po obu stronach timestampu pobierać jednym żądaniem /api/btc/candles
+const RANGE_CANDLES = 500
+
+function timeframeToMs(timeframe) {
+  const value = parseInt(timeframe, 10)
+  const unit = timeframe.slice(-1)
+  const unitMs = { m: 60 * 1000, h: 60 * 60 * 1000, d: 24 * 60 * 60 * 1000 }[unit]
+  return value * unitMs
+}
+
+// Timestamp ISO bez strefy traktowany jak UTC (jak _to_utc w backendzie)
+function toUtcMs(timestamp) {
+  const hasZone = /(Z|[+-]\d{2}:?\d{2})$/.test(timestamp)
+  return new Date(hasZone ? timestamp : `${timestamp}Z`).getTime()
+}
+
+// Ostatnia świeca nie późniejsza niż tsMs (wyszukiwanie binarne po posortowanych timestampach)
+function candleAt(columns, tsMs) {
+  const timestamps = columns.timestamp
+  let lo = 0
+  let hi = timestamps.length - 1
+  let found = -1
+  while (lo <= hi) {
+    const mid = (lo + hi) >> 1
+    if (timestamps[mid] <= tsMs) {
+      found = mid
+      lo = mid + 1
+    } else {
+      hi = mid - 1
+    }
+  }
+  if (found < 0) return null
+
+  const value = (name) => (columns[name] ? columns[name][found] : null)
+  const indicators = {}
+  Object.keys(columns).forEach((name) => {
+    if (!['timestamp', 'open', 'high', 'low', 'close', 'volume'].includes(name)) {
+      indicators[name] = value(name)
+    }
+  })
+  return {
+    timestamp: new Date(timestamps[found]).toISOString(),
+    price: value('close'),
+    open: value('open'),
+    high: value('high'),
+    low: value('low'),
+    close: value('close'),
+    volume: value('volume'),
+    indicators
+  }
+}
+
 const PriceDisplay = memo(function PriceDisplay({ timestamp, resolutionHours = 1/60 }) {
   const [priceData, setPriceData] = useState(null)
   const [loading, setLoading] = useState(false)
   const timeoutRef = useRef(null)
   const lastTimestampRef = useRef(null)
   const hasDataRef = useRef(false) // Ref do śledzenia, czy już mamy dane
+  // Załadowany zakres świec: { timeframe, startMs, endMs, columns } - przesuwanie slidera
+  // w jego obrębie nie wysyła żadnych żądań
+  const rangeRef = useRef(null)
 
   useEffect(() => {
     if (!timestamp) return
@@ -42,71 +97,76 @@ const PriceDisplay = memo(function PriceDisplay({ timestamp, resolutionHours = 1
       clearTimeout(timeoutRef.current)
     }
 
+    // Konwertuj resolutionHours na timeframe
+    const timeframe = resolutionHoursToTimeframe(resolutionHours)
+    const tsMs = toUtcMs(timestamp)
+    const range = rangeRef.current
+
+    // Timestamp w załadowanym zakresie - świeca i wskaźniki z pamięci
+    if (range && range.timeframe === timeframe && tsMs >= range.startMs && tsMs <= range.endMs) {
+      const candle = candleAt(range.columns, tsMs)
+      if (candle) {
+        setPriceData(candle)
+        hasDataRef.current = true
+        lastTimestampRef.current = timestamp
+        return
+      }
+    }
+
     // Jeśli timestamp się nie zmienił, nie pobieraj ponownie
-    if (lastTimestampRef.current === timestamp) {
-      console.log('📊 PriceDisplay: timestamp bez zmian, pomijam pobieranie:', timestamp)
+    if (lastTimestampRef.current === timestamp && range && range.timeframe === timeframe) {
       return
     }
 
-    console.log('📊 PriceDisplay: timestamp się zmienił, pobieram dane:', {
-      old: lastTimestampRef.current,
-      new: timestamp,
-      resolutionHours: resolutionHours
-    })
-
-    // Konwertuj resolutionHours na timeframe
-    const timeframe = resolutionHoursToTimeframe(resolutionHours)
-    
-    // Usuń debounce - kurs musi się zmieniać przy każdej zmianie slidera/klatki
-    // Tylko minimalny debounce (50ms) żeby uniknąć zbyt wielu requestów podczas szybkiego przesuwania
+    // Minimalny debounce (50ms) żeby uniknąć wielu żądań podczas szybkiego przesuwania poza zakresem
     const debounceTime = 50
 
     // Nie pokazuj "Ładowanie..." jeśli już mamy dane - to zapobiega miganiu
-    // Tylko ustaw loading jeśli nie mamy żadnych danych
     if (!hasDataRef.current) {
       setLoading(true)
     }
 
     timeoutRef.current = setTimeout(() => {
-      const fetchPrice = async () => {
+      const fetchRange = async () => {
+        const candleMs = timeframeToMs(timeframe)
+        const startMs = tsMs - RANGE_CANDLES * candleMs
+        const endMs = Math.min(tsMs + RANGE_CANDLES * candleMs, Date.now())
         try {
-          // Ustaw loading tylko jeśli nie mamy danych (żeby nie migać)
-          if (!hasDataRef.current) {
-            setLoading(true)
-          }
-          console.log('📊 PriceDisplay: Pobieram dane dla timestamp:', {
+          console.log('📊 PriceDisplay: Pobieram zakres świec:', {
             timestamp: timestamp,
             timeframe: timeframe,
-            resolutionHours: resolutionHours
+            start: new Date(startMs).toISOString(),
+            end: new Date(endMs).toISOString()
           })
-          const response = await axios.get('/api/btc/price', {
+          const response = await axios.get('/api/btc/candles', {
             params: {
-              timestamp: timestamp,
+              start: new Date(startMs).toISOString(),
+              end: new Date(endMs).toISOString(),
               exchange: 'binance',
               symbol: 'BTC/USDC',
               timeframe: timeframe,
-              resolution_hours: resolutionHours, // Przekaż resolution_hours do backendu
-              lookback_hours: 100
+              // Rozgrzewka wskaźników (SMA 200) przed początkiem zakresu
+              lookback_hours: Math.max(100, Math.ceil(200 * candleMs / (60 * 60 * 1000)))
             }
           })
-          console.log('✅ PriceDisplay: Otrzymano dane:', {
-            price: response.data?.price,
-            timestamp: timestamp,
-            timeframe: timeframe
-          })
-          setPriceData(response.data)
+          const columns = response.data?.columns
+          if (!columns || !columns.timestamp || columns.timestamp.length === 0) {
+            setPriceData({ error: response.data?.error || 'Brak danych kursu' })
+            return
+          }
+          rangeRef.current = { timeframe, startMs, endMs, columns }
+          setPriceData(candleAt(columns, tsMs) || { error: 'Brak danych kursu' })
           hasDataRef.current = true // Oznacz, że mamy dane
           lastTimestampRef.current = timestamp
         } catch (err) {
           console.error('❌ PriceDisplay: Błąd pobierania kursu BTC:', err)
           // Nie ustawiaj priceData na null jeśli już mamy dane - pokaż poprzednie dane
-          // setPriceData(null)
         } finally {
           setLoading(false)
         }
       }
 
-      fetchPrice()
+      fetchRange()
     }, debounceTime)
 
     return () => {
@@ -114,7 +174,7 @@ const PriceDisplay = memo(function PriceDisplay({ timestamp, resolutionHours = 1
         clearTimeout(timeoutRef.current)
       }
     }
-  }, [timestamp, resolutionHours]) // Dodano resolutionHours do zależności
+  }, [timestamp, resolutionHours])
 
   if (loading) {
     return (
@@ -35,7 +35,7 @@ fi
 echo "🔧 Uruchamiam backend API..."
 cd "$SCRIPT_DIR/backend"
 source venv/bin/activate
-python app.py &
+python asgi.py &
 BACKEND_PID=$!
 
 # Poczekaj chwilę na uruchomienie backendu